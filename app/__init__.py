@@ -21,11 +21,13 @@ def create_app():
     from app.routes.auth import auth_bp
     from app.routes.report import report_bp
     from app.routes.oauth import oauth_bp
+    from app.routes.screener import screener_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(company_bp, url_prefix='/api')
     app.register_blueprint(auth_bp)  # /login, /signup 등 직접 접근
     app.register_blueprint(report_bp)
     app.register_blueprint(oauth_bp)  # 소셜 로그인
+    app.register_blueprint(screener_bp)
     
     return app
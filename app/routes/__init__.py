@@ -1,7 +1,8 @@
 from app.routes.main import main_bp
 from app.routes.company import company_bp
 from app.routes.report import report_bp
+from app.routes.screener import screener_bp
 
-__all__ = ['main_bp', 'company_bp', 'report_bp']
+__all__ = ['main_bp', 'company_bp', 'report_bp', 'screener_bp']
 
 
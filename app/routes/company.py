@@ -196,98 +196,17 @@ def get_corp_code():
         return jsonify({'error': 'ticker is required', 'corp_code': ''})
     
     try:
-        # DART에서 기업 고유번호 조회
-        import requests
-        from dotenv import load_dotenv
-        load_dotenv()
+        from app.services.dart.corp_index import get_corp_index
         
-        api_key = os.environ.get('DART_API_KEY', '')
-        
-        if not api_key:
-            return jsonify({'error': 'DART API key not configured', 'corp_code': ''})
-        
-        # DART 기업 목록에서 종목코드로 검색
-        # 먼저 캐시된 DART 기업 목록을 사용하거나 API 호출
-        corp_code = find_corp_code_by_ticker(ticker, api_key)
+        # 로컬 고유번호 인덱스에서 종목코드로 검색 (저장본이 없을 때만 DART 다운로드)
+        index = get_corp_index()
+        if index is None:
+            return jsonify({'error': 'DART corp index unavailable', 'corp_code': ''})
         
         return jsonify({
             'ticker': ticker,
-            'corp_code': corp_code
+            'corp_code': index.corp_code(ticker)
         })
         
     except Exception as e:
         return jsonify({'error': str(e), 'corp_code': ''})
-
-
-# DART corp_code 캐시
-_dart_corp_cache = {}
-
-def find_corp_code_by_ticker(ticker, api_key):
-    """DART corp_code 조회 (캐시 사용)"""
-    global _dart_corp_cache
-    
-    # 캐시 확인
-    if ticker in _dart_corp_cache:
-        return _dart_corp_cache[ticker]
-    
-    # 캐시가 없으면 DART API 호출하여 전체 목록 로드
-    if not _dart_corp_cache:
-        load_dart_corp_list(api_key)
-    
-    return _dart_corp_cache.get(ticker, '')
-
-
-def load_dart_corp_list(api_key):
-    """DART 기업 목록 로드 (한번만 실행)"""
-    global _dart_corp_cache
-    
-    try:
-        import requests
-        import zipfile
-        import io
-        import xml.etree.ElementTree as ET
-        
-        # DART 기업코드 목록 다운로드
-        url = "https://opendart.fss.or.kr/api/corpCode.xml"
-        params = {"crtfc_key": api_key}
-        
-        print(f"[DART] Requesting corp list from API...")
-        response = requests.get(url, params=params, timeout=30)
-        
-        print(f"[DART] Response status: {response.status_code}, size: {len(response.content)} bytes")
-        
-        if response.status_code != 200:
-            print(f"[DART] API error: HTTP {response.status_code}")
-            return
-        
-        # 응답이 ZIP 파일인지 확인 (ZIP 파일은 PK로 시작)
-        if not response.content.startswith(b'PK'):
-            # ZIP이 아니면 에러 응답 (JSON 또는 XML)
-            try:
-                error_text = response.content.decode('utf-8')[:500]
-                print(f"[DART] API returned non-ZIP response: {error_text}")
-            except:
-                print(f"[DART] API returned non-ZIP response (unable to decode)")
-            return
-        
-        # ZIP 파일 압축 해제
-        with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-            with z.open('CORPCODE.xml') as f:
-                tree = ET.parse(f)
-                root = tree.getroot()
-                
-                for corp in root.findall('list'):
-                    stock_code = corp.findtext('stock_code', '').strip()
-                    corp_code = corp.findtext('corp_code', '').strip()
-                    
-                    if stock_code:
-                        _dart_corp_cache[stock_code] = corp_code
-        
-        print(f"[DART] Corp list loaded successfully: {len(_dart_corp_cache)} companies")
-        
-    except zipfile.BadZipFile as e:
-        print(f"[DART] BadZipFile error: API may have returned an error message instead of ZIP")
-    except requests.exceptions.Timeout:
-        print(f"[DART] Request timeout - API may be slow or unavailable")
-    except Exception as e:
-        print(f"[DART] Error loading corp list: {type(e).__name__}: {e}")
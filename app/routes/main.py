@@ -295,7 +295,7 @@ def check_credits():
 
 @main_bp.route('/api/portfolio/analyze', methods=['POST'])
 def analyze_portfolio():
-    """AI 포트폴리오 분석 API"""
+    """포트폴리오 분석 API (계산된 배분/리스크 + AI 조언)"""
     from flask import jsonify
     
     user_id = session.get('user_id')
@@ -323,70 +323,15 @@ def analyze_portfolio():
                 "error": f"크레딧이 부족합니다. (필요: {PORTFOLIO_COST}, 보유: {current_credits})"
             }), 400
         
-        # AI 분석 요청
-        from app.services.openai.analysis_service import chat_completion_json
+        # 배분/리스크는 가격 데이터로 계산, AI 는 조언 문장만 작성
+        from app.services.portfolio import build_portfolio_analysis
         
-        # 투자 성향에 따른 리스크 성향 설정
-        risk_profiles = {
-            'conservative': {'risk_tolerance': '낮음', 'stock_ratio': '20-40%', 'focus': '안정적 배당주, 대형주'},
-            'moderately_conservative': {'risk_tolerance': '낮음-중간', 'stock_ratio': '30-50%', 'focus': '우량 배당주, 성장주 일부'},
-            'moderate': {'risk_tolerance': '중간', 'stock_ratio': '40-60%', 'focus': '성장주와 가치주 균형'},
-            'moderately_aggressive': {'risk_tolerance': '중간-높음', 'stock_ratio': '60-80%', 'focus': '성장주 중심, 테마주'},
-            'aggressive': {'risk_tolerance': '높음', 'stock_ratio': '70-90%', 'focus': '고성장주, 소형주, 테마주'}
-        }
-        
-        risk_profile = risk_profiles.get(investment_type, risk_profiles['moderate'])
-        
-        company_list = "\n".join([f"- {c['name']} ({c['code']}, {c['market']})" for c in companies])
-        
-        system_prompt = f"""당신은 KORA AI의 포트폴리오 전문가입니다.
-사용자의 투자 성향과 선택한 기업들을 분석하여 최적의 포트폴리오 배분을 제안해주세요.
-
-## 사용자 투자 성향
-- 유형: {investment_type}
-- 점수: {investment_score}/50
-- 리스크 성향: {risk_profile['risk_tolerance']}
-- 권장 주식 비중: {risk_profile['stock_ratio']}
-- 투자 초점: {risk_profile['focus']}
-
-## 선택한 기업
-{company_list}
-
-## 총 투자 금액
-{total_amount:,}원
-
-반드시 아래 JSON 형식으로만 응답하세요:
-{{
-    "allocations": [
-        {{
-            "code": "종목코드",
-            "name": "기업명",
-            "percentage": 비중(숫자, 합이 100),
-            "opinion": "매수/보유/매도",
-            "opinion_class": "buy/hold/sell",
-            "reason": "배분 이유 (1문장)"
-        }}
-    ],
-    "risk_score": 리스크점수(0-100),
-    "risk_level": "낮음/중간/높음",
-    "expected_return_min": 최소예상수익률(숫자),
-    "expected_return_max": 최대예상수익률(숫자),
-    "advice": "투자 성향을 고려한 종합 조언 (3-5문장, 구체적인 조언과 주의사항 포함)"
-}}
-
-## 배분 원칙
-1. 사용자의 리스크 성향을 반드시 고려
-2. 분산 투자 원칙 적용 (단일 종목 최대 40%)
-3. 같은 업종 편중 방지
-4. 보수적 투자 성향일수록 대형주, 우량주 비중 확대
-5. 적극적 투자 성향일수록 성장주, 테마주 비중 가능"""
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": "위 기업들로 포트폴리오를 구성해주세요."}
-        ]
-        
-        analysis = chat_completion_json(messages, temperature=0.5, max_tokens=2000)
+        analysis = build_portfolio_analysis(
+            companies,
+            total_amount=total_amount,
+            investment_type=investment_type,
+            investment_score=investment_score
+        )
         
         if analysis:
             # 크레딧 차감
@@ -399,7 +344,7 @@ def analyze_portfolio():
                 "credits_used": PORTFOLIO_COST
             })
         else:
-            return jsonify({"success": False, "error": "AI 분석에 실패했습니다."}), 500
+            return jsonify({"success": False, "error": "가격 데이터가 있는 기업이 2개 이상 필요합니다."}), 400
         
     except Exception as e:
         print(f"Portfolio analysis error: {e}")
@@ -435,6 +380,13 @@ def save_portfolio():
             'created_at': firestore.SERVER_TIMESTAMP
         }
         
+        # 분석 결과 배분이 있으면 함께 저장 (시뮬레이션에서 재사용)
+        allocations = data.get('allocations') or []
+        if allocations:
+            portfolio_data['allocations'] = {
+                a['code']: a.get('percentage', 0) for a in allocations if a.get('code')
+            }
+        
         doc_ref = db.collection('portfolios').add(portfolio_data)
         
         return jsonify({
@@ -446,6 +398,86 @@ def save_portfolio():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@main_bp.route('/api/portfolio/simulate', methods=['POST'])
+def simulate_portfolio():
+    """
+    포트폴리오 과거 성과 시뮬레이션 API (배분 후보 일괄 비교)
+
+    Body:
+        portfolio_id: 저장된 포트폴리오 ID (companies 대신 사용 가능)
+        companies: [{'code', 'name'}] 선택 기업 목록
+        allocations: [{'code', 'percentage'}] 분석 결과 배분 (선택)
+        candidates: {이름: {종목코드: 비중}} 추가 비교 후보 (선택)
+        years: 1 / 3 / 5 (기본 3)
+        rebalance: none / monthly / quarterly / yearly (기본 quarterly)
+        total_amount: 초기 투자 금액 (기본 1,000만원)
+    """
+    from flask import jsonify
+
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"success": False, "error": "로그인이 필요합니다."}), 401
+
+    try:
+        data = request.get_json() or {}
+        companies = data.get('companies', [])
+        candidates = dict(data.get('candidates') or {})
+
+        # 저장된 포트폴리오 불러오기
+        portfolio_id = data.get('portfolio_id')
+        if portfolio_id:
+            from app.services.firebase import get_db
+
+            db = get_db()
+            if not db:
+                return jsonify({"success": False, "error": "DB 연결 실패"}), 500
+
+            doc = db.collection('portfolios').document(portfolio_id).get()
+            saved = doc.to_dict() if doc.exists else None
+            if not saved or saved.get('user_id') != user_id:
+                return jsonify({"success": False, "error": "포트폴리오를 찾을 수 없습니다."}), 404
+
+            companies = saved.get('companies', [])
+            if saved.get('allocations'):
+                candidates.setdefault(saved.get('name', '저장된 배분'), saved['allocations'])
+
+        allocations = data.get('allocations') or []
+        if allocations:
+            candidates.setdefault('추천 배분', {
+                a['code']: a.get('percentage', 0) for a in allocations if a.get('code')
+            })
+
+        codes = [c.get('code') for c in companies if c.get('code')]
+        if codes:
+            candidates.setdefault('균등 비중', {code: 1 for code in codes})
+
+        if not candidates:
+            return jsonify({"success": False, "error": "시뮬레이션할 배분이 없습니다."}), 400
+
+        from app.services.portfolio import simulate_portfolios
+
+        initial_amount = float(data.get('total_amount') or 10000000)
+        if initial_amount <= 0:
+            raise ValueError(f"초기 투자 금액은 0보다 커야 합니다: {initial_amount}")
+
+        result = simulate_portfolios(
+            candidates,
+            years=int(data.get('years', 3)),
+            rebalance=data.get('rebalance', 'quarterly'),
+            initial_amount=initial_amount
+        )
+
+        if result:
+            return jsonify({"success": True, "simulation": result})
+        return jsonify({"success": False, "error": "가격 데이터가 있는 기업이 없습니다."}), 400
+
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        print(f"Portfolio simulation error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @main_bp.route('/api/credits/purchase', methods=['POST'])
 def purchase_credits():
     """크레딧 충전 API"""
@@ -7,7 +7,7 @@
 - 보고서 저장/조회 API
 """
 
-from flask import Blueprint, render_template, request, jsonify, session
+from flask import Blueprint, Response, render_template, request, jsonify, session
 import json
 import numpy as np
 
@@ -289,33 +289,90 @@ def chat_with_report():
 
 @report_bp.route('/api/report/price-history/<ticker>')
 def get_price_history(ticker):
-    """차트용 가격 히스토리 API"""
+    """
+    차트용 가격 히스토리 API
+
+    Query:
+        days: 조회 기간 (기본 365일)
+        points: 최대 점 개수 (지정 시 LTTB 다운샘플링)
+        resolution: daily | weekly | monthly | auto (기본: points 지정 시 auto, 아니면 daily)
+        format: records (기본, [{date, open, ...}]) | columnar ({date: [...], close: [...]}) | msgpack
+    """
+    from app.services.krx.krx_pool import KrxBusyError, KrxTimeoutError
+
     try:
         days = request.args.get('days', 365, type=int)
-        
-        from app.services.krx.stock_service import get_price_history as fetch_price_history
-        history = fetch_price_history(ticker, days=days)
-        
-        if history:
-            data = [
-                {
-                    "date": h.date,
-                    "open": h.open,
-                    "high": h.high,
-                    "low": h.low,
-                    "close": h.close,
-                    "volume": h.volume
-                }
-                for h in history
-            ]
-            return jsonify({"success": True, "data": data})
+        points = request.args.get('points', type=int)
+        resolution = request.args.get('resolution', 'auto' if points else 'daily')
+        fmt = request.args.get('format', 'records')
+        fields = ["date", "open", "high", "low", "close", "volume"]
+
+        if points is not None and points < 3:
+            return jsonify({"success": False, "error": "points는 3 이상이어야 합니다."}), 400
+        if resolution not in ('auto', 'daily', 'weekly', 'monthly'):
+            return jsonify({"success": False, "error": f"지원하지 않는 resolution: {resolution}"}), 400
+        
+        if resolution == 'daily' and not points:
+            from app.services.krx.stock_service import get_price_history as fetch_price_history
+            history = fetch_price_history(ticker, days=days)
         else:
+            from datetime import datetime, timedelta
+            from app.services.krx.price_pyramid import get_chart_series
+            from app.services.krx.trading_calendar import latest_trading_day
+
+            end = latest_trading_day()
+            start = (datetime.strptime(end, "%Y%m%d") - timedelta(days=days)).strftime("%Y%m%d")
+            history = get_chart_series(ticker, start, end, points=points, resolution=resolution)
+        
+        if not history:
             return jsonify({"success": False, "error": "데이터 없음"}), 404
-            
+
+        if fmt == 'msgpack':
+            return Response(history.to_msgpack(fields), mimetype='application/x-msgpack')
+        if fmt == 'columnar':
+            return jsonify({"success": True, "data": history.to_columnar(fields)})
+        return jsonify({"success": True, "data": history.to_records(fields)})
+
+    except (KrxTimeoutError, KrxBusyError) as e:
+        return jsonify({"success": False, "error": f"KRX 응답 지연: {e}"}), 503
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@report_bp.route('/api/report/valuation-band/<ticker>')
+def get_valuation_band(ticker):
+    """
+    차트용 과거 PER/PBR 밴드 API (주간 이력, 저장된 데이터만 사용)
+
+    Query:
+        years: 밴드 기간 (기본 5년)
+        points: 시계열 최대 점 개수 (기본 60)
+    """
+    try:
+        from app.services.krx.valuation_history import get_valuation_band as fetch_valuation_band
+
+        years = request.args.get('years', 5, type=int)
+        points = request.args.get('points', 60, type=int)
+        if years < 1 or points < 2:
+            return jsonify({"success": False, "error": "years는 1 이상, points는 2 이상이어야 합니다."}), 400
+
+        band = fetch_valuation_band(ticker, years=years, points=points)
+        if not band:
+            return jsonify({"success": False, "error": "데이터 없음"}), 404
+        return jsonify({"success": True, "data": band})
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@report_bp.route('/api/report/krx-status')
+def get_krx_status():
+    """KRX 조회 풀 상태 API (대기열 길이, 실행 수, 시간 초과/거부 건수)"""
+    from app.services.krx.krx_pool import get_pool_stats
+
+    return jsonify({"success": True, "data": get_pool_stats()})
+
+
 @report_bp.route('/api/report/request-answer', methods=['POST'])
 def answer_request():
     """사용자 요청사항에 대한 AI 답변"""
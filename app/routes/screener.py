@@ -0,0 +1,67 @@
+"""
+스크리너 관련 라우트
+- 기술적 지표 스크리닝 API
+- 재무/밸류에이션 스크리닝 API
+"""
+
+from flask import Blueprint, request, jsonify
+
+screener_bp = Blueprint('screener', __name__)
+
+
+def _run_screen(screen, presets, default_sort, default_order):
+    """
+    공통 쿼리 파라미터로 스크리닝 실행
+
+    Query:
+        q: 필터 식 또는 프리셋 이름
+        market: KOSPI / KOSDAQ (선택)
+        sort: 정렬 컬럼
+        order: asc / desc
+        page, page_size: 페이지 (기본 1, 50)
+    """
+    from app.services.screener import ExpressionError
+
+    try:
+        expression = request.args.get('q', '').strip()
+        if not expression:
+            return jsonify({
+                "success": False,
+                "error": "필터 식(q)을 입력해주세요.",
+                "presets": presets
+            }), 400
+
+        result = screen(
+            expression,
+            market=request.args.get('market') or None,
+            sort=request.args.get('sort', default_sort),
+            ascending=request.args.get('order', default_order).lower() != 'desc',
+            page=request.args.get('page', 1, type=int),
+            page_size=request.args.get('page_size', 50, type=int),
+        )
+        if not result:
+            return jsonify({"success": False, "error": "스크리닝 데이터가 아직 준비되지 않았습니다."}), 503
+
+        return jsonify({"success": True, "data": result})
+
+    except ExpressionError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        print(f"[Screener] 스크리닝 오류: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@screener_bp.route('/api/screener/technical')
+def technical_screener():
+    """기술적 지표 스크리닝 (예: q=rsi < 30 and volume_surge, 기본 정렬 rsi 오름차순)"""
+    from app.services.screener import screen_technical, TECHNICAL_PRESETS
+
+    return _run_screen(screen_technical, TECHNICAL_PRESETS, 'rsi', 'asc')
+
+
+@screener_bp.route('/api/screener/fundamental')
+def fundamental_screener():
+    """재무/밸류에이션 스크리닝 (예: q=per < 10 and roe >= 15, 기본 정렬 시가총액 내림차순)"""
+    from app.services.screener import screen_fundamental, FUNDAMENTAL_PRESETS
+
+    return _run_screen(screen_fundamental, FUNDAMENTAL_PRESETS, 'market_cap', 'desc')
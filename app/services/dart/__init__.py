@@ -1,5 +1,26 @@
 # DART OpenAPI Services
-# TODO: DART 전자공시 API 연동 예정
-
-__all__ = []
+from app.services.dart.dart_client import (
+    get_dart_client,
+    DartApiError,
+    DartClient,
+)
+from app.services.dart.corp_index import (
+    get_corp_index,
+    get_corp_code,
+    find_corp_code_by_name,
+    get_corp_info,
+    CorpIndex,
+    CorpInfo,
+)
 
+__all__ = [
+    'get_dart_client',
+    'DartApiError',
+    'DartClient',
+    'get_corp_index',
+    'get_corp_code',
+    'find_corp_code_by_name',
+    'get_corp_info',
+    'CorpIndex',
+    'CorpInfo',
+]
@@ -0,0 +1,332 @@
+"""
+DART 고유번호 인덱스
+
+DART corpCode.xml(전체 약 10만 개 기업)을 스트리밍 파서(iterparse)로 읽어
+종목코드 → 고유번호, 회사명 → 고유번호, 고유번호 → 메타데이터 조회용 컬럼형 테이블로
+data/cache/dart/corp_index.npz 에 저장한다.
+
+- 고유번호/종목코드는 고정 길이 바이트 배열, 회사명은 UTF-8 연결 바이트 + 오프셋으로 보관 (약 0.6MB)
+- 프로세스 시작 후 첫 조회는 디스크에서 로드만 하며(수십 ms), 다운로드는 하지 않는다
+- 저장본이 하루 이상 지났으면 기존 인덱스로 응답하면서 백그라운드에서 한 번 갱신
+- 저장본이 아예 없을 때만 요청 스레드에서 생성 (일별 작업에서 미리 생성)
+- 생성/갱신은 _build_lock 으로 프로세스당 한 번에 하나만 실행
+
+실행:
+    python -m app.services.dart.corp_index
+"""
+
+import io
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.dart.dart_client import get_dart_client
+from app.utils.local_store import atomic_write_bytes, get_cache_dir
+
+
+# 저장본 갱신 주기 (초)
+CORP_INDEX_MAX_AGE = 24 * 3600
+
+# 생성 실패 후 재시도 대기 시간 (초)
+CORP_INDEX_RETRY_INTERVAL = 600
+
+_index: Optional["CorpIndex"] = None
+_index_lock = threading.Lock()
+_build_lock = threading.Lock()
+_refreshing = False
+_retry_after = 0.0
+
+
+def _index_path() -> str:
+    return os.path.join(get_cache_dir('dart'), 'corp_index.npz')
+
+
+@dataclass
+class CorpInfo:
+    """
+    DART 기업 메타데이터
+    """
+    corp_code: str               # 고유번호 (8자리)
+    corp_name: str               # 회사명
+    stock_code: str = ""         # 종목코드 (상장사만)
+    modify_date: str = ""        # 최종 변경일 (YYYYMMDD)
+
+
+class CorpIndex:
+    """
+    고유번호 컬럼형 테이블
+
+    종목코드 조회 사전은 상장사만 로드 시 만들고,
+    고유번호/회사명 사전은 처음 사용할 때 만든다.
+    """
+
+    def __init__(self, corp_codes: np.ndarray, stock_codes: np.ndarray, modify_dates: np.ndarray,
+                 names: List[str], built_at: float):
+        self.corp_codes = corp_codes
+        self.stock_codes = stock_codes
+        self.modify_dates = modify_dates
+        self.names = names
+        self.built_at = built_at
+
+        listed = np.flatnonzero(stock_codes != b'')
+        self._by_ticker: Dict[str, int] = {
+            stock_codes[i].decode(): int(i) for i in listed
+        }
+        self._by_code: Optional[Dict[str, int]] = None
+        self._by_name: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.corp_codes)
+
+    def is_stale(self) -> bool:
+        return time.time() - self.built_at > CORP_INDEX_MAX_AGE
+
+    def _info(self, i: int) -> CorpInfo:
+        date = int(self.modify_dates[i])
+        return CorpInfo(
+            corp_code=self.corp_codes[i].decode(),
+            corp_name=self.names[i],
+            stock_code=self.stock_codes[i].decode(),
+            modify_date=str(date) if date else "",
+        )
+
+    def corp_code(self, ticker: str) -> str:
+        """종목코드 → 고유번호 (없으면 빈 문자열)"""
+        i = self._by_ticker.get(ticker)
+        return self.corp_codes[i].decode() if i is not None else ""
+
+    def get(self, corp_code: str) -> Optional[CorpInfo]:
+        """고유번호 → 메타데이터 (없으면 None)"""
+        if self._by_code is None:
+            self._by_code = {code.decode(): i for i, code in enumerate(self.corp_codes.tolist())}
+        i = self._by_code.get(corp_code)
+        return self._info(i) if i is not None else None
+
+    def find_by_name(self, name: str) -> Optional[CorpInfo]:
+        """회사명 정확히 일치 → 메타데이터 (동명 기업은 상장사 우선)"""
+        if self._by_name is None:
+            by_name: Dict[str, int] = {}
+            for i, corp_name in enumerate(self.names):
+                if corp_name not in by_name or self.stock_codes[i]:
+                    by_name[corp_name] = i
+            self._by_name = by_name
+        i = self._by_name.get(name.strip())
+        return self._info(i) if i is not None else None
+
+    def tickers(self) -> List[str]:
+        """고유번호가 있는 상장 종목코드 목록"""
+        return sorted(self._by_ticker)
+
+    # ============================================
+    # 저장 / 로드
+    # ============================================
+
+    def save(self) -> None:
+        encoded = [name.encode('utf-8') for name in self.names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            corp_code=self.corp_codes,
+            stock_code=self.stock_codes,
+            modify_date=self.modify_dates,
+            name_bytes=np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            name_offsets=offsets,
+            _built_at=np.float64(self.built_at),
+        )
+        atomic_write_bytes(_index_path(), buffer.getvalue())
+
+    @classmethod
+    def load(cls) -> Optional["CorpIndex"]:
+        path = _index_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                blob = data['name_bytes'].tobytes()
+                offsets = data['name_offsets'].tolist()
+                names = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+                return cls(data['corp_code'], data['stock_code'], data['modify_date'],
+                           names, float(data['_built_at']))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[CorpIndex] 로드 오류: {e}")
+            return None
+
+
+# ============================================
+# 생성
+# ============================================
+
+def parse_corp_codes(stream) -> CorpIndex:
+    """
+    CORPCODE.xml 스트림 → CorpIndex (항목 단위로 읽고 바로 해제)
+
+    <result><list><corp_code/><corp_name/><stock_code/><modify_date/></list>...</result>
+    """
+    corp_codes: List[bytes] = []
+    stock_codes: List[bytes] = []
+    modify_dates: List[int] = []
+    names: List[str] = []
+
+    for _, elem in ET.iterparse(stream, events=('end',)):
+        if elem.tag != 'list':
+            continue
+        corp_codes.append((elem.findtext('corp_code') or '').strip().encode())
+        stock_codes.append((elem.findtext('stock_code') or '').strip().encode())
+        names.append((elem.findtext('corp_name') or '').strip())
+        date = (elem.findtext('modify_date') or '').strip()
+        modify_dates.append(int(date) if date.isdigit() else 0)
+        elem.clear()
+
+    return CorpIndex(
+        np.array(corp_codes, dtype='S8'),
+        np.array(stock_codes, dtype='S6'),
+        np.array(modify_dates, dtype=np.int32),
+        names,
+        built_at=time.time(),
+    )
+
+
+def build_corp_index() -> CorpIndex:
+    """
+    DART corpCode.xml 다운로드 → 인덱스 생성 및 저장
+
+    Raises:
+        ValueError: ZIP 이 아닌 응답 (API 키 오류 등)
+    """
+    global _index
+
+    started = time.time()
+    content = get_dart_client().download("corpCode.xml")
+    if not content.startswith(b'PK'):
+        raise ValueError(f"corpCode.xml ZIP 응답 아님: {content[:200].decode('utf-8', 'replace')}")
+
+    with zipfile.ZipFile(io.BytesIO(content)) as z:
+        member = next((n for n in z.namelist() if n.lower().endswith('.xml')), 'CORPCODE.xml')
+        with z.open(member) as f:
+            index = parse_corp_codes(f)
+
+    index.save()
+    with _index_lock:
+        _index = index
+
+    print(f"[CorpIndex] {len(index)}개 기업 (상장 {len(index.tickers())}개) 인덱스 저장 "
+          f"({time.time() - started:.1f}초)")
+    return index
+
+
+def _refresh_in_background() -> None:
+    """저장본이 오래된 경우 한 번만 백그라운드 갱신"""
+    global _refreshing
+
+    def run():
+        global _index, _refreshing, _retry_after
+        try:
+            with _build_lock:
+                # 다른 스레드/프로세스가 이미 갱신했으면 다시 받지 않음
+                latest = CorpIndex.load()
+                if latest is not None and not latest.is_stale():
+                    with _index_lock:
+                        _index = latest
+                else:
+                    build_corp_index()
+        except Exception as e:
+            print(f"[CorpIndex] 갱신 오류: {e}")
+            _retry_after = time.time() + CORP_INDEX_RETRY_INTERVAL
+        finally:
+            with _index_lock:
+                _refreshing = False
+
+    with _index_lock:
+        if _refreshing or time.time() < _retry_after:
+            return
+        _refreshing = True
+    threading.Thread(target=run, name='corp-index-refresh', daemon=True).start()
+
+
+def get_corp_index() -> Optional[CorpIndex]:
+    """
+    고유번호 인덱스 조회 (메모리 → 디스크, 저장본이 없을 때만 다운로드)
+
+    Returns:
+        CorpIndex 또는 None (저장본이 없고 생성도 실패한 경우)
+
+    Example:
+        >>> index = get_corp_index()
+        >>> print(index.corp_code("055550"), index.find_by_name("신한지주"))
+    """
+    global _index, _retry_after
+
+    with _index_lock:
+        if _index is None:
+            _index = CorpIndex.load()
+        index = _index
+
+    if index is None:
+        # 동시 요청은 한 스레드의 생성을 기다린 뒤 그 결과를 사용
+        with _build_lock:
+            with _index_lock:
+                index = _index
+            if index is not None:
+                return index
+            if time.time() < _retry_after:
+                return None
+            try:
+                return build_corp_index()
+            except Exception as e:
+                print(f"[CorpIndex] 생성 오류: {e}")
+                _retry_after = time.time() + CORP_INDEX_RETRY_INTERVAL
+                return None
+
+    if index.is_stale():
+        _refresh_in_background()
+    return index
+
+
+def refresh_corp_index() -> int:
+    """저장본이 하루 이상 지났으면 다시 생성 (일별 작업용, 기업 수 반환)"""
+    with _build_lock:
+        index = CorpIndex.load()
+        if index is None or index.is_stale():
+            index = build_corp_index()
+    return len(index)
+
+
+# ============================================
+# 편의 함수
+# ============================================
+
+def get_corp_code(ticker: str) -> str:
+    """종목코드 → DART 고유번호 (없으면 빈 문자열)"""
+    index = get_corp_index()
+    return index.corp_code(ticker) if index else ""
+
+
+def find_corp_code_by_name(name: str) -> str:
+    """회사명 → DART 고유번호 (없으면 빈 문자열)"""
+    index = get_corp_index()
+    info = index.find_by_name(name) if index else None
+    return info.corp_code if info else ""
+
+
+def get_corp_info(corp_code: str) -> Optional[CorpInfo]:
+    """DART 고유번호 → 메타데이터 (없으면 None)"""
+    index = get_corp_index()
+    return index.get(corp_code) if index else None
+
+
+if __name__ == "__main__":
+    build_corp_index()
+
+    started = time.time()
+    index = CorpIndex.load()
+    print(f"로드 {(time.time() - started) * 1000:.0f}ms, {len(index)}개 기업")
+    print(index.corp_code("055550"), index.find_by_name("신한지주"), index.get("00382199"))
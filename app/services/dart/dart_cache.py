@@ -0,0 +1,186 @@
+# dart_cache.py
+# DART 응답 디스크 캐시 (SQLite)
+#
+# data/cache/dart/responses.sqlite 에 (엔드포인트, 파라미터) → 응답 JSON 을 저장한다.
+# WAL 모드로 여러 워커 프로세스가 같은 파일을 동시에 읽고 쓰며, 재시작 후에도 유지된다.
+#
+# 만료 정책 (cache_ttl):
+# - 마감된 보고서 기간(사업연도 + 보고서 코드의 제출 기한 경과)의 재무/배당/주식총수: 영구
+# - 아직 제출 기한 전인 기간: 1일 (조기 제출/정정 반영)
+# - list.json (공시 목록): 6시간
+# - company.json (기업 개황): 7일
+# - 013(조회된 데이터 없음): 1일 (제출 후 다시 조회)
+# - 그 외 상태 코드(오류/요청 제한)는 저장하지 않음
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.utils.local_store import get_cache_dir
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# 엔드포인트별 기본 만료 시간 (초)
+ENDPOINT_TTL = {
+    "list.json": 6 * HOUR,
+    "company.json": 7 * DAY,
+}
+DEFAULT_TTL = DAY
+
+# 사업연도/보고서 기간 단위 엔드포인트 (마감된 기간은 영구 보관)
+PERIOD_ENDPOINTS = {
+    "fnlttSinglAcntAll.json",
+    "fnlttSinglIndx.json",
+    "fnlttMultiAcnt.json",
+    "alotMatter.json",
+    "stockTotqySttus.json",
+}
+OPEN_PERIOD_TTL = DAY
+NO_DATA_TTL = DAY
+
+# 보고서 코드 → 제출 기한 (사업연도 기준 연도 오프셋, 월, 일)
+REPORT_DEADLINES = {
+    "11013": (0, 5, 15),    # 1분기보고서
+    "11012": (0, 8, 14),    # 반기보고서
+    "11014": (0, 11, 14),   # 3분기보고서
+    "11011": (1, 3, 31),    # 사업보고서
+}
+
+# 저장 대상 상태 코드
+CACHEABLE_STATUSES = {"000", "013"}
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+
+
+def _db_path() -> str:
+    return os.path.join(get_cache_dir('dart'), 'responses.sqlite')
+
+
+def _connect() -> sqlite3.Connection:
+    """현재 스레드(프로세스)용 연결 (fork 후에는 새로 연결)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid() and _local.path == _db_path():
+        return conn
+
+    path = _db_path()
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    with _schema_lock:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " endpoint TEXT NOT NULL,"
+            " body TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " expires_at REAL)"     # NULL: 영구
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires_at)")
+
+    _local.conn, _local.pid, _local.path = conn, os.getpid(), path
+    return conn
+
+
+def cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """엔드포인트 + 정렬된 파라미터 (API 키 제외)"""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k != "crtfc_key")
+    return endpoint + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+def period_closed(bsns_year: str, reprt_code: str, now: datetime = None) -> bool:
+    """사업연도 + 보고서 코드의 제출 기한이 지났는지 여부 (기한 후 15일 여유)"""
+    now = now or datetime.now()
+    try:
+        offset, month, day = REPORT_DEADLINES.get(str(reprt_code), REPORT_DEADLINES["11011"])
+        deadline = datetime(int(bsns_year) + offset, month, day)
+    except (TypeError, ValueError):
+        return False
+    return (now - deadline).days > 15
+
+
+def cache_ttl(endpoint: str, params: Dict[str, Any], data: Dict[str, Any]) -> Optional[float]:
+    """
+    응답의 보관 기간 (초)
+
+    Returns:
+        None: 영구, 0: 저장하지 않음, 양수: 만료까지 초
+    """
+    status = data.get("status")
+    if status not in CACHEABLE_STATUSES:
+        return 0
+    if status == "013":
+        return NO_DATA_TTL
+
+    if endpoint in PERIOD_ENDPOINTS:
+        if params.get("bsns_year") and period_closed(params["bsns_year"], params.get("reprt_code", "11011")):
+            return None
+        return OPEN_PERIOD_TTL
+
+    return ENDPOINT_TTL.get(endpoint, DEFAULT_TTL)
+
+
+def get_cached(endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """만료되지 않은 저장 응답 (없으면 None)"""
+    try:
+        row = _connect().execute(
+            "SELECT body FROM responses WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (cache_key(endpoint, params), time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, ValueError) as e:
+        print(f"[DartCache] 조회 오류: {e}")
+        return None
+
+
+def put_cached(endpoint: str, params: Dict[str, Any], data: Dict[str, Any]) -> bool:
+    """정책에 따라 응답 저장 (저장했으면 True)"""
+    ttl = cache_ttl(endpoint, params, data)
+    if ttl == 0:
+        return False
+
+    now = time.time()
+    try:
+        _connect().execute(
+            "INSERT OR REPLACE INTO responses (key, endpoint, body, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (cache_key(endpoint, params), endpoint, json.dumps(data, ensure_ascii=False),
+             now, None if ttl is None else now + ttl),
+        )
+        return True
+    except sqlite3.Error as e:
+        print(f"[DartCache] 저장 오류: {e}")
+        return False
+
+
+def purge_expired() -> int:
+    """만료된 응답 삭제 (삭제 건수)"""
+    try:
+        return _connect().execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+    except sqlite3.Error as e:
+        print(f"[DartCache] 정리 오류: {e}")
+        return 0
+
+
+def get_cache_info() -> Dict[str, Any]:
+    """엔드포인트별 저장 건수 / 영구 보관 건수 / 파일 크기"""
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT endpoint, COUNT(*), SUM(expires_at IS NULL) FROM responses GROUP BY endpoint"
+    ).fetchall()
+    return {
+        'path': _db_path(),
+        'size': os.path.getsize(_db_path()),
+        'endpoints': {endpoint: {'entries': count, 'permanent': permanent} for endpoint, count, permanent in rows},
+    }
+
+
+if __name__ == "__main__":
+    print(f"만료 삭제: {purge_expired()}건")
+    print(get_cache_info())
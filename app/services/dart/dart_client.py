@@ -0,0 +1,233 @@
+# dart_client.py
+# DART OpenAPI 공통 클라이언트
+#
+# - 연결 재사용 (keep-alive 세션, 커넥션 풀)
+# - 엔드포인트별 (연결, 응답) 제한 시간
+# - 일시적 오류 재시도 (지수 백오프 + 지터)
+#     · 네트워크 오류 / 시간 초과 / HTTP 429, 5xx
+#     · DART 상태 코드 020(요청 제한 초과), 800(시스템 점검), 900(정의되지 않은 오류)
+# - API 키는 .env 의 DART_API_KEY 를 자동으로 붙인다
+# - JSON 응답은 엔드포인트별 만료 정책으로 디스크 캐시(dart_cache, SQLite)에 보관
+
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from app.services.dart import dart_cache
+
+# 프로젝트 루트의 .env 파일 로드
+env_path = Path(__file__).resolve().parents[3] / ".env"
+load_dotenv(env_path)
+
+BASE_URL = "https://opendart.fss.or.kr/api"
+
+# 엔드포인트별 (연결, 응답) 제한 시간 (초)
+ENDPOINT_TIMEOUTS = {
+    "company.json": (3.05, 10),
+    "list.json": (3.05, 10),
+    "alotMatter.json": (3.05, 10),
+    "stockTotqySttus.json": (3.05, 10),
+    "fnlttSinglIndx.json": (3.05, 15),
+    "fnlttSinglAcntAll.json": (3.05, 20),
+    "fnlttMultiAcnt.json": (3.05, 30),
+    "corpCode.xml": (3.05, 60),
+}
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# 재시도 설정
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5          # 일시적 오류 기본 대기 (초)
+RATE_LIMIT_BACKOFF = 5.0    # 020 요청 제한 초과 기본 대기 (초)
+BACKOFF_MAX = 30.0
+
+# 세션 커넥션 풀 크기 (동시 요청 스레드 수 이상)
+POOL_SIZE = 16
+
+# DART 상태 코드
+STATUS_OK = "000"
+STATUS_NO_DATA = "013"
+STATUS_RATE_LIMIT = "020"
+STATUS_MESSAGES = {
+    "000": "정상",
+    "010": "등록되지 않은 키",
+    "011": "사용할 수 없는 키",
+    "012": "접근할 수 없는 IP",
+    "013": "조회된 데이터 없음",
+    "014": "파일이 존재하지 않음",
+    "020": "요청 제한 초과",
+    "021": "조회 가능한 회사 개수 초과",
+    "100": "필드의 부적절한 값",
+    "101": "부적절한 접근",
+    "800": "시스템 점검",
+    "900": "정의되지 않은 오류",
+    "901": "개인정보 보유기간 만료 키",
+}
+RETRY_STATUSES = {"020", "800", "900"}
+RETRY_HTTP_CODES = {429, 500, 502, 503, 504}
+
+
+class DartApiError(Exception):
+    """재시도 후에도 DART 응답을 받지 못한 경우 (status: DART 상태 코드 또는 HTTP 코드)"""
+
+    def __init__(self, message: str, status: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class DartClient:
+    """
+    DART OpenAPI 클라이언트 (스레드 간 공유)
+
+    Example:
+        >>> client = get_dart_client()
+        >>> data = client.get("company.json", {"corp_code": "00382199"})
+        >>> print(data["status"], data.get("corp_name"))
+    """
+
+    def __init__(self, api_key: str = None, max_retries: int = MAX_RETRIES, pool_size: int = POOL_SIZE):
+        self.api_key = api_key if api_key is not None else os.getenv("DART_API_KEY", "")
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0, "cache_hits": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _backoff(self, attempt: int, base: float) -> float:
+        """지수 백오프 + 전체 지터 (동시 재시도가 몰리지 않도록 분산)"""
+        return random.uniform(base, min(BACKOFF_MAX, base * 2 ** (attempt + 1)))
+
+    def _send(self, endpoint: str, params: Dict[str, Any], timeout=None) -> requests.Response:
+        """재시도 포함 GET 요청 (응답 본문 판별은 호출 측)"""
+        params = dict(params or {})
+        params.setdefault("crtfc_key", self.api_key)
+        timeout = timeout or ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        url = f"{BASE_URL}/{endpoint}"
+
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                res = self.session.get(url, params=params, timeout=timeout)
+                if res.status_code not in RETRY_HTTP_CODES:
+                    return res
+                error: Exception = DartApiError(f"HTTP {res.status_code}", str(res.status_code))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt >= self.max_retries:
+                self._count("failures")
+                raise error
+            wait = self._backoff(attempt, BACKOFF_BASE)
+            print(f"[DART] {endpoint} 재시도 {attempt + 1}/{self.max_retries} ({wait:.1f}초 후): {error}")
+            self._count("retries")
+            time.sleep(wait)
+            attempt += 1
+
+    def get(self, endpoint: str, params: Dict[str, Any] = None, timeout=None, cache: bool = True) -> Dict[str, Any]:
+        """
+        JSON API 조회 (디스크 캐시 우선)
+
+        Args:
+            endpoint: API 이름 (예: "company.json")
+            params: 요청 파라미터 (crtfc_key 제외)
+            timeout: (연결, 응답) 제한 시간 (기본: 엔드포인트별 설정)
+            cache: 디스크 캐시 사용 여부 (False면 항상 새로 조회하고 저장도 하지 않음)
+
+        Returns:
+            DART 응답 딕셔너리 ('status', 'message', 'list' 등)
+            재시도 대상 상태 코드(020 등)가 끝까지 이어지면 마지막 응답을 그대로 반환
+
+        Raises:
+            requests.RequestException / DartApiError: 재시도 후에도 네트워크/HTTP 오류
+        """
+        params = params or {}
+        if cache:
+            cached = dart_cache.get_cached(endpoint, params)
+            if cached is not None:
+                self._count("cache_hits")
+                return cached
+
+        attempt = 0
+        while True:
+            res = self._send(endpoint, params, timeout)
+            try:
+                data = res.json()
+            except ValueError:
+                self._count("failures")
+                raise DartApiError(f"{endpoint} JSON 응답 아님 (HTTP {res.status_code})", str(res.status_code))
+
+            status = data.get("status")
+            if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                if status in RETRY_STATUSES:
+                    self._count("failures")
+                elif cache:
+                    dart_cache.put_cached(endpoint, params, data)
+                return data
+
+            base = RATE_LIMIT_BACKOFF if status == STATUS_RATE_LIMIT else BACKOFF_BASE
+            if status == STATUS_RATE_LIMIT:
+                self._count("rate_limited")
+            wait = self._backoff(attempt, base)
+            print(f"[DART] {endpoint} 상태 {status}({STATUS_MESSAGES.get(status, data.get('message'))}), "
+                  f"{wait:.1f}초 후 재시도 {attempt + 1}/{self.max_retries}")
+            self._count("retries")
+            time.sleep(wait)
+            attempt += 1
+
+    def download(self, endpoint: str, params: Dict[str, Any] = None, timeout=None) -> bytes:
+        """
+        파일 API 조회 (예: corpCode.xml ZIP)
+
+        Returns:
+            응답 본문 바이트 (HTTP 200이 아니면 DartApiError)
+        """
+        res = self._send(endpoint, params, timeout)
+        if res.status_code != 200:
+            raise DartApiError(f"{endpoint} HTTP {res.status_code}", str(res.status_code))
+        return res.content
+
+    def stats(self) -> Dict[str, int]:
+        """요청/재시도/요청 제한/실패/캐시 적중 건수"""
+        with self._lock:
+            return dict(self._counters)
+
+
+def status_message(data: Dict[str, Any]) -> str:
+    """DART 응답의 상태 코드와 메시지 (로그용)"""
+    status = data.get("status", "")
+    return f"[{status}] {data.get('message') or STATUS_MESSAGES.get(status, '')}"
+
+
+_client: Optional[DartClient] = None
+_client_lock = threading.Lock()
+
+
+def get_dart_client() -> DartClient:
+    """프로세스 전역 DART 클라이언트 (처음 사용할 때 생성)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DartClient()
+        return _client
+
+
+if __name__ == "__main__":
+    client = get_dart_client()
+    data = client.get("company.json", {"corp_code": "00382199"})
+    print(status_message(data), data.get("corp_name"))
+    print(client.stats())
@@ -1,20 +1,10 @@
 # get_company.py
 # 기업 개황 정보 조회
 
-import os
-import requests
-from pathlib import Path
-from dotenv import load_dotenv
+from app.services.dart.dart_client import get_dart_client
 
-# 프로젝트 루트의 .env 파일 로드
-env_path = Path(__file__).resolve().parents[3] / ".env"
-load_dotenv(env_path)
-
-# DART API KEY
-API_KEY = os.getenv("DART_API_KEY")
-
-# 기업 개황 API URL
-URL = "https://opendart.fss.or.kr/api/company.json"
+# 기업 개황 API
+ENDPOINT = "company.json"
 
 
 def get_company_info(corp_code):
@@ -25,12 +15,10 @@ def get_company_info(corp_code):
     - 전화번호, 팩스번호, 업종코드, 설립일, 결산월 등
     """
     params = {
-        "crtfc_key": API_KEY,
         "corp_code": corp_code
     }
 
-    res = requests.get(URL, params=params)
-    data = res.json()
+    data = get_dart_client().get(ENDPOINT, params)
 
     if data.get("status") == "000":
         return data
@@ -1,18 +1,10 @@
 # get_disclosure_list.py
 # 정기공시(A) 최신 보고서 조회 최종버전
 
-import os
-import requests
 from datetime import datetime
-from pathlib import Path
-from dotenv import load_dotenv
+from app.services.dart.dart_client import get_dart_client
 
-# 프로젝트 루트의 .env 파일 로드
-env_path = Path(__file__).resolve().parents[3] / ".env"
-load_dotenv(env_path)
-API_KEY = os.getenv("DART_API_KEY")
-
-URL = "https://opendart.fss.or.kr/api/list.json"
+ENDPOINT = "list.json"
 
 
 def get_regular_reports(corp_code, start="20200101", end=None):
@@ -20,7 +12,6 @@ def get_regular_reports(corp_code, start="20200101", end=None):
         end = datetime.today().strftime("%Y%m%d")
 
     params = {
-        "crtfc_key": API_KEY,
         "corp_code": corp_code,
         "bgn_de": start,
         "end_de": end,
@@ -30,8 +21,7 @@ def get_regular_reports(corp_code, start="20200101", end=None):
         "page_count": 100
     }
 
-    r = requests.get(URL, params=params)
-    data = r.json()
+    data = get_dart_client().get(ENDPOINT, params)
 
     if data.get("status") != "000":
         print("DART 오류:", data.get("message"))
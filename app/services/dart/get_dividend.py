@@ -1,20 +1,10 @@
 # get_dividend.py
 # 배당에 관한 사항 조회
 
-import os
-import requests
-from pathlib import Path
-from dotenv import load_dotenv
+from app.services.dart.dart_client import get_dart_client
 
-# 프로젝트 루트의 .env 파일 로드
-env_path = Path(__file__).resolve().parents[3] / ".env"
-load_dotenv(env_path)
-
-# DART API KEY
-API_KEY = os.getenv("DART_API_KEY")
-
-# 배당에 관한 사항 API URL
-URL = "https://opendart.fss.or.kr/api/alotMatter.json"
+# 배당에 관한 사항 API
+ENDPOINT = "alotMatter.json"
 
 
 def get_dividend_info(corp_code, bsns_year, reprt_code):
@@ -34,14 +24,12 @@ def get_dividend_info(corp_code, bsns_year, reprt_code):
         배당 관련 정보 (주당배당금, 배당수익률, 배당성향 등)
     """
     params = {
-        "crtfc_key": API_KEY,
         "corp_code": corp_code,
         "bsns_year": bsns_year,
         "reprt_code": reprt_code
     }
 
-    res = requests.get(URL, params=params)
-    data = res.json()
+    data = get_dart_client().get(ENDPOINT, params)
 
     if data.get("status") == "000":
         return data.get("list", [])
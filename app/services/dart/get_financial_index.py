@@ -1,20 +1,18 @@
 # get_financial_index.py
 # 단일회사 주요계정 지표 조회
 
-import os
-import requests
-from pathlib import Path
-from dotenv import load_dotenv
+from app.services.dart.dart_client import get_dart_client
 
-# 프로젝트 루트의 .env 파일 로드
-env_path = Path(__file__).resolve().parents[3] / ".env"
-load_dotenv(env_path)
+# 단일회사 주요계정 지표 API
+ENDPOINT = "fnlttSinglIndx.json"
 
-# DART API KEY
-API_KEY = os.getenv("DART_API_KEY")
-
-# 단일회사 주요계정 지표 API URL
-URL = "https://opendart.fss.or.kr/api/fnlttSinglIndx.json"
+# 지표분류코드 → 분류명
+INDEX_CODES = {
+    "M210000": "수익성지표",
+    "M220000": "안정성지표",
+    "M230000": "성장성지표",
+    "M240000": "활동성지표"
+}
 
 
 def fetch_financial_index(corp_code, bsns_year, reprt_code, idx_cl_code):
@@ -39,15 +37,13 @@ def fetch_financial_index(corp_code, bsns_year, reprt_code, idx_cl_code):
         주요계정 지표 리스트
     """
     params = {
-        "crtfc_key": API_KEY,
         "corp_code": corp_code,
         "bsns_year": bsns_year,
         "reprt_code": reprt_code,
         "idx_cl_code": idx_cl_code
     }
 
-    res = requests.get(URL, params=params)
-    data = res.json()
+    data = get_dart_client().get(ENDPOINT, params)
 
     if data.get("status") == "000":
         return data.get("list", [])
@@ -68,16 +64,9 @@ def fetch_all_financial_index(corp_code, bsns_year, reprt_code):
     Returns:
         분류별 주요계정 지표 딕셔너리
     """
-    index_codes = {
-        "M210000": "수익성지표",
-        "M220000": "안정성지표",
-        "M230000": "성장성지표",
-        "M240000": "활동성지표"
-    }
-    
     result = {}
     
-    for code, name in index_codes.items():
+    for code, name in INDEX_CODES.items():
         data = fetch_financial_index(corp_code, bsns_year, reprt_code, code)
         if data:
             result[name] = data
@@ -1,33 +1,21 @@
 # get_financials.py
 # 단일회사 전체 재무제표 조회
 
-import os
-import requests
-from pathlib import Path
-from dotenv import load_dotenv
+from app.services.dart.dart_client import get_dart_client
 
-# 프로젝트 루트의 .env 파일 로드
-env_path = Path(__file__).resolve().parents[3] / ".env"
-load_dotenv(env_path)
-
-# DART API KEY
-API_KEY = os.getenv("DART_API_KEY")
-
-# 단일회사 전체 재무제표 API URL
-URL = "https://opendart.fss.or.kr/api/fnlttSinglAcntAll.json"
+# 단일회사 전체 재무제표 API
+ENDPOINT = "fnlttSinglAcntAll.json"
 
 # DART 조회 함수 정의
 def fetch_financials(corp_code, year, report_code, fs_div):
     params = {
-        "crtfc_key": API_KEY,
         "corp_code": corp_code,
         "bsns_year": year,
         "reprt_code": report_code,
         "fs_div": fs_div
     }
 
-    res = requests.get(URL, params=params)
-    data = res.json()
+    data = get_dart_client().get(ENDPOINT, params)
 
     # status 값이 000이면 정상
     if data.get("status") == "000":
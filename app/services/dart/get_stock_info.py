@@ -1,20 +1,10 @@
 # get_stock_info.py
 # 주식의 총수 현황 조회
 
-import os
-import requests
-from pathlib import Path
-from dotenv import load_dotenv
+from app.services.dart.dart_client import get_dart_client
 
-# 프로젝트 루트의 .env 파일 로드
-env_path = Path(__file__).resolve().parents[3] / ".env"
-load_dotenv(env_path)
-
-# DART API KEY
-API_KEY = os.getenv("DART_API_KEY")
-
-# 주식의 총수 현황 API URL
-URL = "https://opendart.fss.or.kr/api/stockTotqySttus.json"
+# 주식의 총수 현황 API
+ENDPOINT = "stockTotqySttus.json"
 
 
 def get_stock_total_qty(corp_code: str, bsns_year: str = None, reprt_code: str = "11011") -> dict:
@@ -41,7 +31,6 @@ def get_stock_total_qty(corp_code: str, bsns_year: str = None, reprt_code: str =
         bsns_year = str(datetime.now().year - 1)
     
     params = {
-        "crtfc_key": API_KEY,
         "corp_code": corp_code,
         "bsns_year": bsns_year,
         "reprt_code": reprt_code
@@ -50,8 +39,7 @@ def get_stock_total_qty(corp_code: str, bsns_year: str = None, reprt_code: str =
     print(f"[DART] 주식총수 조회: corp_code={corp_code}, year={bsns_year}, reprt_code={reprt_code}")
     
     try:
-        res = requests.get(URL, params=params, timeout=10)
-        data = res.json()
+        data = get_dart_client().get(ENDPOINT, params)
         
         if data.get("status") == "000":
             items = data.get("list", [])
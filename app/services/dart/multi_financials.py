@@ -0,0 +1,235 @@
+"""
+다중회사 주요계정 일괄 조회
+
+DART 다중회사 주요계정 API(fnlttMultiAcnt)는 요청 한 번에 최대 100개 기업의
+재무상태표/손익계산서 주요 계정을 돌려준다.
+상장사 전체를 100개씩 나눠 조회하고(약 30회), 기업별로 extract_key_accounts 와 같은 구조로 정리하여
+data/cache/dart/key_accounts/{사업연도}_{보고서코드}.json 에 저장한다.
+
+- 연결(CFS) 계정이 있으면 연결, 없으면 별도(OFS) 계정 사용 (fetch_financials_auto 와 같은 기준)
+- 재무비율 저장소(ratio_store)에 같은 사업연도 값이 없는 기업은 주요 계정으로 계산한 비율을 채운다
+  (단일회사 전체 재무제표로 계산한 비율이 있으면 유지)
+- 응답은 DART 클라이언트 디스크 캐시를 거치므로 마감된 사업연도는 다시 받지 않는다
+
+실행:
+    python -m app.services.dart.multi_financials [사업연도] [--reprt 11011]
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.dart.dart_client import get_dart_client, status_message
+from app.utils.local_store import get_cache_dir, load_json, save_json
+
+ENDPOINT = "fnlttMultiAcnt.json"
+
+# 요청 한 번에 넣을 수 있는 최대 기업 수 (DART 제한)
+MULTI_ACCOUNT_LIMIT = 100
+
+_tables: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _store_path(year: str, reprt_code: str) -> str:
+    return os.path.join(get_cache_dir('dart', 'key_accounts'), f"{year}_{reprt_code}.json")
+
+
+def chunked(items: List[str], size: int = MULTI_ACCOUNT_LIMIT) -> List[List[str]]:
+    """목록을 size 개씩 나눔"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# ============================================
+# 조회 / 정리
+# ============================================
+
+def fetch_multi_accounts(corp_codes: List[str], year: str, reprt_code: str = "11011") -> List[Dict[str, Any]]:
+    """
+    다중회사 주요계정 한 번 조회
+
+    Args:
+        corp_codes: DART 고유번호 목록 (최대 100개)
+        year: 사업연도
+        reprt_code: 보고서 코드 (11011: 사업보고서)
+
+    Returns:
+        계정 행 목록 (조회된 데이터가 없으면 빈 리스트)
+    """
+    if len(corp_codes) > MULTI_ACCOUNT_LIMIT:
+        raise ValueError(f"한 번에 최대 {MULTI_ACCOUNT_LIMIT}개 기업까지 조회할 수 있습니다")
+
+    params = {
+        "corp_code": ",".join(corp_codes),
+        "bsns_year": str(year),
+        "reprt_code": reprt_code
+    }
+    data = get_dart_client().get(ENDPOINT, params)
+
+    if data.get("status") == "000":
+        return data.get("list", [])
+    if data.get("status") != "013":
+        print(f"[MultiFinancials] DART 오류 {status_message(data)}")
+    return []
+
+
+def group_key_accounts(rows: List[Dict[str, Any]], ticker_to_corp: Dict[str, str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """
+    계정 행 → 기업별 (재무제표 구분, 주요 계정)
+
+    Args:
+        rows: fetch_multi_accounts 결과
+        ticker_to_corp: 종목코드 → 고유번호 (응답에 corp_code가 없는 경우 stock_code로 매칭)
+
+    Returns:
+        {고유번호: ('CFS' 또는 'OFS', extract_key_accounts 구조)}
+    """
+    from app.services.report_service import extract_key_accounts
+
+    by_corp: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for row in rows:
+        corp_code = row.get("corp_code") or ticker_to_corp.get((row.get("stock_code") or "").strip())
+        if not corp_code:
+            continue
+        by_corp.setdefault(corp_code, {}).setdefault(row.get("fs_div", "OFS"), []).append(row)
+
+    result = {}
+    for corp_code, statements in by_corp.items():
+        fs_type = "CFS" if statements.get("CFS") else "OFS"
+        key_accounts = extract_key_accounts(statements.get(fs_type, []))
+        if key_accounts:
+            result[corp_code] = (fs_type, key_accounts)
+    return result
+
+
+# ============================================
+# 일괄 갱신 / 조회
+# ============================================
+
+def refresh_key_accounts(year: str = None, reprt_code: str = "11011", tickers: List[str] = None) -> Dict[str, int]:
+    """
+    상장사 전체 주요 계정 일괄 조회 및 저장 (100개 기업씩)
+
+    Args:
+        year: 사업연도 (기본: 전년도)
+        reprt_code: 보고서 코드
+        tickers: 대상 종목 (기본: 종목 인덱스 전체)
+
+    Returns:
+        {'companies': 대상 기업 수, 'requests': 요청 수, 'saved': 저장 수, 'ratios': 비율 저장 수}
+    """
+    from app.services.dart.corp_index import get_corp_index
+    from app.services.dart.ratio_store import load_ratio_store, save_ratio_batch
+    from app.services.krx.ticker_index import get_ticker_index
+    from app.services.report_service import calculate_financial_ratios
+
+    started = time.time()
+    year = str(year or datetime.now().year - 1)
+    tickers = tickers or get_ticker_index().tickers()
+
+    corp_index = get_corp_index()
+    if corp_index is None:
+        print("[MultiFinancials] 고유번호 인덱스 없음")
+        return {'companies': 0, 'requests': 0, 'saved': 0, 'ratios': 0}
+
+    ticker_to_corp = {}
+    for ticker in tickers:
+        corp_code = corp_index.corp_code(ticker)
+        if corp_code:
+            ticker_to_corp[ticker] = corp_code
+    corp_to_ticker = {corp_code: ticker for ticker, corp_code in ticker_to_corp.items()}
+
+    # 고유번호 순으로 나눠 같은 구성의 요청이 캐시에 다시 맞도록 함
+    chunks = chunked(sorted(corp_to_ticker))
+    table: Dict[str, Dict[str, Any]] = {}
+    for i, chunk in enumerate(chunks, 1):
+        try:
+            rows = fetch_multi_accounts(chunk, year, reprt_code)
+        except Exception as e:
+            print(f"[MultiFinancials] {i}/{len(chunks)} 조회 오류: {e}")
+            continue
+        for corp_code, (fs_type, key_accounts) in group_key_accounts(rows, ticker_to_corp).items():
+            table[corp_code] = {
+                'ticker': corp_to_ticker.get(corp_code, ''),
+                'fs_type': fs_type,
+                'key_accounts': key_accounts,
+            }
+
+    result = {
+        'year': year,
+        'reprt_code': reprt_code,
+        'updated': datetime.now().strftime("%Y%m%d"),
+        'companies': table,
+    }
+    save_json(_store_path(year, reprt_code), result)
+    with _lock:
+        _tables[f"{year}_{reprt_code}"] = result
+
+    # 사업보고서 기준 재무비율 중 같은 사업연도 값이 없는 기업만 채움
+    ratio_entries = {}
+    if reprt_code == "11011":
+        store = load_ratio_store()
+        for corp_code, entry in table.items():
+            if store.get(corp_code, {}).get('year', '') >= year:
+                continue
+            ratios = calculate_financial_ratios(entry['key_accounts'])
+            if ratios:
+                ratio_entries[corp_code] = {'ticker': entry['ticker'], 'year': year,
+                                            'fs_type': entry['fs_type'], 'ratios': ratios}
+        save_ratio_batch(ratio_entries)
+
+    counts = {'companies': len(corp_to_ticker), 'requests': len(chunks),
+              'saved': len(table), 'ratios': len(ratio_entries)}
+    print(f"[MultiFinancials] {year} ({reprt_code}) 주요 계정 갱신: {counts} ({time.time() - started:.1f}초)")
+    return counts
+
+
+def get_key_accounts_table(year: str = None, reprt_code: str = "11011") -> Optional[Dict[str, Any]]:
+    """
+    저장된 주요 계정 테이블 (메모리 → 디스크)
+
+    Returns:
+        {'year', 'reprt_code', 'updated', 'companies': {고유번호: {'ticker', 'fs_type', 'key_accounts'}}}
+        또는 None
+    """
+    year = str(year or datetime.now().year - 1)
+    key = f"{year}_{reprt_code}"
+    with _lock:
+        table = _tables.get(key)
+        if table is None:
+            table = load_json(_store_path(year, reprt_code))
+            if table is not None:
+                _tables[key] = table
+        return table
+
+
+def get_key_accounts(ticker: str, year: str = None, reprt_code: str = "11011") -> Dict[str, Any]:
+    """
+    종목의 저장된 주요 계정 (동종업계 비교/스크리닝용, 네트워크 조회 없음)
+
+    Returns:
+        {'corp_code', 'ticker', 'year', 'fs_type', 'key_accounts'} 또는 빈 딕셔너리
+
+    Example:
+        >>> accounts = get_key_accounts("055550", "2024")
+        >>> print(accounts['key_accounts']['자산총계']['current'])
+    """
+    table = get_key_accounts_table(year, reprt_code)
+    if not table:
+        return {}
+    for corp_code, entry in table['companies'].items():
+        if entry.get('ticker') == ticker:
+            return dict(entry, corp_code=corp_code, year=table['year'])
+    return {}
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    reprt_code = "11011"
+    if '--reprt' in sys.argv:
+        reprt_code = sys.argv[sys.argv.index('--reprt') + 1]
+        args = [arg for arg in args if arg != reprt_code]
+    refresh_key_accounts(args[0] if args else None, reprt_code)
@@ -0,0 +1,242 @@
+"""
+기업별 재무비율 저장소
+
+calculate_financial_ratios 결과(ROE, 부채비율, 영업이익률 등)를 corp_code 별로 디스크에 보관한다.
+(data/cache/dart/ratios.sqlite, 기업 한 행 단위로 갱신하므로 여러 워커가 동시에 기록해도 유실 없음)
+
+- 보고서 생성 시 계산된 비율을 그대로 기록 (추가 DART 호출 없음)
+- refresh_ratio_store 로 상장사 전체를 미리 채울 수 있음 (사업연도가 같으면 건너뜀)
+- multi_financials.refresh_key_accounts 는 다중회사 주요계정(100개 기업씩)으로 빈 기업을 빠르게 채움
+- 스크리너는 저장된 값만 읽는다
+
+실행:
+    python -m app.services.dart.ratio_store [사업연도] [--limit N]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.local_store import connect_sqlite, get_cache_dir, load_json
+
+
+# 스크리너에 노출하는 비율 (calculate_financial_ratios 키 → 컬럼명)
+RATIO_COLUMNS = {
+    'ROE': 'roe',
+    'ROA': 'roa',
+    'debt_ratio': 'debt_ratio',
+    'equity_ratio': 'equity_ratio',
+    'current_ratio': 'current_ratio',
+    'quick_ratio': 'quick_ratio',
+    'interest_coverage': 'interest_coverage',
+    'operating_margin': 'operating_margin',
+    'net_margin': 'net_margin',
+    'asset_turnover': 'asset_turnover',
+}
+
+_ratios: Optional[Dict[str, Dict[str, Any]]] = None
+_ratios_mtime: float = 0.0
+_lock = threading.Lock()
+_legacy_imported = False
+
+_RATIO_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS ratios ("
+    " corp_code TEXT PRIMARY KEY,"
+    " ticker TEXT,"
+    " year TEXT,"
+    " fs_type TEXT,"
+    " ratios TEXT,"             # calculate_financial_ratios 결과 (JSON)
+    " updated TEXT,"            # 기록일 (YYYYMMDD)
+    " updated_at REAL)",        # 기록 시각 (변경 감지용)
+    "CREATE INDEX IF NOT EXISTS ratios_updated_at ON ratios (updated_at)",
+]
+
+_UPSERT_SQL = (
+    "INSERT INTO ratios (corp_code, ticker, year, fs_type, ratios, updated, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(corp_code) DO UPDATE SET "
+    " ticker = excluded.ticker, year = excluded.year, fs_type = excluded.fs_type,"
+    " ratios = excluded.ratios, updated = excluded.updated, updated_at = excluded.updated_at "
+    # 더 최근 사업연도 값이 이미 있으면 유지
+    "WHERE excluded.year >= ratios.year"
+)
+
+
+def _ratio_db() -> sqlite3.Connection:
+    """재무비율 DB 연결 (이전 ratios.json 이 있으면 처음 한 번 가져옴)"""
+    global _legacy_imported
+
+    conn = connect_sqlite(os.path.join(get_cache_dir('dart'), 'ratios.sqlite'), _RATIO_SCHEMA)
+    if not _legacy_imported:
+        _legacy_imported = True
+        legacy = load_json(os.path.join(get_cache_dir('dart'), 'ratios.json'))
+        if legacy:
+            # 이미 있는 행은 건드리지 않음 (프로세스마다 실행되어도 최신 값 유지)
+            _upsert(conn, legacy, updated=None,
+                    sql="INSERT OR IGNORE INTO ratios VALUES (?, ?, ?, ?, ?, ?, ?)")
+    return conn
+
+
+def _upsert(conn: sqlite3.Connection, entries: Dict[str, Dict[str, Any]], updated: Optional[str],
+            sql: str = _UPSERT_SQL) -> None:
+    """여러 기업 행을 한 트랜잭션으로 갱신 (updated 가 None 이면 항목의 기록일 유지)"""
+    now = time.time()
+    rows = [
+        (corp_code, entry.get('ticker', ''), str(entry.get('year', '')), entry.get('fs_type', ''),
+         json.dumps(entry.get('ratios') or {}, ensure_ascii=False),
+         updated or entry.get('updated', ''), now)
+        for corp_code, entry in entries.items()
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(sql, rows)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def ratio_store_mtime() -> float:
+    """마지막 기록 시각 (없으면 0)"""
+    try:
+        row = _ratio_db().execute("SELECT COALESCE(MAX(updated_at), 0) FROM ratios").fetchone()
+    except sqlite3.Error as e:
+        print(f"[RatioStore] 조회 오류: {e}")
+        return 0.0
+    return float(row[0])
+
+
+def load_ratio_store() -> Dict[str, Dict[str, Any]]:
+    """
+    corp_code → {'ticker', 'year', 'fs_type', 'ratios', 'updated'} (기록이 바뀐 경우에만 다시 읽음)
+    """
+    global _ratios, _ratios_mtime
+
+    with _lock:
+        mtime = ratio_store_mtime()
+        if _ratios is None or mtime != _ratios_mtime:
+            try:
+                rows = _ratio_db().execute(
+                    "SELECT corp_code, ticker, year, fs_type, ratios, updated FROM ratios"
+                ).fetchall()
+            except sqlite3.Error as e:
+                print(f"[RatioStore] 조회 오류: {e}")
+                return _ratios or {}
+            _ratios = {
+                corp_code: {'ticker': ticker, 'year': year, 'fs_type': fs_type,
+                            'ratios': json.loads(ratios or '{}'), 'updated': updated}
+                for corp_code, ticker, year, fs_type, ratios, updated in rows
+            }
+            _ratios_mtime = mtime
+        return _ratios
+
+
+def save_ratios(corp_code: str, ticker: str, year: str, fs_type: str, ratios: Dict[str, Any]) -> None:
+    """
+    기업 하나의 재무비율 기록
+
+    Args:
+        corp_code: DART 고유번호
+        ticker: 종목코드
+        year: 사업연도
+        fs_type: CFS(연결) / OFS(별도)
+        ratios: calculate_financial_ratios 결과
+    """
+    if not corp_code or not ratios:
+        return
+    save_ratio_batch({corp_code: {
+        'ticker': ticker,
+        'year': str(year),
+        'fs_type': fs_type,
+        'ratios': ratios,
+    }})
+
+
+def save_ratio_batch(entries: Dict[str, Dict[str, Any]]) -> None:
+    """여러 기업의 재무비율을 한 번에 기록 (해당 기업 행만 갱신, 트랜잭션 1회)"""
+    if not entries:
+        return
+    try:
+        _upsert(_ratio_db(), entries, updated=datetime.now().strftime("%Y%m%d"))
+    except sqlite3.Error as e:
+        print(f"[RatioStore] 저장 오류: {e}")
+
+
+def get_ratios_by_ticker() -> Dict[str, Dict[str, Any]]:
+    """종목코드 → 저장된 항목"""
+    return {entry['ticker']: dict(entry, corp_code=corp_code)
+            for corp_code, entry in load_ratio_store().items() if entry.get('ticker')}
+
+
+def refresh_ratio_store(year: str = None, tickers: List[str] = None, limit: int = None) -> Dict[str, int]:
+    """
+    상장사 재무비율 일괄 계산 (사업보고서 기준, 같은 사업연도가 이미 있으면 건너뜀)
+
+    Args:
+        year: 사업연도 (기본: 전년도)
+        tickers: 대상 종목 (기본: 종목 인덱스 전체)
+        limit: 최대 DART 조회 기업 수 (일일 호출 한도 관리용)
+
+    Returns:
+        {'saved': 저장 수, 'skipped': 건너뜀, 'failed': 실패 수}
+    """
+    from app.services.dart.corp_index import get_corp_index
+    from app.services.dart.get_financials import fetch_financials_auto
+    from app.services.krx.ticker_index import get_ticker_index
+    from app.services.report_service import calculate_financial_ratios, extract_key_accounts
+
+    year = str(year or datetime.now().year - 1)
+    tickers = tickers or get_ticker_index().tickers()
+    store = load_ratio_store()
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    counts = {'saved': 0, 'skipped': 0, 'failed': 0}
+
+    corp_index = get_corp_index()
+    if corp_index is None:
+        print("[RatioStore] 고유번호 인덱스 없음")
+        return counts
+
+    for ticker in tickers:
+        if limit is not None and counts['saved'] + counts['failed'] >= limit:
+            break
+
+        corp_code = corp_index.corp_code(ticker)
+        if not corp_code or store.get(corp_code, {}).get('year', '') >= year:
+            counts['skipped'] += 1
+            continue
+
+        try:
+            financials, fs_type = fetch_financials_auto(corp_code, year, "11011")
+            ratios = calculate_financial_ratios(extract_key_accounts(financials)) if financials else {}
+            if not ratios:
+                counts['failed'] += 1
+                continue
+            entries[corp_code] = {'ticker': ticker, 'year': year, 'fs_type': fs_type, 'ratios': ratios}
+            counts['saved'] += 1
+        except Exception as e:
+            print(f"[RatioStore] {ticker} 조회 오류: {e}")
+            counts['failed'] += 1
+
+        # 중간 저장 (중단되어도 받은 결과 유지)
+        if len(entries) >= 100:
+            save_ratio_batch(entries)
+            entries = {}
+
+    save_ratio_batch(entries)
+    print(f"[RatioStore] {year} 재무비율 갱신: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    limit = None
+    if '--limit' in sys.argv:
+        limit = int(sys.argv[sys.argv.index('--limit') + 1])
+        args = [arg for arg in args if arg != str(limit)]
+    refresh_ratio_store(args[0] if args else None, limit=limit)
@@ -10,6 +10,11 @@ from firebase_admin import firestore
 from app.models.analysis import AnalysisHistory
 from app.models.company import PopularCompany
 from app.services.firebase.auth_service import get_db, increment_analysis_count
+from app.services.krx.price_pyramid import compact_price_history
+
+
+# 보고서 저장 시 가격 이력 최대 점 개수
+SAVED_PRICE_POINTS = 150
 
 
 # ============================================
@@ -246,7 +251,8 @@ def save_report(user_id: str, report_data: dict) -> Optional[str]:
             'moving_averages': krx_data.get('moving_averages', {}),
             'rsi': krx_data.get('rsi', {}),
             'mfi': krx_data.get('mfi', {}),
-            'price_history': krx_data.get('price_history', [])[-100:]  # 최근 100일만
+            # 1년 이력을 LTTB 로 축소 (이동평균은 축소 전 일별 값으로 계산해 함께 저장)
+            'price_history': compact_price_history(krx_data.get('price_history', []), SAVED_PRICE_POINTS)
         }
         
         # DART 데이터 저장 (재무지표, 배당, 공시 등)
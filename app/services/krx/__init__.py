@@ -10,9 +10,68 @@ from app.services.krx.stock_service import (
     calculate_rsi,
     calculate_mfi,
     get_technical_indicators,
+    get_risk_metrics,
+    get_ohlcv_frame,
+    OhlcvFrame,
     StockPrice,
     StockSummary,
 )
+from app.services.krx.market_snapshot import (
+    get_market_snapshot,
+    get_snapshot_row,
+    MarketSnapshot,
+)
+from app.services.krx.price_series import PriceSeries
+from app.services.krx.price_pyramid import (
+    get_price_pyramid,
+    get_chart_series,
+    PricePyramid,
+)
+from app.services.krx.indicator_engine import (
+    get_indicator_panel,
+    IndicatorPanel,
+)
+from app.services.krx.indicator_state import (
+    get_indicator_state,
+    IndicatorState,
+)
+from app.services.krx.backtest import (
+    get_signal_backtest,
+    get_signal_quality,
+)
+from app.services.krx.market_risk import (
+    get_market_risk,
+    get_market_risk_table,
+)
+from app.services.krx.krx_pool import (
+    get_pool_stats,
+    krx_budget,
+    krx_call,
+    KrxBusyError,
+    KrxTimeoutError,
+)
+from app.services.krx.investor_flow import (
+    get_investor_flow,
+    get_investor_flow_table,
+)
+from app.services.krx.index_store import (
+    index_closes,
+    load_index_bars,
+)
+from app.services.krx.valuation_history import (
+    get_valuation_band,
+    get_valuation_history,
+    ValuationHistory,
+)
+from app.services.krx.sector_stats import (
+    get_sector_stats,
+    get_sector_valuation,
+)
+from app.services.krx.ticker_index import (
+    get_ticker_index,
+    get_ticker_info,
+    TickerInfo,
+)
 
 __all__ = [
     'get_current_price',
@@ -25,7 +84,42 @@ __all__ = [
     'calculate_rsi',
     'calculate_mfi',
     'get_technical_indicators',
+    'get_risk_metrics',
+    'get_ohlcv_frame',
+    'OhlcvFrame',
     'StockPrice',
     'StockSummary',
+    'get_market_snapshot',
+    'get_snapshot_row',
+    'MarketSnapshot',
+    'PriceSeries',
+    'get_price_pyramid',
+    'get_chart_series',
+    'PricePyramid',
+    'get_indicator_panel',
+    'IndicatorPanel',
+    'get_indicator_state',
+    'IndicatorState',
+    'get_signal_backtest',
+    'get_signal_quality',
+    'get_market_risk',
+    'get_market_risk_table',
+    'get_pool_stats',
+    'krx_budget',
+    'krx_call',
+    'KrxBusyError',
+    'KrxTimeoutError',
+    'get_investor_flow',
+    'get_investor_flow_table',
+    'index_closes',
+    'load_index_bars',
+    'get_valuation_band',
+    'get_valuation_history',
+    'ValuationHistory',
+    'get_sector_stats',
+    'get_sector_valuation',
+    'get_ticker_index',
+    'get_ticker_info',
+    'TickerInfo',
 ]
 
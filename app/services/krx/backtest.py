@@ -0,0 +1,339 @@
+"""
+기술적 신호 백테스트
+
+stock_service 가 보고하는 신호(골든/데드크로스, RSI/MFI 과매수/과매도)를
+일봉 저장소 전체 종목 × 수년치 가격 패널에 한 번의 배열 연산으로 적용하고,
+신호 발생 후 N 거래일의 수익률, 적중률, 최대 역행폭(드로다운)을 집계한다.
+(data/cache/krx/backtest/YYYYMMDD.json)
+
+- 신호 정의는 indicator_engine 의 벡터 함수(이동평균, RSI, MFI, 크로스)를 그대로 사용
+- 과매수/과매도는 구간에 진입한 날만 신호로 집계 (연속 일자 중복 제외)
+- 미래 구간 최저/최고가는 희소 테이블(2의 거듭제곱 창 병합)로 종목 × 날짜 전체를 한 번에 계산
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.krx.indicator_engine import (
+    MFI_PERIOD,
+    RSI_PERIOD,
+    build_price_panel,
+    compute_crosses,
+    compute_mfi,
+    compute_rsi,
+    rolling_mean,
+)
+from app.utils.local_store import get_cache_dir, load_json, save_json
+
+
+# 백테스트 기간 (거래일, 약 3년) + 지표 준비 기간
+BACKTEST_SESSIONS = 750
+WARMUP_SESSIONS = 30
+
+# 보고 기간 시작일: 대상 종목 중 이 비율 이상에 종가가 있는 첫 거래일
+MIN_COVERAGE = 0.5
+
+# 신호 후 관찰 기간 (거래일)
+HORIZONS = [5, 20, 60]
+
+# 신호 정의: 이름 → (표시명, 방향: 1 상승 기대 / -1 하락 기대)
+SIGNALS = {
+    'golden_cross': ('골든크로스 (5일선 > 20일선)', 1),
+    'dead_cross': ('데드크로스 (5일선 < 20일선)', -1),
+    'rsi_oversold': ('RSI 과매도 (30 이하)', 1),
+    'rsi_overbought': ('RSI 과매수 (70 이상)', -1),
+    'mfi_oversold': ('MFI 과매도 (20 이하)', 1),
+    'mfi_overbought': ('MFI 과매수 (80 이상)', -1),
+}
+
+_results: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _backtest_dir() -> str:
+    return get_cache_dir('krx', 'backtest')
+
+
+def _result_path(date: str) -> str:
+    return os.path.join(_backtest_dir(), f"{date}.json")
+
+
+def backtest_start(date: str, sessions: int = BACKTEST_SESSIONS) -> str:
+    """백테스트 가격 패널의 첫 거래일 (일봉 저장소가 포함해야 하는 시작일, 지표 준비 기간 포함)"""
+    from app.services.krx.trading_calendar import previous_trading_day
+    return previous_trading_day(sessions + WARMUP_SESSIONS - 1, date)
+
+
+# ============================================
+# 벡터 연산
+# ============================================
+
+def _onset(state: np.ndarray) -> np.ndarray:
+    """조건이 새로 참이 된 날만 True (전일도 참이면 제외)"""
+    onset = state.copy()
+    onset[:, 1:] &= ~state[:, :-1]
+    return onset
+
+
+def forward_returns(close: np.ndarray, horizon: int) -> np.ndarray:
+    """horizon 거래일 후 수익률 (미래 데이터가 없으면 NaN)"""
+    result = np.full(close.shape, np.nan)
+    if horizon < close.shape[1]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[:, :-horizon] = close[:, horizon:] / close[:, :-horizon] - 1
+    return result
+
+
+def forward_extreme(values: np.ndarray, horizon: int, func=np.minimum) -> np.ndarray:
+    """
+    다음 날부터 horizon 거래일 동안의 최솟값/최댓값 (func: np.minimum / np.maximum)
+
+    희소 테이블 방식: 길이 w 창의 결과를 두 개 겹쳐 2w 창을 만들고,
+    마지막에 길이 w 창 두 개로 horizon 창을 덮는다. 연산량은 O(종목 × 날짜 × log horizon).
+    """
+    count, length = values.shape
+    result = np.full(values.shape, np.nan)
+    valid = length - horizon
+    if valid <= 0:
+        return result
+
+    level = values[:, 1:]  # level[:, t] = t 다음 날부터 w 일 구간 (w=1)
+    width = 1
+    while width * 2 <= horizon:
+        level = func(level[:, :-width], level[:, width:])
+        width *= 2
+
+    offset = horizon - width
+    result[:, :valid] = func(level[:, :valid], level[:, offset:offset + valid])
+    return result
+
+
+def compute_signals(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                    volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """가격 행렬 → 신호 발생 여부 (종목 × 거래일 bool)"""
+    golden, dead = compute_crosses(rolling_mean(close, 5), rolling_mean(close, 20))
+    rsi = compute_rsi(close, RSI_PERIOD)
+    mfi = compute_mfi(high, low, close, volume, MFI_PERIOD)
+
+    with np.errstate(invalid='ignore'):
+        return {
+            'golden_cross': golden,
+            'dead_cross': dead,
+            'rsi_oversold': _onset(rsi <= 30),
+            'rsi_overbought': _onset(rsi >= 70),
+            'mfi_oversold': _onset(mfi <= 20),
+            'mfi_overbought': _onset(mfi >= 80),
+        }
+
+
+def covered_start(close: np.ndarray, min_coverage: float = MIN_COVERAGE) -> int:
+    """종목 중 min_coverage 이상에 종가가 있는 첫 거래일 위치 (없으면 열 개수)"""
+    if close.shape[0] == 0:
+        return close.shape[1]
+    coverage = np.isfinite(close).mean(axis=0)
+    covered = np.flatnonzero(coverage >= min_coverage)
+    return int(covered[0]) if len(covered) else close.shape[1]
+
+
+def _summarize(returns: np.ndarray, adverse: np.ndarray, direction: int) -> Dict[str, Any]:
+    """신호 발생 건의 수익률/역행폭 → 통계"""
+    if len(returns) == 0:
+        return {'count': 0}
+    return {
+        'count': int(len(returns)),
+        'hit_rate': round(float(np.mean(direction * returns > 0)) * 100, 1),
+        'avg_return': round(float(np.mean(returns)) * 100, 2),
+        'median_return': round(float(np.median(returns)) * 100, 2),
+        'avg_drawdown': round(float(np.mean(adverse)) * 100, 2),
+        'worst_drawdown': round(float(np.percentile(adverse, 5)) * 100, 2),
+    }
+
+
+# ============================================
+# 백테스트
+# ============================================
+
+def run_backtest(date: str, tickers: List[str] = None, sessions: int = BACKTEST_SESSIONS,
+                 horizons: List[int] = None) -> Dict[str, Any]:
+    """
+    저장소 전체 종목 신호 백테스트
+
+    Args:
+        date: 마지막 거래일 (YYYYMMDD)
+        tickers: 대상 종목 (기본: 저장소의 모든 종목)
+        sessions: 백테스트 기간 (거래일)
+        horizons: 관찰 기간 목록 (기본 HORIZONS)
+
+    Returns:
+        {
+            'date', 'start', 'end', 'sessions', 'tickers', 'horizons',
+            (start/sessions: 실제 데이터가 있는 구간 - 종목 MIN_COVERAGE 이상에 종가가 있는 첫 거래일부터)
+            'baseline': {'20': {'count', 'hit_rate', 'avg_return', ...}},
+            'signals': {'golden_cross': {'label', 'direction', 'events', 'horizons': {'20': {...}}}}
+        }
+    """
+    started = time.time()
+    horizons = horizons or HORIZONS
+
+    panel = build_price_panel(date, tickers, sessions + WARMUP_SESSIONS)
+    signals = compute_signals(panel.high, panel.low, panel.close, panel.volume)
+
+    # 지표 준비 기간의 신호는 제외
+    for events in signals.values():
+        events[:, :WARMUP_SESSIONS] = False
+
+    close = panel.close
+    baseline_window = np.zeros(close.shape, dtype=bool)
+    baseline_window[:, WARMUP_SESSIONS:] = True
+
+    # 요청 기간이 아니라 가격 데이터가 실제로 있는 구간을 보고
+    first = max(covered_start(close), WARMUP_SESSIONS)
+    result: Dict[str, Any] = {
+        'date': date,
+        'start': panel.dates[first] if len(panel.dates) > first else None,
+        'end': panel.dates[-1] if panel.dates else None,
+        'sessions': max(len(panel.dates) - first, 0),
+        'tickers': int(panel.shape[0]),
+        'horizons': horizons,
+        'baseline': {},
+        'signals': {
+            name: {'label': label, 'direction': direction, 'events': int(signals[name].sum()), 'horizons': {}}
+            for name, (label, direction) in SIGNALS.items()
+        },
+    }
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for horizon in horizons:
+            returns = forward_returns(close, horizon)
+            drawdown = forward_extreme(close, horizon, np.minimum) / close - 1
+            runup = forward_extreme(close, horizon, np.maximum) / close - 1
+            finite = np.isfinite(returns) & np.isfinite(drawdown) & np.isfinite(runup)
+
+            # 상승 기대 신호의 역행폭은 하락폭, 하락 기대 신호는 상승폭 (음수로 표기)
+            adverse_long = np.minimum(drawdown, 0)
+            adverse_short = np.minimum(-runup, 0)
+
+            mask = baseline_window & finite
+            result['baseline'][str(horizon)] = _summarize(returns[mask], adverse_long[mask], 1)
+
+            for name, (_, direction) in SIGNALS.items():
+                mask = signals[name] & finite
+                adverse = adverse_long if direction > 0 else adverse_short
+                result['signals'][name]['horizons'][str(horizon)] = _summarize(
+                    returns[mask], adverse[mask], direction)
+
+    result['elapsed'] = round(time.time() - started, 2)
+    print(f"[Backtest] {date} 신호 백테스트: {panel.shape[0]}개 종목 × {panel.shape[1]}일 "
+          f"({result['elapsed']}초)")
+    return result
+
+
+def build_signal_backtest(date: str, tickers: List[str] = None) -> Dict[str, Any]:
+    """백테스트 실행 및 저장"""
+    result = run_backtest(date, tickers)
+    save_json(_result_path(date), result)
+    with _lock:
+        _results.clear()
+        _results[date] = result
+    return result
+
+
+def _latest_result_date() -> Optional[str]:
+    dates = sorted(name[:-5] for name in os.listdir(_backtest_dir()) if name.endswith('.json'))
+    return dates[-1] if dates else None
+
+
+def get_signal_backtest(date: str = None, build: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    신호 백테스트 결과 조회
+
+    Args:
+        date: 기준 거래일 (기본: 저장된 가장 최근 결과)
+        build: 결과가 없으면 실행할지 여부
+
+    Example:
+        >>> result = get_signal_backtest()
+        >>> print(result['signals']['golden_cross']['horizons']['20']['hit_rate'])
+    """
+    if date is None:
+        date = _latest_result_date()
+        if date is None:
+            if not build:
+                return None
+            from app.services.krx.trading_calendar import latest_trading_day
+            date = latest_trading_day()
+
+    with _lock:
+        result = _results.get(date) or load_json(_result_path(date))
+        if result is not None:
+            _results.clear()
+            _results[date] = result
+            return result
+
+    if not build:
+        return None
+    try:
+        return build_signal_backtest(date)
+    except Exception as e:
+        print(f"[Backtest] {date} 실행 오류: {e}")
+        return None
+
+
+def get_signal_quality(signals: List[str], horizon: int = 20) -> Dict[str, Any]:
+    """
+    현재 발생한 신호들의 과거 성과 (보고서용)
+
+    Args:
+        signals: SIGNALS 의 신호 이름 목록 (예: ['golden_cross', 'rsi_oversold'])
+        horizon: 관찰 기간 (거래일)
+
+    Returns:
+        {'period': 'YYYYMMDD~YYYYMMDD', 'sessions', 'tickers', 'horizon', 'baseline': {...}, 'signals': {이름: {'label', ...통계}}}
+        (결과가 없거나 해당 신호가 없으면 빈 딕셔너리)
+    """
+    try:
+        result = get_signal_backtest()
+        if not result or not signals:
+            return {}
+
+        key = str(horizon)
+        quality = {
+            name: dict(result['signals'][name]['horizons'].get(key, {}),
+                       label=result['signals'][name]['label'])
+            for name in signals if name in result['signals']
+        }
+        if not quality:
+            return {}
+
+        return {
+            'period': f"{result['start']}~{result['end']}",
+            'sessions': result.get('sessions'),
+            'tickers': result['tickers'],
+            'horizon': horizon,
+            'baseline': result['baseline'].get(key, {}),
+            'signals': quality,
+        }
+
+    except Exception as e:
+        print(f"[Backtest] 신호 성과 조회 오류: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    result = build_signal_backtest(sys.argv[1] if len(sys.argv) > 1 else latest_trading_day())
+    print(f"기간: {result['start']} ~ {result['end']} ({result['sessions']}거래일), 종목 {result['tickers']}개")
+    for horizon in result['horizons']:
+        base = result['baseline'][str(horizon)]
+        print(f"\n[{horizon}일 후] 전체 평균 {base.get('avg_return')}%, 상승 비율 {base.get('hit_rate')}%")
+        for name, signal in result['signals'].items():
+            stats = signal['horizons'][str(horizon)]
+            print(f"  {signal['label']}: {stats.get('count')}건, 적중률 {stats.get('hit_rate')}%, "
+                  f"평균 {stats.get('avg_return')}%, 평균 역행폭 {stats.get('avg_drawdown')}%")
@@ -0,0 +1,177 @@
+"""
+KRX 일별 수집 작업
+
+장 마감 후 하루 한 번 실행하여 시장 전체 데이터를 미리 받아 둔다.
+요청 처리 중에는 저장된 결과만 읽으므로 종목별 KRX 호출이 발생하지 않는다.
+
+실행:
+    python -m app.services.krx.daily_job [YYYYMMDD] [--seed]
+
+    --seed: 저장소에 없는 상장 종목까지 일봉을 받아 시장 전체 지표 대상으로 추가
+"""
+
+import sys
+import time
+from typing import Any, Dict
+
+from app.services.krx import price_store
+from app.services.krx.backtest import backtest_start, build_signal_backtest
+from app.services.krx.index_store import sync_indices
+from app.services.krx.indicator_engine import build_indicator_panel
+from app.services.krx.indicator_state import update_indicator_state
+from app.services.krx.investor_flow import build_investor_flow
+from app.services.krx.market_risk import build_market_risk
+from app.services.krx.market_snapshot import build_market_snapshot
+from app.services.krx.price_pyramid import get_price_pyramid
+from app.services.krx.sector_stats import build_sector_stats, refresh_sector_map
+from app.services.krx.ticker_index import build_ticker_index
+from app.services.krx.trading_calendar import refresh_trading_calendar
+from app.services.krx.valuation_history import update_history
+
+
+def run_daily_job(date: str = None, seed_universe: bool = False) -> Dict[str, Any]:
+    """
+    일별 수집 작업 실행
+
+    Args:
+        date: 거래일 (기본: 최근 거래일)
+        seed_universe: 종목 인덱스의 모든 종목을 일봉 저장소에 추가할지 여부
+
+    Returns:
+        단계별 결과 딕셔너리
+    """
+    # 요청 처리와 달리 캘린더 갱신을 기다린 뒤 당일 거래일 여부로 날짜를 정함
+    date = date or refresh_trading_calendar().latest_trading_day()
+    started = time.time()
+    result: Dict[str, Any] = {'date': date}
+
+    print(f"[DailyJob] {date} 수집 시작")
+
+    # 1. 시장 전체 스냅샷 (시세/기본 지표/시가총액)
+    try:
+        snapshot = build_market_snapshot(date)
+        result['snapshot'] = len(snapshot) if snapshot else 0
+    except Exception as e:
+        print(f"[DailyJob] 스냅샷 생성 오류: {e}")
+        result['snapshot'] = None
+
+    # 2. 종목 메타데이터 인덱스 (CSV + 스냅샷 + pykrx 종목 목록)
+    index = None
+    try:
+        index = build_ticker_index(include_listings=True, date=date)
+        result['ticker_index'] = len(index)
+    except Exception as e:
+        print(f"[DailyJob] 종목 인덱스 생성 오류: {e}")
+        result['ticker_index'] = None
+
+    # 3. 일봉 저장소에 당일 봉 추가 (저장된 종목은 스냅샷에서 채우므로 KRX 호출 없음)
+    #    백테스트 기간(약 3년)보다 저장 구간이 짧은 종목은 앞쪽 구간을 한 번만 보충
+    try:
+        tickers = None
+        if seed_universe and index is not None:
+            tickers = sorted(set(price_store.stored_tickers()) | set(index.tickers()))
+        result['price_store'] = price_store.sync_all(date, tickers, backfill_from=backtest_start(date))
+    except Exception as e:
+        print(f"[DailyJob] 일봉 저장소 동기화 오류: {e}")
+        result['price_store'] = None
+
+    # 4. 종목별 일/주/월봉 피라미드 (차트 요청 시 재집계 없음)
+    try:
+        tickers = price_store.stored_tickers()
+        for ticker in tickers:
+            get_price_pyramid(ticker)
+        result['pyramids'] = len(tickers)
+    except Exception as e:
+        print(f"[DailyJob] 가격 피라미드 생성 오류: {e}")
+        result['pyramids'] = None
+
+    # 5. 증분 지표 상태 (전일 상태에 당일 봉 한 줄 반영)
+    try:
+        result['indicator_state'] = len(update_indicator_state(date))
+    except Exception as e:
+        print(f"[DailyJob] 지표 상태 갱신 오류: {e}")
+        result['indicator_state'] = None
+
+    # 6. 시장 전체 기술적 지표 패널 (스크리닝용 이력 포함)
+    try:
+        result['indicators'] = len(build_indicator_panel(date))
+    except Exception as e:
+        print(f"[DailyJob] 지표 계산 오류: {e}")
+        result['indicators'] = None
+
+    # 7. 업종별 밸류에이션 통계 (KRX 업종 분류 갱신 후 스냅샷에서 계산)
+    try:
+        refresh_sector_map(date)
+    except Exception as e:
+        print(f"[DailyJob] 업종 분류 갱신 오류: {e}")
+    try:
+        stats = build_sector_stats(date)
+        result['sector_stats'] = len(stats['groups']) if stats else 0
+    except Exception as e:
+        print(f"[DailyJob] 업종 통계 계산 오류: {e}")
+        result['sector_stats'] = None
+
+    # 8. 기술적 신호 백테스트 (보고서의 신호 검증용)
+    try:
+        backtest = build_signal_backtest(date)
+        result['backtest'] = backtest['elapsed']
+    except Exception as e:
+        print(f"[DailyJob] 신호 백테스트 오류: {e}")
+        result['backtest'] = None
+
+    # 9. KOSPI/KOSDAQ 지수 일봉 및 시장 대비 위험 지표 (베타, 변동성, 낙폭, 상대강도)
+    try:
+        result['indices'] = sync_indices(date)
+    except Exception as e:
+        print(f"[DailyJob] 지수 동기화 오류: {e}")
+        result['indices'] = None
+    try:
+        result['market_risk'] = len(build_market_risk(date)['tickers'])
+    except Exception as e:
+        print(f"[DailyJob] 시장 대비 위험 지표 오류: {e}")
+        result['market_risk'] = None
+
+    # 10. 주간 PER/PBR 이력 (과거 밸류에이션 밴드용, 스냅샷에서 반영)
+    try:
+        result['valuation_history'] = update_history(date)
+    except Exception as e:
+        print(f"[DailyJob] 밸류에이션 이력 갱신 오류: {e}")
+        result['valuation_history'] = None
+
+    # 11. 투자자별 수급 (외국인/기관/개인 5/20/60일 누적 순매수, 시장×투자자 일괄 조회)
+    try:
+        result['investor_flow'] = len(build_investor_flow(date)['tickers'])
+    except Exception as e:
+        print(f"[DailyJob] 투자자별 수급 집계 오류: {e}")
+        result['investor_flow'] = None
+
+    # 12. DART 고유번호 인덱스 (하루 이상 지났을 때만 corpCode.xml 다시 받음)
+    try:
+        from app.services.dart.corp_index import refresh_corp_index
+        result['corp_index'] = refresh_corp_index()
+    except Exception as e:
+        print(f"[DailyJob] 고유번호 인덱스 갱신 오류: {e}")
+        result['corp_index'] = None
+
+    # 13. DART 주요 계정 일괄 조회 (100개 기업씩 약 30회, 마감된 사업연도는 응답 캐시에서 재사용)
+    #     재무비율 저장소의 빈 기업을 채워 재무 스크리너의 ROE/부채비율/이익률 결측을 줄임
+    #     전년도 사업보고서 제출 기한 전에는 전전년도도 함께 갱신 (오래된 연도부터)
+    try:
+        from app.services.dart.dart_cache import period_closed
+        from app.services.dart.multi_financials import refresh_key_accounts
+
+        year = int(date[:4]) - 1
+        years = [year] if period_closed(str(year), "11011") else [year - 1, year]
+        result['key_accounts'] = {str(y): refresh_key_accounts(str(y))['saved'] for y in years}
+    except Exception as e:
+        print(f"[DailyJob] 주요 계정 갱신 오류: {e}")
+        result['key_accounts'] = None
+
+    result['elapsed'] = round(time.time() - started, 1)
+    print(f"[DailyJob] {date} 수집 완료 ({result['elapsed']}초): {result}")
+    return result
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    run_daily_job(args[0] if args else None, seed_universe='--seed' in sys.argv)
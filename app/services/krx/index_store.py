@@ -0,0 +1,232 @@
+"""
+로컬 지수 일봉 저장소
+
+KOSPI / KOSDAQ 지수 일봉을 종목 일봉 저장소(price_store)와 같은 방식으로
+NumPy 구조화 배열(.npy)에 data/cache/krx/index 아래 보관하고,
+마지막 저장일 이후 구간만 KRX에서 받아 이어 붙인다.
+
+- 지수 값은 소수점이 있으므로 가격 필드는 float64
+- 마지막 저장 봉은 장중 값일 수 있어 이어 붙일 때 항상 다시 받는다
+"""
+
+import io
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pykrx import stock
+
+from app.services.krx.price_store import MARKET_CLOSE, _merge, date_to_days, days_to_date
+from app.utils.local_store import atomic_write_bytes, get_cache_dir, load_json, save_json
+
+
+# 시장 → KRX 지수 코드
+INDICES = {
+    'KOSPI': '1001',
+    'KOSDAQ': '2001',
+}
+
+# 저장 형식
+INDEX_DTYPE = np.dtype([
+    ('date', '<i4'),      # 1970-01-01 기준 일수
+    ('open', '<f8'),      # 시가
+    ('high', '<f8'),      # 고가
+    ('low', '<f8'),       # 저가
+    ('close', '<f8'),     # 종가
+    ('volume', '<i8'),    # 거래량
+])
+
+_COLUMN_MAP = {
+    '시가': 'open',
+    '고가': 'high',
+    '저가': 'low',
+    '종가': 'close',
+    '거래량': 'volume',
+}
+
+# 처음 저장할 때의 조회 기간 (달력 기준 일수, 약 5년)
+DEFAULT_LOOKBACK_DAYS = 365 * 5 + 30
+
+_lock = threading.Lock()
+
+
+def _store_dir() -> str:
+    return get_cache_dir('krx', 'index')
+
+
+def _bars_path(code: str) -> str:
+    return os.path.join(_store_dir(), f"{code}.npy")
+
+
+def _meta_path(code: str) -> str:
+    return os.path.join(_store_dir(), f"{code}.json")
+
+
+def index_code(market: str) -> str:
+    """시장명(KOSPI/KOSDAQ) 또는 지수 코드 → 지수 코드"""
+    return INDICES.get((market or '').upper(), market)
+
+
+# ============================================
+# 저장 / 로드
+# ============================================
+
+def _df_to_bars(df: pd.DataFrame) -> np.ndarray:
+    """pykrx 지수 일봉 DataFrame → 구조화 배열"""
+    if df is None or df.empty:
+        return np.empty(0, dtype=INDEX_DTYPE)
+
+    bars = np.empty(len(df), dtype=INDEX_DTYPE)
+    bars['date'] = (df.index.values.astype('datetime64[D]') - np.datetime64('1970-01-01', 'D')).astype(np.int32)
+    for column, field in _COLUMN_MAP.items():
+        bars[field] = df[column].to_numpy(dtype=INDEX_DTYPE[field])
+    return bars
+
+
+def _fetch_bars(code: str, start: str, end: str) -> np.ndarray:
+    """KRX에서 구간 지수 일봉 조회"""
+    return _df_to_bars(stock.get_index_ohlcv_by_date(start, end, code, name_display=False))
+
+
+def load_index_bars(market: str) -> np.ndarray:
+    """
+    저장된 지수 일봉 배열 로드
+
+    Args:
+        market: 'KOSPI' / 'KOSDAQ' 또는 지수 코드
+
+    Returns:
+        INDEX_DTYPE 구조화 배열 (없으면 빈 배열)
+    """
+    path = _bars_path(index_code(market))
+    if not os.path.exists(path):
+        return np.empty(0, dtype=INDEX_DTYPE)
+    try:
+        return np.load(path)
+    except (OSError, ValueError) as e:
+        print(f"[IndexStore] {market} 로드 오류: {e}")
+        return np.empty(0, dtype=INDEX_DTYPE)
+
+
+def _save_bars(code: str, bars: np.ndarray, meta: Dict) -> None:
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(bars, dtype=INDEX_DTYPE))
+    atomic_write_bytes(_bars_path(code), buffer.getvalue())
+    save_json(_meta_path(code), meta)
+
+
+def sync_index(market: str, start: str, end: str) -> np.ndarray:
+    """
+    지수 저장소가 start ~ end 구간을 포함하도록 동기화
+
+    Args:
+        market: 'KOSPI' / 'KOSDAQ' 또는 지수 코드
+        start: 시작일 (YYYYMMDD)
+        end: 종료일 (YYYYMMDD)
+
+    Returns:
+        동기화된 전체 지수 일봉 배열
+    """
+    code = index_code(market)
+    with _lock:
+        meta = load_json(_meta_path(code)) or {}
+        bars = load_index_bars(code)
+        changed = False
+
+        if len(bars) == 0 or not meta:
+            bars = _fetch_bars(code, start, end)
+            meta = {'covered_from': start}
+            changed = True
+
+        else:
+            if start < meta.get('covered_from', days_to_date(bars['date'][0])):
+                before_end = (datetime.strptime(meta['covered_from'], "%Y%m%d")
+                              - timedelta(days=1)).strftime("%Y%m%d")
+                bars = _merge(bars, _fetch_bars(code, start, before_end))
+                meta['covered_from'] = start
+                changed = True
+
+            if meta.get('synced_to', '') < end or not meta.get('final', False):
+                bars = _merge(bars, _fetch_bars(code, days_to_date(bars['date'][-1]), end))
+                changed = True
+
+        if changed:
+            now = datetime.now()
+            meta['synced_to'] = end
+            meta['synced_at'] = time.time()
+            meta['final'] = end < now.strftime("%Y%m%d") or now.strftime("%H%M") >= MARKET_CLOSE
+            _save_bars(code, bars, meta)
+
+        return bars
+
+
+def sync_indices(end: str, lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> Dict[str, int]:
+    """
+    KOSPI / KOSDAQ 지수를 end 일자까지 동기화 (일별 작업용)
+
+    Returns:
+        {시장: 저장된 봉 수}
+    """
+    default_start = (datetime.strptime(end, "%Y%m%d") - timedelta(days=lookback_days)).strftime("%Y%m%d")
+
+    result = {}
+    for market, code in INDICES.items():
+        try:
+            meta = load_json(_meta_path(code)) or {}
+            result[market] = len(sync_index(code, meta.get('covered_from', default_start), end))
+        except Exception as e:
+            print(f"[IndexStore] {market} 동기화 오류: {e}")
+            result[market] = 0
+
+    print(f"[IndexStore] {end} 지수 동기화: {result}")
+    return result
+
+
+def index_closes(market: str, dates: List[str]) -> np.ndarray:
+    """
+    저장된 지수 종가를 거래일 목록에 맞춘 배열 (저장소에 없는 날짜는 NaN)
+
+    Example:
+        >>> closes = index_closes('KOSPI', ['20241230', '20250102'])
+    """
+    bars = load_index_bars(market)
+    closes = np.full(len(dates), np.nan)
+    if len(bars) == 0 or not dates:
+        return closes
+
+    day_index = np.array([date_to_days(d) for d in dates], dtype=np.int32)
+    pos = np.searchsorted(bars['date'], day_index)
+    found = pos < len(bars)
+    found[found] = bars['date'][pos[found]] == day_index[found]
+    closes[found] = bars['close'][pos[found]]
+    return closes
+
+
+def get_index_info(market: str) -> Optional[Dict]:
+    """저장 현황 (저장 봉 수, 보유 구간, 마지막 종가)"""
+    code = index_code(market)
+    meta = load_json(_meta_path(code))
+    if not meta:
+        return None
+    bars = load_index_bars(code)
+    return {
+        'code': code,
+        'bars': len(bars),
+        'covered_from': meta.get('covered_from'),
+        'synced_to': meta.get('synced_to'),
+        'last_date': days_to_date(bars['date'][-1]) if len(bars) else None,
+        'last_close': float(bars['close'][-1]) if len(bars) else None,
+    }
+
+
+if __name__ == "__main__":
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    sync_indices(latest_trading_day())
+    for market in INDICES:
+        print(market, get_index_info(market))
@@ -0,0 +1,425 @@
+"""
+시장 전체 기술적 지표 엔진
+
+로컬 일봉 저장소의 종목들을 (종목 × 거래일) 2차원 NumPy 배열로 정렬하고
+RSI, MFI, 이동평균(5/20/60/120), 거래량 이동평균, 골든/데드크로스, 거래량 급증을
+시장 전체에 대해 한 번의 벡터 연산으로 계산한다.
+
+- 계산식은 stock_service.OhlcvFrame 의 종목별 계산과 동일
+- 상장 전/데이터 없는 칸은 NaN 으로 두고 해당 구간의 지표도 NaN
+- 결과는 data/cache/krx/indicators/YYYYMMDD.npz 에 저장되어 스크리닝/알림에서 재사용
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.krx import price_store
+from app.utils.local_store import get_cache_dir, atomic_write_bytes
+
+
+# 패널에 담을 거래일 수 (120일 이동평균 + 크로스 판단 + 여유분)
+PANEL_SESSIONS = 260
+
+# 기본 지표 기간
+MA_PERIODS = [5, 20, 60, 120]
+VOLUME_MA_PERIODS = [5, 20]
+RSI_PERIOD = 14
+MFI_PERIOD = 14
+
+# 거래량 급증 기준 (20일 평균 대비 배수)
+VOLUME_SURGE_RATIO = 2
+
+# 추세 코드
+TREND_UP = 1
+TREND_NEUTRAL = 0
+TREND_DOWN = -1
+
+_panels: Dict[str, "IndicatorPanel"] = {}
+_panel_lock = threading.Lock()
+_panel_mtime: float = 0.0
+
+
+def _panel_path(date: str) -> str:
+    return os.path.join(get_cache_dir('krx', 'indicators'), f"{date}.npz")
+
+
+# ============================================
+# 가격 패널
+# ============================================
+
+class PricePanel:
+    """
+    (종목 × 거래일) 가격 행렬
+
+    tickers: 종목코드 배열 (행)
+    dates: 거래일 목록 YYYYMMDD (열, 오름차순)
+    open/high/low/close/volume: float64 2차원 배열 (결측은 NaN)
+    """
+
+    def __init__(self, tickers: np.ndarray, dates: List[str], fields: Dict[str, np.ndarray]):
+        self.tickers = tickers
+        self.dates = dates
+        self.open = fields['open']
+        self.high = fields['high']
+        self.low = fields['low']
+        self.close = fields['close']
+        self.volume = fields['volume']
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+
+def _panel_dates(end: str, sessions: int) -> List[str]:
+    """end 이하 최근 sessions 개 거래일"""
+    from app.services.krx.trading_calendar import get_trading_calendar
+
+    calendar = get_trading_calendar()
+    start = calendar.previous_trading_day(sessions - 1, end)
+    return calendar.sessions_between(start, end)
+
+
+def build_price_panel(end: str, tickers: List[str] = None, sessions: int = PANEL_SESSIONS) -> PricePanel:
+    """
+    로컬 저장소에서 가격 패널 생성 (네트워크 조회 없음)
+
+    Args:
+        end: 마지막 거래일 (YYYYMMDD)
+        tickers: 대상 종목 (기본: 저장소의 모든 종목)
+        sessions: 거래일 수
+
+    Returns:
+        PricePanel
+    """
+    tickers = tickers if tickers is not None else price_store.stored_tickers()
+    dates = _panel_dates(end, sessions)
+    day_index = np.array([price_store.date_to_days(d) for d in dates], dtype=np.int32)
+
+    fields = {
+        name: np.full((len(tickers), len(dates)), np.nan)
+        for name in ['open', 'high', 'low', 'close', 'volume']
+    }
+
+    for row, ticker in enumerate(tickers):
+        bars = price_store.load_bars(ticker)
+        if len(bars) == 0 or len(dates) == 0:
+            continue
+
+        # 저장 봉 날짜 → 패널 열 위치 (패널 범위 밖/휴장일 불일치는 제외)
+        cols = np.searchsorted(day_index, bars['date'])
+        valid = cols < len(dates)
+        valid[valid] = day_index[cols[valid]] == bars['date'][valid]
+
+        for name in fields:
+            fields[name][row, cols[valid]] = bars[name][valid]
+
+    return PricePanel(np.array(tickers, dtype='U6'), dates, fields)
+
+
+# ============================================
+# 벡터 연산
+# ============================================
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    행 방향 이동 합계 (창 안에 NaN 이 있으면 NaN)
+
+    정수 값(가격, 거래량)의 누적합은 float64 에서 정확하므로 누적합 차분으로 계산한다.
+    """
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] < window:
+        return out
+
+    zeros = np.zeros((values.shape[0], 1))
+    cumsum = np.concatenate([zeros, np.cumsum(np.nan_to_num(values), axis=1)], axis=1)
+    nan_count = np.concatenate([zeros, np.cumsum(np.isnan(values), axis=1)], axis=1)
+
+    sums = cumsum[:, window:] - cumsum[:, :-window]
+    has_nan = (nan_count[:, window:] - nan_count[:, :-window]) > 0
+    out[:, window - 1:] = np.where(has_nan, np.nan, sums)
+    return out
+
+
+def _rolling_sum_exact(values: np.ndarray, window: int) -> np.ndarray:
+    """행 방향 이동 합계 (소수 값용, 창 단위 직접 합산)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] < window:
+        return out
+    out[:, window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=1).sum(axis=-1)
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """행 방향 단순 이동평균"""
+    return _rolling_sum(values, window) / window
+
+
+def _diff(values: np.ndarray) -> np.ndarray:
+    """행 방향 전일 대비 차이 (첫 열은 NaN)"""
+    out = np.full(values.shape, np.nan)
+    out[:, 1:] = values[:, 1:] - values[:, :-1]
+    return out
+
+
+def _ratio_index(positive: np.ndarray, negative: np.ndarray) -> np.ndarray:
+    """100 - 100 / (1 + positive / negative)  (RSI/MFI 공통)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + positive / negative))
+
+
+def compute_rsi(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """RSI (OhlcvFrame.rsi 와 같은 단순 이동평균 방식)"""
+    delta = _diff(close)
+    # 결측 구간 표시 (상장 전 등) - 첫 차분의 NaN 은 pandas 와 같이 0 으로 취급
+    missing = np.isnan(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[missing] = np.nan
+    loss[missing] = np.nan
+    return _ratio_index(rolling_mean(gain, period), rolling_mean(loss, period))
+
+
+def compute_mfi(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                period: int = MFI_PERIOD) -> np.ndarray:
+    """MFI (OhlcvFrame.mfi 와 같은 계산식)"""
+    typical_price = (high + low + close) / 3
+    raw_money_flow = typical_price * volume
+    tp_diff = _diff(typical_price)
+
+    missing = np.isnan(raw_money_flow)
+    positive = np.where(tp_diff > 0, raw_money_flow, 0.0)
+    negative = np.where(tp_diff < 0, raw_money_flow, 0.0)
+    positive[missing] = np.nan
+    negative[missing] = np.nan
+
+    return _ratio_index(_rolling_sum_exact(positive, period), _rolling_sum_exact(negative, period))
+
+
+def compute_crosses(fast: np.ndarray, slow: np.ndarray):
+    """
+    골든/데드크로스 (전일 fast < slow 이고 당일 fast > slow 이면 골든크로스)
+
+    Returns:
+        (golden, dead) bool 2차원 배열
+    """
+    golden = np.zeros(fast.shape, dtype=bool)
+    dead = np.zeros(fast.shape, dtype=bool)
+    golden[:, 1:] = (fast[:, :-1] < slow[:, :-1]) & (fast[:, 1:] > slow[:, 1:])
+    dead[:, 1:] = (fast[:, :-1] > slow[:, :-1]) & (fast[:, 1:] < slow[:, 1:])
+    return golden, dead
+
+
+def compute_trend(close: np.ndarray, ma5: np.ndarray, ma20: np.ndarray) -> np.ndarray:
+    """추세 코드 (OhlcvFrame.moving_averages 의 추세 판단과 동일, 이동평균은 정수로 절사)"""
+    ma5_int = np.trunc(np.nan_to_num(ma5))
+    ma20_int = np.trunc(np.nan_to_num(ma20))
+
+    trend = np.full(close.shape, TREND_NEUTRAL, dtype=np.int8)
+    valid = ma20_int > 0
+    trend[valid & (close > ma20_int) & (ma5_int > ma20_int)] = TREND_UP
+    trend[valid & (close < ma20_int) & (ma5_int < ma20_int)] = TREND_DOWN
+    return trend
+
+
+# ============================================
+# 지표 패널
+# ============================================
+
+class IndicatorPanel:
+    """
+    시장 전체 지표 행렬 묶음
+
+    values: 지표명 → (종목 × 거래일) 배열
+      close, change_rate, ma5/ma20/ma60/ma120, vol_ma5/vol_ma20, rsi, mfi,
+      golden_cross, dead_cross, volume_surge, trend
+    """
+
+    def __init__(self, date: str, tickers: np.ndarray, dates: List[str],
+                 values: Dict[str, np.ndarray], built_at: float):
+        self.date = date
+        self.tickers = tickers
+        self.dates = dates
+        self.values = values
+        self.built_at = built_at
+        self._position: Dict[str, int] = {t: i for i, t in enumerate(tickers.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._position
+
+    def position(self, ticker: str) -> Optional[int]:
+        return self._position.get(ticker)
+
+    def latest(self, name: str) -> np.ndarray:
+        """지표의 마지막 거래일 값 (종목 순서 1차원 배열)"""
+        return self.values[name][:, -1]
+
+    def row(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """종목 한 개의 마지막 거래일 지표 (결측은 None)"""
+        pos = self._position.get(ticker)
+        if pos is None:
+            return None
+
+        row = {'ticker': ticker, 'date': self.dates[-1] if self.dates else self.date}
+        for name, values in self.values.items():
+            value = values[pos, -1]
+            if isinstance(value, np.bool_):
+                row[name] = bool(value)
+            elif isinstance(value, np.integer):
+                row[name] = int(value)
+            else:
+                row[name] = None if np.isnan(value) else float(value)
+        return row
+
+    def to_frame(self, names: List[str] = None) -> pd.DataFrame:
+        """마지막 거래일 지표 테이블 (index: 종목코드)"""
+        names = names or list(self.values)
+        return pd.DataFrame({name: self.latest(name) for name in names},
+                            index=pd.Index(self.tickers, name='ticker'))
+
+    def save(self) -> None:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            _tickers=self.tickers,
+            _dates=np.array(self.dates, dtype='U8'),
+            _built_at=np.float64(self.built_at),
+            **self.values
+        )
+        atomic_write_bytes(_panel_path(self.date), buffer.getvalue())
+
+    @classmethod
+    def load(cls, date: str) -> Optional["IndicatorPanel"]:
+        path = _panel_path(date)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                values = {k: data[k] for k in data.files if not k.startswith('_')}
+                return cls(date, data['_tickers'], data['_dates'].tolist(), values,
+                           float(data['_built_at']))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[IndicatorEngine] {date} 로드 오류: {e}")
+            return None
+
+
+def compute_indicators(panel: PricePanel, date: str = None) -> IndicatorPanel:
+    """
+    가격 패널 → 시장 전체 지표 (한 번의 벡터 연산)
+
+    Args:
+        panel: PricePanel
+        date: 기준 거래일 (기본: 패널의 마지막 거래일)
+    """
+    close = panel.close
+    values: Dict[str, np.ndarray] = {'close': close}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_rate = np.full(close.shape, np.nan)
+        change_rate[:, 1:] = (close[:, 1:] - close[:, :-1]) / close[:, :-1] * 100
+    values['change_rate'] = change_rate
+
+    for period in MA_PERIODS:
+        values[f'ma{period}'] = rolling_mean(close, period)
+    for period in VOLUME_MA_PERIODS:
+        values[f'vol_ma{period}'] = rolling_mean(panel.volume, period)
+
+    values['rsi'] = compute_rsi(close)
+    values['mfi'] = compute_mfi(panel.high, panel.low, close, panel.volume)
+
+    values['golden_cross'], values['dead_cross'] = compute_crosses(values['ma5'], values['ma20'])
+
+    vol_ma20 = values['vol_ma20']
+    values['volume_surge'] = np.nan_to_num(vol_ma20) > 0
+    values['volume_surge'] &= panel.volume > vol_ma20 * VOLUME_SURGE_RATIO
+
+    values['trend'] = compute_trend(close, values['ma5'], values['ma20'])
+
+    date = date or (panel.dates[-1] if panel.dates else '')
+    return IndicatorPanel(date, panel.tickers, panel.dates, values, built_at=time.time())
+
+
+def build_indicator_panel(date: str, tickers: List[str] = None) -> IndicatorPanel:
+    """
+    저장소 전체 종목의 지표 계산 및 저장
+
+    Args:
+        date: 기준 거래일 (YYYYMMDD)
+        tickers: 대상 종목 (기본: 저장소의 모든 종목)
+    """
+    started = time.time()
+    panel = build_price_panel(date, tickers)
+    indicators = compute_indicators(panel, date)
+    indicators.save()
+
+    print(f"[IndicatorEngine] {date} 지표 계산: {panel.shape[0]}개 종목 × {panel.shape[1]}일 "
+          f"({time.time() - started:.2f}초)")
+    return indicators
+
+
+def latest_panel_date() -> Optional[str]:
+    """디스크에 저장된 가장 최근 지표 패널 날짜 (계산 없음)"""
+    dates = [name[:-4] for name in os.listdir(get_cache_dir('krx', 'indicators')) if name.endswith('.npz')]
+    return max(dates) if dates else None
+
+
+def get_indicator_panel(date: str = None, build: bool = False) -> Optional[IndicatorPanel]:
+    """
+    시장 전체 지표 패널 조회 (메모리 → 디스크, 파일이 바뀐 경우에만 다시 읽음)
+
+    계산은 일별 작업의 build_indicator_panel 에서 하며, 요청 처리 중에는 저장된 패널만 읽는다.
+
+    Args:
+        date: 기준 거래일 (기본: 최근 거래일)
+        build: 저장된 패널이 없으면 계산할지 여부 (일별 작업/스크립트용)
+
+    Example:
+        >>> panel = get_indicator_panel()
+        >>> df = panel.to_frame(['rsi', 'mfi', 'golden_cross'])
+        >>> print(df[df['rsi'] <= 30].head())
+    """
+    global _panel_mtime
+
+    if date is None:
+        from app.services.krx.trading_calendar import latest_trading_day
+        date = latest_trading_day()
+
+    with _panel_lock:
+        path = _panel_path(date)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+        panel = _panels.get(date)
+
+        # 다른 프로세스(일별 작업)가 파일을 다시 쓴 경우 새로 로드
+        if mtime and (panel is None or mtime != _panel_mtime):
+            panel = IndicatorPanel.load(date) or panel
+
+        if panel is None and build:
+            try:
+                panel = build_indicator_panel(date)
+                mtime = os.path.getmtime(path)
+            except Exception as e:
+                print(f"[IndicatorEngine] {date} 계산 오류: {e}")
+
+        if panel is not None:
+            # 최근 거래일 패널 하나만 메모리에 유지
+            _panels.clear()
+            _panels[date] = panel
+            _panel_mtime = mtime
+
+        return panel
+
+
+if __name__ == "__main__":
+    panel = get_indicator_panel(build=True)
+    if panel:
+        df = panel.to_frame(['close', 'rsi', 'mfi', 'ma20', 'golden_cross', 'volume_surge'])
+        print(df.describe())
+        print(df[df['golden_cross']].head(10))
@@ -0,0 +1,567 @@
+"""
+증분 기술적 지표 상태
+
+이동평균, RSI, MFI, 거래량 이동평균을 새 일봉 한 개씩 상수 시간에 갱신하는 스트리밍 상태.
+시장 전체 종목을 행으로 묶어 한 번에 갱신하고 data/cache/krx/indicator_state.npz 에 저장한다.
+
+- 이동 합계: 종목별 최근 window 개 값을 원형 버퍼에 두고 합계를 더하고 빼서 갱신
+  (버퍼가 한 바퀴 돌 때마다 합계를 다시 더해 부동소수 오차 누적을 막음)
+- RSI: 기존 calculate_rsi 와 같은 단순 이동평균 값(rsi)과 Wilder 평활 값(rsi_wilder)을 함께 유지
+- 야간 작업은 전일 상태에 당일 봉 한 줄만 반영하고,
+  수정주가 변경 등으로 전일 종가가 맞지 않는 종목만 저장소 이력으로 다시 계산한다.
+"""
+
+import io
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.krx import price_store
+from app.services.krx.indicator_engine import (
+    MA_PERIODS,
+    VOLUME_MA_PERIODS,
+    RSI_PERIOD,
+    MFI_PERIOD,
+    VOLUME_SURGE_RATIO,
+    TREND_UP,
+    TREND_DOWN,
+    TREND_NEUTRAL,
+    PANEL_SESSIONS,
+    build_price_panel,
+)
+from app.utils.local_store import get_cache_dir, atomic_write_bytes
+
+
+# 보관할 최근 RSI/MFI 이력 수 (보고서 표시용)
+HISTORY_LENGTH = 5
+
+_state: Optional["IndicatorState"] = None
+_state_mtime = 0.0
+_state_lock = threading.Lock()
+
+
+def _state_path() -> str:
+    return os.path.join(get_cache_dir('krx'), 'indicator_state.npz')
+
+
+def _ratio_index(positive: np.ndarray, negative: np.ndarray) -> np.ndarray:
+    """100 - 100 / (1 + positive / negative)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + positive / negative))
+
+
+# ============================================
+# 스트리밍 구성 요소
+# ============================================
+
+class RollingWindow:
+    """
+    종목 n개의 최근 window 개 값 원형 버퍼 (모든 종목이 같은 위치를 공유)
+
+    total: 버퍼 내 유효값 합계, missing: 버퍼 내 NaN 개수
+    """
+
+    def __init__(self, window: int, n: int):
+        self.window = window
+        self.pos = 0
+        self.buf = np.full((n, window), np.nan)
+        self.total = np.zeros(n)
+        self.missing = np.full(n, window, dtype=np.int32)
+
+    def push(self, values: np.ndarray) -> None:
+        """새 값 한 열 추가 (종목당 O(1))"""
+        old = self.buf[:, self.pos]
+        old_nan = np.isnan(old)
+        new_nan = np.isnan(values)
+
+        self.total += np.where(new_nan, 0.0, values) - np.where(old_nan, 0.0, old)
+        self.missing += new_nan.astype(np.int32) - old_nan.astype(np.int32)
+        self.buf[:, self.pos] = values
+        self.pos = (self.pos + 1) % self.window
+
+        # 한 바퀴마다 합계 재계산 (분할 상환 O(1))
+        if self.pos == 0:
+            self.total = np.nansum(self.buf, axis=1)
+
+    def sum(self) -> np.ndarray:
+        return np.where(self.missing > 0, np.nan, self.total)
+
+    def mean(self) -> np.ndarray:
+        return self.sum() / self.window
+
+    def ordered(self) -> np.ndarray:
+        """오래된 값 → 최근 값 순서의 버퍼"""
+        return np.roll(self.buf, -self.pos, axis=1)
+
+    def add_rows(self, count: int) -> None:
+        self.buf = np.vstack([self.buf, np.full((count, self.window), np.nan)])
+        self.total = np.concatenate([self.total, np.zeros(count)])
+        self.missing = np.concatenate([self.missing, np.full(count, self.window, dtype=np.int32)])
+
+    def copy_row(self, row: int, source: "RollingWindow", source_row: int) -> None:
+        """다른 버퍼의 한 행을 원형 위치를 맞춰 복사"""
+        self.buf[row] = np.roll(source.buf[source_row], self.pos - source.pos)
+        self.total[row] = source.total[source_row]
+        self.missing[row] = source.missing[source_row]
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            f'{prefix}.buf': self.buf,
+            f'{prefix}.total': self.total,
+            f'{prefix}.missing': self.missing,
+            f'{prefix}.pos': np.int64(self.pos),
+        }
+
+    def load_arrays(self, data, prefix: str) -> None:
+        self.buf = data[f'{prefix}.buf']
+        self.total = data[f'{prefix}.total']
+        self.missing = data[f'{prefix}.missing']
+        self.pos = int(data[f'{prefix}.pos'])
+
+
+class RsiState:
+    """
+    RSI 스트리밍 상태
+
+    - gains/losses: 단순 이동평균 RSI (calculate_rsi 와 동일)
+    - avg_gain/avg_loss: Wilder 평활 (첫 period 개는 단순 평균으로 시작)
+    """
+
+    def __init__(self, period: int, n: int):
+        self.period = period
+        self.prev_close = np.full(n, np.nan)
+        self.gains = RollingWindow(period, n)
+        self.losses = RollingWindow(period, n)
+        self.avg_gain = np.zeros(n)
+        self.avg_loss = np.zeros(n)
+        self.count = np.zeros(n, dtype=np.int32)
+
+    def push(self, close: np.ndarray) -> None:
+        delta = close - self.prev_close
+        missing = np.isnan(close)
+        # 전일 종가가 없는 첫 봉의 변화량은 0으로 취급 (pandas diff + where 와 동일)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        gain[missing] = np.nan
+        loss[missing] = np.nan
+
+        self.gains.push(gain)
+        self.losses.push(loss)
+
+        # Wilder 평활 (결측이면 다시 시작)
+        p = self.period
+        warming = self.count < p
+        self.avg_gain = np.where(warming, self.avg_gain + np.nan_to_num(gain) / p,
+                                 (self.avg_gain * (p - 1) + np.nan_to_num(gain)) / p)
+        self.avg_loss = np.where(warming, self.avg_loss + np.nan_to_num(loss) / p,
+                                 (self.avg_loss * (p - 1) + np.nan_to_num(loss)) / p)
+        self.count = np.where(missing, 0, self.count + 1).astype(np.int32)
+        self.avg_gain[missing] = 0.0
+        self.avg_loss[missing] = 0.0
+
+        self.prev_close = close.astype(float)
+
+    def value(self) -> np.ndarray:
+        return _ratio_index(self.gains.mean(), self.losses.mean())
+
+    def wilder_value(self) -> np.ndarray:
+        value = _ratio_index(self.avg_gain, self.avg_loss)
+        return np.where(self.count >= self.period, value, np.nan)
+
+    def add_rows(self, count: int) -> None:
+        self.prev_close = np.concatenate([self.prev_close, np.full(count, np.nan)])
+        self.gains.add_rows(count)
+        self.losses.add_rows(count)
+        self.avg_gain = np.concatenate([self.avg_gain, np.zeros(count)])
+        self.avg_loss = np.concatenate([self.avg_loss, np.zeros(count)])
+        self.count = np.concatenate([self.count, np.zeros(count, dtype=np.int32)])
+
+    def copy_row(self, row: int, source: "RsiState", source_row: int) -> None:
+        self.prev_close[row] = source.prev_close[source_row]
+        self.gains.copy_row(row, source.gains, source_row)
+        self.losses.copy_row(row, source.losses, source_row)
+        self.avg_gain[row] = source.avg_gain[source_row]
+        self.avg_loss[row] = source.avg_loss[source_row]
+        self.count[row] = source.count[source_row]
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {
+            f'{prefix}.prev_close': self.prev_close,
+            f'{prefix}.avg_gain': self.avg_gain,
+            f'{prefix}.avg_loss': self.avg_loss,
+            f'{prefix}.count': self.count,
+        }
+        arrays.update(self.gains.to_arrays(f'{prefix}.gains'))
+        arrays.update(self.losses.to_arrays(f'{prefix}.losses'))
+        return arrays
+
+    def load_arrays(self, data, prefix: str) -> None:
+        self.prev_close = data[f'{prefix}.prev_close']
+        self.avg_gain = data[f'{prefix}.avg_gain']
+        self.avg_loss = data[f'{prefix}.avg_loss']
+        self.count = data[f'{prefix}.count']
+        self.gains.load_arrays(data, f'{prefix}.gains')
+        self.losses.load_arrays(data, f'{prefix}.losses')
+
+
+class MfiState:
+    """MFI 스트리밍 상태 (양/음 자금 흐름 이동 합계)"""
+
+    def __init__(self, period: int, n: int):
+        self.period = period
+        self.prev_tp = np.full(n, np.nan)
+        self.positive = RollingWindow(period, n)
+        self.negative = RollingWindow(period, n)
+
+    def push(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> None:
+        typical_price = (high + low + close) / 3
+        raw_money_flow = typical_price * volume
+        tp_diff = typical_price - self.prev_tp
+
+        missing = np.isnan(raw_money_flow)
+        positive = np.where(tp_diff > 0, raw_money_flow, 0.0)
+        negative = np.where(tp_diff < 0, raw_money_flow, 0.0)
+        positive[missing] = np.nan
+        negative[missing] = np.nan
+
+        self.positive.push(positive)
+        self.negative.push(negative)
+        self.prev_tp = typical_price
+
+    def value(self) -> np.ndarray:
+        return _ratio_index(self.positive.sum(), self.negative.sum())
+
+    def add_rows(self, count: int) -> None:
+        self.prev_tp = np.concatenate([self.prev_tp, np.full(count, np.nan)])
+        self.positive.add_rows(count)
+        self.negative.add_rows(count)
+
+    def copy_row(self, row: int, source: "MfiState", source_row: int) -> None:
+        self.prev_tp[row] = source.prev_tp[source_row]
+        self.positive.copy_row(row, source.positive, source_row)
+        self.negative.copy_row(row, source.negative, source_row)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {f'{prefix}.prev_tp': self.prev_tp}
+        arrays.update(self.positive.to_arrays(f'{prefix}.positive'))
+        arrays.update(self.negative.to_arrays(f'{prefix}.negative'))
+        return arrays
+
+    def load_arrays(self, data, prefix: str) -> None:
+        self.prev_tp = data[f'{prefix}.prev_tp']
+        self.positive.load_arrays(data, f'{prefix}.positive')
+        self.negative.load_arrays(data, f'{prefix}.negative')
+
+
+# ============================================
+# 시장 전체 상태
+# ============================================
+
+class IndicatorState:
+    """
+    시장 전체 증분 지표 상태
+
+    advance()로 하루치 봉 한 열을 받아 모든 지표를 종목당 상수 시간에 갱신한다.
+    """
+
+    def __init__(self, tickers: List[str]):
+        n = len(tickers)
+        self.tickers = list(tickers)
+        self.date = ''
+        self.history_dates: List[str] = []
+        self._position: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+
+        self.ma = {period: RollingWindow(period, n) for period in MA_PERIODS}
+        self.vol_ma = {period: RollingWindow(period, n) for period in VOLUME_MA_PERIODS}
+        self.rsi = RsiState(RSI_PERIOD, n)
+        self.mfi = MfiState(MFI_PERIOD, n)
+        self.rsi_history = RollingWindow(HISTORY_LENGTH, n)
+        self.mfi_history = RollingWindow(HISTORY_LENGTH, n)
+
+        self.close = np.full(n, np.nan)
+        self.volume = np.full(n, np.nan)
+        self.prev_ma5 = np.full(n, np.nan)
+        self.prev_ma20 = np.full(n, np.nan)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._position
+
+    def position(self, ticker: str) -> Optional[int]:
+        return self._position.get(ticker)
+
+    def _components(self) -> Dict[str, Any]:
+        components = {f'ma{p}': w for p, w in self.ma.items()}
+        components.update({f'vol_ma{p}': w for p, w in self.vol_ma.items()})
+        components.update({
+            'rsi': self.rsi,
+            'mfi': self.mfi,
+            'rsi_history': self.rsi_history,
+            'mfi_history': self.mfi_history,
+        })
+        return components
+
+    _ROW_ARRAYS = ['close', 'volume', 'prev_ma5', 'prev_ma20']
+
+    # ----------------------------------------
+    # 갱신
+    # ----------------------------------------
+
+    def add_tickers(self, tickers: List[str]) -> List[int]:
+        """새 종목 행 추가 (지표는 이력이 채워질 때까지 NaN)"""
+        new = [t for t in tickers if t not in self._position]
+        if not new:
+            return []
+
+        start = len(self.tickers)
+        for component in self._components().values():
+            component.add_rows(len(new))
+        for name in self._ROW_ARRAYS:
+            setattr(self, name, np.concatenate([getattr(self, name), np.full(len(new), np.nan)]))
+
+        self.tickers.extend(new)
+        self._position.update({t: start + i for i, t in enumerate(new)})
+        return list(range(start, len(self.tickers)))
+
+    def advance(self, date: str, high: np.ndarray, low: np.ndarray,
+                close: np.ndarray, volume: np.ndarray) -> None:
+        """
+        하루치 봉 반영 (배열은 self.tickers 순서, 봉이 없는 종목은 NaN)
+        """
+        self.prev_ma5 = self.ma[5].mean() if 5 in self.ma else self.prev_ma5
+        self.prev_ma20 = self.ma[20].mean() if 20 in self.ma else self.prev_ma20
+
+        for window in self.ma.values():
+            window.push(close)
+        for window in self.vol_ma.values():
+            window.push(volume)
+        self.rsi.push(close)
+        self.mfi.push(high, low, close, volume)
+
+        self.rsi_history.push(self.rsi.value())
+        self.mfi_history.push(self.mfi.value())
+        self.history_dates = (self.history_dates + [date])[-HISTORY_LENGTH:]
+
+        self.close = close.astype(float)
+        self.volume = volume.astype(float)
+        self.date = date
+
+    def copy_rows(self, rows: List[int], source: "IndicatorState") -> None:
+        """source 상태(같은 날짜까지 계산됨)에서 종목 행을 복사"""
+        for row in rows:
+            source_row = source.position(self.tickers[row])
+            if source_row is None:
+                continue
+            components = source._components()
+            for name, component in self._components().items():
+                component.copy_row(row, components[name], source_row)
+            for name in self._ROW_ARRAYS:
+                getattr(self, name)[row] = getattr(source, name)[source_row]
+
+    # ----------------------------------------
+    # 조회
+    # ----------------------------------------
+
+    def latest(self) -> Dict[str, np.ndarray]:
+        """현재 지표값 (종목 순서 배열)"""
+        values = {'close': self.close}
+        for period, window in self.ma.items():
+            values[f'ma{period}'] = window.mean()
+        for period, window in self.vol_ma.items():
+            values[f'vol_ma{period}'] = window.mean()
+        values['rsi'] = self.rsi.value()
+        values['rsi_wilder'] = self.rsi.wilder_value()
+        values['mfi'] = self.mfi.value()
+
+        ma5, ma20 = values.get('ma5'), values.get('ma20')
+        if ma5 is not None and ma20 is not None:
+            values['golden_cross'] = (self.prev_ma5 < self.prev_ma20) & (ma5 > ma20)
+            values['dead_cross'] = (self.prev_ma5 > self.prev_ma20) & (ma5 < ma20)
+
+            ma5_int = np.trunc(np.nan_to_num(ma5))
+            ma20_int = np.trunc(np.nan_to_num(ma20))
+            trend = np.full(len(self), TREND_NEUTRAL, dtype=np.int8)
+            valid = ma20_int > 0
+            trend[valid & (self.close > ma20_int) & (ma5_int > ma20_int)] = TREND_UP
+            trend[valid & (self.close < ma20_int) & (ma5_int < ma20_int)] = TREND_DOWN
+            values['trend'] = trend
+
+        vol_ma20 = values.get('vol_ma20')
+        if vol_ma20 is not None:
+            values['volume_surge'] = (np.nan_to_num(vol_ma20) > 0) & (self.volume > vol_ma20 * VOLUME_SURGE_RATIO)
+
+        return values
+
+    def row(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        종목 한 개의 현재 지표
+
+        Returns:
+            지표명 → 값 (결측은 None), rsi_history / mfi_history 포함
+        """
+        pos = self._position.get(ticker)
+        if pos is None:
+            return None
+
+        row: Dict[str, Any] = {'ticker': ticker, 'date': self.date}
+        for name, values in self.latest().items():
+            value = values[pos]
+            if isinstance(value, np.bool_):
+                row[name] = bool(value)
+            elif isinstance(value, np.integer):
+                row[name] = int(value)
+            else:
+                row[name] = None if np.isnan(value) else float(value)
+
+        dates = self.history_dates
+        for name, window in [('rsi_history', self.rsi_history), ('mfi_history', self.mfi_history)]:
+            history = window.ordered()[pos][-len(dates):] if dates else []
+            row[name] = [(date, None if np.isnan(v) else float(v)) for date, v in zip(dates, history)]
+        return row
+
+    # ----------------------------------------
+    # 저장
+    # ----------------------------------------
+
+    def save(self) -> None:
+        arrays: Dict[str, np.ndarray] = {
+            '_tickers': np.array(self.tickers, dtype='U6'),
+            '_date': np.array(self.date),
+            '_history_dates': np.array(self.history_dates, dtype='U8'),
+        }
+        for name, component in self._components().items():
+            arrays.update(component.to_arrays(name))
+        for name in self._ROW_ARRAYS:
+            arrays[name] = getattr(self, name)
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        atomic_write_bytes(_state_path(), buffer.getvalue())
+
+    @classmethod
+    def load(cls) -> Optional["IndicatorState"]:
+        path = _state_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                state = cls(data['_tickers'].tolist())
+                state.date = str(data['_date'])
+                state.history_dates = data['_history_dates'].tolist()
+                for name, component in state._components().items():
+                    component.load_arrays(data, name)
+                for name in cls._ROW_ARRAYS:
+                    setattr(state, name, data[name])
+                return state
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[IndicatorState] 로드 오류: {e}")
+            return None
+
+
+# ============================================
+# 생성 / 야간 갱신
+# ============================================
+
+def seed_indicator_state(date: str, tickers: List[str] = None) -> IndicatorState:
+    """
+    저장소 일봉 이력을 처음부터 재생하여 상태 생성
+
+    Args:
+        date: 마지막 거래일 (YYYYMMDD)
+        tickers: 대상 종목 (기본: 저장소의 모든 종목)
+    """
+    panel = build_price_panel(date, tickers, sessions=PANEL_SESSIONS)
+    state = IndicatorState(panel.tickers.tolist())
+
+    for col, day in enumerate(panel.dates):
+        state.advance(day, panel.high[:, col], panel.low[:, col],
+                      panel.close[:, col], panel.volume[:, col])
+    return state
+
+
+def _latest_bars(tickers: List[str], date: str) -> Dict[str, np.ndarray]:
+    """저장소에서 종목별 date 봉과 직전 봉 종가 (없으면 NaN)"""
+    day = price_store.date_to_days(date)
+    fields = {name: np.full(len(tickers), np.nan) for name in ['high', 'low', 'close', 'volume', 'prev_close']}
+
+    for i, ticker in enumerate(tickers):
+        bars = price_store.load_bars(ticker)
+        if len(bars) == 0:
+            continue
+        pos = np.searchsorted(bars['date'], day)
+        if pos < len(bars) and bars['date'][pos] == day:
+            for name in ['high', 'low', 'close', 'volume']:
+                fields[name][i] = bars[name][pos]
+        if pos > 0:
+            fields['prev_close'][i] = bars['close'][pos - 1]
+    return fields
+
+
+def update_indicator_state(date: str) -> IndicatorState:
+    """
+    야간 증분 갱신: 전일 상태에 date 일봉 한 줄만 반영하여 저장
+
+    - 상태가 없거나 전일 상태가 아니면 전체 재생성
+    - 저장소의 새 종목, 전일 종가가 상태와 다른 종목(수정주가 변경)만 이력으로 재계산
+    """
+    from app.services.krx.trading_calendar import previous_trading_day
+
+    started = time.time()
+    state = IndicatorState.load()
+
+    if state is None or state.date != previous_trading_day(1, date):
+        if state is None or state.date != date:
+            state = seed_indicator_state(date)
+            state.save()
+            print(f"[IndicatorState] {date} 전체 생성: {len(state)}개 종목 ({time.time() - started:.2f}초)")
+        return state
+
+    new_rows = state.add_tickers(price_store.stored_tickers())
+    bars = _latest_bars(state.tickers, date)
+
+    # 전일 종가가 맞지 않는 종목은 재계산 대상
+    with np.errstate(invalid='ignore'):
+        mismatch = ~np.isnan(bars['prev_close']) & (bars['prev_close'] != state.close)
+    reseed = sorted(set(new_rows) | set(np.flatnonzero(mismatch).tolist()))
+
+    state.advance(date, bars['high'], bars['low'], bars['close'], bars['volume'])
+
+    if reseed:
+        fresh = seed_indicator_state(date, [state.tickers[i] for i in reseed])
+        state.copy_rows(reseed, fresh)
+
+    state.save()
+    print(f"[IndicatorState] {date} 증분 갱신: {len(state)}개 종목, 재계산 {len(reseed)}개 "
+          f"({time.time() - started:.2f}초)")
+    return state
+
+
+def get_indicator_state() -> Optional[IndicatorState]:
+    """
+    저장된 지표 상태 조회 (파일이 바뀌었을 때만 다시 로드, 네트워크 조회 없음)
+
+    Example:
+        >>> state = get_indicator_state()
+        >>> print(state.row("055550")['rsi'])
+    """
+    global _state, _state_mtime
+
+    with _state_lock:
+        path = _state_path()
+        mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+        if mtime and mtime != _state_mtime:
+            _state = IndicatorState.load()
+            _state_mtime = mtime
+        return _state
+
+
+if __name__ == "__main__":
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    state = update_indicator_state(latest_trading_day())
+    print(state.row("055550"))
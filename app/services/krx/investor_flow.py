@@ -0,0 +1,402 @@
+"""
+투자자별 수급 (외국인 / 기관 / 개인)
+
+거래일 하루에 대해 KOSPI/KOSDAQ 전 종목의 투자자별 순매수 거래대금/거래량을
+시장 × 투자자 일괄 조회(총 6회)로 받아
+data/cache/krx/investor_flow/daily/YYYYMMDD.npz 컬럼형 테이블로 저장하고,
+최근 60거래일 테이블을 (투자자 × 종목 × 거래일) 배열로 쌓아
+5/20/60일 누적 순매수, 시가총액 대비 강도, 연속 순매수일을 한 번에 계산한다.
+(data/cache/krx/investor_flow/YYYYMMDD.json, 일별 작업에서 생성)
+
+- 순매수 금액 단위는 억원, 강도는 시가총액 대비 %
+- 시장 전체 수급은 같은 테이블의 종목 합계 (추가 조회 없음)
+- 연속 순매수일: 양수는 연속 순매수, 음수는 연속 순매도 일수
+
+보고서 생성 시에는 저장된 결과만 읽으므로 추가 네트워크 조회가 없다.
+"""
+
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from pykrx import stock
+
+from app.services.krx.market_snapshot import MARKET_CLOSE, MARKETS, MarketSnapshot
+from app.utils.local_store import atomic_write_bytes, get_cache_dir, load_json, save_json
+
+
+# 투자자 구분 → pykrx 투자자명
+INVESTORS = {
+    'foreign': '외국인',
+    'institution': '기관합계',
+    'individual': '개인',
+}
+
+INVESTOR_LABELS = {
+    'foreign': '외국인',
+    'institution': '기관',
+    'individual': '개인',
+}
+
+# 누적 기간 (거래일)
+FLOW_WINDOWS = [5, 20, 60]
+
+# 금액 단위 (억원)
+AMOUNT_UNIT = 100_000_000
+
+_results: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _flow_dir() -> str:
+    return get_cache_dir('krx', 'investor_flow')
+
+
+def _daily_path(date: str) -> str:
+    return os.path.join(get_cache_dir('krx', 'investor_flow', 'daily'), f"{date}.npz")
+
+
+def _result_path(date: str) -> str:
+    return os.path.join(_flow_dir(), f"{date}.json")
+
+
+# ============================================
+# 일별 테이블 (시장 × 투자자 일괄 조회)
+# ============================================
+
+def fetch_daily_flow(date: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    하루치 전 종목 투자자별 순매수 조회
+
+    Args:
+        date: 거래일 (YYYYMMDD)
+
+    Returns:
+        {'ticker', 'market', 'foreign_value', 'foreign_volume', ...} 컬럼 배열
+        또는 None (해당일 데이터가 없는 경우)
+    """
+    parts: List[Dict[str, np.ndarray]] = []
+
+    for market in MARKETS:
+        frames = {key: stock.get_market_net_purchases_of_equities(date, date, market, investor)
+                  for key, investor in INVESTORS.items()}
+        tickers = sorted(set().union(*(df.index.astype(str) for df in frames.values() if df is not None)))
+        if not tickers:
+            continue
+
+        part = {
+            'ticker': np.array(tickers, dtype='U6'),
+            'market': np.full(len(tickers), market, dtype='U6'),
+        }
+        for key, df in frames.items():
+            for field, column in (('value', '순매수거래대금'), ('volume', '순매수거래량')):
+                if df is None or df.empty or column not in df.columns:
+                    part[f'{key}_{field}'] = np.zeros(len(tickers), dtype=np.int64)
+                else:
+                    series = df[column].set_axis(df.index.astype(str)).reindex(tickers)
+                    part[f'{key}_{field}'] = series.fillna(0).to_numpy(dtype=np.int64)
+        parts.append(part)
+
+    if not parts:
+        return None
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def _save_daily(date: str, columns: Dict[str, np.ndarray]) -> None:
+    now = datetime.now()
+    final = date < now.strftime("%Y%m%d") or now.strftime("%H%M") >= MARKET_CLOSE
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, _final=np.bool_(final), **columns)
+    atomic_write_bytes(_daily_path(date), buffer.getvalue())
+
+
+def load_daily_flow(date: str, final_only: bool = False) -> Optional[Dict[str, np.ndarray]]:
+    """저장된 하루치 투자자별 순매수 테이블 (없으면 None)"""
+    path = _daily_path(date)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if final_only and not bool(data['_final']):
+                return None
+            return {k: data[k] for k in data.files if not k.startswith('_')}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[InvestorFlow] {date} 로드 오류: {e}")
+        return None
+
+
+def sync_daily_flows(dates: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    거래일 목록의 일별 테이블 확보 (저장소에 없거나 장중 저장분만 KRX 조회)
+
+    Returns:
+        {거래일: 컬럼 배열} (조회 실패한 날짜는 제외)
+    """
+    tables = {}
+    fetched = 0
+    for date in dates:
+        columns = load_daily_flow(date, final_only=True)
+        if columns is None:
+            try:
+                columns = fetch_daily_flow(date)
+            except Exception as e:
+                print(f"[InvestorFlow] {date} 조회 오류: {e}")
+                columns = None
+            if columns is not None:
+                _save_daily(date, columns)
+                fetched += 1
+        if columns is not None:
+            tables[date] = columns
+
+    if fetched:
+        print(f"[InvestorFlow] 일별 수급 {fetched}일 조회 (보유 {len(tables)}/{len(dates)}일)")
+    return tables
+
+
+# ============================================
+# 벡터 연산
+# ============================================
+
+def stack_flows(tables: Dict[str, Dict[str, np.ndarray]], dates: List[str]):
+    """
+    일별 테이블 → (투자자 × 종목 × 거래일) 순매수 금액 배열
+
+    Returns:
+        (tickers, markets, values) - 해당일에 없는 종목은 0
+    """
+    tickers = np.unique(np.concatenate([tables[d]['ticker'] for d in dates]))
+    markets = np.full(len(tickers), '', dtype='U6')
+    values = np.zeros((len(INVESTORS), len(tickers), len(dates)), dtype=np.float64)
+
+    for j, date in enumerate(dates):
+        table = tables[date]
+        pos = np.searchsorted(tickers, table['ticker'])
+        markets[pos] = table['market']
+        for i, key in enumerate(INVESTORS):
+            values[i, pos, j] = table[f'{key}_value']
+    return tickers, markets, values
+
+
+def window_sums(values: np.ndarray, windows: List[int]) -> np.ndarray:
+    """
+    마지막 거래일 기준 기간별 누적합 (... × 거래일 → ... × 기간)
+
+    보유 거래일보다 긴 기간은 NaN
+    """
+    days = values.shape[-1]
+    cumulative = np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)], axis=-1)
+    sums = [cumulative[..., -1] - cumulative[..., days - w] if w <= days
+            else np.full(values.shape[:-1], np.nan) for w in windows]
+    return np.stack(sums, axis=-1)
+
+
+def net_streak(values: np.ndarray) -> np.ndarray:
+    """마지막 거래일부터 같은 방향 순매수가 이어진 일수 (순매도는 음수, 당일 0이면 0)"""
+    sign = np.sign(values)
+    same = (sign == sign[..., -1:])[..., ::-1]
+    run = np.where(same.all(axis=-1), same.shape[-1], same.argmin(axis=-1))
+    return (run * sign[..., -1]).astype(np.int64)
+
+
+def _rounded(value: float, digits: int = 2) -> Optional[float]:
+    return round(float(value), digits) + 0.0 if np.isfinite(value) else None
+
+
+# ============================================
+# 계산 / 저장
+# ============================================
+
+def build_investor_flow(date: str) -> Dict[str, Any]:
+    """
+    최근 60거래일 투자자별 수급 집계 및 저장
+
+    Args:
+        date: 마지막 거래일 (YYYYMMDD)
+
+    Returns:
+        {
+            'date', 'start', 'end', 'sessions', 'windows', 'unit',
+            'markets': {'KOSPI': {'foreign': {'net': [5일, 20일, 60일], 'today'}, ...}},
+            'tickers': {종목코드: {'market', 'net': {투자자: [...]}, 'intensity': {투자자: [...]},
+                                   'streak': {투자자: 일수}}}
+        }
+    """
+    from app.services.krx.trading_calendar import get_trading_calendar
+
+    started = time.time()
+    calendar = get_trading_calendar()
+    sessions = calendar.sessions_between(calendar.previous_trading_day(max(FLOW_WINDOWS) - 1, date), date)
+
+    tables = sync_daily_flows(sessions)
+    dates = [d for d in sessions if d in tables]
+    if not dates:
+        raise ValueError(f"{date} 기준 투자자별 수급 데이터가 없습니다")
+
+    tickers, markets, values = stack_flows(tables, dates)
+    values /= AMOUNT_UNIT
+    sums = window_sums(values, FLOW_WINDOWS)       # 투자자 × 종목 × 기간
+    streaks = net_streak(values)                   # 투자자 × 종목
+
+    # 시가총액 대비 강도 (최근 스냅샷 기준)
+    market_cap = np.full(len(tickers), np.nan)
+    snapshot = MarketSnapshot.load(dates[-1])
+    if snapshot is not None:
+        cap_pos = np.searchsorted(tickers, snapshot.tickers)
+        in_range = cap_pos < len(tickers)
+        matched = np.zeros(len(snapshot), dtype=bool)
+        matched[in_range] = tickers[cap_pos[in_range]] == snapshot.tickers[in_range]
+        caps = snapshot.columns['market_cap'][matched].astype(np.float64) / AMOUNT_UNIT
+        market_cap[cap_pos[matched]] = np.where(caps > 0, caps, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        intensity = sums / market_cap[None, :, None] * 100
+
+    result: Dict[str, Any] = {
+        'date': date,
+        'start': dates[0],
+        'end': dates[-1],
+        'sessions': len(dates),
+        'windows': FLOW_WINDOWS,
+        'unit': '억원',
+        'markets': {},
+        'tickers': {},
+    }
+
+    for market in MARKETS:
+        in_market = markets == market
+        result['markets'][market] = {
+            key: {
+                'net': [_rounded(v, 1) for v in sums[i, in_market].sum(axis=0)],
+                'today': _rounded(values[i, in_market, -1].sum(), 1),
+            }
+            for i, key in enumerate(INVESTORS)
+        }
+
+    for t, ticker in enumerate(tickers.tolist()):
+        result['tickers'][ticker] = {
+            'market': str(markets[t]),
+            'net': {key: [_rounded(v) for v in sums[i, t]] for i, key in enumerate(INVESTORS)},
+            'intensity': {key: [_rounded(v, 3) for v in intensity[i, t]] for i, key in enumerate(INVESTORS)},
+            'streak': {key: int(streaks[i, t]) for i, key in enumerate(INVESTORS)},
+        }
+
+    save_json(_result_path(date), result)
+    with _lock:
+        _results.clear()
+        _results[date] = result
+
+    print(f"[InvestorFlow] {date} 투자자별 수급: {len(tickers)}개 종목, {len(dates)}거래일 "
+          f"({time.time() - started:.2f}초)")
+    return result
+
+
+def _latest_result_date() -> Optional[str]:
+    dates = sorted(name[:-5] for name in os.listdir(_flow_dir()) if name.endswith('.json'))
+    return dates[-1] if dates else None
+
+
+def get_investor_flow_table(date: str = None) -> Optional[Dict[str, Any]]:
+    """
+    저장된 투자자별 수급 집계 조회 (메모리 → 디스크)
+
+    Args:
+        date: 기준 거래일 (기본: 저장된 가장 최근 결과)
+    """
+    date = date or _latest_result_date()
+    if date is None:
+        return None
+
+    with _lock:
+        result = _results.get(date) or load_json(_result_path(date))
+        if result is not None:
+            _results.clear()
+            _results[date] = result
+        return result
+
+
+def _flow_signal(net_20: Dict[str, Optional[float]]) -> str:
+    """20일 외국인/기관 순매수 방향 → 수급 판단"""
+    foreign = net_20.get('foreign') or 0
+    institution = net_20.get('institution') or 0
+    if foreign > 0 and institution > 0:
+        return "외국인·기관 동반 순매수"
+    if foreign < 0 and institution < 0:
+        return "외국인·기관 동반 순매도"
+    if foreign > 0:
+        return "외국인 주도 순매수"
+    if institution > 0:
+        return "기관 주도 순매수"
+    return "개인 주도"
+
+
+def get_investor_flow(ticker: str, date: str = None) -> Dict[str, Any]:
+    """
+    종목의 투자자별 수급 (야간 작업이 계산해 둔 결과, 네트워크 조회 없음)
+
+    Returns:
+        {
+            'ticker', 'date', 'period', 'market', 'unit', 'signal',
+            'investors': {'foreign': {'label', 'net_5', 'net_20', 'net_60',
+                                      'intensity_5', ..., 'streak'}, ...},
+            'market_flow': 소속 시장 전체 {'foreign': {'net_5', ..., 'today'}, ...}
+        }
+        (결과가 없으면 빈 딕셔너리)
+
+    Example:
+        >>> flow = get_investor_flow("055550")
+        >>> print(flow['signal'], flow['investors']['foreign']['net_20'])
+    """
+    try:
+        table = get_investor_flow_table(date)
+        if not table:
+            return {}
+
+        row = table['tickers'].get(ticker)
+        if not row:
+            return {}
+
+        windows = table['windows']
+        investors = {}
+        for key, label in INVESTOR_LABELS.items():
+            data = {'label': label, 'streak': row['streak'][key]}
+            for w, net, intensity in zip(windows, row['net'][key], row['intensity'][key]):
+                data[f'net_{w}'] = net
+                data[f'intensity_{w}'] = intensity
+            investors[key] = data
+
+        market_flow = {}
+        for key, data in table['markets'].get(row['market'], {}).items():
+            market_flow[key] = dict({f'net_{w}': v for w, v in zip(windows, data['net'])},
+                                    label=INVESTOR_LABELS[key], today=data['today'])
+
+        return {
+            'ticker': ticker,
+            'date': table['date'][:4] + '-' + table['date'][4:6] + '-' + table['date'][6:],
+            'period': f"{table['start']}~{table['end']}",
+            'market': row['market'],
+            'unit': table['unit'],
+            'signal': _flow_signal({key: investors[key].get('net_20') for key in INVESTORS}),
+            'investors': investors,
+            'market_flow': market_flow,
+        }
+
+    except Exception as e:
+        print(f"[InvestorFlow] {ticker} 조회 오류: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    result = build_investor_flow(sys.argv[1] if len(sys.argv) > 1 else latest_trading_day())
+    print(f"기간: {result['start']} ~ {result['end']} ({result['sessions']}거래일)")
+    for market, flows in result['markets'].items():
+        print(market, flows)
+    print(get_investor_flow("055550"))
@@ -0,0 +1,290 @@
+"""
+KRX 조회 작업 풀
+
+pykrx는 KRX 웹 페이지를 동기 방식으로 조회하므로 요청 스레드에서 직접 부르면
+KRX가 느려질 때 Flask 워커가 제한 없이 묶인다.
+종목 서비스의 네트워크 조회는 이 풀을 거쳐 다음을 보장한다.
+
+- 동시 실행 수 제한 (KORA_KRX_WORKERS, 기본 4)
+- 대기열 길이 제한 (KORA_KRX_QUEUE, 기본 32) - 가득 차면 즉시 KrxBusyError
+- 호출별 제한 시간 (KORA_KRX_TIMEOUT, 기본 10초) - 초과 시 KrxTimeoutError,
+  아직 시작하지 않은 작업은 취소하고 시작 시점에 기한이 지난 작업은 실행하지 않음
+- 요청 단위 예산 (krx_budget) - 보고서 한 건의 KRX 조회 전체 시간을 제한하여
+  예산을 다 쓰면 이후 조회는 바로 실패하고 부분 결과로 응답
+
+실행 중인 pykrx 호출은 중단할 수 없으므로 제한 시간이 지나도 작업자 스레드에서 끝까지 실행되며,
+결과는 로컬 저장소에 반영되어 다음 요청에서 사용된다.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+KRX_MAX_WORKERS = int(os.environ.get('KORA_KRX_WORKERS', 4))
+KRX_MAX_QUEUE = int(os.environ.get('KORA_KRX_QUEUE', 32))
+KRX_CALL_TIMEOUT = float(os.environ.get('KORA_KRX_TIMEOUT', 10))
+
+
+class KrxTimeoutError(TimeoutError):
+    """제한 시간(또는 요청 예산) 안에 KRX 조회가 끝나지 않음"""
+
+
+class KrxBusyError(RuntimeError):
+    """KRX 조회 대기열이 가득 참"""
+
+
+class KrxBudget:
+    """
+    요청 단위 KRX 조회 예산
+
+    deadline: 예산 만료 시각 (time.time 기준)
+    failures: 예산 안에서 실패한 조회 이름 목록 (시간 초과/대기열 초과)
+    """
+
+    def __init__(self, seconds: float):
+        self.deadline = time.time() + seconds
+        self.failures: List[str] = []
+
+    def remaining(self) -> float:
+        return self.deadline - time.time()
+
+
+class KrxPool:
+    """
+    제한된 크기의 KRX 조회 스레드 풀
+
+    Example:
+        >>> pool = KrxPool(max_workers=2, max_queue=8)
+        >>> df = pool.call(stock.get_market_ohlcv, "20250102", "20250110", "055550", timeout=5)
+        >>> print(pool.stats())
+    """
+
+    def __init__(self, max_workers: int = KRX_MAX_WORKERS, max_queue: int = KRX_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='krx')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._counters = {
+            'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0,
+            'timed_out': 0, 'cancelled': 0, 'expired': 0,
+        }
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._run_seconds = 0.0
+        self._wait_seconds = 0.0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def submit(self, fn: Callable, *args, deadline: Optional[float] = None, **kwargs) -> Future:
+        """
+        조회 작업 등록 (대기열이 가득 차면 KrxBusyError)
+
+        Args:
+            deadline: 이 시각(time.time 기준)이 지나서 시작하게 되면 실행하지 않음
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise KrxBusyError(f"KRX 조회 대기열 초과 ({self.max_workers + self.max_queue}건)")
+
+        queued_at = time.time()
+
+        def run():
+            started = time.time()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_seconds += started - queued_at
+            try:
+                if deadline is not None and started > deadline:
+                    with self._lock:
+                        self._counters['expired'] += 1
+                    raise KrxTimeoutError(f"{getattr(fn, '__name__', 'KRX 조회')} 시작 전 기한 만료")
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.time() - started
+
+        with self._lock:
+            self._counters['submitted'] += 1
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+
+        def done(f: Future):
+            if f.cancelled():
+                with self._lock:
+                    self._queued -= 1
+                    self._counters['cancelled'] += 1
+            elif f.exception() is not None:
+                self._count('failed')
+            else:
+                self._count('completed')
+            self._slots.release()
+
+        future.add_done_callback(done)
+        return future
+
+    def call(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        조회 작업을 실행하고 제한 시간 안에 결과 반환
+
+        Args:
+            fn: 조회 함수
+            timeout: 제한 시간 (초, 기본 KRX_CALL_TIMEOUT - 요청 예산이 더 짧으면 예산 기준)
+
+        Raises:
+            KrxTimeoutError: 제한 시간 초과 (시작 전이면 작업 취소)
+            KrxBusyError: 대기열 초과
+        """
+        name = getattr(fn, '__name__', 'KRX 조회')
+        budget = current_budget()
+        timeout = KRX_CALL_TIMEOUT if timeout is None else timeout
+        if budget is not None:
+            timeout = min(timeout, budget.remaining())
+            if timeout <= 0:
+                budget.failures.append(name)
+                raise KrxTimeoutError(f"{name} 요청 예산 소진")
+
+        try:
+            future = self.submit(fn, *args, deadline=time.time() + timeout, **kwargs)
+        except KrxBusyError:
+            if budget is not None:
+                budget.failures.append(name)
+            raise
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._count('timed_out')
+            if budget is not None:
+                budget.failures.append(name)
+            raise KrxTimeoutError(f"{name} {timeout:.1f}초 초과")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        풀 상태 지표
+
+        Returns:
+            {'workers', 'queue_limit', 'queued', 'running', 'max_queued',
+             'submitted', 'completed', 'failed', 'rejected', 'timed_out', 'cancelled', 'expired',
+             'avg_wait_ms', 'avg_run_ms'}
+        """
+        with self._lock:
+            started = self._counters['completed'] + self._counters['failed']
+            return dict(
+                self._counters,
+                workers=self.max_workers,
+                queue_limit=self.max_queue,
+                queued=self._queued,
+                running=self._running,
+                max_queued=self._max_queued,
+                avg_wait_ms=round(self._wait_seconds / started * 1000, 1) if started else None,
+                avg_run_ms=round(self._run_seconds / started * 1000, 1) if started else None,
+            )
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """대기 중인 작업을 취소하고 풀 종료 (실행 중인 작업은 끝까지 실행)"""
+        self._executor.shutdown(wait=False, cancel_futures=cancel)
+
+
+# ============================================
+# 전역 풀 / 요청 예산
+# ============================================
+
+_pool: Optional[KrxPool] = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_krx_pool() -> KrxPool:
+    """프로세스 전역 KRX 조회 풀 (처음 사용할 때 생성)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = KrxPool()
+        return _pool
+
+
+def krx_call(fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    전역 풀에서 KRX 조회 실행
+
+    Example:
+        >>> df = krx_call(stock.get_market_fundamental, "20250102", "20250102", "055550")
+    """
+    return get_krx_pool().call(fn, *args, timeout=timeout, **kwargs)
+
+
+def current_budget() -> Optional[KrxBudget]:
+    """현재 스레드에 설정된 요청 예산 (없으면 None)"""
+    return getattr(_local, 'budget', None)
+
+
+@contextmanager
+def krx_budget(seconds: float):
+    """
+    블록 안의 KRX 조회 전체에 시간 예산 적용 (현재 스레드 기준)
+
+    Example:
+        >>> with krx_budget(20) as budget:
+        ...     summary = get_stock_summary("055550")
+        >>> if budget.failures:
+        ...     print(f"생략된 조회: {budget.failures}")
+    """
+    previous = current_budget()
+    budget = KrxBudget(seconds)
+    if previous is not None:
+        budget.deadline = min(budget.deadline, previous.deadline)
+    _local.budget = budget
+    try:
+        yield budget
+    finally:
+        _local.budget = previous
+        if previous is not None:
+            previous.failures.extend(budget.failures)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """전역 풀 상태 지표 (풀을 아직 만들지 않았으면 빈 지표)"""
+    with _pool_lock:
+        pool = _pool
+    if pool is None:
+        return {'workers': KRX_MAX_WORKERS, 'queue_limit': KRX_MAX_QUEUE, 'queued': 0, 'running': 0}
+    return pool.stats()
+
+
+if __name__ == "__main__":
+    pool = KrxPool(max_workers=2, max_queue=2)
+
+    try:
+        pool.call(time.sleep, 2, timeout=0.5)
+    except KrxTimeoutError as e:
+        print(f"시간 초과: {e}")
+
+    futures = []
+    for _ in range(5):
+        try:
+            futures.append(pool.submit(time.sleep, 0.2))
+        except KrxBusyError as e:
+            print(f"대기열 초과: {e}")
+    for f in futures:
+        f.result()
+    print(pool.stats())
@@ -0,0 +1,314 @@
+"""
+시장 대비 위험 지표
+
+일봉 저장소 전체 종목의 최근 1년 가격 패널과 소속 시장 지수(KOSPI/KOSDAQ)로
+베타, 상관계수, 60일/250일 변동성, 최대낙폭, 상대강도를 한 번의 배열 연산으로 계산한다.
+(data/cache/krx/market_risk/YYYYMMDD.json, 일별 작업에서 생성)
+
+- 수익률은 일별 종가 기준, 종목과 지수 모두 값이 있는 날만 사용
+- 변동성은 연율화 (거래일 252일)
+- 상대강도: 같은 기간 종목 수익률과 지수 수익률의 비율 ((1 + 종목) / (1 + 지수) - 1)
+- RS 등급: 250일 수익률의 시장 전체 백분위 (0~100)
+
+보고서 생성 시에는 저장된 결과만 읽으므로 추가 네트워크 조회가 없다.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.services.krx.index_store import INDICES, index_closes
+from app.services.krx.indicator_engine import build_price_panel
+from app.utils.local_store import get_cache_dir, load_json, save_json
+
+
+TRADING_DAYS = 252
+
+# 계산 기간 (거래일)
+RISK_SESSIONS = 250
+SHORT_VOL_SESSIONS = 60
+
+# 상대강도 기간 (거래일)
+RS_WINDOWS = [20, 60, 250]
+
+# 지표별 최소 수익률 관측 수 (미만이면 None)
+MIN_OBSERVATIONS = 20
+
+_results: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _risk_dir() -> str:
+    return get_cache_dir('krx', 'market_risk')
+
+
+def _result_path(date: str) -> str:
+    return os.path.join(_risk_dir(), f"{date}.json")
+
+
+# ============================================
+# 벡터 연산
+# ============================================
+
+def daily_returns(close: np.ndarray) -> np.ndarray:
+    """종가 행렬 → 일별 수익률 (전일/당일 중 하나라도 없으면 NaN)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return close[:, 1:] / close[:, :-1] - 1
+
+
+def window_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """최근 window 개 수익률의 연율화 표준편차 (관측치 부족 시 NaN)"""
+    recent = returns[:, -window:]
+    valid = np.isfinite(recent)
+    count = valid.sum(axis=1)
+    values = np.where(valid, recent, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = values.sum(axis=1) / count
+        variance = (np.where(valid, recent - mean[:, None], 0.0) ** 2).sum(axis=1) / (count - 1)
+    return np.where(count >= MIN_OBSERVATIONS, np.sqrt(variance) * np.sqrt(TRADING_DAYS), np.nan)
+
+
+def beta_correlation(returns: np.ndarray, market: np.ndarray):
+    """
+    종목별 베타와 상관계수 (행마다 종목/지수 모두 값이 있는 날만 사용)
+
+    Args:
+        returns: 종목 수익률 (종목 × 거래일)
+        market: 같은 모양의 소속 시장 지수 수익률
+
+    Returns:
+        (beta, correlation) 배열
+    """
+    valid = np.isfinite(returns) & np.isfinite(market)
+    count = valid.sum(axis=1)
+    r = np.where(valid, returns, 0.0)
+    m = np.where(valid, market, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_r = r.sum(axis=1) / count
+        mean_m = m.sum(axis=1) / count
+        cov = (r * m).sum(axis=1) / count - mean_r * mean_m
+        var_r = (r * r).sum(axis=1) / count - mean_r ** 2
+        var_m = (m * m).sum(axis=1) / count - mean_m ** 2
+        beta = cov / var_m
+        corr = cov / np.sqrt(var_r * var_m)
+
+    enough = count >= MIN_OBSERVATIONS
+    return np.where(enough, beta, np.nan), np.where(enough, corr, np.nan)
+
+
+def max_drawdown(close: np.ndarray) -> np.ndarray:
+    """행별 최대낙폭 (음수 비율, 결측일은 건너뜀)"""
+    peaks = np.fmax.accumulate(close, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.fmin.reduce(close / peaks - 1, axis=1)
+
+
+def period_return(close: np.ndarray, window: int) -> np.ndarray:
+    """window 거래일 수익률 (시작일/마지막 날 종가가 없으면 NaN)"""
+    if close.shape[1] <= window:
+        return np.full(close.shape[0], np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return close[:, -1] / close[:, -window - 1] - 1
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """유효값 중 백분위 (0~100, NaN 은 NaN)"""
+    ranks = np.full(values.shape, np.nan)
+    valid = np.isfinite(values)
+    count = int(valid.sum())
+    if count == 0:
+        return ranks
+    order = np.argsort(np.argsort(values[valid], kind='stable'), kind='stable')
+    ranks[valid] = order / max(count - 1, 1) * 100
+    return ranks
+
+
+def compute_market_risk(close: np.ndarray, market_close: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    종목 종가와 소속 시장 지수 종가(같은 모양) → 지표 배열
+
+    Returns:
+        {'beta', 'correlation', 'volatility_60', 'volatility_250', 'max_drawdown',
+         'return_20', ..., 'relative_strength_20', ..., 'rs_rating'} (비율, 종목 순서)
+    """
+    returns = daily_returns(close)
+    market_returns = daily_returns(market_close)
+    beta, corr = beta_correlation(returns, market_returns)
+
+    metrics = {
+        'beta': beta,
+        'correlation': corr,
+        'volatility_60': window_volatility(returns, SHORT_VOL_SESSIONS),
+        'volatility_250': window_volatility(returns, RISK_SESSIONS),
+        'max_drawdown': max_drawdown(close),
+    }
+    for window in RS_WINDOWS:
+        stock_return = period_return(close, window)
+        market_return = period_return(market_close, window)
+        metrics[f'return_{window}'] = stock_return
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics[f'relative_strength_{window}'] = (1 + stock_return) / (1 + market_return) - 1
+    metrics['rs_rating'] = percentile_rank(metrics[f'return_{RS_WINDOWS[-1]}'])
+    return metrics
+
+
+def _rounded(value: float, scale: float = 100, digits: int = 2) -> Optional[float]:
+    return round(float(value) * scale, digits) + 0.0 if np.isfinite(value) else None
+
+
+# ============================================
+# 계산 / 저장
+# ============================================
+
+def build_market_risk(date: str) -> Dict[str, Any]:
+    """
+    저장소 전체 종목의 시장 대비 위험 지표 계산 및 저장
+
+    Args:
+        date: 마지막 거래일 (YYYYMMDD)
+
+    Returns:
+        {
+            'date', 'start', 'end',
+            'indices': {'KOSPI': {'volatility_60', 'volatility_250', 'max_drawdown', 'return_20', ...}},
+            'tickers': {종목코드: {'market', 'beta', 'correlation', 'volatility_60', ..., 'rs_rating'}}
+        }
+        (변동성/수익률/낙폭/상대강도는 %, 베타/상관계수는 배수)
+    """
+    from app.services.krx.ticker_index import get_ticker_index
+
+    started = time.time()
+    panel = build_price_panel(date, None, RISK_SESSIONS + 1)
+
+    index = get_ticker_index()
+    markets = np.array([(index.get(t).market if index.get(t) else '') for t in panel.tickers.tolist()])
+    index_close = {market: index_closes(market, panel.dates) for market in INDICES}
+
+    # 종목별 소속 시장 지수 (KOSDAQ 외에는 KOSPI 기준)
+    market_close = np.where((markets == 'KOSDAQ')[:, None],
+                            index_close['KOSDAQ'][None, :], index_close['KOSPI'][None, :])
+    metrics = compute_market_risk(panel.close, market_close)
+
+    # 지수 자체 지표 (베타/상대강도 제외)
+    index_matrix = np.vstack([index_close[market] for market in INDICES])
+    index_metrics = compute_market_risk(index_matrix, index_matrix)
+
+    ratio_fields = {'beta', 'correlation'}
+    scaled_fields = {'rs_rating'}
+
+    def _row(values: Dict[str, np.ndarray], i: int, fields) -> Dict[str, Any]:
+        row = {}
+        for name in fields:
+            value = values[name][i]
+            if name in ratio_fields:
+                row[name] = _rounded(value, 1, 2)
+            elif name in scaled_fields:
+                row[name] = _rounded(value, 1, 1)
+            else:
+                row[name] = _rounded(value)
+        return row
+
+    index_fields = ['volatility_60', 'volatility_250', 'max_drawdown'] + [f'return_{w}' for w in RS_WINDOWS]
+    result: Dict[str, Any] = {
+        'date': date,
+        'start': panel.dates[0] if panel.dates else None,
+        'end': panel.dates[-1] if panel.dates else None,
+        'indices': {market: _row(index_metrics, i, index_fields) for i, market in enumerate(INDICES)},
+        'tickers': {},
+    }
+
+    has_data = np.isfinite(panel.close).sum(axis=1) > MIN_OBSERVATIONS
+    for i, ticker in enumerate(panel.tickers.tolist()):
+        if has_data[i]:
+            result['tickers'][ticker] = dict(_row(metrics, i, metrics.keys()),
+                                             market=markets[i] or 'KOSPI')
+
+    save_json(_result_path(date), result)
+    with _lock:
+        _results.clear()
+        _results[date] = result
+
+    print(f"[MarketRisk] {date} 시장 대비 위험 지표: {len(result['tickers'])}개 종목 "
+          f"({time.time() - started:.2f}초)")
+    return result
+
+
+def _latest_result_date() -> Optional[str]:
+    dates = sorted(name[:-5] for name in os.listdir(_risk_dir()) if name.endswith('.json'))
+    return dates[-1] if dates else None
+
+
+def get_market_risk_table(date: str = None) -> Optional[Dict[str, Any]]:
+    """
+    저장된 시장 대비 위험 지표 조회 (메모리 → 디스크)
+
+    Args:
+        date: 기준 거래일 (기본: 저장된 가장 최근 결과)
+    """
+    date = date or _latest_result_date()
+    if date is None:
+        return None
+
+    with _lock:
+        result = _results.get(date) or load_json(_result_path(date))
+        if result is not None:
+            _results.clear()
+            _results[date] = result
+        return result
+
+
+def get_market_risk(ticker: str, date: str = None) -> Dict[str, Any]:
+    """
+    종목의 시장 대비 위험 지표
+
+    Returns:
+        {
+            'ticker', 'date', 'period', 'market', 'beta', 'correlation',
+            'volatility_60', 'volatility_250', 'max_drawdown',
+            'return_20', 'return_60', 'return_250',
+            'relative_strength_20', 'relative_strength_60', 'relative_strength_250', 'rs_rating',
+            'index': 소속 시장 지수 지표
+        }
+        (결과가 없으면 빈 딕셔너리)
+
+    Example:
+        >>> risk = get_market_risk("055550")
+        >>> print(risk['beta'], risk['volatility_60'], risk['relative_strength_60'])
+    """
+    try:
+        table = get_market_risk_table(date)
+        if not table:
+            return {}
+
+        row = table['tickers'].get(ticker)
+        if not row:
+            return {}
+
+        return dict(
+            row,
+            ticker=ticker,
+            date=table['date'][:4] + '-' + table['date'][4:6] + '-' + table['date'][6:],
+            period=f"{table['start']}~{table['end']}",
+            index=table['indices'].get(row['market'], {}),
+        )
+
+    except Exception as e:
+        print(f"[MarketRisk] {ticker} 조회 오류: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    result = build_market_risk(sys.argv[1] if len(sys.argv) > 1 else latest_trading_day())
+    print(f"기간: {result['start']} ~ {result['end']}")
+    for market, stats in result['indices'].items():
+        print(market, stats)
+    print(get_market_risk("055550"))
@@ -0,0 +1,310 @@
+"""
+KRX 시장 전체 일별 스냅샷
+
+거래일 하루에 대해 KOSPI/KOSDAQ 전 종목의 시세, 기본 지표(PER/PBR/EPS/BPS/DIV/DPS),
+시가총액/상장주식수를 시장별 일괄 조회(총 6회)로 받아
+data/cache/krx/snapshot/YYYYMMDD.npz 컬럼형 테이블로 저장한다.
+
+현재가/밸류에이션/요약 조회는 종목별 KRX 호출 대신 이 스냅샷을 읽으므로
+요청 비용이 조회 종목 수와 무관하다.
+"""
+
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pykrx import stock
+
+from app.utils.local_store import get_cache_dir, atomic_write_bytes
+
+
+# 수집 대상 시장
+MARKETS = ["KOSPI", "KOSDAQ"]
+
+# 장중 스냅샷 재생성 간격 (초)
+SNAPSHOT_INTRADAY_TTL = 600
+
+# 장 마감 시각 (HHMM) - 이후 생성한 스냅샷은 확정으로 간주
+MARKET_CLOSE = "1530"
+
+# 메모리에 유지할 스냅샷 수
+SNAPSHOT_CACHE_SIZE = 5
+
+# 컬럼 정의: 이름 → (pykrx 컬럼, dtype)
+_PRICE_COLUMNS = {
+    'open': ('시가', np.int64),
+    'high': ('고가', np.int64),
+    'low': ('저가', np.int64),
+    'close': ('종가', np.int64),
+    'volume': ('거래량', np.int64),
+    'trading_value': ('거래대금', np.int64),
+    'change_rate': ('등락률', np.float64),
+}
+_FUNDAMENTAL_COLUMNS = {
+    'per': ('PER', np.float64),
+    'pbr': ('PBR', np.float64),
+    'eps': ('EPS', np.float64),
+    'bps': ('BPS', np.float64),
+    'div': ('DIV', np.float64),
+    'dps': ('DPS', np.float64),
+}
+_CAP_COLUMNS = {
+    'market_cap': ('시가총액', np.int64),
+    'shares': ('상장주식수', np.int64),
+}
+
+# 생성 실패 후 재시도 대기 시간 (초)
+SNAPSHOT_RETRY_INTERVAL = 300
+
+# 다른 스레드의 생성 완료를 기다리는 최대 시간 (초, 초과 시 None)
+SNAPSHOT_WAIT_TIMEOUT = 30
+
+_snapshots: Dict[str, "MarketSnapshot"] = {}
+_snapshot_lock = threading.Lock()
+_retry_after: Dict[str, float] = {}
+
+# 날짜별 생성 중 표시 (같은 날짜는 한 스레드만 생성, 나머지는 기존 스냅샷으로 응답)
+_building: Dict[str, threading.Event] = {}
+
+
+def _snapshot_path(date: str) -> str:
+    return os.path.join(get_cache_dir('krx', 'snapshot'), f"{date}.npz")
+
+
+class MarketSnapshot:
+    """
+    하루치 시장 전체 컬럼형 테이블
+
+    columns: 컬럼명 → 종목 순서와 같은 길이의 NumPy 배열
+    종목 조회는 ticker → 행 위치 사전으로 O(1)
+    """
+
+    def __init__(self, date: str, columns: Dict[str, np.ndarray], built_at: float, final: bool):
+        self.date = date
+        self.columns = columns
+        self.built_at = built_at
+        self.final = final
+        self._position: Dict[str, int] = {t: i for i, t in enumerate(columns['ticker'].tolist())}
+
+    def __len__(self) -> int:
+        return len(self.columns['ticker'])
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._position
+
+    @property
+    def tickers(self) -> np.ndarray:
+        return self.columns['ticker']
+
+    def is_stale(self) -> bool:
+        """장중 스냅샷의 재생성 필요 여부"""
+        return not self.final and time.time() - self.built_at > SNAPSHOT_INTRADAY_TTL
+
+    def position(self, ticker: str) -> Optional[int]:
+        return self._position.get(ticker)
+
+    def get(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        종목 한 행 조회
+
+        Returns:
+            컬럼명 → 값 (정수/실수, 결측은 None) 딕셔너리 또는 None
+        """
+        pos = self._position.get(ticker)
+        if pos is None:
+            return None
+
+        row = {'date': self.date}
+        for name, values in self.columns.items():
+            value = values[pos]
+            if isinstance(value, np.floating):
+                row[name] = None if np.isnan(value) else float(value)
+            elif isinstance(value, np.integer):
+                row[name] = int(value)
+            else:
+                row[name] = str(value)
+        return row
+
+    def save(self) -> None:
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            _built_at=np.float64(self.built_at),
+            _final=np.bool_(self.final),
+            **self.columns
+        )
+        atomic_write_bytes(_snapshot_path(self.date), buffer.getvalue())
+
+    @classmethod
+    def load(cls, date: str) -> Optional["MarketSnapshot"]:
+        path = _snapshot_path(date)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {k: data[k] for k in data.files if not k.startswith('_')}
+                return cls(date, columns, float(data['_built_at']), bool(data['_final']))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[MarketSnapshot] {date} 로드 오류: {e}")
+            return None
+
+
+# ============================================
+# 생성
+# ============================================
+
+def _to_column(df: pd.DataFrame, column: str, dtype, index: pd.Index) -> np.ndarray:
+    """시장별 DataFrame 컬럼을 종목 순서에 맞춰 배열로 변환 (결측: 실수 NaN, 정수 0)"""
+    if df is None or df.empty or column not in df.columns:
+        series = pd.Series(np.nan, index=index)
+    else:
+        series = df[column].reindex(index)
+
+    if dtype is np.float64:
+        return series.astype(float).to_numpy()
+    return series.fillna(0).to_numpy(dtype=dtype)
+
+
+def build_market_snapshot(date: str) -> Optional[MarketSnapshot]:
+    """
+    시장 전체 스냅샷 생성 및 저장
+
+    Args:
+        date: 거래일 (YYYYMMDD)
+
+    Returns:
+        MarketSnapshot 또는 None (시세 데이터가 없는 경우)
+    """
+    parts: List[Dict[str, np.ndarray]] = []
+
+    for market in MARKETS:
+        ohlcv = stock.get_market_ohlcv(date, market=market)
+        if ohlcv is None or ohlcv.empty:
+            continue
+
+        fundamental = stock.get_market_fundamental(date, market=market)
+        cap = stock.get_market_cap(date, market=market)
+
+        index = ohlcv.index
+        part = {
+            'ticker': np.array(index.astype(str), dtype='U6'),
+            'market': np.full(len(index), market, dtype='U6'),
+        }
+        for name, (column, dtype) in _PRICE_COLUMNS.items():
+            part[name] = _to_column(ohlcv, column, dtype, index)
+        for name, (column, dtype) in _FUNDAMENTAL_COLUMNS.items():
+            part[name] = _to_column(fundamental, column, dtype, index)
+        for name, (column, dtype) in _CAP_COLUMNS.items():
+            part[name] = _to_column(cap, column, dtype, index)
+        parts.append(part)
+
+    if not parts:
+        return None
+
+    columns = {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+    now = datetime.now()
+    final = date < now.strftime("%Y%m%d") or now.strftime("%H%M") >= MARKET_CLOSE
+
+    snapshot = MarketSnapshot(date, columns, built_at=time.time(), final=final)
+    snapshot.save()
+
+    print(f"[MarketSnapshot] {date} 스냅샷 저장: {len(snapshot)}개 종목")
+    return snapshot
+
+
+def get_market_snapshot(date: str = None, build: bool = True) -> Optional[MarketSnapshot]:
+    """
+    시장 전체 스냅샷 조회 (메모리 → 디스크 → KRX 순)
+
+    Args:
+        date: 거래일 (기본: 최근 거래일)
+        build: 없거나 오래된 경우 새로 생성할지 여부
+               (같은 날짜를 다른 스레드가 생성 중이면 기다리지 않고 기존 스냅샷 반환)
+
+    Returns:
+        MarketSnapshot 또는 None
+
+    Example:
+        >>> snapshot = get_market_snapshot()
+        >>> print(snapshot.get("055550")['per'])
+    """
+    if date is None:
+        from app.services.krx.trading_calendar import latest_trading_day
+        date = latest_trading_day()
+
+    with _snapshot_lock:
+        snapshot = _snapshots.get(date)
+        if snapshot is None:
+            snapshot = MarketSnapshot.load(date)
+            if snapshot is not None:
+                _remember(snapshot)
+
+        if not build or (snapshot is not None and not snapshot.is_stale()) \
+                or time.time() < _retry_after.get(date, 0):
+            return snapshot
+
+        building = _building.get(date)
+        if building is None:
+            _building[date] = threading.Event()
+
+    if building is not None:
+        # 다른 스레드가 생성 중: 기존 스냅샷이 있으면 바로 응답, 없으면 제한 시간까지 대기
+        if snapshot is not None:
+            return snapshot
+        if not building.wait(SNAPSHOT_WAIT_TIMEOUT):
+            print(f"[MarketSnapshot] {date} 생성 대기 {SNAPSHOT_WAIT_TIMEOUT}초 초과")
+            return None
+        with _snapshot_lock:
+            return _snapshots.get(date)
+
+    # 네트워크 조회는 잠금 밖에서 수행하고 결과 교체만 잠금 안에서 한다
+    failed = False
+    try:
+        snapshot = build_market_snapshot(date) or snapshot
+    except Exception as e:
+        print(f"[MarketSnapshot] {date} 생성 오류: {e}")
+        failed = True
+    finally:
+        with _snapshot_lock:
+            if failed:
+                _retry_after[date] = time.time() + SNAPSHOT_RETRY_INTERVAL
+            if snapshot is not None:
+                _remember(snapshot)
+            _building.pop(date).set()
+
+    return snapshot
+
+
+def _remember(snapshot: MarketSnapshot) -> None:
+    """메모리 캐시에 스냅샷 등록 (_snapshot_lock 안에서 호출)"""
+    _snapshots[snapshot.date] = snapshot
+    while len(_snapshots) > SNAPSHOT_CACHE_SIZE:
+        _snapshots.pop(min(_snapshots))
+
+
+def latest_snapshot_date() -> Optional[str]:
+    """디스크에 저장된 가장 최근 스냅샷 날짜 (네트워크 조회 없음)"""
+    dates = [name[:-4] for name in os.listdir(get_cache_dir('krx', 'snapshot')) if name.endswith('.npz')]
+    return max(dates) if dates else None
+
+
+def get_snapshot_row(ticker: str, date: str = None) -> Optional[Dict[str, Any]]:
+    """스냅샷에서 종목 한 행 조회 (없으면 None)"""
+    snapshot = get_market_snapshot(date)
+    if snapshot is None:
+        return None
+    return snapshot.get(ticker)
+
+
+if __name__ == "__main__":
+    snapshot = get_market_snapshot()
+    if snapshot:
+        print(f"{snapshot.date}: {len(snapshot)}개 종목 (확정: {snapshot.final})")
+        print(snapshot.get("055550"))
@@ -0,0 +1,335 @@
+"""
+다해상도 가격 피라미드와 차트용 다운샘플링
+
+종목 일봉 저장소(price_store)의 배열에서 주봉/월봉을 미리 집계해 두고
+(data/cache/krx/pyramid/<ticker>.npz), 차트 요청은 필요한 해상도와 점 개수만 돌려준다.
+
+- 주봉: 월요일 시작 주, 월봉: 달력 월 (시가=첫 봉 시가, 고가=최고, 저가=최저, 종가=마지막 봉 종가, 거래량=합계)
+- 다운샘플링: LTTB(Largest-Triangle-Three-Buckets), 종가 기준으로 모양을 유지하는 봉만 선택
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.krx import price_store
+from app.services.krx.krx_pool import krx_call
+from app.services.krx.price_series import PriceSeries
+from app.utils.local_store import get_cache_dir, atomic_write_bytes
+
+
+RESOLUTIONS = ['daily', 'weekly', 'monthly']
+
+# 메모리에 유지할 종목 피라미드 수
+PYRAMID_CACHE_SIZE = 256
+
+_pyramids: "OrderedDict[str, PricePyramid]" = OrderedDict()
+_pyramid_lock = threading.Lock()
+
+
+def _pyramid_path(ticker: str) -> str:
+    return os.path.join(get_cache_dir('krx', 'pyramid'), f"{ticker}.npz")
+
+
+# ============================================
+# 집계
+# ============================================
+
+def _week_keys(days: np.ndarray) -> np.ndarray:
+    """1970-01-01(목요일) 기준 일수 → 월요일 시작 주 번호"""
+    return (days.astype(np.int64) + 3) // 7
+
+
+def _month_keys(days: np.ndarray) -> np.ndarray:
+    """1970-01-01 기준 일수 → 1970-01 기준 월 번호"""
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def aggregate_bars(bars: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    같은 키(주/월)의 연속 봉을 하나로 집계
+
+    Returns:
+        PRICE_DTYPE 배열 (date: 구간 첫 거래일)
+    """
+    if len(bars) == 0:
+        return np.empty(0, dtype=price_store.PRICE_DTYPE)
+
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+    ends = np.concatenate([starts[1:], [len(bars)]]) - 1
+
+    candles = np.empty(len(starts), dtype=price_store.PRICE_DTYPE)
+    candles['date'] = bars['date'][starts]
+    candles['open'] = bars['open'][starts]
+    candles['high'] = np.maximum.reduceat(bars['high'], starts)
+    candles['low'] = np.minimum.reduceat(bars['low'], starts)
+    candles['close'] = bars['close'][ends]
+    candles['volume'] = np.add.reduceat(bars['volume'], starts)
+    return candles
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링
+
+    첫 점과 마지막 점을 고정하고, 나머지를 points - 2 개 구간으로 나눠
+    직전 선택 점·다음 구간 평균과 만드는 삼각형 넓이가 가장 큰 점을 고른다.
+
+    Args:
+        x, y: 좌표 배열 (x 오름차순)
+        points: 결과 점 개수
+
+    Returns:
+        선택된 점의 인덱스 배열
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        if next_end <= next_start:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area)) if end > start else start
+        selected[i + 1] = prev
+
+    return selected
+
+
+def downsample_records(records: List[Dict[str, Any]], points: int,
+                       value_key: str = 'close') -> List[Dict[str, Any]]:
+    """레코드 리스트를 value_key 기준 LTTB 로 points 개까지 축소"""
+    if len(records) <= points:
+        return records
+    y = np.array([r.get(value_key) or 0 for r in records], dtype=float)
+    return [records[i] for i in lttb(np.arange(len(records)), y, points)]
+
+
+def compact_price_history(records: List[Dict[str, Any]], points: int = 150,
+                          ma_periods: List[int] = [5, 20, 60]) -> List[Dict[str, Any]]:
+    """
+    저장용 가격 이력 축소 (보고서 저장 시 사용)
+
+    축소 전 일별 종가로 이동평균(ma5/ma20/ma60)을 계산해 각 점에 붙인 뒤 LTTB 로 줄이므로,
+    축소된 점에서도 화면의 이동평균선이 일별 기준 값으로 그려진다.
+    """
+    if len(records) <= points:
+        return records
+
+    close = np.array([r.get('close') or 0 for r in records], dtype=float)
+    cumsum = np.concatenate([[0.0], np.cumsum(close)])
+
+    enriched = [dict(r) for r in records]
+    for period in ma_periods:
+        ma = np.full(len(close), np.nan)
+        if len(close) >= period:
+            ma[period - 1:] = (cumsum[period:] - cumsum[:-period]) / period
+        for record, value in zip(enriched, ma.tolist()):
+            # 화면(calculateMA)과 같은 반올림
+            record[f'ma{period}'] = None if np.isnan(value) else int(np.floor(value + 0.5))
+
+    return downsample_records(enriched, points)
+
+
+# ============================================
+# 피라미드
+# ============================================
+
+class PricePyramid:
+    """
+    종목 하나의 일/주/월 봉 묶음 (모두 PRICE_DTYPE 배열)
+    """
+
+    def __init__(self, ticker: str, daily: np.ndarray, weekly: np.ndarray, monthly: np.ndarray):
+        self.ticker = ticker
+        self.daily = daily
+        self.weekly = weekly
+        self.monthly = monthly
+
+    @classmethod
+    def from_bars(cls, ticker: str, bars: np.ndarray) -> "PricePyramid":
+        return cls(
+            ticker,
+            bars,
+            aggregate_bars(bars, _week_keys(bars['date'])),
+            aggregate_bars(bars, _month_keys(bars['date'])),
+        )
+
+    def matches(self, bars: np.ndarray) -> bool:
+        """저장소 일봉과 같은 데이터로 만든 피라미드인지 여부"""
+        if len(bars) != len(self.daily):
+            return False
+        if len(bars) == 0:
+            return True
+        return (bars['date'][-1] == self.daily['date'][-1] and bars['close'][-1] == self.daily['close'][-1]
+                and bars['close'][0] == self.daily['close'][0])
+
+    def level(self, resolution: str) -> np.ndarray:
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"알 수 없는 해상도: {resolution}")
+        return getattr(self, resolution)
+
+    def candles(self, start: str, end: str, resolution: str = 'daily') -> np.ndarray:
+        """start ~ end 구간의 해상도별 봉 (구간 첫 거래일 기준, 배열 뷰)"""
+        candles = self.level(resolution)
+        lo = np.searchsorted(candles['date'], price_store.date_to_days(start), side='left')
+        hi = np.searchsorted(candles['date'], price_store.date_to_days(end), side='right')
+        return candles[lo:hi]
+
+    def save(self) -> None:
+        buffer = io.BytesIO()
+        np.savez(buffer, daily=self.daily, weekly=self.weekly, monthly=self.monthly)
+        atomic_write_bytes(_pyramid_path(self.ticker), buffer.getvalue())
+
+    @classmethod
+    def load(cls, ticker: str) -> Optional["PricePyramid"]:
+        path = _pyramid_path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(ticker, data['daily'], data['weekly'], data['monthly'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[PricePyramid] {ticker} 로드 오류: {e}")
+            return None
+
+
+def get_price_pyramid(ticker: str, bars: np.ndarray = None) -> PricePyramid:
+    """
+    종목 가격 피라미드 조회 (메모리 → 디스크 → 저장소 일봉으로 생성)
+
+    Args:
+        ticker: 종목코드
+        bars: 이미 동기화한 저장소 일봉 (없으면 저장소에서 로드, 네트워크 조회 없음)
+
+    Example:
+        >>> pyramid = get_price_pyramid("055550")
+        >>> print(len(pyramid.daily), len(pyramid.weekly), len(pyramid.monthly))
+    """
+    if bars is None:
+        bars = price_store.load_bars(ticker)
+
+    with _pyramid_lock:
+        pyramid = _pyramids.get(ticker)
+        if pyramid is not None and pyramid.matches(bars):
+            _pyramids.move_to_end(ticker)
+            return pyramid
+
+    pyramid = PricePyramid.load(ticker)
+    if pyramid is None or not pyramid.matches(bars):
+        pyramid = PricePyramid.from_bars(ticker, np.array(bars))
+        try:
+            pyramid.save()
+        except OSError as e:
+            print(f"[PricePyramid] {ticker} 저장 오류: {e}")
+
+    with _pyramid_lock:
+        _pyramids[ticker] = pyramid
+        _pyramids.move_to_end(ticker)
+        while len(_pyramids) > PYRAMID_CACHE_SIZE:
+            _pyramids.popitem(last=False)
+
+    return pyramid
+
+
+def window_candles(ticker: str, bars: np.ndarray, resolution: str = 'monthly') -> np.ndarray:
+    """
+    일봉 구간 bars 를 주/월봉으로 집계 (저장된 피라미드 재사용)
+
+    구간 첫 주/월은 구간 안의 일봉만으로 다시 집계하고(부분 구간),
+    나머지는 피라미드의 집계 결과를 그대로 쓴다.
+    피라미드가 bars 와 같은 날짜에서 끝나지 않으면 bars 만으로 집계한다.
+    """
+    if len(bars) == 0:
+        return np.empty(0, dtype=price_store.PRICE_DTYPE)
+
+    keys = _week_keys(bars['date']) if resolution == 'weekly' else _month_keys(bars['date'])
+    pyramid = get_price_pyramid(ticker)
+    if len(pyramid.daily) == 0 or pyramid.daily['date'][-1] != bars['date'][-1]:
+        return aggregate_bars(bars, keys)
+
+    head_end = int(np.searchsorted(keys, keys[0], side='right'))
+    head = aggregate_bars(bars[:head_end], keys[:head_end])
+    if head_end == len(bars):
+        return head
+
+    rest = pyramid.candles(price_store.days_to_date(bars['date'][head_end]),
+                           price_store.days_to_date(bars['date'][-1]), resolution)
+    return np.concatenate([head, rest])
+
+
+def choose_resolution(pyramid: PricePyramid, start: str, end: str, points: int) -> str:
+    """
+    points 개 이상의 봉이 있는 가장 성긴 해상도 (LTTB 로 points 개까지 축소할 원본)
+
+    구간이 짧아 일봉도 points 개가 안 되면 일봉
+    """
+    for resolution in reversed(RESOLUTIONS):
+        if len(pyramid.candles(start, end, resolution)) >= points:
+            return resolution
+    return 'daily'
+
+
+def get_chart_series(ticker: str, start: str, end: str, points: int = None,
+                     resolution: str = 'auto') -> PriceSeries:
+    """
+    차트용 가격 시계열
+
+    Args:
+        ticker: 종목코드
+        start, end: 조회 구간 (YYYYMMDD)
+        points: 최대 점 개수 (지정 시 LTTB 로 축소)
+        resolution: daily | weekly | monthly | auto (points 개 이상인 가장 성긴 해상도)
+
+    Returns:
+        PriceSeries (등락률은 직전 봉 종가 대비)
+
+    Raises:
+        KrxTimeoutError / KrxBusyError: 저장소에 없는 구간을 KRX 조회 풀에서 받지 못한 경우
+    """
+    # 로컬 일봉 저장소에서 조회 (저장소에 없는 구간만 KRX 조회 풀에서 조회)
+    if price_store.is_synced(ticker, start, end):
+        bars = price_store.sync_ticker(ticker, start, end)
+    else:
+        bars = krx_call(price_store.sync_ticker, ticker, start, end)
+    pyramid = get_price_pyramid(ticker, bars)
+
+    if resolution == 'auto':
+        resolution = choose_resolution(pyramid, start, end, points) if points else 'daily'
+
+    candles = pyramid.candles(start, end, resolution)
+    if points and len(candles) > points:
+        candles = candles[lttb(candles['date'], candles['close'], points)]
+
+    return PriceSeries.from_bars(ticker, candles)
+
+
+if __name__ == "__main__":
+    from datetime import datetime, timedelta
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    end = latest_trading_day()
+    start = (datetime.strptime(end, "%Y%m%d") - timedelta(days=365 * 5)).strftime("%Y%m%d")
+    series = get_chart_series("055550", start, end, points=200)
+    print(f"{len(series)}개 점: {series.date_strings()[:3]} ...")
@@ -0,0 +1,162 @@
+"""
+배열 기반 가격 시계열
+
+일별 가격 이력을 StockPrice 객체 리스트 대신 타입 배열 묶음으로 보관한다.
+
+- 날짜: 1970-01-01 기준 일수 (int32)
+- 시가/고가/저가/종가/거래량: int64, 등락률: float64
+- 슬라이싱은 배열 뷰를 공유하므로 복사가 없고,
+  JSON(컬럼형/레코드형)과 msgpack 으로 행 객체를 거치지 않고 바로 직렬화한다.
+
+기존 코드와의 호환을 위해 정수 인덱스 접근과 순회는 StockPrice 를 반환한다.
+"""
+
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+# 직렬화 가능한 필드 (date 는 YYYY-MM-DD 문자열로 변환)
+FIELDS = ['date', 'open', 'high', 'low', 'close', 'volume', 'change_rate']
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def _change_rate(close: np.ndarray) -> np.ndarray:
+    """직전 값 대비 등락률 (%), 소수 둘째 자리 반올림, 첫 값은 0.0"""
+    change_rate = np.zeros(len(close))
+    if len(close) > 1:
+        prev = close[:-1].astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = (close[1:] - prev) / prev * 100
+        change_rate[1:] = np.where(np.isfinite(rate), np.round(rate, 2), 0.0)
+    return change_rate
+
+
+class PriceSeries(Sequence):
+    """
+    종목 하나의 일별 가격 시계열
+
+    Example:
+        >>> series = get_price_history("055550", days=365)
+        >>> series.close[-20:].mean()
+        >>> series[-5:].to_columnar(['date', 'close'])
+    """
+
+    def __init__(self, ticker: str, dates: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray, change_rate: np.ndarray):
+        self.ticker = ticker
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.change_rate = change_rate
+
+    @classmethod
+    def empty(cls, ticker: str) -> "PriceSeries":
+        ints = np.empty(0, dtype=np.int64)
+        return cls(ticker, np.empty(0, dtype=np.int32), ints, ints, ints, ints, ints,
+                   np.empty(0, dtype=np.float64))
+
+    @classmethod
+    def from_frame(cls, ticker: str, df: pd.DataFrame) -> "PriceSeries":
+        """
+        pykrx 컬럼명(시가/고가/저가/종가/거래량) DataFrame → PriceSeries
+
+        등락률은 전일 종가 대비 (%)로 계산하며 첫 날은 0.0
+        """
+        if df is None or df.empty:
+            return cls.empty(ticker)
+
+        close = df['종가'].to_numpy(dtype=np.int64)
+        return cls(
+            ticker,
+            (df.index.values.astype('datetime64[D]') - _EPOCH).astype(np.int32),
+            df['시가'].to_numpy(dtype=np.int64),
+            df['고가'].to_numpy(dtype=np.int64),
+            df['저가'].to_numpy(dtype=np.int64),
+            close,
+            df['거래량'].to_numpy(dtype=np.int64),
+            _change_rate(close),
+        )
+
+    @classmethod
+    def from_bars(cls, ticker: str, bars: np.ndarray) -> "PriceSeries":
+        """price_store.PRICE_DTYPE 구조화 배열 → PriceSeries (필드 뷰 공유)"""
+        if len(bars) == 0:
+            return cls.empty(ticker)
+        return cls(ticker, bars['date'], bars['open'], bars['high'], bars['low'],
+                   bars['close'], bars['volume'], _change_rate(bars['close']))
+
+    # ----------------------------------------
+    # 시퀀스 (StockPrice 호환)
+    # ----------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            # 배열 뷰 공유 (복사 없음)
+            return PriceSeries(self.ticker, self.dates[key], self.open[key], self.high[key],
+                               self.low[key], self.close[key], self.volume[key], self.change_rate[key])
+
+        from app.services.krx.stock_service import StockPrice
+
+        return StockPrice(
+            date=str(_EPOCH + np.timedelta64(int(self.dates[key]), 'D')),
+            open=int(self.open[key]),
+            high=int(self.high[key]),
+            low=int(self.low[key]),
+            close=int(self.close[key]),
+            volume=int(self.volume[key]),
+            change_rate=float(self.change_rate[key])
+        )
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self[i]
+
+    def tail(self, n: int) -> "PriceSeries":
+        return self[-n:] if len(self) > n else self
+
+    # ----------------------------------------
+    # 직렬화
+    # ----------------------------------------
+
+    def date_strings(self) -> List[str]:
+        """날짜 목록 (YYYY-MM-DD)"""
+        return np.datetime_as_string(_EPOCH + self.dates.astype('timedelta64[D]')).tolist()
+
+    def _column(self, field: str) -> List[Any]:
+        if field == 'date':
+            return self.date_strings()
+        if field not in FIELDS:
+            raise ValueError(f"알 수 없는 필드: {field}")
+        return getattr(self, field).tolist()
+
+    def to_columnar(self, fields: List[str] = None) -> Dict[str, List[Any]]:
+        """
+        컬럼형 딕셔너리 {'date': [...], 'close': [...], ...}
+
+        행마다 객체를 만들지 않으므로 JSON 크기와 변환 비용이 가장 작다.
+        """
+        return {field: self._column(field) for field in (fields or FIELDS)}
+
+    def to_records(self, fields: List[str] = None) -> List[Dict[str, Any]]:
+        """레코드형 리스트 [{'date': ..., 'close': ...}, ...] (기존 JSON 형식)"""
+        fields = fields or FIELDS
+        columns = [self._column(field) for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def to_msgpack(self, fields: List[str] = None) -> bytes:
+        """컬럼형 msgpack 직렬화"""
+        import msgpack
+
+        return msgpack.packb({'ticker': self.ticker, **self.to_columnar(fields)}, use_bin_type=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'ticker': self.ticker, **self.to_columnar()}
@@ -0,0 +1,388 @@
+"""
+로컬 일봉 저장소
+
+종목별 일봉을 NumPy 구조화 배열(.npy)로 data/cache/krx/ohlcv 에 보관하고,
+마지막 저장일 이후 구간만 KRX에서 받아 이어 붙인다.
+이미 저장된 구간의 가격 이력 조회는 디스크에서만 읽으므로 네트워크 호출이 없다.
+
+- 날짜: 1970-01-01 기준 일수 (int32)
+- 가격/거래량: int64
+- 수정주가 변경(액면분할 등) 감지: 이어 붙일 때 마지막 저장 봉을 다시 받아 비교하고,
+  값이 다르면 해당 종목 전체를 다시 받는다.
+- 최근 거래일 봉 한 개만 모자라면 시장 전체 스냅샷(market_snapshot)의 행으로 채워
+  종목별 KRX 호출 없이 이어 붙인다.
+"""
+
+import io
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pykrx import stock
+
+from app.utils.local_store import get_cache_dir, load_json, save_json, atomic_write_bytes
+
+
+# 저장 형식
+PRICE_DTYPE = np.dtype([
+    ('date', '<i4'),      # 1970-01-01 기준 일수
+    ('open', '<i8'),      # 시가
+    ('high', '<i8'),      # 고가
+    ('low', '<i8'),       # 저가
+    ('close', '<i8'),     # 종가
+    ('volume', '<i8'),    # 거래량
+])
+
+# pykrx 컬럼명 → 저장 필드
+_COLUMN_MAP = {
+    '시가': 'open',
+    '고가': 'high',
+    '저가': 'low',
+    '종가': 'close',
+    '거래량': 'volume',
+}
+
+# 장중 당일 봉 재동기화 간격 (초)
+INTRADAY_SYNC_INTERVAL = 300
+
+# 장 마감 시각 (HHMM) - 이후 동기화한 당일 봉은 확정으로 간주
+MARKET_CLOSE = "1530"
+
+_EPOCH = datetime(1970, 1, 1)
+_ticker_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _store_dir() -> str:
+    return get_cache_dir('krx', 'ohlcv')
+
+
+def _bars_path(ticker: str) -> str:
+    return os.path.join(_store_dir(), f"{ticker}.npy")
+
+
+def _meta_path(ticker: str) -> str:
+    return os.path.join(_store_dir(), f"{ticker}.json")
+
+
+def _lock_for(ticker: str) -> threading.Lock:
+    with _locks_guard:
+        return _ticker_locks.setdefault(ticker, threading.Lock())
+
+
+def date_to_days(date_str: str) -> int:
+    """YYYYMMDD → 1970-01-01 기준 일수"""
+    return (datetime.strptime(date_str, "%Y%m%d") - _EPOCH).days
+
+
+def days_to_date(days: int) -> str:
+    """1970-01-01 기준 일수 → YYYYMMDD"""
+    return (_EPOCH + timedelta(days=int(days))).strftime("%Y%m%d")
+
+
+# ============================================
+# 변환
+# ============================================
+
+def df_to_bars(df: pd.DataFrame) -> np.ndarray:
+    """pykrx 일봉 DataFrame → 구조화 배열"""
+    if df is None or df.empty:
+        return np.empty(0, dtype=PRICE_DTYPE)
+
+    bars = np.empty(len(df), dtype=PRICE_DTYPE)
+    bars['date'] = (df.index.values.astype('datetime64[D]') - np.datetime64('1970-01-01', 'D')).astype(np.int32)
+    for column, field in _COLUMN_MAP.items():
+        bars[field] = df[column].to_numpy(dtype=np.int64)
+    return bars
+
+
+def bars_to_df(bars: np.ndarray) -> pd.DataFrame:
+    """구조화 배열 → pykrx와 같은 컬럼명의 DataFrame"""
+    index = pd.DatetimeIndex(
+        (np.datetime64('1970-01-01', 'D') + bars['date'].astype('timedelta64[D]')).astype('datetime64[ns]'),
+        name='날짜'
+    )
+    data = {column: np.asarray(bars[field]) for column, field in _COLUMN_MAP.items()}
+    return pd.DataFrame(data, index=index)
+
+
+# ============================================
+# 저장 / 로드
+# ============================================
+
+def load_bars(ticker: str, mmap_mode: Optional[str] = None) -> np.ndarray:
+    """
+    저장된 일봉 배열 로드
+
+    Args:
+        ticker: 종목코드
+        mmap_mode: np.load 메모리 매핑 모드 (대량 일괄 조회 시 'r')
+
+    Returns:
+        PRICE_DTYPE 구조화 배열 (없으면 빈 배열)
+    """
+    path = _bars_path(ticker)
+    if not os.path.exists(path):
+        return np.empty(0, dtype=PRICE_DTYPE)
+    try:
+        return np.load(path, mmap_mode=mmap_mode)
+    except (OSError, ValueError) as e:
+        print(f"[PriceStore] {ticker} 로드 오류: {e}")
+        return np.empty(0, dtype=PRICE_DTYPE)
+
+
+def _save_bars(ticker: str, bars: np.ndarray, meta: Dict) -> None:
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(bars, dtype=PRICE_DTYPE))
+    atomic_write_bytes(_bars_path(ticker), buffer.getvalue())
+    save_json(_meta_path(ticker), meta)
+
+
+def _fetch_bars(ticker: str, start: str, end: str) -> np.ndarray:
+    """KRX에서 구간 일봉 조회"""
+    return df_to_bars(stock.get_market_ohlcv(start, end, ticker))
+
+
+def _merge(stored: np.ndarray, fetched: np.ndarray) -> np.ndarray:
+    """날짜 기준 병합 (같은 날짜는 새로 받은 봉 우선)"""
+    if len(stored) == 0:
+        return fetched
+    if len(fetched) == 0:
+        return np.array(stored)
+    keep = ~np.isin(stored['date'], fetched['date'])
+    merged = np.concatenate([np.asarray(stored)[keep], fetched])
+    return merged[np.argsort(merged['date'], kind='stable')]
+
+
+def _is_intraday_stale(meta: Dict, end: str) -> bool:
+    """당일 봉을 장중에 받아 두었고 재동기화 간격이 지났는지 여부"""
+    if meta.get('synced_to') != end:
+        return False
+    if meta.get('final', False):
+        return False
+    return time.time() - meta.get('synced_at', 0) > INTRADAY_SYNC_INTERVAL
+
+
+# 스냅샷 등락률과 저장 종가로 계산한 등락률의 허용 오차 (%p)
+SNAPSHOT_CHANGE_TOLERANCE = 0.05
+
+
+def _tail_from_snapshot(ticker: str, bars: np.ndarray, end: str):
+    """
+    시장 전체 스냅샷에서 end 일자 봉 한 개를 만든다
+
+    마지막 저장 봉이 end 직전 거래일(이어 붙이기) 또는 end 당일(장중 갱신)일 때만 사용하며,
+    스냅샷 등락률이 저장된 전일 종가와 맞지 않으면(수정주가 변경 가능성) None을 반환하여
+    KRX 구간 조회로 넘긴다.
+
+    Returns:
+        (봉 배열, MarketSnapshot) 또는 None
+    """
+    from app.services.krx.market_snapshot import get_market_snapshot
+    from app.services.krx.trading_calendar import previous_trading_day
+
+    last_date = days_to_date(bars['date'][-1])
+    if last_date == end:
+        prev_close = int(bars['close'][-2]) if len(bars) > 1 else 0
+    elif last_date == previous_trading_day(1, end):
+        prev_close = int(bars['close'][-1])
+    else:
+        return None
+
+    # 저장된 스냅샷만 사용 (없으면 호출 측에서 KRX 구간 조회, 종목 동기화 중 시장 전체 생성 없음)
+    snapshot = get_market_snapshot(end, build=False)
+    row = snapshot.get(ticker) if snapshot else None
+    if not row or row['close'] <= 0:
+        return None
+
+    if prev_close > 0 and row['change_rate'] is not None:
+        expected = (row['close'] - prev_close) / prev_close * 100
+        if abs(expected - row['change_rate']) > SNAPSHOT_CHANGE_TOLERANCE:
+            return None
+
+    tail = np.empty(1, dtype=PRICE_DTYPE)
+    tail['date'] = date_to_days(end)
+    for field in _COLUMN_MAP.values():
+        tail[field] = row[field]
+    return tail, snapshot
+
+
+def sync_ticker(ticker: str, start: str, end: str) -> np.ndarray:
+    """
+    저장소가 start ~ end 구간을 포함하도록 동기화
+
+    - 저장 이력이 없으면 구간 전체 조회
+    - 앞쪽이 모자라면 부족한 구간만 추가 조회
+    - 뒤쪽은 마지막 저장 봉부터 조회하여 이어 붙임 (수정주가 변경 시 전체 재조회)
+
+    Returns:
+        동기화된 전체 일봉 배열
+    """
+    with _lock_for(ticker):
+        meta = load_json(_meta_path(ticker)) or {}
+        bars = load_bars(ticker)
+        changed = False
+        snapshot = None
+
+        if len(bars) == 0 or not meta:
+            bars = _fetch_bars(ticker, start, end)
+            meta = {'covered_from': start}
+            changed = True
+
+        else:
+            # 앞쪽 구간 보충
+            covered_from = meta.get('covered_from', days_to_date(bars['date'][0]))
+            if start < covered_from:
+                before_end = (datetime.strptime(covered_from, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+                bars = _merge(bars, _fetch_bars(ticker, start, before_end))
+                meta['covered_from'] = start
+                changed = True
+
+            # 뒤쪽 구간 이어 붙이기
+            if meta.get('synced_to', '') < end or _is_intraday_stale(meta, end):
+                from_snapshot = _tail_from_snapshot(ticker, bars, end)
+
+                if from_snapshot is not None:
+                    # 스냅샷 행으로 최근 거래일 봉 보충 (종목별 KRX 호출 없음)
+                    tail, snapshot = from_snapshot
+                    bars = _merge(bars, tail)
+                else:
+                    last_date = days_to_date(bars['date'][-1])
+                    last_is_final = meta.get('final', False) or last_date < meta.get('synced_to', '')
+                    tail = _fetch_bars(ticker, last_date, end)
+
+                    if (last_is_final and len(tail) and tail['date'][0] == bars['date'][-1]
+                            and tail['close'][0] != bars['close'][-1]):
+                        # 확정된 과거 봉이 바뀜 → 수정주가 재계산, 전체 재조회
+                        print(f"[PriceStore] {ticker} 수정주가 변경 감지, 전체 재조회")
+                        bars = _fetch_bars(ticker, meta['covered_from'], end)
+                    else:
+                        bars = _merge(bars, tail)
+                changed = True
+
+        if changed:
+            now = datetime.now()
+            meta['synced_to'] = end
+            meta['synced_at'] = time.time()
+            if snapshot is not None:
+                # 장중에 만든 스냅샷이면 당일 봉은 아직 확정이 아님
+                meta['final'] = snapshot.final
+            else:
+                meta['final'] = end < now.strftime("%Y%m%d") or now.strftime("%H%M") >= MARKET_CLOSE
+            _save_bars(ticker, bars, meta)
+            bars = load_bars(ticker)
+
+        return bars
+
+
+def is_synced(ticker: str, start: str, end: str) -> bool:
+    """저장소만으로 start ~ end 구간을 응답할 수 있는지 여부 (sync_ticker가 KRX를 조회하지 않는 경우)"""
+    meta = load_json(_meta_path(ticker))
+    if not meta or not os.path.exists(_bars_path(ticker)):
+        return False
+    if start < meta.get('covered_from', end):
+        return False
+    return meta.get('synced_to', '') >= end and not _is_intraday_stale(meta, end)
+
+
+def get_ohlcv(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """
+    구간 일봉 조회 (로컬 저장소 우선)
+
+    Args:
+        ticker: 종목코드
+        start: 시작일 (YYYYMMDD)
+        end: 종료일 (YYYYMMDD, 최근 거래일)
+
+    Returns:
+        pykrx get_market_ohlcv와 같은 컬럼(시가/고가/저가/종가/거래량)의 DataFrame
+
+    Example:
+        >>> df = get_ohlcv("055550", "20240101", "20241231")
+        >>> print(df['종가'].iloc[-1])
+    """
+    bars = sync_ticker(ticker, start, end)
+    if len(bars) == 0:
+        return bars_to_df(np.empty(0, dtype=PRICE_DTYPE))
+
+    lo = np.searchsorted(bars['date'], date_to_days(start), side='left')
+    hi = np.searchsorted(bars['date'], date_to_days(end), side='right')
+    return bars_to_df(bars[lo:hi])
+
+
+def stored_tickers() -> List[str]:
+    """저장소에 일봉이 있는 종목코드 목록"""
+    return sorted(name[:-4] for name in os.listdir(_store_dir()) if name.endswith('.npy'))
+
+
+def sync_all(end: str, tickers: List[str] = None, lookback_days: int = 400,
+             backfill_from: str = None) -> Dict[str, int]:
+    """
+    여러 종목을 end 일자까지 일괄 동기화 (일별 작업용)
+
+    이미 저장된 종목은 시장 스냅샷으로 최근 봉만 이어 붙이므로 KRX 호출이 거의 없고,
+    처음 저장하는 종목만 lookback_days 구간을 조회한다.
+    backfill_from 을 주면 저장 구간이 그보다 짧은 종목은 앞쪽 구간을 한 번 보충한다.
+
+    Args:
+        end: 동기화 종료일 (YYYYMMDD)
+        tickers: 대상 종목 (기본: 이미 저장된 종목)
+        lookback_days: 신규 종목의 조회 기간 (달력 기준 일수)
+        backfill_from: 모든 종목이 포함해야 하는 시작일 (YYYYMMDD, 백테스트 기간 등)
+
+    Returns:
+        {'synced': 성공 종목 수, 'failed': 실패 종목 수}
+    """
+    tickers = tickers if tickers is not None else stored_tickers()
+    default_start = (datetime.strptime(end, "%Y%m%d") - timedelta(days=lookback_days)).strftime("%Y%m%d")
+    if backfill_from:
+        default_start = min(default_start, backfill_from)
+
+    synced = failed = 0
+    for ticker in tickers:
+        try:
+            meta = load_json(_meta_path(ticker)) or {}
+            start = meta.get('covered_from', default_start)
+            if backfill_from:
+                start = min(start, backfill_from)
+            sync_ticker(ticker, start, end)
+            synced += 1
+        except Exception as e:
+            print(f"[PriceStore] {ticker} 동기화 오류: {e}")
+            failed += 1
+
+    print(f"[PriceStore] {end} 일괄 동기화: 성공 {synced}개, 실패 {failed}개")
+    return {'synced': synced, 'failed': failed}
+
+
+def get_store_info(ticker: str) -> Optional[Dict]:
+    """저장 현황 (저장 봉 수, 보유 구간)"""
+    meta = load_json(_meta_path(ticker))
+    if not meta:
+        return None
+    bars = load_bars(ticker)
+    return {
+        'ticker': ticker,
+        'bars': len(bars),
+        'covered_from': meta.get('covered_from'),
+        'synced_to': meta.get('synced_to'),
+        'first_date': days_to_date(bars['date'][0]) if len(bars) else None,
+        'last_date': days_to_date(bars['date'][-1]) if len(bars) else None,
+    }
+
+
+if __name__ == "__main__":
+    from app.services.krx.trading_calendar import latest_trading_day
+
+    ticker = "055550"
+    end = latest_trading_day()
+    start = (datetime.strptime(end, "%Y%m%d") - timedelta(days=365)).strftime("%Y%m%d")
+
+    df = get_ohlcv(ticker, start, end)
+    print(f"{ticker}: {len(df)}개 봉 ({start} ~ {end})")
+    print(get_store_info(ticker))
@@ -0,0 +1,325 @@
+"""
+업종별 밸류에이션 통계
+
+시장 전체 스냅샷(market_snapshot)의 PER/PBR/EPS/BPS/DIV 를 업종으로 묶어
+중앙값, 평균, 사분위수와 종목별 업종 내 백분위를 하루 한 번 미리 계산한다.
+(data/cache/krx/sector_stats/YYYYMMDD.json)
+
+업종 구분 우선순위:
+1. DART 업종코드(industry_mapper 와 같은 표준산업분류) 앞 3자리 - 동종 종목이 MIN_SECTOR_PEERS 이상일 때
+2. KRX 업종 분류 (get_market_sector_classifications, 시장별 1회 조회)
+3. 시장 (KOSPI/KOSDAQ)
+
+보고서 생성 시에는 저장된 통계만 읽으므로 추가 네트워크 조회가 없다.
+종목 → 업종 매핑은 data/cache/krx/sector_map.sqlite 에 종목 단위로 갱신한다
+(보고서 워커와 일별 작업이 동시에 기록해도 서로의 값을 덮어쓰지 않음).
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.local_store import connect_sqlite, get_cache_dir, load_json, save_json
+
+
+# 통계 대상 지표 (스냅샷 컬럼)
+METRICS = ['per', 'pbr', 'eps', 'bps', 'div']
+
+# 업종코드 그룹으로 인정할 최소 종목 수
+MIN_SECTOR_PEERS = 5
+
+# 업종코드 그룹 자릿수 (표준산업분류 중분류 수준)
+INDUSTRY_PREFIX_LENGTH = 3
+
+_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+_legacy_imported = False
+
+_SECTOR_MAP_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS sector_map ("
+    " ticker TEXT PRIMARY KEY,"
+    " sector TEXT,"             # KRX 업종명
+    " induty_code TEXT)",       # DART 업종코드
+]
+
+
+def _sector_map_path() -> str:
+    return os.path.join(get_cache_dir('krx'), 'sector_map.sqlite')
+
+
+def _map_db() -> sqlite3.Connection:
+    """업종 매핑 DB 연결 (이전 sector_map.json 이 있으면 처음 한 번 가져옴)"""
+    global _legacy_imported
+
+    conn = connect_sqlite(_sector_map_path(), _SECTOR_MAP_SCHEMA)
+    if not _legacy_imported:
+        _legacy_imported = True
+        legacy = load_json(os.path.join(get_cache_dir('krx'), 'sector_map.json'))
+        if legacy:
+            conn.executemany(
+                "INSERT OR IGNORE INTO sector_map (ticker, sector, induty_code) VALUES (?, ?, ?)",
+                [(t, e.get('sector'), e.get('induty_code')) for t, e in legacy.items()],
+            )
+    return conn
+
+
+def _stats_path(date: str) -> str:
+    return os.path.join(get_cache_dir('krx', 'sector_stats'), f"{date}.json")
+
+
+# ============================================
+# 종목 → 업종 매핑
+# ============================================
+
+def load_sector_map() -> Dict[str, Dict[str, str]]:
+    """종목코드 → {'sector': KRX 업종명, 'induty_code': DART 업종코드}"""
+    try:
+        rows = _map_db().execute("SELECT ticker, sector, induty_code FROM sector_map").fetchall()
+    except sqlite3.Error as e:
+        print(f"[SectorStats] 업종 매핑 조회 오류: {e}")
+        return {}
+    result: Dict[str, Dict[str, str]] = {}
+    for ticker, sector, induty_code in rows:
+        entry = result[ticker] = {}
+        if sector:
+            entry['sector'] = sector
+        if induty_code:
+            entry['induty_code'] = induty_code
+    return result
+
+
+def record_induty_code(ticker: str, induty_code: str) -> None:
+    """
+    DART 기업개황에서 얻은 업종코드 기록 (종목 한 행만 갱신)
+
+    보고서 생성 중 기업개황을 조회할 때마다 호출되어 업종코드 그룹이 점점 채워진다.
+    """
+    if not ticker or not induty_code:
+        return
+    try:
+        _map_db().execute(
+            "INSERT INTO sector_map (ticker, induty_code) VALUES (?, ?) "
+            "ON CONFLICT(ticker) DO UPDATE SET induty_code = excluded.induty_code",
+            (ticker, str(induty_code).strip()),
+        )
+    except sqlite3.Error as e:
+        print(f"[SectorStats] {ticker} 업종코드 기록 오류: {e}")
+
+
+def refresh_sector_map(date: str) -> int:
+    """
+    KRX 업종 분류로 종목별 업종명 갱신 (시장별 1회 조회, 일별 작업용)
+
+    Returns:
+        업종명이 있는 종목 수
+    """
+    from pykrx import stock
+    from app.services.krx.market_snapshot import MARKETS
+
+    sectors: Dict[str, str] = {}
+    for market in MARKETS:
+        df = stock.get_market_sector_classifications(date, market)
+        if df is None or df.empty or '업종명' not in df.columns:
+            continue
+        sectors.update({str(t): str(name) for t, name in df['업종명'].items() if name})
+
+    conn = _map_db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "INSERT INTO sector_map (ticker, sector) VALUES (?, ?) "
+            "ON CONFLICT(ticker) DO UPDATE SET sector = excluded.sector",
+            list(sectors.items()),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    print(f"[SectorStats] {date} KRX 업종 분류 갱신: {len(sectors)}개 종목")
+    return len(sectors)
+
+
+# ============================================
+# 통계 계산
+# ============================================
+
+def _valid_mask(metric: str, values: pd.Series) -> pd.Series:
+    """통계에 포함할 값 (PER/PBR 은 0 이하(적자/자본잠식) 제외, EPS/BPS 는 0 제외, 배당수익률은 0 포함)"""
+    if metric in ('per', 'pbr'):
+        return values > 0
+    if metric in ('eps', 'bps'):
+        return values.notna() & (values != 0)
+    return values.notna()
+
+
+def _sector_name(group: str, krx_sectors: pd.Series) -> str:
+    """
+    업종 표시명
+
+    업종코드 그룹은 industry_mapper 에서 이름을 찾고, 없으면 소속 종목의
+    최다 KRX 업종명에 코드를 붙여 표시한다.
+    """
+    kind, _, key = group.partition(':')
+    if kind != 'KSIC':
+        return key
+
+    from app.utils.industry_mapper import get_industry_name
+    name = get_industry_name(key)
+    if name:
+        return name
+    krx_sectors = krx_sectors.dropna()
+    if krx_sectors.empty:
+        return f"업종코드 {key}"
+    return f"{krx_sectors.mode().iloc[0]} (업종코드 {key})"
+
+
+def build_sector_stats(date: str) -> Optional[Dict[str, Any]]:
+    """
+    업종별 통계 계산 및 저장
+
+    Args:
+        date: 스냅샷 거래일 (YYYYMMDD)
+
+    Returns:
+        {'date', 'groups': {업종키: {...}}, 'tickers': {종목코드: {'group', 'percentile'}}} 또는 None
+    """
+    from app.services.krx.market_snapshot import get_market_snapshot
+
+    snapshot = get_market_snapshot(date)
+    if snapshot is None:
+        return None
+
+    columns = snapshot.columns
+    df = pd.DataFrame({name: columns[name] for name in ['ticker', 'market'] + METRICS})
+    df['ticker'] = df['ticker'].astype(str)
+
+    # 업종 그룹 결정
+    sector_map = load_sector_map()
+    industry = df['ticker'].map(
+        lambda t: (sector_map.get(t, {}).get('induty_code') or '')[:INDUSTRY_PREFIX_LENGTH] or None)
+    krx_sector = df['ticker'].map(lambda t: sector_map.get(t, {}).get('sector'))
+    industry_size = industry.map(industry.value_counts())
+
+    df['group'] = np.where(
+        industry.notna() & (industry_size >= MIN_SECTOR_PEERS), 'KSIC:' + industry.fillna(''),
+        np.where(krx_sector.notna(), 'KRX:' + krx_sector.fillna(''), 'MARKET:' + df['market'].astype(str))
+    )
+
+    groups: Dict[str, Dict[str, Any]] = {
+        group: {'name': _sector_name(group, krx_sector[df['group'] == group]), 'size': int(size)}
+        for group, size in df['group'].value_counts().items()
+    }
+    percentiles = pd.DataFrame(index=df.index)
+
+    for metric in METRICS:
+        valid = df[_valid_mask(metric, df[metric])]
+        grouped = valid.groupby('group')[metric]
+        summary = grouped.agg(['count', 'median', 'mean'])
+        summary['p25'] = grouped.quantile(0.25)
+        summary['p75'] = grouped.quantile(0.75)
+
+        for group, row in summary.iterrows():
+            groups[group][metric] = {
+                'count': int(row['count']),
+                'median': round(float(row['median']), 2),
+                'mean': round(float(row['mean']), 2),
+                'p25': round(float(row['p25']), 2),
+                'p75': round(float(row['p75']), 2),
+            }
+        percentiles[metric] = (grouped.rank(pct=True) * 100).round(1)
+
+    tickers: Dict[str, Dict[str, Any]] = {}
+    for idx, ticker, group in zip(df.index, df['ticker'], df['group']):
+        pct = percentiles.loc[idx]
+        tickers[ticker] = {
+            'group': group,
+            'percentile': {m: float(pct[m]) for m in METRICS if pd.notna(pct[m])},
+        }
+
+    stats = {'date': date, 'groups': groups, 'tickers': tickers}
+    save_json(_stats_path(date), stats)
+
+    print(f"[SectorStats] {date} 업종 통계 저장: {len(groups)}개 업종, {len(tickers)}개 종목")
+    return stats
+
+
+def get_sector_stats(date: str = None, build: bool = True) -> Optional[Dict[str, Any]]:
+    """업종 통계 조회 (메모리 → 디스크 → 스냅샷에서 계산)"""
+    if date is None:
+        from app.services.krx.trading_calendar import latest_trading_day
+        date = latest_trading_day()
+
+    with _stats_lock:
+        stats = _stats.get(date) or load_json(_stats_path(date))
+        if stats is None and build:
+            try:
+                stats = build_sector_stats(date)
+            except Exception as e:
+                print(f"[SectorStats] {date} 계산 오류: {e}")
+
+        if stats is not None:
+            _stats.clear()
+            _stats[date] = stats
+        return stats
+
+
+def latest_stats_date() -> Optional[str]:
+    """디스크에 저장된 가장 최근 업종 통계 날짜 (네트워크 조회 없음)"""
+    dates = [name[:-5] for name in os.listdir(get_cache_dir('krx', 'sector_stats')) if name.endswith('.json')]
+    return max(dates) if dates else None
+
+
+def get_sector_valuation(ticker: str, date: str = None) -> Dict[str, Any]:
+    """
+    종목의 업종 비교 밸류에이션 (저장된 통계만 사용, 해당일 통계가 없으면 가장 최근 저장본)
+
+    Returns:
+        {
+            'sector': 업종키, 'sector_name': 업종명, 'peers': 업종 종목 수, 'date': 기준일,
+            'per': {'median', 'mean', 'p25', 'p75', 'count', 'percentile'}, 'pbr': {...}, ...
+        }
+        (통계가 없으면 빈 딕셔너리)
+
+    Example:
+        >>> sector = get_sector_valuation("055550")
+        >>> print(sector['sector_name'], sector['pbr']['median'])
+    """
+    try:
+        stats = get_sector_stats(date, build=False)
+        if stats is None and date is None:
+            latest = latest_stats_date()
+            stats = get_sector_stats(latest, build=False) if latest else None
+        if not stats:
+            return {}
+
+        member = stats['tickers'].get(ticker)
+        if not member:
+            return {}
+
+        group = stats['groups'].get(member['group'], {})
+        result = {
+            'sector': member['group'],
+            'sector_name': group.get('name', ''),
+            'peers': group.get('size', 0),
+            'date': stats['date'][:4] + '-' + stats['date'][4:6] + '-' + stats['date'][6:],
+        }
+        for metric in METRICS:
+            if metric in group:
+                result[metric] = dict(group[metric], percentile=member['percentile'].get(metric))
+        return result
+
+    except Exception as e:
+        print(f"[SectorStats] {ticker} 조회 오류: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    sector = get_sector_valuation("055550")
+    print(f"업종: {sector.get('sector_name')} ({sector.get('peers')}개 종목)")
+    for metric in METRICS:
+        print(metric, sector.get(metric))
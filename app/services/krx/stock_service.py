@@ -7,8 +7,15 @@ pykrx 라이브러리를 사용한 한국거래소 공식 데이터 조회
 - 1년간 주가 변동 추이
 - 이동평균선 계산
 - 거래량 추이 조회
+
+종목별 일봉은 OhlcvFrame으로 한 번만 조회하고,
+모든 공개 함수는 그 프레임 위의 얇은 뷰로 동작한다.
+현재가/밸류에이션/시장 구분은 시장 전체 일별 스냅샷(market_snapshot)에서 읽는다.
 """
 
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
@@ -16,6 +23,17 @@ import pandas as pd
 
 from pykrx import stock
 
+from app.services.krx import price_store
+from app.services.krx.indicator_engine import RSI_PERIOD, MFI_PERIOD
+from app.services.krx.indicator_state import get_indicator_state
+from app.services.krx.market_risk import get_market_risk
+from app.services.krx.krx_pool import KrxBusyError, KrxTimeoutError, krx_call
+from app.services.krx.market_snapshot import get_market_snapshot
+from app.services.krx.price_pyramid import window_candles
+from app.services.krx.price_series import PriceSeries
+from app.services.krx.ticker_index import get_ticker_name, get_ticker_market
+from app.services.krx.trading_calendar import latest_trading_day
+
 
 # ============================================
 # 데이터 클래스
@@ -76,6 +94,10 @@ class StockSummary:
     ma60: int = 0                # 60일 이동평균
     ma120: int = 0               # 120일 이동평균
     
+    # 시가총액 (시장 전체 스냅샷)
+    market_cap: int = 0          # 시가총액 (원)
+    listed_shares: int = 0       # 상장주식수
+    
     # 메타
     last_updated: str = ""       # 마지막 업데이트 날짜
     
@@ -97,6 +119,8 @@ class StockSummary:
             'ma20': self.ma20,
             'ma60': self.ma60,
             'ma120': self.ma120,
+            'market_cap': self.market_cap,
+            'listed_shares': self.listed_shares,
             'last_updated': self.last_updated
         }
 
@@ -105,81 +129,173 @@ class StockSummary:
 # 유틸리티 함수
 # ============================================
 
-def _get_date_str(date: datetime = None) -> str:
-    """날짜를 YYYYMMDD 형식 문자열로 변환"""
-    if date is None:
-        date = datetime.now()
-    return date.strftime("%Y%m%d")
-
-
-def _get_latest_trading_date() -> str:
-    """가장 최근 거래일 조회"""
-    today = datetime.now()
-    # 최근 7일 내 거래일 찾기
-    for i in range(7):
-        date = today - timedelta(days=i)
-        date_str = _get_date_str(date)
-        try:
-            df = stock.get_market_ohlcv(date_str, date_str, "005930")  # 삼성전자로 테스트
-            if not df.empty:
-                return date_str
-        except:
-            continue
-    return _get_date_str(today)
-
-
 def _get_stock_name(ticker: str) -> str:
-    """종목코드로 종목명 조회"""
+    """종목코드로 종목명 조회 (종목 메타데이터 인덱스)"""
     try:
-        return stock.get_market_ticker_name(ticker)
-    except:
+        return get_ticker_name(ticker)
+    except Exception:
         return ""
 
 
 def _get_market_type(ticker: str) -> str:
-    """종목코드로 시장 구분 조회"""
+    """종목코드로 시장 구분 조회 (종목 메타데이터 인덱스)"""
     try:
-        kospi_tickers = stock.get_market_ticker_list(market="KOSPI")
-        if ticker in kospi_tickers:
-            return "KOSPI"
-        return "KOSDAQ"
-    except:
+        return get_ticker_market(ticker) or "KOSPI"
+    except Exception:
         return "KOSPI"
 
 
+def _rsi_signal(value: Optional[float]) -> str:
+    """RSI 값 → 신호"""
+    if value is None:
+        return "중립"
+    if value >= 70:
+        return "과매수"
+    if value <= 30:
+        return "과매도"
+    return "강세" if value >= 50 else "약세"
+
+
+def _mfi_signal(value: Optional[float]) -> str:
+    """MFI 값 → 신호"""
+    if value is None:
+        return "중립"
+    if value >= 80:
+        return "과매수"
+    if value <= 20:
+        return "과매도"
+    return "자금 유입" if value >= 50 else "자금 유출"
+
+
+def _beta_signal(value: Optional[float]) -> str:
+    """베타 → 시장 민감도"""
+    if value is None:
+        return "N/A"
+    if value >= 1.2:
+        return "고베타 (시장보다 크게 변동)"
+    if value <= 0.8:
+        return "저베타 (방어적)"
+    return "시장 수준"
+
+
+def _relative_signal(value: Optional[float]) -> str:
+    """상대강도(%) → 시장 대비 흐름"""
+    if value is None:
+        return "N/A"
+    if value >= 5:
+        return "시장 대비 강세"
+    if value <= -5:
+        return "시장 대비 약세"
+    return "시장과 유사"
+
+
+def _snapshot_row(ticker: str, date: str = None) -> Optional[Dict[str, Any]]:
+    """
+    시장 전체 스냅샷에서 종목 한 행 조회 (없으면 None)
+
+    저장된 스냅샷이 없거나 장중 스냅샷이 오래된 경우에만 KRX 조회 풀에서 새로 만들고,
+    시간 초과/대기열 초과 시에는 기존 스냅샷(또는 None)으로 응답한다.
+    """
+    date = date or latest_trading_day()
+    snapshot = get_market_snapshot(date, build=False)
+    if snapshot is None or snapshot.is_stale():
+        try:
+            snapshot = krx_call(get_market_snapshot, date) or snapshot
+        except (KrxTimeoutError, KrxBusyError) as e:
+            print(f"[StockService] 스냅샷 생성 생략: {e}")
+    return snapshot.get(ticker) if snapshot else None
+
+
+def _snapshot_quote(ticker: str, row: Optional[Dict[str, Any]] = None) -> Optional[StockPrice]:
+    """시장 전체 스냅샷에서 최근 거래일 시세 조회 (없으면 None)"""
+    row = row or _snapshot_row(ticker)
+    if not row or row['close'] <= 0:
+        return None
+
+    date = row['date']
+    return StockPrice(
+        date=date[:4] + '-' + date[4:6] + '-' + date[6:],
+        open=row['open'],
+        high=row['high'],
+        low=row['low'],
+        close=row['close'],
+        volume=row['volume'],
+        change_rate=round(row['change_rate'], 2) if row['change_rate'] is not None else 0.0
+    )
+
+
 # ============================================
-# 주가 조회 함수
+# OHLCV 프레임 엔진
 # ============================================
 
-def get_current_price(ticker: str) -> Optional[StockPrice]:
+# 한 번에 조회할 기본 기간 (달력 기준 일수)
+# 1년 가격 히스토리(365 + 10일)와 120일 이동평균 계산 구간(300일)을 모두 포함
+FRAME_LOOKBACK_DAYS = 400
+
+# 프레임 캐시 유지 시간 (초) 및 최대 종목 수
+FRAME_CACHE_TTL = 300
+FRAME_CACHE_SIZE = 256
+
+_frame_cache: "OrderedDict[str, OhlcvFrame]" = OrderedDict()
+_frame_cache_lock = threading.Lock()
+_frame_fetch_locks: Dict[str, threading.Lock] = {}
+
+
+class OhlcvFrame:
     """
-    현재 주가 조회 (최근 거래일 종가)
-    
-    Args:
-        ticker: 종목코드 (예: "055550")
-        
-    Returns:
-        StockPrice 객체 또는 None
-        
-    Example:
-        >>> price = get_current_price("055550")  # 신한금융지주
-        >>> print(f"현재가: {price.close:,}원")
+    종목 하나의 일봉 데이터를 한 번만 조회하여 모든 지표를 계산하는 엔진
+
+    현재가, 가격 이력, 1년 추이, 이동평균, 거래량, RSI, MFI를
+    같은 DataFrame에서 계산하므로 지표 수와 무관하게 KRX 조회는 1회로 끝난다.
+    각 메서드는 기존 공개 함수와 동일한 구조의 결과를 반환한다.
     """
-    try:
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=7)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
+
+    def __init__(self, ticker: str, df: pd.DataFrame, end_date: str, lookback_days: int):
+        self.ticker = ticker
+        self.df = df
+        self.end_date = end_date              # 조회 기준 거래일 (YYYYMMDD)
+        self.lookback_days = lookback_days    # 조회한 기간 (달력 기준 일수)
+        self.fetched_at = time.time()
+
+    @property
+    def empty(self) -> bool:
+        return self.df is None or self.df.empty
+
+    def covers(self, lookback_days: int) -> bool:
+        """요청 기간을 이 프레임으로 처리할 수 있는지 여부"""
+        return self.lookback_days >= lookback_days
+
+    def is_fresh(self) -> bool:
+        """캐시 유효 시간 이내인지 여부"""
+        return time.time() - self.fetched_at < FRAME_CACHE_TTL
+
+    def _start_date(self, days: int) -> str:
+        """기준 거래일로부터 days일 이전 날짜 (YYYYMMDD)"""
+        return (datetime.strptime(self.end_date, "%Y%m%d") - timedelta(days=days)).strftime("%Y%m%d")
+
+    def window(self, days: int) -> pd.DataFrame:
+        """기준 거래일로부터 최근 days일(달력 기준) 구간"""
+        if self.empty:
+            return self.df
+        start = pd.Timestamp(self._start_date(days))
+        return self.df[self.df.index >= start]
+
+    # ----------------------------------------
+    # 주가
+    # ----------------------------------------
+
+    def current_price(self) -> Optional[StockPrice]:
+        """현재 주가 (최근 거래일 종가)"""
+        df = self.window(7)
         if df.empty:
             return None
-        
+
         # 가장 최근 데이터
         latest = df.iloc[-1]
         prev = df.iloc[-2] if len(df) > 1 else latest
-        
+
         change_rate = ((latest['종가'] - prev['종가']) / prev['종가'] * 100) if prev['종가'] > 0 else 0
-        
+
         return StockPrice(
             date=df.index[-1].strftime("%Y-%m-%d"),
             open=int(latest['시가']),
@@ -189,118 +305,49 @@ def get_current_price(ticker: str) -> Optional[StockPrice]:
             volume=int(latest['거래량']),
             change_rate=round(change_rate, 2)
         )
-        
-    except Exception as e:
-        print(f"Error fetching current price: {e}")
-        return None
 
+    def price_history(self, days: int = 30) -> PriceSeries:
+        """일별 주가 이력 (배열 기반 시계열)"""
+        df = self.window(days + 10)
+        return PriceSeries.from_frame(self.ticker, df).tail(days)
 
-def get_price_history(
-    ticker: str,
-    days: int = 30
-) -> List[StockPrice]:
-    """
-    일별 주가 이력 조회
-    
-    Args:
-        ticker: 종목코드
-        days: 조회 기간 (일)
-        
-    Returns:
-        StockPrice 객체 리스트
-        
-    Example:
-        >>> history = get_price_history("055550", days=30)
-        >>> for price in history[-5:]:
-        ...     print(f"{price.date}: {price.close:,}원")
-    """
-    try:
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=days + 10)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
+    def yearly_trend(self) -> Dict[str, Any]:
+        """최근 1년간 주가 변동 추이"""
+        df = self.window(365)
         if df.empty:
-            return []
-        
-        # 등락률 계산
-        df['change_rate'] = df['종가'].pct_change() * 100
-        
-        result = []
-        for idx, row in df.iterrows():
-            result.append(StockPrice(
-                date=idx.strftime("%Y-%m-%d"),
-                open=int(row['시가']),
-                high=int(row['고가']),
-                low=int(row['저가']),
-                close=int(row['종가']),
-                volume=int(row['거래량']),
-                change_rate=round(row['change_rate'], 2) if pd.notna(row['change_rate']) else 0.0
-            ))
-        
-        return result[-days:] if len(result) > days else result
-        
-    except Exception as e:
-        print(f"Error fetching price history: {e}")
-        return []
+            return {}
 
+        start_date = self._start_date(365)
+        end_date = self.end_date
 
-def get_yearly_trend(ticker: str) -> Dict[str, Any]:
-    """
-    최근 1년간 주가 변동 추이
-    
-    Args:
-        ticker: 종목코드
-        
-    Returns:
-        연간 추이 데이터 딕셔너리
-        
-    Example:
-        >>> trend = get_yearly_trend("055550")
-        >>> print(f"1년 수익률: {trend['return_rate']}%")
-    """
-    try:
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=365)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
-        if df.empty:
-            return {}
-        
         # 기본 통계
         first_price = int(df.iloc[0]['종가'])
         last_price = int(df.iloc[-1]['종가'])
         high_price = int(df['고가'].max())
         low_price = int(df['저가'].min())
         avg_volume = int(df['거래량'].mean())
-        
+
         # 수익률
         return_rate = round((last_price - first_price) / first_price * 100, 2)
-        
-        # 월별 데이터 (차트용)
-        df['month'] = df.index.to_period('M')
-        monthly = df.groupby('month').agg({
-            '시가': 'first',
-            '고가': 'max',
-            '저가': 'min',
-            '종가': 'last',
-            '거래량': 'sum'
-        })
-        
+
+        # 월별 데이터 (차트용) - 가격 피라미드의 월봉 사용
+        monthly = window_candles(self.ticker, price_store.df_to_bars(df), 'monthly')
+        months = monthly['date'].astype('datetime64[D]').astype('datetime64[M]').astype(str)
+
         monthly_data = []
-        for idx, row in monthly.iterrows():
+        for month, candle in zip(months, monthly.tolist()):
+            _, open_, high, low, close, volume = candle
             monthly_data.append({
-                'month': str(idx),
-                'open': int(row['시가']),
-                'high': int(row['고가']),
-                'low': int(row['저가']),
-                'close': int(row['종가']),
-                'volume': int(row['거래량'])
+                'month': month,
+                'open': int(open_),
+                'high': int(high),
+                'low': int(low),
+                'close': int(close),
+                'volume': int(volume)
             })
-        
+
         return {
-            'ticker': ticker,
+            'ticker': self.ticker,
             'period': f"{start_date[:4]}-{start_date[4:6]} ~ {end_date[:4]}-{end_date[4:6]}",
             'first_price': first_price,
             'last_price': last_price,
@@ -311,91 +358,402 @@ def get_yearly_trend(ticker: str) -> Dict[str, Any]:
             'trading_days': len(df),
             'monthly_data': monthly_data
         }
-        
-    except Exception as e:
-        print(f"Error fetching yearly trend: {e}")
-        return {}
 
+    # ----------------------------------------
+    # 이동평균 / 거래량
+    # ----------------------------------------
 
-def get_moving_averages(
-    ticker: str,
-    periods: List[int] = [5, 20, 60, 120]
-) -> Dict[str, Any]:
-    """
-    이동평균선 계산
-    
-    Args:
-        ticker: 종목코드
-        periods: 이동평균 기간 리스트 (기본: 5, 20, 60, 120일)
-        
-    Returns:
-        이동평균선 데이터 딕셔너리
-        
-    Example:
-        >>> ma = get_moving_averages("055550")
-        >>> print(f"20일선: {ma['current']['ma20']:,}원")
-    """
-    try:
-        # 가장 긴 기간 + 여유분
-        max_period = max(periods) + 30
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=max_period * 2)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
+    def moving_averages(self, periods: List[int] = [5, 20, 60, 120]) -> Dict[str, Any]:
+        """이동평균선 계산"""
+        df = self.window((max(periods) + 30) * 2)
         if df.empty:
             return {}
-        
-        # 이동평균 계산
-        for period in periods:
-            df[f'ma{period}'] = df['종가'].rolling(window=period).mean()
-        
+
+        close = df['종가']
+        ma = {period: close.rolling(window=period).mean() for period in periods}
+
         # 현재 이동평균값
-        latest = df.iloc[-1]
         current_ma = {}
         for period in periods:
-            ma_val = latest[f'ma{period}']
+            ma_val = ma[period].iloc[-1]
             current_ma[f'ma{period}'] = int(ma_val) if pd.notna(ma_val) else 0
-        
-        # 골든크로스/데드크로스 체크
+
+        # 골든크로스/데드크로스 체크 (5일선과 20일선)
         signals = []
-        if len(df) > 1:
-            prev = df.iloc[-2]
-            # 5일선과 20일선
-            if pd.notna(latest['ma5']) and pd.notna(latest['ma20']):
-                if prev['ma5'] < prev['ma20'] and latest['ma5'] > latest['ma20']:
+        if len(df) > 1 and 5 in ma and 20 in ma:
+            ma5_now, ma20_now = ma[5].iloc[-1], ma[20].iloc[-1]
+            ma5_prev, ma20_prev = ma[5].iloc[-2], ma[20].iloc[-2]
+            if pd.notna(ma5_now) and pd.notna(ma20_now):
+                if ma5_prev < ma20_prev and ma5_now > ma20_now:
                     signals.append("골든크로스 (5일선 > 20일선)")
-                elif prev['ma5'] > prev['ma20'] and latest['ma5'] < latest['ma20']:
+                elif ma5_prev > ma20_prev and ma5_now < ma20_now:
                     signals.append("데드크로스 (5일선 < 20일선)")
-        
+
         # 추세 판단
-        current_price = int(latest['종가'])
+        current_price = int(close.iloc[-1])
         trend = "중립"
         if current_ma.get('ma20', 0) > 0:
             if current_price > current_ma['ma20'] and current_ma['ma5'] > current_ma['ma20']:
                 trend = "상승 추세"
             elif current_price < current_ma['ma20'] and current_ma['ma5'] < current_ma['ma20']:
                 trend = "하락 추세"
-        
+
         # 최근 30일 이동평균 데이터 (차트용)
-        recent_df = df.tail(30)
         ma_history = []
-        for idx, row in recent_df.iterrows():
-            data = {'date': idx.strftime("%Y-%m-%d"), 'close': int(row['종가'])}
+        for i in range(max(len(df) - 30, 0), len(df)):
+            data = {'date': df.index[i].strftime("%Y-%m-%d"), 'close': int(close.iloc[i])}
             for period in periods:
-                ma_val = row[f'ma{period}']
+                ma_val = ma[period].iloc[i]
                 data[f'ma{period}'] = int(ma_val) if pd.notna(ma_val) else None
             ma_history.append(data)
-        
+
         return {
-            'ticker': ticker,
+            'ticker': self.ticker,
             'current_price': current_price,
             'current': current_ma,
             'trend': trend,
             'signals': signals,
             'history': ma_history
         }
-        
+
+    def volume_trend(self, days: int = 30) -> Dict[str, Any]:
+        """거래량 추이"""
+        df = self.window(days + 10).tail(days)
+        if df.empty:
+            return {}
+
+        volume = df['거래량']
+
+        # 거래량 통계
+        avg_volume = int(volume.mean())
+        max_volume = int(volume.max())
+        min_volume = int(volume.min())
+        latest_volume = int(volume.iloc[-1])
+
+        # 거래량 이동평균
+        vol_ma5 = volume.rolling(window=5).mean()
+        vol_ma20 = volume.rolling(window=20).mean()
+
+        # 거래량 급증 체크 (20일 평균 대비 2배 이상)
+        last_ma20 = vol_ma20.iloc[-1]
+        volume_surge = latest_volume > last_ma20 * 2 if pd.notna(last_ma20) and last_ma20 > 0 else False
+
+        # 일별 거래량 데이터
+        volume_history = []
+        for i in range(len(df)):
+            volume_history.append({
+                'date': df.index[i].strftime("%Y-%m-%d"),
+                'volume': int(volume.iloc[i]),
+                'close': int(df['종가'].iloc[i]),
+                'vol_ma5': int(vol_ma5.iloc[i]) if pd.notna(vol_ma5.iloc[i]) else None,
+                'vol_ma20': int(vol_ma20.iloc[i]) if pd.notna(vol_ma20.iloc[i]) else None
+            })
+
+        return {
+            'ticker': self.ticker,
+            'period_days': days,
+            'avg_volume': avg_volume,
+            'max_volume': max_volume,
+            'min_volume': min_volume,
+            'latest_volume': latest_volume,
+            'volume_surge': volume_surge,
+            'history': volume_history
+        }
+
+    # ----------------------------------------
+    # 기술적 지표
+    # ----------------------------------------
+
+    def rsi(self, period: int = 14) -> Dict[str, Any]:
+        """RSI (Relative Strength Index)"""
+        df = self.window(period * 3)
+        if df.empty or len(df) < period + 1:
+            return {}
+
+        # 가격 변화
+        delta = df['종가'].diff()
+
+        # 상승/하락 분리
+        gain = delta.where(delta > 0, 0)
+        loss = (-delta).where(delta < 0, 0)
+
+        # 평균 계산 (Wilder's smoothing)
+        avg_gain = gain.rolling(window=period).mean()
+        avg_loss = loss.rolling(window=period).mean()
+
+        # RS 및 RSI 계산
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+
+        current_rsi = round(float(rsi.iloc[-1]), 2) if pd.notna(rsi.iloc[-1]) else None
+
+        # 신호 판단
+        signal = _rsi_signal(current_rsi)
+
+        # 최근 5일 RSI 히스토리
+        rsi_history = []
+        for i in range(-5, 0):
+            if pd.notna(rsi.iloc[i]):
+                rsi_history.append({
+                    'date': df.index[i].strftime("%Y-%m-%d"),
+                    'rsi': round(float(rsi.iloc[i]), 2)
+                })
+
+        return {
+            'ticker': self.ticker,
+            'period': period,
+            'value': current_rsi,
+            'signal': signal,
+            'overbought': current_rsi >= 70 if current_rsi else False,
+            'oversold': current_rsi <= 30 if current_rsi else False,
+            'history': rsi_history
+        }
+
+    def mfi(self, period: int = 14) -> Dict[str, Any]:
+        """MFI (Money Flow Index)"""
+        df = self.window(period * 3)
+        if df.empty or len(df) < period + 1:
+            return {}
+
+        # Typical Price (고가 + 저가 + 종가) / 3
+        typical_price = (df['고가'] + df['저가'] + df['종가']) / 3
+
+        # Raw Money Flow = Typical Price × Volume
+        raw_money_flow = typical_price * df['거래량']
+
+        # Money Flow 방향 결정
+        tp_diff = typical_price.diff()
+
+        positive_flow = raw_money_flow.where(tp_diff > 0, 0)
+        negative_flow = raw_money_flow.where(tp_diff < 0, 0)
+
+        # 기간 합계
+        positive_sum = positive_flow.rolling(window=period).sum()
+        negative_sum = negative_flow.rolling(window=period).sum()
+
+        # Money Flow Ratio
+        mfr = positive_sum / negative_sum
+
+        # MFI 계산
+        mfi = 100 - (100 / (1 + mfr))
+
+        current_mfi = round(float(mfi.iloc[-1]), 2) if pd.notna(mfi.iloc[-1]) else None
+
+        # 신호 판단
+        signal = _mfi_signal(current_mfi)
+
+        # 최근 5일 MFI 히스토리
+        mfi_history = []
+        for i in range(-5, 0):
+            if pd.notna(mfi.iloc[i]):
+                mfi_history.append({
+                    'date': df.index[i].strftime("%Y-%m-%d"),
+                    'mfi': round(float(mfi.iloc[i]), 2)
+                })
+
+        return {
+            'ticker': self.ticker,
+            'period': period,
+            'value': current_mfi,
+            'signal': signal,
+            'overbought': current_mfi >= 80 if current_mfi else False,
+            'oversold': current_mfi <= 20 if current_mfi else False,
+            'history': mfi_history
+        }
+
+    # ----------------------------------------
+    # 종합
+    # ----------------------------------------
+
+    def summary(self, name: str, market: str, quote: Optional[StockPrice] = None) -> Optional[StockSummary]:
+        """주식 종합 요약 정보 (quote가 주어지면 당일 시세로 사용)"""
+        current = quote or self.current_price()
+        if not current:
+            return None
+
+        ma_data = self.moving_averages()
+        yearly = self.yearly_trend()
+
+        # 전일 대비
+        history = self.price_history(days=2)
+        change = 0
+        if len(history) >= 2:
+            change = history[-1].close - history[-2].close
+
+        return StockSummary(
+            ticker=self.ticker,
+            name=name,
+            market=market,
+            current_price=current.close,
+            change=change,
+            change_rate=current.change_rate,
+            open=current.open,
+            high=current.high,
+            low=current.low,
+            volume=current.volume,
+            high_52w=yearly.get('high_price', 0),
+            low_52w=yearly.get('low_price', 0),
+            ma5=ma_data.get('current', {}).get('ma5', 0),
+            ma20=ma_data.get('current', {}).get('ma20', 0),
+            ma60=ma_data.get('current', {}).get('ma60', 0),
+            ma120=ma_data.get('current', {}).get('ma120', 0),
+            last_updated=current.date
+        )
+
+
+def _fetch_ohlcv_frame(ticker: str, end_date: str, lookback_days: int) -> OhlcvFrame:
+    """일봉 데이터를 조회하여 프레임 생성"""
+    start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=lookback_days)).strftime("%Y%m%d")
+
+    # 로컬 일봉 저장소에서 조회 (마지막 저장일 이후 구간만 KRX 조회 풀에서 조회)
+    if price_store.is_synced(ticker, start_date, end_date):
+        df = price_store.get_ohlcv(ticker, start_date, end_date)
+    else:
+        df = krx_call(price_store.get_ohlcv, ticker, start_date, end_date)
+
+    return OhlcvFrame(ticker, df, end_date, lookback_days)
+
+
+def get_ohlcv_frame(ticker: str, lookback_days: int = FRAME_LOOKBACK_DAYS) -> OhlcvFrame:
+    """
+    종목의 OHLCV 프레임 조회 (캐시 사용)
+
+    같은 종목에 대한 연속 호출은 하나의 프레임을 공유하므로
+    보고서 1건을 만드는 동안 KRX 조회는 종목당 1회만 발생한다.
+    더 긴 기간이 필요하면 해당 기간으로 다시 조회하여 캐시를 교체한다.
+
+    Args:
+        ticker: 종목코드
+        lookback_days: 필요한 조회 기간 (달력 기준 일수)
+
+    Returns:
+        OhlcvFrame 객체
+
+    Example:
+        >>> frame = get_ohlcv_frame("055550")
+        >>> print(frame.rsi()['value'], frame.moving_averages()['trend'])
+    """
+    lookback_days = max(lookback_days, FRAME_LOOKBACK_DAYS)
+    end_date = latest_trading_day()
+
+    with _frame_cache_lock:
+        fetch_lock = _frame_fetch_locks.setdefault(ticker, threading.Lock())
+
+    # 같은 종목을 동시에 요청하면 한 스레드만 조회하고 나머지는 결과를 공유
+    with fetch_lock:
+        with _frame_cache_lock:
+            frame = _frame_cache.get(ticker)
+            if (frame is not None and frame.end_date == end_date
+                    and frame.is_fresh() and frame.covers(lookback_days)):
+                _frame_cache.move_to_end(ticker)
+                return frame
+
+        frame = _fetch_ohlcv_frame(ticker, end_date, lookback_days)
+
+        with _frame_cache_lock:
+            _frame_cache[ticker] = frame
+            _frame_cache.move_to_end(ticker)
+            while len(_frame_cache) > FRAME_CACHE_SIZE:
+                _frame_cache.popitem(last=False)
+
+        return frame
+
+
+# ============================================
+# 주가 조회 함수
+# ============================================
+
+def get_current_price(ticker: str) -> Optional[StockPrice]:
+    """
+    현재 주가 조회 (최근 거래일 종가)
+
+    Args:
+        ticker: 종목코드 (예: "055550")
+
+    Returns:
+        StockPrice 객체 또는 None
+
+    Example:
+        >>> price = get_current_price("055550")  # 신한금융지주
+        >>> print(f"현재가: {price.close:,}원")
+    """
+    try:
+        return _snapshot_quote(ticker) or get_ohlcv_frame(ticker).current_price()
+    except Exception as e:
+        print(f"Error fetching current price: {e}")
+        return None
+
+
+def get_price_history(
+    ticker: str,
+    days: int = 30
+) -> PriceSeries:
+    """
+    일별 주가 이력 조회
+
+    Args:
+        ticker: 종목코드
+        days: 조회 기간 (일)
+
+    Returns:
+        PriceSeries (인덱스 접근/순회 시 StockPrice)
+
+    Example:
+        >>> history = get_price_history("055550", days=30)
+        >>> for price in history[-5:]:
+        ...     print(f"{price.date}: {price.close:,}원")
+        >>> history.to_columnar(['date', 'close'])
+    """
+    try:
+        return get_ohlcv_frame(ticker, lookback_days=days + 10).price_history(days)
+    except Exception as e:
+        print(f"Error fetching price history: {e}")
+        return PriceSeries.empty(ticker)
+
+
+def get_yearly_trend(ticker: str) -> Dict[str, Any]:
+    """
+    최근 1년간 주가 변동 추이
+
+    Args:
+        ticker: 종목코드
+
+    Returns:
+        연간 추이 데이터 딕셔너리
+
+    Example:
+        >>> trend = get_yearly_trend("055550")
+        >>> print(f"1년 수익률: {trend['return_rate']}%")
+    """
+    try:
+        return get_ohlcv_frame(ticker).yearly_trend()
+    except Exception as e:
+        print(f"Error fetching yearly trend: {e}")
+        return {}
+
+
+def get_moving_averages(
+    ticker: str,
+    periods: List[int] = [5, 20, 60, 120]
+) -> Dict[str, Any]:
+    """
+    이동평균선 계산
+
+    Args:
+        ticker: 종목코드
+        periods: 이동평균 기간 리스트 (기본: 5, 20, 60, 120일)
+
+    Returns:
+        이동평균선 데이터 딕셔너리
+
+    Example:
+        >>> ma = get_moving_averages("055550")
+        >>> print(f"20일선: {ma['current']['ma20']:,}원")
+    """
+    try:
+        # 가장 긴 기간 + 여유분
+        frame = get_ohlcv_frame(ticker, lookback_days=(max(periods) + 30) * 2)
+        return frame.moving_averages(periods)
     except Exception as e:
         print(f"Error calculating moving averages: {e}")
         return {}
@@ -404,65 +762,20 @@ def get_moving_averages(
 def get_volume_trend(ticker: str, days: int = 30) -> Dict[str, Any]:
     """
     거래량 추이 조회
-    
+
     Args:
         ticker: 종목코드
         days: 조회 기간 (일)
-        
+
     Returns:
         거래량 추이 데이터 딕셔너리
-        
+
     Example:
         >>> volume = get_volume_trend("055550")
         >>> print(f"평균 거래량: {volume['avg_volume']:,}주")
     """
     try:
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=days + 10)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
-        if df.empty:
-            return {}
-        
-        df = df.tail(days)
-        
-        # 거래량 통계
-        avg_volume = int(df['거래량'].mean())
-        max_volume = int(df['거래량'].max())
-        min_volume = int(df['거래량'].min())
-        latest_volume = int(df.iloc[-1]['거래량'])
-        
-        # 거래량 이동평균
-        df['vol_ma5'] = df['거래량'].rolling(window=5).mean()
-        df['vol_ma20'] = df['거래량'].rolling(window=20).mean()
-        
-        # 거래량 급증 체크 (20일 평균 대비 2배 이상)
-        vol_ma20 = df['vol_ma20'].iloc[-1]
-        volume_surge = latest_volume > vol_ma20 * 2 if pd.notna(vol_ma20) and vol_ma20 > 0 else False
-        
-        # 일별 거래량 데이터
-        volume_history = []
-        for idx, row in df.iterrows():
-            volume_history.append({
-                'date': idx.strftime("%Y-%m-%d"),
-                'volume': int(row['거래량']),
-                'close': int(row['종가']),
-                'vol_ma5': int(row['vol_ma5']) if pd.notna(row['vol_ma5']) else None,
-                'vol_ma20': int(row['vol_ma20']) if pd.notna(row['vol_ma20']) else None
-            })
-        
-        return {
-            'ticker': ticker,
-            'period_days': days,
-            'avg_volume': avg_volume,
-            'max_volume': max_volume,
-            'min_volume': min_volume,
-            'latest_volume': latest_volume,
-            'volume_surge': volume_surge,
-            'history': volume_history
-        }
-        
+        return get_ohlcv_frame(ticker, lookback_days=days + 10).volume_trend(days)
     except Exception as e:
         print(f"Error fetching volume trend: {e}")
         return {}
@@ -471,13 +784,13 @@ def get_volume_trend(ticker: str, days: int = 30) -> Dict[str, Any]:
 def get_stock_summary(ticker: str) -> Optional[StockSummary]:
     """
     주식 종합 요약 정보 조회
-    
+
     Args:
         ticker: 종목코드
-        
+
     Returns:
         StockSummary 객체 또는 None
-        
+
     Example:
         >>> summary = get_stock_summary("055550")  # 신한금융지주
         >>> print(f"{summary.name}: {summary.current_price:,}원 ({summary.change_rate:+.2f}%)")
@@ -486,44 +799,16 @@ def get_stock_summary(ticker: str) -> Optional[StockSummary]:
         # 기본 정보
         name = _get_stock_name(ticker)
         market = _get_market_type(ticker)
-        
-        # 현재가 조회
-        current = get_current_price(ticker)
-        if not current:
-            return None
-        
-        # 이동평균
-        ma_data = get_moving_averages(ticker)
-        
-        # 52주 최고/최저
-        yearly = get_yearly_trend(ticker)
-        
-        # 전일 대비
-        history = get_price_history(ticker, days=2)
-        change = 0
-        if len(history) >= 2:
-            change = history[-1].close - history[-2].close
-        
-        return StockSummary(
-            ticker=ticker,
-            name=name,
-            market=market,
-            current_price=current.close,
-            change=change,
-            change_rate=current.change_rate,
-            open=current.open,
-            high=current.high,
-            low=current.low,
-            volume=current.volume,
-            high_52w=yearly.get('high_price', 0),
-            low_52w=yearly.get('low_price', 0),
-            ma5=ma_data.get('current', {}).get('ma5', 0),
-            ma20=ma_data.get('current', {}).get('ma20', 0),
-            ma60=ma_data.get('current', {}).get('ma60', 0),
-            ma120=ma_data.get('current', {}).get('ma120', 0),
-            last_updated=current.date
-        )
-        
+
+        row = _snapshot_row(ticker)
+        summary = get_ohlcv_frame(ticker).summary(name, market, quote=_snapshot_quote(ticker, row))
+
+        # 시가총액/상장주식수 (스냅샷, 종목별 조회 없음)
+        if summary and row:
+            summary.market_cap = row.get('market_cap') or 0
+            summary.listed_shares = row.get('shares') or 0
+        return summary
+
     except Exception as e:
         print(f"Error fetching stock summary: {e}")
         return None
@@ -548,27 +833,31 @@ def get_valuation(ticker: str) -> Dict[str, Any]:
         >>> print(f"PER: {val['per']}, PBR: {val['pbr']}")
     """
     try:
-        date = _get_latest_trading_date()
-        
-        # 개별 종목 기본 지표
-        df = stock.get_market_fundamental(date, date, ticker)
-        
-        if df.empty:
-            return {}
-        
-        row = df.iloc[0]
-        
+        date = latest_trading_day()
+
+        # 시장 전체 스냅샷 우선, 없으면 개별 종목 기본 지표 조회
+        row = _snapshot_row(ticker, date)
+        if row is None:
+            df = krx_call(stock.get_market_fundamental, date, date, ticker)
+            if df.empty:
+                return {}
+            fundamental = df.iloc[0]
+            row = {
+                key.lower(): float(fundamental[key]) if pd.notna(fundamental[key]) else None
+                for key in ['PER', 'PBR', 'EPS', 'BPS', 'DIV', 'DPS']
+            }
+
         return {
             'ticker': ticker,
             'date': date[:4] + '-' + date[4:6] + '-' + date[6:],
-            'per': round(float(row['PER']), 2) if pd.notna(row['PER']) else None,
-            'pbr': round(float(row['PBR']), 2) if pd.notna(row['PBR']) else None,
-            'eps': int(row['EPS']) if pd.notna(row['EPS']) else None,
-            'bps': int(row['BPS']) if pd.notna(row['BPS']) else None,
-            'div_yield': round(float(row['DIV']), 2) if pd.notna(row['DIV']) else None,  # 배당수익률
-            'dps': int(row['DPS']) if pd.notna(row['DPS']) else None,  # 주당배당금
+            'per': round(row['per'], 2) if row['per'] is not None else None,
+            'pbr': round(row['pbr'], 2) if row['pbr'] is not None else None,
+            'eps': int(row['eps']) if row['eps'] is not None else None,
+            'bps': int(row['bps']) if row['bps'] is not None else None,
+            'div_yield': round(row['div'], 2) if row['div'] is not None else None,  # 배당수익률
+            'dps': int(row['dps']) if row['dps'] is not None else None,  # 주당배당금
         }
-        
+
     except Exception as e:
         print(f"Error fetching valuation: {e}")
         return {}
@@ -581,80 +870,24 @@ def get_valuation(ticker: str) -> Dict[str, Any]:
 def calculate_rsi(ticker: str, period: int = 14) -> Dict[str, Any]:
     """
     RSI (Relative Strength Index) 계산
-    
+
     - RSI > 70: 과매수 구간 (매도 신호)
     - RSI < 30: 과매도 구간 (매수 신호)
-    
+
     Args:
         ticker: 종목코드
         period: RSI 기간 (기본 14일)
-        
+
     Returns:
         RSI 데이터 딕셔너리
-        
+
     Example:
         >>> rsi = calculate_rsi("055550")
         >>> print(f"RSI(14): {rsi['value']}")
     """
     try:
         # RSI 계산을 위해 충분한 데이터 필요
-        days_needed = period * 3
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=days_needed)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
-        if df.empty or len(df) < period + 1:
-            return {}
-        
-        # 가격 변화
-        delta = df['종가'].diff()
-        
-        # 상승/하락 분리
-        gain = delta.where(delta > 0, 0)
-        loss = (-delta).where(delta < 0, 0)
-        
-        # 평균 계산 (Wilder's smoothing)
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
-        
-        # RS 및 RSI 계산
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        current_rsi = round(float(rsi.iloc[-1]), 2) if pd.notna(rsi.iloc[-1]) else None
-        
-        # 신호 판단
-        signal = "중립"
-        if current_rsi is not None:
-            if current_rsi >= 70:
-                signal = "과매수"
-            elif current_rsi <= 30:
-                signal = "과매도"
-            elif current_rsi >= 50:
-                signal = "강세"
-            else:
-                signal = "약세"
-        
-        # 최근 5일 RSI 히스토리
-        rsi_history = []
-        for i in range(-5, 0):
-            if pd.notna(rsi.iloc[i]):
-                rsi_history.append({
-                    'date': df.index[i].strftime("%Y-%m-%d"),
-                    'rsi': round(float(rsi.iloc[i]), 2)
-                })
-        
-        return {
-            'ticker': ticker,
-            'period': period,
-            'value': current_rsi,
-            'signal': signal,
-            'overbought': current_rsi >= 70 if current_rsi else False,
-            'oversold': current_rsi <= 30 if current_rsi else False,
-            'history': rsi_history
-        }
-        
+        return get_ohlcv_frame(ticker, lookback_days=period * 3).rsi(period)
     except Exception as e:
         print(f"Error calculating RSI: {e}")
         return {}
@@ -663,93 +896,70 @@ def calculate_rsi(ticker: str, period: int = 14) -> Dict[str, Any]:
 def calculate_mfi(ticker: str, period: int = 14) -> Dict[str, Any]:
     """
     MFI (Money Flow Index) 계산
-    
+
     - RSI의 거래량 가중 버전
     - MFI > 80: 과매수 구간
     - MFI < 20: 과매도 구간
-    
+
     Args:
         ticker: 종목코드
         period: MFI 기간 (기본 14일)
-        
+
     Returns:
         MFI 데이터 딕셔너리
-        
+
     Example:
         >>> mfi = calculate_mfi("055550")
         >>> print(f"MFI(14): {mfi['value']}")
     """
     try:
         # MFI 계산을 위해 충분한 데이터 필요
-        days_needed = period * 3
-        end_date = _get_latest_trading_date()
-        start_date = (datetime.strptime(end_date, "%Y%m%d") - timedelta(days=days_needed)).strftime("%Y%m%d")
-        
-        df = stock.get_market_ohlcv(start_date, end_date, ticker)
-        
-        if df.empty or len(df) < period + 1:
-            return {}
-        
-        # Typical Price (고가 + 저가 + 종가) / 3
-        typical_price = (df['고가'] + df['저가'] + df['종가']) / 3
-        
-        # Raw Money Flow = Typical Price × Volume
-        raw_money_flow = typical_price * df['거래량']
-        
-        # Money Flow 방향 결정
-        tp_diff = typical_price.diff()
-        
-        positive_flow = raw_money_flow.where(tp_diff > 0, 0)
-        negative_flow = raw_money_flow.where(tp_diff < 0, 0)
-        
-        # 기간 합계
-        positive_sum = positive_flow.rolling(window=period).sum()
-        negative_sum = negative_flow.rolling(window=period).sum()
-        
-        # Money Flow Ratio
-        mfr = positive_sum / negative_sum
-        
-        # MFI 계산
-        mfi = 100 - (100 / (1 + mfr))
-        
-        current_mfi = round(float(mfi.iloc[-1]), 2) if pd.notna(mfi.iloc[-1]) else None
-        
-        # 신호 판단
-        signal = "중립"
-        if current_mfi is not None:
-            if current_mfi >= 80:
-                signal = "과매수"
-            elif current_mfi <= 20:
-                signal = "과매도"
-            elif current_mfi >= 50:
-                signal = "자금 유입"
-            else:
-                signal = "자금 유출"
-        
-        # 최근 5일 MFI 히스토리
-        mfi_history = []
-        for i in range(-5, 0):
-            if pd.notna(mfi.iloc[i]):
-                mfi_history.append({
-                    'date': df.index[i].strftime("%Y-%m-%d"),
-                    'mfi': round(float(mfi.iloc[i]), 2)
-                })
-        
-        return {
-            'ticker': ticker,
-            'period': period,
-            'value': current_mfi,
-            'signal': signal,
-            'overbought': current_mfi >= 80 if current_mfi else False,
-            'oversold': current_mfi <= 20 if current_mfi else False,
-            'history': mfi_history
-        }
-        
+        return get_ohlcv_frame(ticker, lookback_days=period * 3).mfi(period)
     except Exception as e:
         print(f"Error calculating MFI: {e}")
         return {}
 
 
+def _indicators_from_state(ticker: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    증분 지표 상태에서 RSI/MFI 결과 구성 (calculate_rsi/calculate_mfi 와 같은 구조)
+
+    Returns:
+        (rsi, mfi) - 상태가 없거나 최근 거래일 기준이 아니면 빈 딕셔너리
+    """
+    state = get_indicator_state()
+    if state is None or state.date != latest_trading_day():
+        return {}, {}
+
+    row = state.row(ticker)
+    if row is None:
+        return {}, {}
+
+    def _format(date: str) -> str:
+        return date[:4] + '-' + date[4:6] + '-' + date[6:]
+
+    results = []
+    for name, period, signal_fn, high, low in [('rsi', RSI_PERIOD, _rsi_signal, 70, 30),
+                                               ('mfi', MFI_PERIOD, _mfi_signal, 80, 20)]:
+        value = round(row[name], 2) if row[name] is not None else None
+        if value is None:
+            results.append({})
+            continue
+        results.append({
+            'ticker': ticker,
+            'period': period,
+            'value': value,
+            'signal': signal_fn(value),
+            'overbought': value >= high if value else False,
+            'oversold': value <= low if value else False,
+            'history': [
+                {'date': _format(date), name: round(v, 2)}
+                for date, v in row[f'{name}_history'] if v is not None
+            ]
+        })
+    return results[0], results[1]
+
+
 def get_technical_indicators(ticker: str) -> Dict[str, Any]:
     """
     주요 기술적 지표 종합 조회
@@ -764,8 +974,12 @@ def get_technical_indicators(ticker: str) -> Dict[str, Any]:
         >>> indicators = get_technical_indicators("055550")
         >>> print(f"RSI: {indicators['rsi']['value']}, MFI: {indicators['mfi']['value']}")
     """
-    rsi = calculate_rsi(ticker)
-    mfi = calculate_mfi(ticker)
+    # 야간 작업이 계산해 둔 지표 상태 우선, 없으면 일봉으로 계산
+    rsi, mfi = _indicators_from_state(ticker)
+    if not rsi:
+        rsi = calculate_rsi(ticker)
+    if not mfi:
+        mfi = calculate_mfi(ticker)
     valuation = get_valuation(ticker)
     
     # 종합 신호 판단
@@ -790,6 +1004,34 @@ def get_technical_indicators(ticker: str) -> Dict[str, Any]:
     }
 
 
+# ============================================
+# 시장 대비 위험 지표 (베타, 변동성, 낙폭, 상대강도)
+# ============================================
+
+def get_risk_metrics(ticker: str) -> Dict[str, Any]:
+    """
+    시장 대비 위험 지표 조회 (야간 작업이 계산해 둔 결과, 네트워크 조회 없음)
+
+    Args:
+        ticker: 종목코드
+
+    Returns:
+        market_risk.get_market_risk 결과 + 'beta_signal', 'relative_signal'
+        (결과가 없으면 빈 딕셔너리)
+
+    Example:
+        >>> risk = get_risk_metrics("055550")
+        >>> print(f"베타: {risk['beta']} ({risk['beta_signal']}), 60일 변동성: {risk['volatility_60']}%")
+    """
+    risk = get_market_risk(ticker)
+    if not risk:
+        return {}
+
+    risk['beta_signal'] = _beta_signal(risk.get('beta'))
+    risk['relative_signal'] = _relative_signal(risk.get('relative_strength_60'))
+    return risk
+
+
 # ============================================
 # 테스트
 # ============================================
@@ -865,4 +1107,12 @@ if __name__ == "__main__":
         print(f"주의 신호: {', '.join(indicators['signals'])}")
     else:
         print("특별한 신호 없음")
+    
+    # 9. 시장 대비 위험 지표
+    print("\n[시장 대비 위험]")
+    risk = get_risk_metrics(ticker)
+    if risk:
+        print(f"베타: {risk.get('beta')} ({risk.get('beta_signal')})")
+        print(f"변동성 60일/250일: {risk.get('volatility_60')}% / {risk.get('volatility_250')}%")
+        print(f"상대강도 60일: {risk.get('relative_strength_60')}% ({risk.get('relative_signal')})")
 
@@ -0,0 +1,264 @@
+"""
+종목 메타데이터 인덱스
+
+종목코드 → 종목명/시장/상장일/상장주식수를 딕셔너리 한 번 조회로 반환한다.
+
+- 기본 데이터: data/corp_list/kospi.csv, kosdaq.csv (KRX 상장 종목 목록)
+- 보정: 디스크에 저장된 최근 시장 스냅샷(시장 구분, 상장주식수)
+- 신규 상장: 일별 작업에서 pykrx 종목 목록으로 추가
+
+인덱스는 data/cache/krx/ticker_index.json 에 저장되고 프로세스당 한 번 로드되며,
+일별 작업이 파일을 새로 쓰면(수정 시각 변경) 다시 읽는다.
+저장본이 없을 때만 로컬 데이터로 생성하며, 요청 처리 중에는 네트워크 조회를 하지 않는다.
+"""
+
+import csv
+import os
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.utils.local_store import get_cache_dir, load_json, save_json
+
+
+# 종목 목록 CSV 위치 및 시장별 파일
+CORP_LIST_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data', 'corp_list')
+CORP_LIST_FILES = {
+    'KOSPI': 'kospi.csv',
+    'KOSDAQ': 'kosdaq.csv',
+}
+
+_index: Optional["TickerIndex"] = None
+_index_lock = threading.Lock()
+_index_mtime: float = 0.0
+
+
+def _index_path() -> str:
+    return os.path.join(get_cache_dir('krx'), 'ticker_index.json')
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y%m%d")
+
+
+def _normalize_market(market: str) -> str:
+    """'KOSDAQ GLOBAL' 등 세부 구분을 KOSPI/KOSDAQ 으로 통일"""
+    market = (market or '').upper()
+    if market.startswith('KOSDAQ'):
+        return 'KOSDAQ'
+    if market.startswith('KOSPI'):
+        return 'KOSPI'
+    return market
+
+
+@dataclass
+class TickerInfo:
+    """
+    종목 메타데이터
+    """
+    ticker: str                  # 종목코드 (6자리)
+    name: str                    # 종목명 (약명, pykrx 표기와 동일)
+    full_name: str = ""          # 정식 종목명
+    market: str = ""             # 시장 (KOSPI/KOSDAQ)
+    listing_date: str = ""       # 상장일 (YYYY-MM-DD)
+    shares: int = 0              # 상장주식수
+
+
+class TickerIndex:
+    """
+    종목코드 → TickerInfo 해시 인덱스
+    """
+
+    def __init__(self, items: Dict[str, TickerInfo], built_on: str):
+        self.items = items
+        self.built_on = built_on
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.items
+
+    def get(self, ticker: str) -> Optional[TickerInfo]:
+        return self.items.get(ticker)
+
+    def tickers(self, market: str = None) -> List[str]:
+        """종목코드 목록 (시장 지정 시 해당 시장만)"""
+        if market is None:
+            return list(self.items)
+        return [t for t, info in self.items.items() if info.market == market]
+
+    def to_dict(self) -> Dict:
+        return {
+            'built_on': self.built_on,
+            'items': [asdict(info) for info in self.items.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TickerIndex":
+        items = {row['ticker']: TickerInfo(**row) for row in data.get('items', [])}
+        return cls(items, data.get('built_on', ''))
+
+
+# ============================================
+# 생성
+# ============================================
+
+def _read_corp_list(market: str) -> List[Dict[str, str]]:
+    """종목 목록 CSV 로드 (cp949/euc-kr/utf-8 순으로 시도)"""
+    path = os.path.join(CORP_LIST_DIR, CORP_LIST_FILES[market])
+    if not os.path.exists(path):
+        return []
+
+    for encoding in ['cp949', 'euc-kr', 'utf-8']:
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                return list(csv.DictReader(f))
+        except UnicodeDecodeError:
+            continue
+    return []
+
+
+def _load_csv_items() -> Dict[str, TickerInfo]:
+    items: Dict[str, TickerInfo] = {}
+
+    for market in CORP_LIST_FILES:
+        for row in _read_corp_list(market):
+            code = row.get('단축코드', row.get('종목코드', '')).strip()
+            if not code:
+                continue
+
+            short_name = row.get('한글 종목약명', '').strip()
+            full_name = row.get('한글 종목명', row.get('한글 정식명칭', '')).strip()
+            shares = row.get('상장주식수', '').replace(',', '').strip()
+
+            items[code] = TickerInfo(
+                ticker=code,
+                name=short_name or full_name,
+                full_name=full_name or short_name,
+                market=_normalize_market(row.get('시장구분', market)) or market,
+                listing_date=row.get('상장일', '').strip().replace('/', '-'),
+                shares=int(shares) if shares.isdigit() else 0,
+            )
+
+    return items
+
+
+def _apply_snapshot(items: Dict[str, TickerInfo]) -> None:
+    """디스크의 최근 시장 스냅샷으로 시장 구분/상장주식수 보정"""
+    from app.services.krx.market_snapshot import latest_snapshot_date, get_market_snapshot
+
+    date = latest_snapshot_date()
+    snapshot = get_market_snapshot(date, build=False) if date else None
+    if snapshot is None:
+        return
+
+    for ticker, market, shares in zip(snapshot.columns['ticker'].tolist(),
+                                      snapshot.columns['market'].tolist(),
+                                      snapshot.columns['shares'].tolist()):
+        info = items.get(ticker)
+        if info is None:
+            items[ticker] = info = TickerInfo(ticker=ticker, name="")
+        info.market = market
+        if shares > 0:
+            info.shares = int(shares)
+
+
+def _apply_listings(items: Dict[str, TickerInfo], date: str = None) -> None:
+    """pykrx 종목 목록으로 신규 상장 종목 추가 및 종목명 보충 (네트워크 조회)"""
+    from pykrx import stock
+
+    for market in CORP_LIST_FILES:
+        for ticker in stock.get_market_ticker_list(date, market=market):
+            info = items.get(ticker)
+            if info is None:
+                items[ticker] = info = TickerInfo(ticker=ticker, name="")
+            info.market = market
+            if not info.name:
+                info.name = stock.get_market_ticker_name(ticker)
+                info.full_name = info.full_name or info.name
+
+
+def build_ticker_index(include_listings: bool = False, date: str = None) -> TickerIndex:
+    """
+    종목 메타데이터 인덱스 생성 및 저장
+
+    Args:
+        include_listings: pykrx 종목 목록까지 반영할지 여부 (일별 작업에서 사용)
+        date: 종목 목록 기준일 (기본: 최근 거래일)
+    """
+    items = _load_csv_items()
+    _apply_snapshot(items)
+
+    if include_listings:
+        try:
+            _apply_listings(items, date)
+        except Exception as e:
+            print(f"[TickerIndex] 종목 목록 조회 오류: {e}")
+
+    index = TickerIndex(items, built_on=_today())
+    save_json(_index_path(), index.to_dict())
+
+    print(f"[TickerIndex] {len(index)}개 종목 인덱스 저장")
+    return index
+
+
+def get_ticker_index() -> TickerIndex:
+    """
+    종목 메타데이터 인덱스 조회 (마지막 저장본 사용, 파일이 바뀌었을 때만 다시 로드)
+
+    Example:
+        >>> index = get_ticker_index()
+        >>> print(index.get("055550").name)
+    """
+    global _index, _index_mtime
+
+    with _index_lock:
+        path = _index_path()
+        mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+        if _index is not None and mtime == _index_mtime:
+            return _index
+
+        data = load_json(path) if mtime else None
+        if data:
+            # 날짜와 무관하게 마지막 저장본 사용 (일별 작업의 신규 상장 종목명 유지)
+            _index = TickerIndex.from_dict(data)
+            _index_mtime = mtime
+        elif _index is None:
+            # 저장본이 없을 때만 로컬 데이터(CSV + 스냅샷)로 생성
+            try:
+                _index = build_ticker_index()
+                _index_mtime = os.path.getmtime(path)
+            except Exception as e:
+                print(f"[TickerIndex] 생성 오류: {e}")
+                _index, _index_mtime = TickerIndex({}, built_on=''), -1.0
+
+        return _index
+
+
+# ============================================
+# 편의 함수
+# ============================================
+
+def get_ticker_info(ticker: str) -> Optional[TickerInfo]:
+    """종목 메타데이터 (없으면 None)"""
+    return get_ticker_index().get(ticker)
+
+
+def get_ticker_name(ticker: str) -> str:
+    """종목명 (없으면 빈 문자열)"""
+    info = get_ticker_info(ticker)
+    return info.name if info else ""
+
+
+def get_ticker_market(ticker: str) -> Optional[str]:
+    """시장 구분 KOSPI/KOSDAQ (없으면 None)"""
+    info = get_ticker_info(ticker)
+    return info.market if info and info.market else None
+
+
+if __name__ == "__main__":
+    index = build_ticker_index(include_listings=True)
+    print(index.get("055550"))
+    print(f"KOSPI {len(index.tickers('KOSPI'))}개 / KOSDAQ {len(index.tickers('KOSDAQ'))}개")
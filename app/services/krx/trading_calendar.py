@@ -0,0 +1,380 @@
+"""
+KRX 거래일 캘린더
+
+하루 한 번 삼성전자(005930) 일봉 구간을 조회하여 거래일 목록을 만들고
+data/cache/krx/trading_calendar.json 에 저장한다.
+이후 최근 거래일, n 거래일 전, 구간 내 거래일 수를 딕셔너리 조회(O(1))로 계산한다.
+
+- 주말과 과거 휴장일은 조회된 거래일 목록으로 판단
+- 당일은 장 시작 후 일봉이 생길 때까지 최대 PROBE_INTERVAL 간격으로 한 번씩만 확인
+- 요청 스레드는 저장된 캘린더로 바로 응답하고, 갱신/당일 확인은 KRX 조회 풀에서 한 번만 실행
+  (저장된 캘린더가 아예 없을 때만 조회 풀 결과를 제한 시간까지 기다림)
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pykrx import stock
+
+from app.services.krx.krx_pool import KrxBusyError, KrxTimeoutError, get_krx_pool, krx_call
+from app.utils.local_store import get_cache_dir, load_json, save_json
+
+
+# 거래일 판단에 사용하는 기준 종목 (삼성전자)
+REFERENCE_TICKER = "005930"
+
+# 최초 생성 시 조회할 기간 (년)
+CALENDAR_HISTORY_YEARS = 6
+
+# 정규장 시간 (HHMM)
+MARKET_OPEN = "0900"
+MARKET_CLOSE = "1530"
+
+# 장중 당일 거래일 여부 재확인 간격 (초)
+PROBE_INTERVAL = 600
+
+_calendar: Optional["TradingCalendar"] = None
+_calendar_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_refreshing = False
+_retry_after = 0.0
+
+
+def _calendar_path() -> str:
+    return os.path.join(get_cache_dir('krx'), 'trading_calendar.json')
+
+
+def _to_date(date_str: str) -> datetime:
+    return datetime.strptime(date_str, "%Y%m%d")
+
+
+def _to_str(date: datetime) -> str:
+    return date.strftime("%Y%m%d")
+
+
+class TradingCalendar:
+    """
+    KRX 거래일 캘린더
+
+    sessions: 오름차순 거래일 목록 (YYYYMMDD)
+    closed_days: 평일이지만 휴장으로 확인된 날 (당일 확인 결과)
+    """
+
+    def __init__(self, sessions: List[str], built_on: str, closed_days: List[str] = None,
+                 probed_at: float = 0.0):
+        self.sessions = sorted(set(sessions))
+        self.built_on = built_on
+        self.closed_days = set(closed_days or [])
+        self.probed_at = probed_at
+        self._index()
+
+    def _index(self) -> None:
+        """거래일 위치 및 날짜별 직전 거래일 위치 사전 생성"""
+        self._position: Dict[str, int] = {d: i for i, d in enumerate(self.sessions)}
+        self._floor: Dict[str, int] = {}
+
+        if not self.sessions:
+            return
+
+        # 첫 거래일부터 생성일까지 모든 달력일 → 해당일 이하 마지막 거래일 위치
+        day = _to_date(self.sessions[0])
+        last_day = max(_to_date(self.built_on), _to_date(self.sessions[-1]))
+        pos = 0
+        while day <= last_day:
+            key = _to_str(day)
+            if key in self._position:
+                pos = self._position[key]
+            self._floor[key] = pos
+            day += timedelta(days=1)
+
+    def to_dict(self) -> Dict:
+        return {
+            'built_on': self.built_on,
+            'sessions': self.sessions,
+            'closed_days': sorted(self.closed_days),
+            'probed_at': self.probed_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TradingCalendar":
+        return cls(
+            sessions=data.get('sessions', []),
+            built_on=data.get('built_on', ''),
+            closed_days=data.get('closed_days', []),
+            probed_at=data.get('probed_at', 0.0),
+        )
+
+    # ----------------------------------------
+    # 조회
+    # ----------------------------------------
+
+    def _floor_position(self, date: str) -> int:
+        """date 이하 마지막 거래일의 위치"""
+        pos = self._floor.get(date)
+        if pos is not None:
+            return pos
+        # 캘린더 범위 밖의 날짜
+        return max(bisect_right(self.sessions, date) - 1, 0)
+
+    def is_trading_day(self, date: str) -> bool:
+        """거래일 여부"""
+        return date in self._position
+
+    def latest_trading_day(self, date: str = None) -> str:
+        """
+        date(기본: 오늘) 이하의 가장 최근 거래일
+
+        Returns:
+            YYYYMMDD
+        """
+        if not self.sessions:
+            return _latest_weekday(date)
+        return self.sessions[self._floor_position(date or _to_str(datetime.now()))]
+
+    def previous_trading_day(self, n: int = 1, date: str = None) -> str:
+        """
+        최근 거래일로부터 n 거래일 전 날짜
+
+        Args:
+            n: 거슬러 올라갈 거래일 수 (0이면 최근 거래일)
+            date: 기준일 (기본: 오늘)
+        """
+        if not self.sessions:
+            return _latest_weekday(date, n)
+        pos = self._floor_position(date or _to_str(datetime.now()))
+        return self.sessions[max(pos - n, 0)]
+
+    def trading_days_between(self, start: str, end: str) -> int:
+        """start ~ end (양끝 포함) 구간의 거래일 수"""
+        if not self.sessions or start > end:
+            return 0
+        end_pos = self._floor_position(end)
+        if end < self.sessions[0]:
+            return 0
+        start_pos = self._floor_position(start)
+        if start not in self._position and start >= self.sessions[0]:
+            start_pos += 1
+        return max(end_pos - start_pos + 1, 0)
+
+    def sessions_between(self, start: str, end: str) -> List[str]:
+        """start ~ end (양끝 포함) 구간의 거래일 목록"""
+        count = self.trading_days_between(start, end)
+        if count <= 0:
+            return []
+        end_pos = self._floor_position(end)
+        return self.sessions[end_pos - count + 1:end_pos + 1]
+
+
+# ============================================
+# 생성 / 갱신
+# ============================================
+
+def _latest_weekday(date: str = None, n: int = 0) -> str:
+    """캘린더를 만들 수 없을 때의 대체값 (주말만 제외)"""
+    day = _to_date(date) if date else datetime.now()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    while n > 0:
+        day -= timedelta(days=1)
+        if day.weekday() < 5:
+            n -= 1
+    return _to_str(day)
+
+
+def _fetch_sessions(start: str, end: str) -> List[str]:
+    """기준 종목 일봉으로 거래일 목록 조회 (1회 요청)"""
+    df = stock.get_market_ohlcv(start, end, REFERENCE_TICKER)
+    if df is None or df.empty:
+        return []
+    return [idx.strftime("%Y%m%d") for idx in df.index]
+
+
+def build_trading_calendar(previous: Optional[TradingCalendar] = None) -> TradingCalendar:
+    """
+    거래일 캘린더 생성
+
+    이전 캘린더가 있으면 마지막 거래일 이후 구간만 조회하여 이어 붙인다.
+    """
+    today = _to_str(datetime.now())
+
+    if previous and previous.sessions:
+        sessions = list(previous.sessions)
+        start = sessions[-1]
+    else:
+        sessions = []
+        start = _to_str(datetime.now() - timedelta(days=365 * CALENDAR_HISTORY_YEARS))
+
+    fetched = _fetch_sessions(start, today)
+    if not sessions and not fetched:
+        # 최초 생성에서 빈 응답은 저장하지 않고 오류로 처리 (재시도 대기 후 다시 생성)
+        raise ValueError(f"{start} ~ {today} 거래일 조회 결과 없음")
+    sessions.extend(fetched)
+
+    calendar = TradingCalendar(sessions, built_on=today, probed_at=time.time())
+    save_json(_calendar_path(), calendar.to_dict())
+
+    print(f"[TradingCalendar] {len(calendar.sessions)}개 거래일 저장 ({calendar.sessions[0] if calendar.sessions else '-'} ~ {today})")
+    return calendar
+
+
+def _probe_due(calendar: TradingCalendar) -> bool:
+    """평일 장 시작 후 아직 확인되지 않은 당일이고, 마지막 확인 후 PROBE_INTERVAL 이 지났는지 여부"""
+    now = datetime.now()
+    today = _to_str(now)
+
+    if now.weekday() >= 5 or now.strftime("%H%M") < MARKET_OPEN:
+        return False
+    if calendar.is_trading_day(today) or today in calendar.closed_days:
+        return False
+    return time.time() - calendar.probed_at >= PROBE_INTERVAL
+
+
+def _probe_today(calendar: TradingCalendar) -> TradingCalendar:
+    """
+    장중/장마감 후 당일 거래일 여부 확인
+
+    평일이고 아직 확인되지 않은 당일에 대해서만, PROBE_INTERVAL 마다 한 번 조회한다.
+    """
+    if not _probe_due(calendar):
+        return calendar
+
+    today = _to_str(datetime.now())
+    hhmm = datetime.now().strftime("%H%M")
+    sessions = _fetch_sessions(today, today)
+    closed_days = set(calendar.closed_days)
+    if not sessions and hhmm >= MARKET_CLOSE:
+        # 장 마감 후에도 일봉이 없으면 휴장일
+        closed_days.add(today)
+
+    updated = TradingCalendar(calendar.sessions + sessions, calendar.built_on,
+                              sorted(closed_days), probed_at=time.time())
+    save_json(_calendar_path(), updated.to_dict())
+    return updated
+
+
+def _needs_refresh(calendar: TradingCalendar) -> bool:
+    """오늘 생성되지 않았거나 당일 확인 시점이 된 경우"""
+    return calendar.built_on != _to_str(datetime.now()) or _probe_due(calendar)
+
+
+def refresh_trading_calendar() -> TradingCalendar:
+    """
+    캘린더 갱신 및 당일 확인 (호출 스레드에서 KRX 조회, 동시에 한 번만 실행)
+
+    일별 작업/KRX 조회 풀에서 호출한다. 실패하면 PROBE_INTERVAL 동안 재시도하지 않는다.
+    """
+    global _calendar, _retry_after
+
+    with _refresh_lock:
+        with _calendar_lock:
+            calendar = _load_calendar()
+        if not _needs_refresh(calendar):
+            return calendar
+
+        try:
+            if calendar.built_on != _to_str(datetime.now()):
+                # 다른 워커 프로세스가 오늘 이미 만든 캘린더가 있으면 재사용
+                data = load_json(_calendar_path())
+                if data and data.get('built_on') == _to_str(datetime.now()):
+                    calendar = TradingCalendar.from_dict(data)
+                else:
+                    calendar = build_trading_calendar(calendar)
+
+            calendar = _probe_today(calendar)
+
+        except Exception as e:
+            print(f"[TradingCalendar] 갱신 오류: {e}")
+            _retry_after = time.time() + PROBE_INTERVAL
+            return calendar
+
+        with _calendar_lock:
+            _calendar = calendar
+        return calendar
+
+
+def _load_calendar() -> TradingCalendar:
+    """메모리 → 디스크 순으로 캘린더 로드 (_calendar_lock 안에서 호출, 네트워크 조회 없음)"""
+    global _calendar
+    if _calendar is None:
+        data = load_json(_calendar_path())
+        _calendar = TradingCalendar.from_dict(data) if data else TradingCalendar([], built_on='')
+    return _calendar
+
+
+def _refresh_in_background() -> None:
+    """KRX 조회 풀에 갱신 작업을 한 번만 등록 (완료를 기다리지 않음)"""
+    global _refreshing
+
+    with _calendar_lock:
+        if _refreshing:
+            return
+        _refreshing = True
+
+    def done(_):
+        global _refreshing
+        _refreshing = False
+
+    try:
+        get_krx_pool().submit(refresh_trading_calendar).add_done_callback(done)
+    except KrxBusyError:
+        _refreshing = False
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """
+    거래일 캘린더 조회 (저장된 캘린더로 바로 응답, 갱신은 KRX 조회 풀에서 하루 한 번)
+
+    Returns:
+        TradingCalendar 객체
+
+    Example:
+        >>> cal = get_trading_calendar()
+        >>> print(cal.latest_trading_day(), cal.previous_trading_day(5))
+    """
+    with _calendar_lock:
+        calendar = _load_calendar()
+
+    # 갱신 실패 직후에는 요청마다 KRX를 다시 호출하지 않도록 잠시 대기
+    if not _needs_refresh(calendar) or time.time() < _retry_after:
+        return calendar
+
+    if calendar.sessions:
+        _refresh_in_background()
+        return calendar
+
+    # 저장된 캘린더가 없을 때만 조회 풀 결과를 기다림 (시간 초과 시 주말만 제외한 대체값 사용)
+    try:
+        return krx_call(refresh_trading_calendar)
+    except (KrxTimeoutError, KrxBusyError) as e:
+        print(f"[TradingCalendar] 생성 대기 생략: {e}")
+        return calendar
+
+
+# ============================================
+# 편의 함수
+# ============================================
+
+def latest_trading_day(date: str = None) -> str:
+    """가장 최근 거래일 (YYYYMMDD)"""
+    return get_trading_calendar().latest_trading_day(date)
+
+
+def previous_trading_day(n: int = 1, date: str = None) -> str:
+    """최근 거래일로부터 n 거래일 전 (YYYYMMDD)"""
+    return get_trading_calendar().previous_trading_day(n, date)
+
+
+def trading_days_between(start: str, end: str) -> int:
+    """start ~ end 구간의 거래일 수"""
+    return get_trading_calendar().trading_days_between(start, end)
+
+
+if __name__ == "__main__":
+    cal = get_trading_calendar()
+    print(f"최근 거래일: {cal.latest_trading_day()}")
+    print(f"5거래일 전: {cal.previous_trading_day(5)}")
+    print(f"올해 거래일 수: {cal.trading_days_between(datetime.now().strftime('%Y0101'), cal.latest_trading_day())}")
@@ -0,0 +1,388 @@
+"""
+주간 밸류에이션 이력 및 PER/PBR 밴드
+
+시장 전체 스냅샷(market_snapshot)의 PER/PBR/EPS/BPS 를 주 단위로 누적한
+종목 × 주 컬럼형 테이블을 data/cache/krx/valuation/history.npz 에 보관하고,
+최근 5년 최저/최고/백분위 밴드와 현재 위치를 계산한다.
+
+- 일별 작업에서 당일 스냅샷을 반영 (같은 주의 열은 그 주 마지막 거래일 값으로 교체)
+- 과거 구간은 backfill_history 로 주별 시장 전체 기본 지표를 한 번 받아 채움
+- 보고서/차트 요청 시에는 저장된 테이블만 읽으므로 KRX 호출이 없다
+
+실행:
+    python -m app.services.krx.valuation_history [--backfill 년수]
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.utils.local_store import atomic_write_bytes, get_cache_dir
+
+
+# 이력 필드 (스냅샷 컬럼)
+FIELDS = ['per', 'pbr', 'eps', 'bps']
+
+# 밴드 계산 기간 (년) 및 최소 주 수
+BAND_YEARS = 5
+MIN_BAND_WEEKS = 26
+
+# 밴드 백분위
+BAND_PERCENTILES = [10, 25, 50, 75, 90]
+
+# 차트용 시계열 최대 점 개수
+SERIES_POINTS = 60
+
+_history: Optional["ValuationHistory"] = None
+_history_mtime: float = 0.0
+_lock = threading.Lock()
+
+
+def _history_path() -> str:
+    return os.path.join(get_cache_dir('krx', 'valuation'), 'history.npz')
+
+
+def week_key(date: str) -> str:
+    """YYYYMMDD → ISO 연-주 키 (예: '2025-W07')"""
+    year, week, _ = datetime.strptime(date, "%Y%m%d").isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class ValuationHistory:
+    """
+    종목 × 주 밸류에이션 테이블
+
+    dates: 열마다 그 주에 반영된 마지막 거래일 (오름차순)
+    values: 필드 → (종목 × 주) float32 배열 (결측 NaN)
+    """
+
+    def __init__(self, tickers: np.ndarray, dates: List[str], values: Dict[str, np.ndarray]):
+        self.tickers = tickers
+        self.dates = list(dates)
+        self.values = values
+        self._position: Dict[str, int] = {t: i for i, t in enumerate(tickers.tolist())}
+        self._weeks: Dict[str, int] = {week_key(d): i for i, d in enumerate(self.dates)}
+
+    @classmethod
+    def empty(cls) -> "ValuationHistory":
+        return cls(np.empty(0, dtype='U6'), [], {f: np.empty((0, 0), dtype=np.float32) for f in FIELDS})
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def row(self, ticker: str) -> Optional[Dict[str, np.ndarray]]:
+        pos = self._position.get(ticker)
+        if pos is None:
+            return None
+        return {name: values[pos] for name, values in self.values.items()}
+
+    def apply(self, date: str, tickers: np.ndarray, columns: Dict[str, np.ndarray]) -> bool:
+        """
+        하루치 시장 전체 값을 해당 주의 열에 반영
+
+        같은 주의 열이 있으면 더 늦은(또는 같은) 거래일 값일 때만 교체하고,
+        없으면 날짜 순서에 맞게 열을 끼워 넣는다. 처음 보는 종목은 행을 추가한다.
+
+        Returns:
+            테이블이 바뀌었는지 여부
+        """
+        key = week_key(date)
+        col = self._weeks.get(key)
+        if col is not None and self.dates[col] > date:
+            return False
+
+        # 신규 종목 행 추가
+        tickers = np.asarray(tickers, dtype='U6')
+        new = [t for t in dict.fromkeys(tickers.tolist()) if t not in self._position]
+        if new:
+            self.tickers = np.concatenate([self.tickers, np.array(new, dtype='U6')])
+            for name in FIELDS:
+                pad = np.full((len(new), len(self.dates)), np.nan, dtype=np.float32)
+                self.values[name] = np.vstack([self.values[name], pad])
+
+        # 새 주의 열 추가
+        if col is None:
+            col = int(np.searchsorted(np.array(self.dates, dtype='U8'), date))
+            self.dates.insert(col, date)
+            for name in FIELDS:
+                self.values[name] = np.insert(self.values[name], col, np.nan, axis=1)
+        else:
+            self.dates[col] = date
+
+        self._position = {t: i for i, t in enumerate(self.tickers.tolist())}
+        self._weeks = {week_key(d): i for i, d in enumerate(self.dates)}
+
+        rows = np.array([self._position[t] for t in tickers.tolist()], dtype=np.int64)
+        for name in FIELDS:
+            self.values[name][:, col] = np.nan
+            self.values[name][rows, col] = np.asarray(columns[name], dtype=np.float32)
+        return True
+
+    def save(self) -> None:
+        buffer = io.BytesIO()
+        np.savez(buffer, tickers=self.tickers, dates=np.array(self.dates, dtype='U8'), **self.values)
+        atomic_write_bytes(_history_path(), buffer.getvalue())
+
+    @classmethod
+    def load(cls) -> Optional["ValuationHistory"]:
+        path = _history_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data['tickers'], data['dates'].tolist(), {f: data[f] for f in FIELDS})
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ValuationHistory] 로드 오류: {e}")
+            return None
+
+
+# ============================================
+# 저장 / 로드
+# ============================================
+
+def get_valuation_history() -> ValuationHistory:
+    """저장된 밸류에이션 이력 (파일이 바뀐 경우에만 다시 읽음)"""
+    global _history, _history_mtime
+
+    with _lock:
+        path = _history_path()
+        mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+        if _history is None or mtime != _history_mtime:
+            _history = ValuationHistory.load() or ValuationHistory.empty()
+            _history_mtime = mtime
+        return _history
+
+
+def _apply_batches(batches: List[tuple]) -> int:
+    """(날짜, 종목 배열, 컬럼) 목록을 이력에 반영하고 한 번 저장 (바뀐 주 수 반환)"""
+    global _history, _history_mtime
+
+    with _lock:
+        history = ValuationHistory.load() or ValuationHistory.empty()
+        changed = sum(history.apply(date, tickers, columns) for date, tickers, columns in batches)
+        if changed:
+            history.save()
+            _history = history
+            _history_mtime = os.path.getmtime(_history_path())
+        return changed
+
+
+def update_history(date: str = None) -> int:
+    """
+    저장된 시장 스냅샷으로 이력 갱신 (일별 작업용, KRX 호출 없음)
+
+    Args:
+        date: 거래일 (기본: 디스크의 가장 최근 스냅샷)
+
+    Returns:
+        반영한 종목 수 (스냅샷이 없으면 0)
+    """
+    from app.services.krx.market_snapshot import MarketSnapshot, latest_snapshot_date
+
+    date = date or latest_snapshot_date()
+    snapshot = MarketSnapshot.load(date) if date else None
+    if snapshot is None:
+        return 0
+
+    _apply_batches([(date, snapshot.tickers, {f: snapshot.columns[f] for f in FIELDS})])
+    print(f"[ValuationHistory] {date} 이력 반영: {len(snapshot)}개 종목")
+    return len(snapshot)
+
+
+def _fetch_fundamentals(date: str):
+    """주별 백필용 시장 전체 기본 지표 (저장된 스냅샷 우선, 없으면 시장별 KRX 조회)"""
+    from pykrx import stock
+    from app.services.krx.market_snapshot import MARKETS, MarketSnapshot
+
+    snapshot = MarketSnapshot.load(date)
+    if snapshot is not None:
+        return snapshot.tickers, {f: snapshot.columns[f] for f in FIELDS}
+
+    tickers, columns = [], {f: [] for f in FIELDS}
+    for market in MARKETS:
+        df = stock.get_market_fundamental(date, market=market)
+        if df is None or df.empty:
+            continue
+        tickers.append(np.array(df.index.astype(str), dtype='U6'))
+        for name in FIELDS:
+            columns[name].append(df[name.upper()].astype(float).to_numpy())
+
+    if not tickers:
+        return None
+    return np.concatenate(tickers), {f: np.concatenate(v) for f, v in columns.items()}
+
+
+def backfill_history(years: int = BAND_YEARS, end: str = None) -> int:
+    """
+    과거 주별 이력 채우기 (이미 있는 주는 건너뜀, 주마다 시장별 1회 조회)
+
+    Args:
+        years: 채울 기간 (년)
+        end: 마지막 거래일 (기본: 최근 거래일)
+
+    Returns:
+        새로 채운 주 수
+    """
+    from app.services.krx.trading_calendar import get_trading_calendar, latest_trading_day
+
+    end = end or latest_trading_day()
+    start = (datetime.strptime(end, "%Y%m%d") - timedelta(days=365 * years)).strftime("%Y%m%d")
+    sessions = get_trading_calendar().sessions_between(start, end)
+
+    # 주별 마지막 거래일
+    last_sessions: Dict[str, str] = {}
+    for session in sessions:
+        last_sessions[week_key(session)] = session
+
+    existing = {week_key(d) for d in get_valuation_history().dates}
+    targets = [d for k, d in last_sessions.items() if k not in existing]
+
+    batches, filled = [], 0
+    for date in targets:
+        try:
+            fetched = _fetch_fundamentals(date)
+            if fetched is not None:
+                batches.append((date, *fetched))
+        except Exception as e:
+            print(f"[ValuationHistory] {date} 조회 오류: {e}")
+        # 일정 주 수마다 중간 저장 (중단되어도 진행분 유지)
+        if len(batches) >= 20:
+            filled += _apply_batches(batches)
+            batches = []
+            time.sleep(0.5)
+
+    filled += _apply_batches(batches)
+    print(f"[ValuationHistory] 백필 완료: {filled}주 ({start} ~ {end})")
+    return filled
+
+
+# ============================================
+# 밴드 계산
+# ============================================
+
+def valuation_band(values: np.ndarray) -> Dict[str, Any]:
+    """
+    주간 PER/PBR 시계열 → 밴드 통계 (0 이하(적자/자본잠식)와 결측 제외)
+
+    Returns:
+        {'current', 'min', 'p10', 'p25', 'median', 'p75', 'p90', 'max', 'percentile', 'weeks'}
+        (유효 주 수가 MIN_BAND_WEEKS 미만이면 빈 딕셔너리)
+    """
+    values = np.asarray(values, dtype=float)
+    valid = values[np.isfinite(values) & (values > 0)]
+    if len(valid) < MIN_BAND_WEEKS:
+        return {}
+
+    latest = float(values[-1]) if len(values) else np.nan
+    current = latest if np.isfinite(latest) and latest > 0 else None
+    stats = np.percentile(valid, BAND_PERCENTILES)
+
+    band = {'current': round(current, 2) if current is not None else None,
+            'min': round(float(valid.min()), 2)}
+    for pct, value in zip(BAND_PERCENTILES, stats):
+        band['median' if pct == 50 else f'p{pct}'] = round(float(value), 2)
+    band['max'] = round(float(valid.max()), 2)
+    band['percentile'] = round(float((valid < current).mean()) * 100, 1) if current is not None else None
+    band['weeks'] = int(len(valid))
+    return band
+
+
+def band_position(percentile: Optional[float]) -> str:
+    """밴드 내 백분위 → 위치 표시"""
+    if percentile is None:
+        return "N/A"
+    if percentile <= 20:
+        return "밴드 하단 (과거 대비 저평가)"
+    if percentile >= 80:
+        return "밴드 상단 (과거 대비 고평가)"
+    return "밴드 중간"
+
+
+def _series_indices(length: int, points: int) -> np.ndarray:
+    """차트용 열 인덱스 (마지막 주 포함, 균등 간격)"""
+    if length <= points:
+        return np.arange(length)
+    return np.unique(np.linspace(0, length - 1, points).round().astype(int))
+
+
+def get_valuation_band(ticker: str, years: int = BAND_YEARS, points: int = SERIES_POINTS) -> Dict[str, Any]:
+    """
+    종목의 과거 PER/PBR 밴드 (저장된 주간 이력만 사용)
+
+    Args:
+        ticker: 종목코드
+        years: 밴드 기간 (년)
+        points: 차트용 시계열 최대 점 개수
+
+    Returns:
+        {
+            'ticker', 'period', 'weeks',
+            'per': {'current', 'min', 'p10', 'p25', 'median', 'p75', 'p90', 'max', 'percentile', 'position'},
+            'pbr': {...},
+            'series': {'date': [...], 'per': [...], 'pbr': [...], 'eps': [...], 'bps': [...]}
+        }
+        (이력이 없거나 기간이 짧으면 빈 딕셔너리)
+
+    Example:
+        >>> band = get_valuation_band("055550")
+        >>> print(band['pbr']['median'], band['pbr']['percentile'], band['pbr']['position'])
+    """
+    try:
+        history = get_valuation_history()
+        row = history.row(ticker)
+        if row is None or not history.dates:
+            return {}
+
+        start = (datetime.strptime(history.dates[-1], "%Y%m%d")
+                 - timedelta(days=365 * years)).strftime("%Y%m%d")
+        first = int(np.searchsorted(np.array(history.dates, dtype='U8'), start))
+        dates = history.dates[first:]
+        window = {name: values[first:] for name, values in row.items()}
+
+        result: Dict[str, Any] = {}
+        for metric in ('per', 'pbr'):
+            band = valuation_band(window[metric])
+            if band:
+                result[metric] = dict(band, position=band_position(band['percentile']))
+        if not result:
+            return {}
+
+        listed = np.flatnonzero(np.isfinite(window['per']) | np.isfinite(window['pbr']))
+        first_listed = int(listed[0]) if len(listed) else 0
+        indices = _series_indices(len(dates) - first_listed, points) + first_listed
+
+        def _column(values: np.ndarray) -> List[Optional[float]]:
+            return [round(float(v), 2) if np.isfinite(v) else None for v in values[indices]]
+
+        result.update({
+            'ticker': ticker,
+            'period': f"{dates[first_listed]}~{dates[-1]}",
+            'weeks': len(dates) - first_listed,
+            'series': dict({'date': [dates[i] for i in indices]},
+                           **{name: _column(window[name]) for name in FIELDS}),
+        })
+        return result
+
+    except Exception as e:
+        print(f"[ValuationHistory] {ticker} 밴드 계산 오류: {e}")
+        return {}
+
+
+if __name__ == "__main__":
+    if '--backfill' in sys.argv:
+        position = sys.argv.index('--backfill')
+        years = int(sys.argv[position + 1]) if len(sys.argv) > position + 1 else BAND_YEARS
+        backfill_history(years)
+    else:
+        update_history()
+
+    band = get_valuation_band("055550")
+    print(f"기간: {band.get('period')} ({band.get('weeks')}주)")
+    for metric in ('per', 'pbr'):
+        print(metric, band.get(metric))
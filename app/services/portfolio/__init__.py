@@ -0,0 +1,28 @@
+# 포트폴리오 리스크/배분 Services
+from app.services.portfolio.risk_engine import (
+    analyze_risk,
+    analyze_returns,
+    load_returns,
+    ReturnMatrix,
+    PROFILES,
+)
+from app.services.portfolio.portfolio_service import build_portfolio_analysis
+from app.services.portfolio.simulator import (
+    simulate_portfolios,
+    simulate_matrix,
+    REBALANCE_FREQUENCIES,
+    SIMULATION_YEARS,
+)
+
+__all__ = [
+    'analyze_risk',
+    'analyze_returns',
+    'load_returns',
+    'ReturnMatrix',
+    'PROFILES',
+    'build_portfolio_analysis',
+    'simulate_portfolios',
+    'simulate_matrix',
+    'REBALANCE_FREQUENCIES',
+    'SIMULATION_YEARS',
+]
@@ -0,0 +1,203 @@
+"""
+포트폴리오 분석 서비스
+
+배분 비중, 리스크 점수, 기대수익률 범위는 risk_engine 이 가격 데이터로 계산하고
+GPT 는 계산된 수치를 바탕으로 조언 문장만 작성한다.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from app.services.portfolio.risk_engine import PROFILES, analyze_risk, risk_level, risk_score
+
+
+# 기대수익률 범위 (정규분포 가정 50% 구간: 평균 ± 0.674σ)
+RETURN_RANGE_Z = 0.674
+
+# 균등 비중 대비 이 배수 이상이면 비중 확대, 이하이면 비중 축소
+OVERWEIGHT_RATIO = 1.2
+UNDERWEIGHT_RATIO = 0.8
+
+# 투자 성향별 설명 (조언 프롬프트용)
+RISK_PROFILES = {
+    'conservative': {'risk_tolerance': '낮음', 'stock_ratio': '20-40%', 'focus': '안정적 배당주, 대형주'},
+    'moderately_conservative': {'risk_tolerance': '낮음-중간', 'stock_ratio': '30-50%', 'focus': '우량 배당주, 성장주 일부'},
+    'moderate': {'risk_tolerance': '중간', 'stock_ratio': '40-60%', 'focus': '성장주와 가치주 균형'},
+    'moderately_aggressive': {'risk_tolerance': '중간-높음', 'stock_ratio': '60-80%', 'focus': '성장주 중심, 테마주'},
+    'aggressive': {'risk_tolerance': '높음', 'stock_ratio': '70-90%', 'focus': '고성장주, 소형주, 테마주'}
+}
+
+
+def _opinion(percentage: float, count: int):
+    """균등 비중 대비 배분 비중 → (의견, CSS 클래스)"""
+    equal = 100 / count
+    if percentage >= equal * OVERWEIGHT_RATIO:
+        return "비중 확대", "buy"
+    if percentage <= equal * UNDERWEIGHT_RATIO:
+        return "비중 축소", "sell"
+    return "보유", "hold"
+
+
+def _build_allocations(companies: List[Dict], risk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """추천 배분 → 화면용 배분 목록 (분석에서 제외된 종목은 0%)"""
+    recommended = risk['allocations']['recommended']
+    assets = {asset['ticker']: asset for asset in risk['assets']}
+    count = len(assets)
+
+    allocations = []
+    for company in companies:
+        code = company.get('code')
+        asset = assets.get(code)
+        if asset is None:
+            allocations.append({
+                "code": code,
+                "name": company.get('name', code),
+                "percentage": 0,
+                "opinion": "제외",
+                "opinion_class": "hold",
+                "reason": "가격 이력이 부족하여 배분에서 제외했습니다."
+            })
+            continue
+
+        percentage = recommended['weights'][code]
+        opinion, opinion_class = _opinion(percentage, count)
+        allocations.append({
+            "code": code,
+            "name": company.get('name', code),
+            "percentage": percentage,
+            "opinion": opinion,
+            "opinion_class": opinion_class,
+            "reason": (f"연 변동성 {asset['volatility']}%, 최대낙폭 {asset['max_drawdown']}%, "
+                       f"포트폴리오 위험 기여 {recommended['risk_contributions'][code]}%")
+        })
+
+    return sorted(allocations, key=lambda a: a['percentage'], reverse=True)
+
+
+def _default_advice(risk: Dict[str, Any], metrics: Dict[str, Any]) -> str:
+    """GPT 응답이 없을 때 사용하는 수치 요약"""
+    profile = risk['profile']
+    return (
+        f"{profile['label']} 성향에 맞춰 평균-분산 {profile['mean_variance_share'] * 100:.0f}%, "
+        f"리스크 패리티 {(1 - profile['mean_variance_share']) * 100:.0f}% 비율로 배분했습니다.\n"
+        f"최근 {risk['observations']}거래일 기준 예상 연 변동성은 {metrics['volatility']}%, "
+        f"이 비중으로 보유했을 때의 최대낙폭은 {metrics['max_drawdown']}%입니다.\n"
+        f"과거 수익률은 미래 수익을 보장하지 않으므로 정기적으로 비중을 점검하세요."
+    )
+
+
+def _request_advice(companies: List[Dict], risk: Dict[str, Any], allocations: List[Dict],
+                    investment_type: str, investment_score: int, total_amount: int) -> Dict[str, Any]:
+    """계산된 수치를 근거로 GPT 에 조언 문장 요청 ({'advice', 'reasons'})"""
+    from app.services.openai.analysis_service import chat_completion_json
+
+    profile = RISK_PROFILES.get(investment_type, RISK_PROFILES['moderate'])
+    metrics = risk['allocations']['recommended']['metrics']
+    names = {c.get('code'): c.get('name', c.get('code')) for c in companies}
+
+    allocation_lines = "\n".join(
+        f"- {a['name']} ({a['code']}): {a['percentage']}% / {a['opinion']} / {a['reason']}" for a in allocations
+    )
+    asset_lines = "\n".join(
+        f"- {names.get(a['ticker'], a['ticker'])}: 연 기대수익률 {a['expected_return']}%, 연 변동성 {a['volatility']}%, "
+        f"최대낙폭 {a['max_drawdown']}%, 평균 상관계수 {a['avg_correlation']}"
+        for a in risk['assets']
+    )
+
+    system_prompt = f"""당신은 KORA AI의 포트폴리오 전문가입니다.
+아래 배분과 리스크 수치는 최근 가격 데이터로 이미 계산된 값입니다. 수치를 바꾸지 말고 해석과 조언만 작성하세요.
+
+## 사용자 투자 성향
+- 유형: {investment_type}
+- 점수: {investment_score}/50
+- 리스크 성향: {profile['risk_tolerance']}
+- 권장 주식 비중: {profile['stock_ratio']}
+- 투자 초점: {profile['focus']}
+
+## 총 투자 금액
+{total_amount:,}원
+
+## 계산된 배분 ({risk['period']}, {risk['observations']}거래일)
+{allocation_lines}
+
+## 종목별 리스크
+{asset_lines}
+
+## 포트폴리오 지표
+- 연 기대수익률: {metrics['expected_return']}%
+- 연 변동성: {metrics['volatility']}%
+- 샤프비율: {metrics['sharpe']}
+- 최대낙폭: {metrics['max_drawdown']}%
+
+반드시 아래 JSON 형식으로만 응답하세요:
+{{
+    "advice": "투자 성향을 고려한 종합 조언 (3-5문장, 위 수치를 근거로 구체적인 조언과 주의사항 포함)",
+    "reasons": {{"종목코드": "배분 이유 (1문장, 위 수치 근거)"}}
+}}"""
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": "계산된 포트폴리오에 대한 조언을 작성해주세요."}
+    ]
+    return chat_completion_json(messages, temperature=0.5, max_tokens=1200) or {}
+
+
+def build_portfolio_analysis(companies: List[Dict], total_amount: int = 10000000,
+                             investment_type: str = 'moderate', investment_score: int = 30,
+                             with_advice: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    포트폴리오 분석 (배분/리스크는 계산, 조언은 GPT)
+
+    Args:
+        companies: [{'code', 'name', 'market'}] 선택 기업 목록
+        total_amount: 총 투자 금액 (원)
+        investment_type: 투자 성향 (conservative ~ aggressive)
+        investment_score: 투자 성향 점수
+        with_advice: GPT 조언 생성 여부 (False 이면 수치 요약 사용)
+
+    Returns:
+        {
+            'allocations': [{'code', 'name', 'percentage', 'opinion', 'opinion_class', 'reason'}],
+            'risk_score', 'risk_level', 'expected_return_min', 'expected_return_max', 'advice',
+            'risk': risk_engine 분석 결과 (배분 방식별 비중/지표, 상관계수 등)
+        }
+        (분석 가능한 종목이 2개 미만이면 None)
+
+    Example:
+        >>> analysis = build_portfolio_analysis([{'code': '005930', 'name': '삼성전자'},
+        ...                                      {'code': '055550', 'name': '신한지주'}])
+        >>> print(analysis['allocations'], analysis['risk_score'])
+    """
+    investment_type = investment_type if investment_type in PROFILES else 'moderate'
+    tickers = [c.get('code') for c in companies if c.get('code')]
+
+    risk = analyze_risk(tickers, investment_type)
+    if risk is None:
+        return None
+
+    metrics = risk['allocations']['recommended']['metrics']
+    allocations = _build_allocations(companies, risk)
+    score = risk_score(metrics['volatility'])
+    spread = RETURN_RANGE_Z * metrics['volatility']
+
+    advice = {}
+    if with_advice:
+        try:
+            advice = _request_advice(companies, risk, allocations, investment_type,
+                                     investment_score, total_amount)
+        except Exception as e:
+            print(f"[Portfolio] 조언 생성 오류: {e}")
+
+    for allocation in allocations:
+        reason = advice.get('reasons', {}).get(allocation['code']) if isinstance(advice.get('reasons'), dict) else None
+        if reason and allocation['percentage'] > 0:
+            allocation['reason'] = reason
+
+    return {
+        "allocations": allocations,
+        "risk_score": score,
+        "risk_level": risk_level(score),
+        "expected_return_min": round(metrics['expected_return'] - spread, 1),
+        "expected_return_max": round(metrics['expected_return'] + spread, 1),
+        "advice": advice.get('advice') or _default_advice(risk, metrics),
+        "risk": risk,
+    }
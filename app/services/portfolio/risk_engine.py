@@ -0,0 +1,405 @@
+"""
+포트폴리오 리스크/배분 엔진
+
+일봉 저장소에서 선택 종목의 일별 수익률을 날짜 기준으로 맞춘 뒤
+공분산, 변동성, 상관계수, 최대낙폭(MDD)을 계산하고
+평균-분산, 리스크 패리티, 시가총액 비중 제한(종목당 최대 40%) 배분을 행렬 연산으로 구한다.
+
+- 수익률/변동성은 연율화 (거래일 252일)
+- 기대수익률은 표본 평균을 종목 평균 쪽으로 축소하여 추정 오차를 줄임
+- 모든 배분은 0 이상, 합계 1, 종목당 MAX_WEIGHT 이하 (종목 수가 적으면 1/N 까지 완화)
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+TRADING_DAYS = 252
+
+# 리스크 계산 기간 (거래일)
+RISK_SESSIONS = 250
+
+# 저장소에 없는 일봉 조회 제한 시간 (초, KRX 조회 풀에서 종목 동시 조회)
+PRICE_SYNC_TIMEOUT = 20
+
+# 종목별 최소 수익률 관측 수 (미만이면 제외)
+MIN_OBSERVATIONS = 60
+
+# 종목당 최대 비중
+MAX_WEIGHT = 0.4
+
+# 기대수익률 축소 비율 (0: 표본 평균 그대로, 1: 전 종목 동일)
+RETURN_SHRINKAGE = 0.5
+
+# 투자 성향별 설정
+#   risk_aversion: 평균-분산 위험회피계수 (클수록 분산 축소 우선)
+#   mean_variance_share: 추천 배분에서 평균-분산 비중 (나머지는 리스크 패리티)
+PROFILES = {
+    'conservative': {'label': '안정형', 'risk_aversion': 12.0, 'mean_variance_share': 0.0},
+    'moderately_conservative': {'label': '안정추구형', 'risk_aversion': 8.0, 'mean_variance_share': 0.25},
+    'moderate': {'label': '위험중립형', 'risk_aversion': 5.0, 'mean_variance_share': 0.5},
+    'moderately_aggressive': {'label': '적극투자형', 'risk_aversion': 3.0, 'mean_variance_share': 0.75},
+    'aggressive': {'label': '공격투자형', 'risk_aversion': 1.5, 'mean_variance_share': 1.0},
+}
+
+
+@dataclass
+class ReturnMatrix:
+    """날짜가 맞춰진 일별 수익률 (종목 × 거래일)"""
+    tickers: List[str]
+    dates: List[str]
+    returns: np.ndarray
+    close: np.ndarray
+    excluded: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+# ============================================
+# 데이터 준비
+# ============================================
+
+def align_returns(tickers: List[str], dates: List[str], close: np.ndarray,
+                  min_observations: int = MIN_OBSERVATIONS) -> ReturnMatrix:
+    """
+    종가 행렬(결측 NaN) → 모든 종목에 값이 있는 날짜만 남긴 수익률 행렬
+
+    관측치가 min_observations 미만인 종목(신규 상장 등)은 먼저 제외한다.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[:, 1:] / close[:, :-1] - 1
+    finite = np.isfinite(returns)
+
+    keep = finite.sum(axis=1) >= min_observations
+    excluded = [t for t, k in zip(tickers, keep) if not k]
+    returns, finite, close = returns[keep], finite[keep], close[keep]
+
+    days = finite.all(axis=0) if len(returns) else np.zeros(returns.shape[1], dtype=bool)
+    return ReturnMatrix(
+        tickers=[t for t, k in zip(tickers, keep) if k],
+        dates=[d for d, k in zip(dates[1:], days) if k],
+        returns=returns[:, days],
+        close=close[:, 1:][:, days],
+        excluded=excluded,
+    )
+
+
+def load_returns(tickers: List[str], end: str = None, sessions: int = RISK_SESSIONS) -> ReturnMatrix:
+    """
+    일봉 저장소에서 수익률 행렬 생성 (저장소에 없는 구간만 KRX 조회 풀에서 조회)
+
+    제한 시간 안에 받지 못한 종목은 저장된 일봉만으로 계산한다 (관측치가 부족하면 제외).
+
+    Args:
+        tickers: 종목코드 목록
+        end: 마지막 거래일 (기본: 최근 거래일)
+        sessions: 거래일 수
+    """
+    from app.services.krx import price_store
+    from app.services.krx.indicator_engine import build_price_panel
+    from app.services.krx.krx_pool import KrxBusyError, get_krx_pool
+    from app.services.krx.trading_calendar import latest_trading_day, previous_trading_day
+
+    end = end or latest_trading_day()
+    start = previous_trading_day(sessions, end)
+
+    pool = get_krx_pool()
+    deadline = time.time() + PRICE_SYNC_TIMEOUT
+    futures = {}
+    for ticker in tickers:
+        if price_store.is_synced(ticker, start, end):
+            continue
+        try:
+            futures[ticker] = pool.submit(price_store.sync_ticker, ticker, start, end, deadline=deadline)
+        except KrxBusyError as e:
+            print(f"[RiskEngine] 일봉 동기화 생략: {e}")
+            break
+
+    for ticker, future in futures.items():
+        try:
+            future.result(timeout=max(deadline - time.time(), 0))
+        except Exception as e:
+            future.cancel()
+            print(f"[RiskEngine] {ticker} 일봉 동기화 오류: {type(e).__name__} {e}")
+
+    panel = build_price_panel(end, tickers, sessions + 1)
+    return align_returns(list(tickers), panel.dates, panel.close)
+
+
+# ============================================
+# 리스크 지표
+# ============================================
+
+def max_drawdown(prices: np.ndarray) -> np.ndarray:
+    """행별 최대낙폭 (음수 비율, 예: -0.32)"""
+    prices = np.atleast_2d(prices)
+    peaks = np.maximum.accumulate(prices, axis=1)
+    return (prices / peaks - 1).min(axis=1)
+
+
+def covariance(returns: np.ndarray) -> np.ndarray:
+    """연율화 공분산 행렬"""
+    return np.atleast_2d(np.cov(returns)) * TRADING_DAYS
+
+
+def correlation(cov: np.ndarray) -> np.ndarray:
+    vol = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(vol, vol)
+    return np.nan_to_num(corr)
+
+
+def expected_returns(returns: np.ndarray, shrinkage: float = RETURN_SHRINKAGE) -> np.ndarray:
+    """연율화 기대수익률 (표본 평균을 종목 평균 쪽으로 축소)"""
+    mean = returns.mean(axis=1) * TRADING_DAYS
+    return (1 - shrinkage) * mean + shrinkage * mean.mean()
+
+
+def risk_contributions(weights: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """종목별 위험 기여 비율 (합계 1)"""
+    marginal = cov @ weights
+    total = weights @ marginal
+    return weights * marginal / total if total > 0 else np.full(len(weights), 1 / len(weights))
+
+
+# ============================================
+# 배분
+# ============================================
+
+def effective_cap(count: int, cap: float = MAX_WEIGHT) -> float:
+    """종목 수가 적어 cap 으로 합계 1을 만들 수 없으면 1/N 으로 완화"""
+    return max(cap, 1.0 / count)
+
+
+def project_capped_simplex(values: np.ndarray, cap: float) -> np.ndarray:
+    """
+    {0 ≤ w ≤ cap, Σw = 1} 로의 유클리드 사영
+
+    w = clip(v - τ, 0, cap) 의 합이 1 이 되는 τ 를 이분 탐색으로 찾는다.
+    """
+    low, high = values.min() - 1.0, values.max()
+    for _ in range(100):
+        tau = (low + high) / 2
+        if np.clip(values - tau, 0, cap).sum() > 1:
+            low = tau
+        else:
+            high = tau
+    weights = np.clip(values - (low + high) / 2, 0, cap)
+    return weights / weights.sum()
+
+
+def mean_variance_weights(mu: np.ndarray, cov: np.ndarray, risk_aversion: float,
+                          cap: float = MAX_WEIGHT, iterations: int = 500) -> np.ndarray:
+    """
+    평균-분산 최적 배분: max  w·μ - (λ/2) w·Σw   (0 ≤ w ≤ cap, Σw = 1)
+
+    사영 경사 상승법 (보폭은 목적함수 곡률의 역수)
+    """
+    count = len(mu)
+    cap = effective_cap(count, cap)
+    step = 1.0 / (risk_aversion * max(np.linalg.eigvalsh(cov).max(), 1e-8))
+
+    weights = np.full(count, 1.0 / count)
+    for _ in range(iterations):
+        gradient = mu - risk_aversion * cov @ weights
+        updated = project_capped_simplex(weights + step * gradient, cap)
+        if np.abs(updated - weights).max() < 1e-7:
+            return updated
+        weights = updated
+    return weights
+
+
+def risk_parity_weights(cov: np.ndarray, cap: float = MAX_WEIGHT, iterations: int = 200) -> np.ndarray:
+    """
+    리스크 패리티 배분 (종목별 위험 기여가 같도록)
+
+    볼록 문제 min ½·yᵀΣy - (1/N)·Σ log y_i 의 해 y 를 좌표 하강법으로 구해 정규화한다.
+    (각 좌표의 최적값은 2차 방정식의 양의 근, 음의 상관이 있어도 수렴)
+    """
+    count = len(cov)
+    budget = 1.0 / count
+    variances = np.diag(cov)
+    y = 1.0 / np.sqrt(variances)
+
+    for _ in range(iterations):
+        previous = y.copy()
+        for i in range(count):
+            others = cov[i] @ y - variances[i] * y[i]
+            y[i] = (-others + np.sqrt(others ** 2 + 4 * variances[i] * budget)) / (2 * variances[i])
+        if np.abs(y - previous).max() < 1e-10 * y.max():
+            break
+
+    return capped_weights(y / y.sum(), cap)
+
+
+def capped_weights(weights: np.ndarray, cap: float = MAX_WEIGHT) -> np.ndarray:
+    """비중 제한 적용 (초과분을 나머지 종목에 비례 재분배, 지수 비중 상한 방식)"""
+    count = len(weights)
+    cap = effective_cap(count, cap)
+    weights = weights / weights.sum()
+    for _ in range(count):
+        over = weights > cap + 1e-12
+        if not over.any():
+            break
+        excess = (weights[over] - cap).sum()
+        weights[over] = cap
+        free = ~over & (weights < cap)
+        weights[free] += excess * weights[free] / weights[free].sum()
+    return weights
+
+
+# ============================================
+# 포트폴리오 분석
+# ============================================
+
+def _round_percentages(weights: np.ndarray) -> List[float]:
+    """비중(합 1) → 소수 첫째 자리 백분율 (최대 잔여법으로 합계 정확히 100)"""
+    units = weights * 1000
+    scaled = np.floor(units).astype(int)
+    remainder = 1000 - scaled.sum()
+    scaled[np.argsort(scaled - units)[:remainder]] += 1
+    return (scaled / 10).tolist()
+
+
+def portfolio_metrics(weights: np.ndarray, matrix: ReturnMatrix, mu: np.ndarray,
+                      cov: np.ndarray) -> Dict[str, float]:
+    """배분 하나의 연율 기대수익률/변동성/샤프비율/MDD (%)"""
+    expected = float(weights @ mu)
+    volatility = float(np.sqrt(weights @ cov @ weights))
+    value = np.cumprod(1 + weights @ matrix.returns)
+    return {
+        'expected_return': round(expected * 100, 2),
+        'volatility': round(volatility * 100, 2),
+        'sharpe': round(expected / volatility, 2) if volatility > 0 else None,
+        'max_drawdown': round(float(max_drawdown(np.concatenate([[1.0], value]))[0]) * 100, 2),
+    }
+
+
+def risk_score(volatility: float) -> int:
+    """연 변동성(%) → 리스크 점수 0~100 (10% 이하 0, 50% 이상 100)"""
+    return int(np.clip((volatility - 10) / 40 * 100, 0, 100))
+
+
+def risk_level(score: int) -> str:
+    if score < 35:
+        return "낮음"
+    if score < 65:
+        return "중간"
+    return "높음"
+
+
+def analyze_returns(matrix: ReturnMatrix, investment_type: str = 'moderate',
+                    market_caps: np.ndarray = None, cap: float = MAX_WEIGHT) -> Dict[str, Any]:
+    """
+    수익률 행렬 → 리스크 지표와 배분안
+
+    Args:
+        matrix: 수익률 행렬
+        investment_type: 투자 성향 (PROFILES 키)
+        market_caps: 종목별 시가총액 (비중 제한 시가총액 배분용, 없으면 동일 비중)
+        cap: 종목당 최대 비중
+
+    Returns:
+        {
+            'tickers', 'period', 'observations', 'excluded', 'profile',
+            'assets': [{'ticker', 'expected_return', 'volatility', 'max_drawdown', 'avg_correlation'}],
+            'correlation': 상관계수 행렬,
+            'allocations': {'mean_variance', 'risk_parity', 'capped', 'recommended': {'weights', 'metrics'}}
+        }
+    """
+    profile = PROFILES.get(investment_type, PROFILES['moderate'])
+    returns = matrix.returns
+    count = len(matrix)
+
+    cov = covariance(returns)
+    corr = correlation(cov)
+    mu = expected_returns(returns)
+    volatility = np.sqrt(np.diag(cov))
+    drawdowns = max_drawdown(matrix.close)
+    avg_corr = (corr.sum(axis=1) - 1) / max(count - 1, 1)
+
+    mean_variance = mean_variance_weights(mu, cov, profile['risk_aversion'], cap)
+    risk_parity = risk_parity_weights(cov, cap)
+    if market_caps is None or not np.all(np.asarray(market_caps) > 0):
+        market_caps = np.ones(count)
+    capped = capped_weights(np.asarray(market_caps, dtype=float), cap)
+    share = profile['mean_variance_share']
+    # 두 배분 모두 제약을 만족하므로 볼록 결합도 만족
+    recommended = share * mean_variance + (1 - share) * risk_parity
+
+    allocations = {}
+    for name, weights in [('mean_variance', mean_variance), ('risk_parity', risk_parity),
+                          ('capped', capped), ('recommended', recommended)]:
+        allocations[name] = {
+            'weights': dict(zip(matrix.tickers, _round_percentages(weights))),
+            'risk_contributions': dict(zip(matrix.tickers, (np.round(
+                risk_contributions(weights, cov) * 100, 1) + 0.0).tolist())),
+            'metrics': portfolio_metrics(weights, matrix, mu, cov),
+        }
+
+    return {
+        'tickers': matrix.tickers,
+        'period': f"{matrix.dates[0]}~{matrix.dates[-1]}" if matrix.dates else None,
+        'observations': len(matrix.dates),
+        'excluded': matrix.excluded,
+        'profile': dict(profile, type=investment_type if investment_type in PROFILES else 'moderate'),
+        'assets': [
+            {
+                'ticker': ticker,
+                'expected_return': round(float(mu[i]) * 100, 2),
+                'volatility': round(float(volatility[i]) * 100, 2),
+                'max_drawdown': round(float(drawdowns[i]) * 100, 2),
+                'avg_correlation': round(float(avg_corr[i]), 2),
+            }
+            for i, ticker in enumerate(matrix.tickers)
+        ],
+        'correlation': np.round(corr, 2).tolist(),
+        'allocations': allocations,
+    }
+
+
+def analyze_risk(tickers: List[str], investment_type: str = 'moderate',
+                 end: str = None, sessions: int = RISK_SESSIONS) -> Optional[Dict[str, Any]]:
+    """
+    선택 종목의 리스크 분석 및 배분
+
+    Args:
+        tickers: 종목코드 목록 (2개 이상)
+        investment_type: 투자 성향 (PROFILES 키)
+        end: 마지막 거래일 (기본: 최근 거래일)
+        sessions: 리스크 계산 기간 (거래일)
+
+    Returns:
+        analyze_returns 결과 (분석 가능한 종목이 2개 미만이면 None)
+
+    Example:
+        >>> risk = analyze_risk(["005930", "000660", "055550"], "moderate")
+        >>> print(risk['allocations']['recommended']['weights'])
+    """
+    from app.services.krx.market_snapshot import get_market_snapshot, latest_snapshot_date
+
+    matrix = load_returns(tickers, end, sessions)
+    if len(matrix) < 2 or len(matrix.dates) < MIN_OBSERVATIONS:
+        print(f"[RiskEngine] 분석 가능 종목/기간 부족: {len(matrix)}개 종목, {len(matrix.dates)}일")
+        return None
+
+    # 시가총액은 저장된 최근 스냅샷에서 읽음 (요청 중 스냅샷 생성 없음)
+    date = latest_snapshot_date()
+    snapshot = get_market_snapshot(date, build=False) if date else None
+    rows = [(snapshot.get(ticker) if snapshot else None) or {} for ticker in matrix.tickers]
+    market_caps = np.array([row.get('market_cap') or 0 for row in rows], dtype=float)
+    return analyze_returns(matrix, investment_type, market_caps)
+
+
+if __name__ == "__main__":
+    risk = analyze_risk(["005930", "000660", "055550", "035420"], "moderate")
+    if risk:
+        print(f"기간: {risk['period']} ({risk['observations']}일)")
+        for asset in risk['assets']:
+            print(asset)
+        for name, allocation in risk['allocations'].items():
+            print(name, allocation['weights'], allocation['metrics'])
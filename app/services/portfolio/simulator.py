@@ -0,0 +1,285 @@
+"""
+포트폴리오 과거 성과 시뮬레이터
+
+저장된(또는 후보) 배분을 일봉 저장소의 과거 1/3/5년 가격에 적용하고
+정기 리밸런싱을 반영한 자산 곡선, CAGR, 변동성, 최대낙폭을 계산한다.
+
+- 가격은 risk_engine.load_returns 로 모든 종목에 값이 있는 거래일만 맞춘 종가 (종목 × 거래일)
+- 여러 후보 배분(후보 × 종목 비중 행렬)을 한 번에 계산: 리밸런싱 구간마다
+  보유 수량 행렬 × 구간 가격 행렬의 곱 한 번으로 모든 후보의 자산 곡선을 구한다
+- 리밸런싱 시점은 월/분기/연이 바뀐 첫 거래일 종가 (거래 비용은 반영하지 않음)
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.portfolio.risk_engine import (
+    TRADING_DAYS,
+    ReturnMatrix,
+    _round_percentages,
+    load_returns,
+    max_drawdown,
+)
+
+
+# 시뮬레이션 기간 (년)
+SIMULATION_YEARS = [1, 3, 5]
+
+# 리밸런싱 주기: 이름 → (표시명, 기간 키 함수)
+REBALANCE_FREQUENCIES = {
+    'none': ('리밸런싱 없음', None),
+    'monthly': ('매월', lambda date: date[:6]),
+    'quarterly': ('분기', lambda date: f"{date[:4]}Q{(int(date[4:6]) - 1) // 3}"),
+    'yearly': ('매년', lambda date: date[:4]),
+}
+
+# 한 번에 비교할 수 있는 최대 후보 수
+MAX_CANDIDATES = 20
+
+# 후보 전체에 걸친 최대 종목 수 (저장소에 없는 일봉은 요청 중 조회하므로 제한)
+MAX_TICKERS = 30
+
+# 응답에 포함하는 자산 곡선 점 개수
+CURVE_POINTS = 250
+
+
+# ============================================
+# 벡터 연산
+# ============================================
+
+def rebalance_points(dates: List[str], frequency: str = 'quarterly') -> np.ndarray:
+    """
+    리밸런싱 시점 인덱스 (첫 거래일 포함)
+
+    Args:
+        dates: 거래일 목록 (YYYYMMDD)
+        frequency: REBALANCE_FREQUENCIES 키
+
+    Example:
+        >>> rebalance_points(['20240130', '20240131', '20240201'], 'monthly')
+        array([0, 2])
+    """
+    _, key = REBALANCE_FREQUENCIES[frequency]
+    if key is None or not dates:
+        return np.zeros(1, dtype=int)
+    keys = np.array([key(date) for date in dates])
+    return np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1])
+
+
+def normalize_weights(weights: np.ndarray) -> np.ndarray:
+    """후보별 비중 행(음수는 0) → 합계 1 (합이 0 인 행은 0 유지)"""
+    weights = np.clip(np.atleast_2d(np.asarray(weights, dtype=float)), 0, None)
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def simulate_paths(prices: np.ndarray, weights: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    후보 배분들의 자산 곡선 (시작 1.0)
+
+    각 리밸런싱 시점에 그때의 평가액을 목표 비중대로 다시 나눠 보유 수량을 정하고,
+    다음 리밸런싱 전까지 수량을 고정한 채 평가한다.
+
+    Args:
+        prices: 종가 행렬 (종목 × 거래일, 결측 없음)
+        weights: 비중 행렬 (후보 × 종목, 행 합계 1)
+        points: 리밸런싱 시점 인덱스 (0 포함, 오름차순)
+
+    Returns:
+        자산 곡선 (후보 × 거래일)
+    """
+    count, length = weights.shape[0], prices.shape[1]
+    equity = np.empty((count, length))
+    value = np.ones(count)
+
+    bounds = np.append(points, length)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        units = value[:, None] * weights / prices[:, start]
+        equity[:, start:stop] = units @ prices[:, start:stop]
+        if stop < length:
+            value = units @ prices[:, stop]
+    return equity
+
+
+def equity_metrics(equity: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    자산 곡선(후보 × 거래일) → 후보별 지표 배열 (비율)
+
+    Returns:
+        {'total_return', 'cagr', 'volatility', 'sharpe', 'max_drawdown'}
+    """
+    years = max(equity.shape[1] - 1, 1) / TRADING_DAYS
+    daily = equity[:, 1:] / equity[:, :-1] - 1
+    volatility = daily.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS) if daily.shape[1] > 1 \
+        else np.zeros(len(equity))
+    cagr = equity[:, -1] ** (1 / years) - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, daily.mean(axis=1) * TRADING_DAYS / volatility, np.nan)
+
+    return {
+        'total_return': equity[:, -1] - 1,
+        'cagr': cagr,
+        'volatility': volatility,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown(equity),
+    }
+
+
+def _curve_indices(length: int, points: int) -> np.ndarray:
+    """모든 후보에 공통으로 쓰는 곡선 표본 인덱스 (첫/마지막 거래일 포함, 균등 간격)"""
+    if length <= points:
+        return np.arange(length)
+    return np.unique(np.linspace(0, length - 1, points).round().astype(int))
+
+
+# ============================================
+# 시뮬레이션
+# ============================================
+
+def weight_matrix(candidates: Dict[str, Dict[str, float]], tickers: List[str]) -> np.ndarray:
+    """
+    후보 {이름: {종목코드: 비중}} → 비중 행렬 (후보 × 종목, 행 합계 1, 시뮬레이션 불가 종목은 제외)
+
+    시뮬레이션 가능한 종목에 비중이 하나도 없는 후보의 행은 모두 0 이다.
+    """
+    positions = {ticker: i for i, ticker in enumerate(tickers)}
+    weights = np.zeros((len(candidates), len(tickers)))
+    for row, allocation in enumerate(candidates.values()):
+        for ticker, weight in allocation.items():
+            if ticker in positions:
+                weights[row, positions[ticker]] = float(weight or 0)
+    return normalize_weights(weights)
+
+
+def simulate_matrix(matrix: ReturnMatrix, candidates: Dict[str, Dict[str, float]],
+                    rebalance: str = 'quarterly', initial_amount: float = 10000000,
+                    curve_points: int = CURVE_POINTS) -> Dict[str, Any]:
+    """
+    맞춰진 가격 행렬로 후보 배분 일괄 시뮬레이션
+
+    Args:
+        matrix: risk_engine.ReturnMatrix (close 사용)
+        candidates: {이름: {종목코드: 비중}} (비중은 백분율/비율 무관, 합계로 정규화)
+        rebalance: REBALANCE_FREQUENCIES 키
+        initial_amount: 초기 투자 금액 (원)
+        curve_points: 자산 곡선 점 개수
+
+    Returns:
+        {
+            'period', 'start', 'end', 'years', 'observations', 'rebalance', 'rebalance_count',
+            'tickers', 'excluded', 'skipped': [비중이 없어 제외된 후보], 'dates': [곡선 날짜],
+            'candidates': [{'name', 'weights', 'final_value', 'metrics', 'equity': [곡선 평가액]}]
+        }
+    """
+    weights = weight_matrix(candidates, matrix.tickers)
+    valid = weights.sum(axis=1) > 0
+    names = [name for name, ok in zip(candidates, valid) if ok]
+    skipped = [name for name, ok in zip(candidates, valid) if not ok]
+    weights = weights[valid]
+
+    points = rebalance_points(matrix.dates, rebalance)
+    equity = simulate_paths(matrix.close, weights, points)
+    metrics = equity_metrics(equity)
+    curve = _curve_indices(len(matrix.dates), curve_points)
+
+    def percent(values: np.ndarray, i: int) -> Optional[float]:
+        value = float(values[i])
+        return round(value * 100, 2) + 0.0 if np.isfinite(value) else None
+
+    results = []
+    for i, name in enumerate(names):
+        sharpe = float(metrics['sharpe'][i])
+        results.append({
+            'name': name,
+            'weights': dict(zip(matrix.tickers, _round_percentages(weights[i]))),
+            'final_value': int(round(initial_amount * equity[i, -1])),
+            'metrics': {
+                'total_return': percent(metrics['total_return'], i),
+                'cagr': percent(metrics['cagr'], i),
+                'volatility': percent(metrics['volatility'], i),
+                'sharpe': round(sharpe, 2) if np.isfinite(sharpe) else None,
+                'max_drawdown': percent(metrics['max_drawdown'], i),
+            },
+            'equity': (equity[i, curve] * initial_amount).round().astype(int).tolist(),
+        })
+
+    return {
+        'period': f"{matrix.dates[0]}~{matrix.dates[-1]}",
+        'start': matrix.dates[0],
+        'end': matrix.dates[-1],
+        'years': round((len(matrix.dates) - 1) / TRADING_DAYS, 1),
+        'observations': len(matrix.dates),
+        'rebalance': rebalance,
+        'rebalance_label': REBALANCE_FREQUENCIES[rebalance][0],
+        'rebalance_count': int(len(points) - 1),
+        'initial_amount': initial_amount,
+        'tickers': matrix.tickers,
+        'excluded': matrix.excluded,
+        'skipped': skipped,
+        'dates': [matrix.dates[i] for i in curve],
+        'candidates': results,
+    }
+
+
+def simulate_portfolios(candidates: Dict[str, Dict[str, float]], years: int = 3,
+                        rebalance: str = 'quarterly', end: str = None,
+                        initial_amount: float = 10000000) -> Optional[Dict[str, Any]]:
+    """
+    후보 배분들의 과거 성과 비교
+
+    Args:
+        candidates: {이름: {종목코드: 비중}} (최대 MAX_CANDIDATES 개)
+        years: 시뮬레이션 기간 (SIMULATION_YEARS 중 하나)
+        rebalance: 리밸런싱 주기 (none / monthly / quarterly / yearly)
+        end: 마지막 거래일 (기본: 최근 거래일)
+        initial_amount: 초기 투자 금액 (원)
+
+    Returns:
+        simulate_matrix 결과 (시뮬레이션 가능한 종목이 없거나 기간이 부족하면 None)
+
+    Raises:
+        ValueError: 기간/리밸런싱 주기/후보 수/종목 수 오류
+
+    Example:
+        >>> result = simulate_portfolios({
+        ...     '균등': {'005930': 50, '055550': 50},
+        ...     '삼성 위주': {'005930': 80, '055550': 20},
+        ... }, years=3, rebalance='quarterly')
+        >>> for candidate in result['candidates']:
+        ...     print(candidate['name'], candidate['metrics']['cagr'], candidate['metrics']['max_drawdown'])
+    """
+    if years not in SIMULATION_YEARS:
+        raise ValueError(f"시뮬레이션 기간은 {SIMULATION_YEARS}년 중 하나여야 합니다: {years}")
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise ValueError(f"지원하지 않는 리밸런싱 주기: {rebalance}")
+    if not candidates or len(candidates) > MAX_CANDIDATES:
+        raise ValueError(f"후보 배분은 1~{MAX_CANDIDATES}개여야 합니다: {len(candidates or {})}")
+
+    tickers = sorted({ticker for allocation in candidates.values() for ticker in allocation})
+    if len(tickers) > MAX_TICKERS:
+        raise ValueError(f"후보 배분 전체 종목은 최대 {MAX_TICKERS}개입니다: {len(tickers)}")
+    matrix = load_returns(tickers, end, years * TRADING_DAYS)
+    if len(matrix) == 0 or len(matrix.dates) < 2:
+        print(f"[Simulator] 시뮬레이션 가능 종목/기간 부족: {len(matrix)}개 종목, {len(matrix.dates)}일")
+        return None
+
+    result = simulate_matrix(matrix, candidates, rebalance, initial_amount)
+    if not result['candidates']:
+        return None
+    print(f"[Simulator] {len(candidates)}개 후보 × {len(matrix)}개 종목 × {len(matrix.dates)}일 "
+          f"({result['period']}, {result['rebalance_label']} 리밸런싱)")
+    return result
+
+
+if __name__ == "__main__":
+    result = simulate_portfolios({
+        '균등 비중': {'005930': 1, '000660': 1, '055550': 1, '035420': 1},
+        '반도체 집중': {'005930': 40, '000660': 40, '055550': 10, '035420': 10},
+        '금융 집중': {'005930': 20, '000660': 10, '055550': 60, '035420': 10},
+    }, years=3, rebalance='quarterly')
+    if result:
+        print(f"기간: {result['period']} ({result['years']}년, 리밸런싱 {result['rebalance_count']}회)")
+        for candidate in result['candidates']:
+            print(f"  {candidate['name']}: 최종 {candidate['final_value']:,}원, {candidate['metrics']}")
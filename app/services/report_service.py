@@ -6,6 +6,7 @@ GPT-4o에 전송하고 구조화된 분석 보고서를 생성
 """
 
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from pathlib import Path
@@ -25,23 +26,39 @@ from app.services.krx.stock_service import (
     get_valuation,
     calculate_rsi,
     calculate_mfi,
-    get_price_history
+    get_price_history,
+    get_risk_metrics
 )
+from app.services.krx.backtest import get_signal_quality
+from app.services.krx.krx_pool import krx_budget
+from app.services.krx.investor_flow import get_investor_flow
+from app.services.krx.sector_stats import get_sector_valuation, record_induty_code
+from app.services.krx.valuation_history import get_valuation_band
 
 # Naver 뉴스 서비스
 from app.services.naver.news_service import search_company_news
 
 # DART 서비스
 from app.services.dart.get_company import get_company_info
-from app.services.dart.get_financial_index import fetch_all_financial_index
-from app.services.dart.get_financials import fetch_financials_auto
+from app.services.dart.get_financial_index import INDEX_CODES, fetch_financial_index
+from app.services.dart.get_financials import fetch_financials
 from app.services.dart.get_dividend import get_dividend_info as fetch_dividend
 from app.services.dart.get_disclosure_list import get_regular_reports as fetch_disclosure_list
 from app.services.dart.get_stock_info import get_stock_total_qty
+from app.services.dart.ratio_store import save_ratios
 
 # OpenAI 서비스
 from app.services.openai.analysis_service import chat_completion_json
 
+from app.utils.task_graph import TaskGraph
+
+
+# 보고서 1건의 KRX 조회 시간 예산 (초) - 초과 시 남은 KRX 항목은 생략
+KRX_COLLECT_BUDGET = 20
+
+# 보고서 1건의 DART 동시 호출 수
+DART_MAX_PARALLEL = 6
+
 
 def collect_all_data(
     company_name: str,
@@ -78,84 +95,137 @@ def collect_all_data(
     # ============================================
     # 1. KRX 주가 데이터 수집
     # ============================================
-    try:
-        # 현재가
-        current = get_current_price(ticker)
-        if current:
-            result["krx"]["current_price"] = current.to_dict()
-        
-        # 종합 요약
-        summary = get_stock_summary(ticker)
-        if summary:
-            result["krx"]["summary"] = summary.to_dict()
-        
-        # 1년 추이
-        yearly = get_yearly_trend(ticker)
-        if yearly:
-            result["krx"]["yearly_trend"] = yearly
-        
-        # 이동평균
-        ma = get_moving_averages(ticker)
-        if ma:
-            result["krx"]["moving_averages"] = ma
-        
-        # 거래량
-        volume = get_volume_trend(ticker, days=60)
-        if volume:
-            result["krx"]["volume_trend"] = {
-                "avg_volume": volume.get("avg_volume"),
-                "latest_volume": volume.get("latest_volume"),
-                "volume_surge": volume.get("volume_surge")
-            }
+    # KRX가 느려지면 예산 안에서 받은 데이터만으로 부분 결과 구성
+    with krx_budget(KRX_COLLECT_BUDGET) as budget:
+        try:
+            # 현재가
+            current = get_current_price(ticker)
+            if current:
+                result["krx"]["current_price"] = current.to_dict()
         
-        # 밸류에이션
-        valuation = get_valuation(ticker)
-        if valuation:
-            result["krx"]["valuation"] = valuation
-        
-        # RSI
-        rsi = calculate_rsi(ticker)
-        if rsi:
-            result["krx"]["rsi"] = rsi
-        
-        # MFI
-        mfi = calculate_mfi(ticker)
-        if mfi:
-            result["krx"]["mfi"] = mfi
-        
-        # 1년 가격 히스토리 (차트용)
-        history = get_price_history(ticker, days=365)
-        if history:
-            result["krx"]["price_history"] = [
-                {"date": h.date, "close": h.close, "volume": h.volume}
-                for h in history
-            ]
+            # 종합 요약
+            summary = get_stock_summary(ticker)
+            if summary:
+                result["krx"]["summary"] = summary.to_dict()
+        
+            # 1년 추이
+            yearly = get_yearly_trend(ticker)
+            if yearly:
+                result["krx"]["yearly_trend"] = yearly
+        
+            # 이동평균
+            ma = get_moving_averages(ticker)
+            if ma:
+                result["krx"]["moving_averages"] = ma
+        
+            # 거래량
+            volume = get_volume_trend(ticker, days=60)
+            if volume:
+                result["krx"]["volume_trend"] = {
+                    "avg_volume": volume.get("avg_volume"),
+                    "latest_volume": volume.get("latest_volume"),
+                    "volume_surge": volume.get("volume_surge")
+                }
+        
+            # 밸류에이션
+            valuation = get_valuation(ticker)
+            if valuation:
+                result["krx"]["valuation"] = valuation
+        
+            # 업종 비교 (일별 업종 통계)
+            sector_valuation = get_sector_valuation(ticker)
+            if sector_valuation:
+                result["krx"]["sector_valuation"] = sector_valuation
+        
+            # 과거 PER/PBR 밴드 (주간 이력, 최근 5년)
+            valuation_band = get_valuation_band(ticker)
+            if valuation_band:
+                result["krx"]["valuation_band"] = valuation_band
+        
+            # RSI
+            rsi = calculate_rsi(ticker)
+            if rsi:
+                result["krx"]["rsi"] = rsi
+        
+            # MFI
+            mfi = calculate_mfi(ticker)
+            if mfi:
+                result["krx"]["mfi"] = mfi
+        
+            # 시장 대비 위험 지표 (베타, 변동성, 낙폭, 상대강도 - 일별 계산 결과)
+            market_risk = get_risk_metrics(ticker)
+            if market_risk:
+                result["krx"]["market_risk"] = market_risk
+        
+            # 투자자별 수급 (외국인/기관/개인 누적 순매수 - 일별 집계 결과)
+            investor_flow = get_investor_flow(ticker)
+            if investor_flow:
+                result["krx"]["investor_flow"] = investor_flow
+        
+            # 현재 발생한 신호의 과거 성과 (시장 전체 백테스트)
+            signal_quality = get_signal_quality(active_signals(result["krx"]))
+            if signal_quality:
+                result["krx"]["signal_quality"] = signal_quality
+        
+            # 1년 가격 히스토리 (차트용)
+            history = get_price_history(ticker, days=365)
+            if history:
+                result["krx"]["price_history"] = history.to_records(["date", "close", "volume"])
             
-    except Exception as e:
-        result["errors"].append(f"KRX 데이터 수집 오류: {str(e)}")
+        except Exception as e:
+            result["errors"].append(f"KRX 데이터 수집 오류: {str(e)}")
+    if budget.failures:
+        result["errors"].append(
+            f"KRX 응답 지연으로 일부 주가 데이터 생략: {', '.join(sorted(set(budget.failures)))}"
+        )
     
     # ============================================
     # 2. DART 공시/재무 데이터 수집
     # ============================================
     if corp_code:  # corp_code가 있는 경우에만 DART 데이터 수집
+        # 서로 독립인 DART 호출은 동시에, 개별재무제표는 연결재무제표가 없을 때만 조회
+        graph = TaskGraph(max_workers=DART_MAX_PARALLEL)
+        graph.add("company_info", get_company_info, corp_code)
+        for code in INDEX_CODES:
+            graph.add(code, fetch_financial_index, corp_code, year, "11011", code)
+        graph.add("financials_cfs", fetch_financials, corp_code, year, "11011", "CFS")
+        graph.add("financials_ofs", fetch_financials, corp_code, year, "11011", "OFS",
+                  after=["financials_cfs"], when=lambda r: not r["financials_cfs"])
+        graph.add("dividend", fetch_dividend, corp_code, year, "11011")
+        graph.add("disclosures", fetch_disclosure_list, corp_code)
+        
+        # 주식의 총수 현황 (BPS 계산용, KRX 스냅샷에 상장주식수가 있으면 생략)
+        skip_stock_info = bool(result["krx"].get("summary", {}).get("listed_shares"))
+        if not skip_stock_info:
+            graph.add("stock_info", get_stock_total_qty, corp_code, year, "11011")
+        
+        started = time.time()
+        dart = graph.run()
+        print(f"[DART] {len(dart) - len(graph.skipped)}건 동시 조회 완료 ({time.time() - started:.2f}초, "
+              f"최장 {max(graph.elapsed.values(), default=0):.2f}초)")
+        for name, error in graph.errors.items():
+            result["errors"].append(f"DART 데이터 수집 오류 ({name}): {str(error)}")
+        
         try:
             # 기업 개황
-            company_info = get_company_info(corp_code)
+            company_info = dart["company_info"]
             if company_info:
                 # 업종코드를 업종명으로 변환
                 induty_code = company_info.get('induty_code', '')
                 if induty_code:
                     from app.utils.industry_mapper import get_industry_fast
                     company_info['induty_name'] = get_industry_fast(induty_code)
+                    record_induty_code(ticker, induty_code)
                 result["dart"]["company_info"] = company_info
             
             # 주요 재무지표 (수익성, 안정성, 성장성, 활동성)
-            financial_index = fetch_all_financial_index(corp_code, year, "11011")
+            financial_index = {name: dart[code] for code, name in INDEX_CODES.items() if dart[code]}
             if financial_index:
                 result["dart"]["financial_index"] = financial_index
             
-            # 전체 재무제표
-            financials, fs_type = fetch_financials_auto(corp_code, year, "11011")
+            # 전체 재무제표 (연결 우선, 없으면 개별)
+            financials = dart["financials_cfs"] or dart["financials_ofs"]
+            fs_type = "CFS" if dart["financials_cfs"] else "OFS"
             if financials:
                 # 주요 계정만 추출
                 key_accounts = extract_key_accounts(financials)
@@ -166,20 +236,23 @@ def collect_all_data(
                 }
             
             # 배당 정보
-            dividend = fetch_dividend(corp_code, year, "11011")
+            dividend = dart["dividend"]
             if dividend:
                 result["dart"]["dividend"] = dividend
             
-            # 주식의 총수 현황 (BPS 계산용)
-            stock_info = get_stock_total_qty(corp_code, year, "11011")
-            if stock_info:
-                result["dart"]["stock_info"] = stock_info
-                print(f"[DART] 주식수 조회 완료: {stock_info.get('total_shares')}")
+            # 주식의 총수 현황
+            if skip_stock_info:
+                print(f"[DART] 주식수 조회 생략 (KRX 상장주식수 사용)")
             else:
-                print(f"[DART] 주식수 조회 실패")
+                stock_info = dart["stock_info"]
+                if stock_info:
+                    result["dart"]["stock_info"] = stock_info
+                    print(f"[DART] 주식수 조회 완료: {stock_info.get('total_shares')}")
+                else:
+                    print(f"[DART] 주식수 조회 실패")
             
             # 최근 공시 목록
-            disclosures = fetch_disclosure_list(corp_code)
+            disclosures = dart["disclosures"]
             if disclosures:
                 result["dart"]["disclosures"] = disclosures[:10]  # 최근 10개
                 
@@ -221,6 +294,25 @@ def collect_all_data(
     return result
 
 
+def active_signals(krx_data: Dict[str, Any]) -> List[str]:
+    """KRX 지표 결과에서 현재 발생한 신호 이름 추출 (backtest.SIGNALS 기준)"""
+    signals = []
+    for label in krx_data.get("moving_averages", {}).get("signals", []):
+        if label.startswith("골든크로스"):
+            signals.append("golden_cross")
+        elif label.startswith("데드크로스"):
+            signals.append("dead_cross")
+    
+    for name in ("rsi", "mfi"):
+        label = krx_data.get(name, {}).get("signal")
+        if label == "과매도":
+            signals.append(f"{name}_oversold")
+        elif label == "과매수":
+            signals.append(f"{name}_overbought")
+    
+    return signals
+
+
 def extract_key_accounts(financials: List[Dict]) -> Dict[str, Any]:
     """재무제표에서 주요 계정 추출"""
     key_items = [
@@ -380,6 +472,11 @@ def enrich_financial_data(result: Dict[str, Any]) -> Dict[str, Any]:
         if "calculated_ratios" not in dart_data:
             dart_data["calculated_ratios"] = calculated_ratios
         
+        # 스크리너용 재무비율 저장소에 기록
+        financials_meta = dart_data["financials"]
+        save_ratios(result.get("corp_code"), result.get("ticker"),
+                    financials_meta.get("year"), financials_meta.get("type"), calculated_ratios)
+        
         # ROA가 없으면 계산된 값 사용
         if calculated_ratios.get("ROA") is not None:
             if not dart_data.get("financial_index", {}).get("profitability", {}).get("ROA"):
@@ -489,9 +586,11 @@ def enrich_financial_data(result: Dict[str, Any]) -> Dict[str, Any]:
         market_cap = summary.get("market_cap") if summary else None
         print(f"[BPS 계산] 시가총액: {market_cap}")
         
-        # 발행주식수 계산 방법 1: 시가총액 / 현재가
-        shares = None
-        if market_cap and current_price > 0:
+        # 발행주식수 계산 방법 1: KRX 스냅샷 상장주식수, 없으면 시가총액 / 현재가
+        shares = summary.get("listed_shares") if summary else None
+        if shares:
+            print(f"[BPS 계산] 주식수 (KRX 상장주식수): {shares:,.0f}")
+        elif market_cap and current_price > 0:
             shares = market_cap / current_price
             print(f"[BPS 계산] 주식수 (시가총액/현재가): {shares:,.0f}")
         
@@ -593,11 +692,15 @@ def request_ai_analysis(all_data: Dict[str, Any]) -> Optional[Dict]:
 2. 뉴스/시장 심리는 참고 자료로 활용
 3. 상세 평가는 최소 5문장 이상으로 충분히 설명
 4. 모든 판단에는 구체적인 근거 수치를 명시
+5. 기술적 신호는 제공된 "신호 검증" 백테스트 적중률/수익률을 근거로 신뢰도를 평가
+6. 리스크와 기술적 분석에는 "시장 대비 위험"의 베타, 변동성, 최대낙폭, 상대강도를 지수와 비교하여 인용
+7. 시장 심리 평가에는 "투자자별 수급"의 외국인/기관 누적 순매수와 연속 순매수일을 시장 전체 수급과 비교하여 인용
 
 ## ⚠️ 적정주가 산정 규칙 (필수 준수)
 적정주가는 반드시 아래 공식으로 계산한 "원" 단위 금액을 반환하세요:
 - 일반기업: 적정주가 = EPS × 업종평균PER (예: EPS 5,000원 × PER 12배 = 60,000원)
 - 금융업: 적정주가 = BPS × 업종평균PBR (예: BPS 100,000원 × PBR 0.8배 = 80,000원)
+- 업종평균PER/PBR은 제공된 "업종 비교" 데이터의 업종 중앙값을 사용 (없는 경우에만 추정)
 
 ❌ 잘못된 예: 0.8, 5, 12 (이것은 배수이지 주가가 아닙니다)
 ✅ 올바른 예: 80000, 95000, 120000 (이것이 원 단위 적정주가입니다)
@@ -650,7 +753,7 @@ def request_ai_analysis(all_data: Dict[str, Any]) -> Optional[Dict]:
         "재무건전성": "상세 분석 (최소 5문장). 부채비율, 유동비율, 당좌비율, 자기자본비율, 이자보상배율 등 각 지표의 수치와 적정 기준 대비 평가를 구체적으로 서술. 현금흐름 상태와 재무구조의 안정성 판단.",
         "성장성": "상세 분석 (최소 5문장). 최근 3년간 매출/영업이익/순이익 성장률 추이, CAGR, 업종 대비 성장 속도, 향후 성장 전망, 성장 드라이버 분석.",
         "수익성": "상세 분석 (최소 5문장). ROE, ROA, 영업이익률, 순이익률의 수치와 업종 평균 대비 수준, 수익성 추세 분석, 원가 구조와 마진 분석.",
-        "시장평가": "상세 분석 (최소 5문장). PER, PBR, EV/EBITDA 등 밸류에이션 지표를 업종 평균/경쟁사 대비 비교, 과거 밸류에이션 밴드 대비 현재 위치, 적정 밸류에이션 수준 제시.",
+        "시장평가": "상세 분석 (최소 5문장). PER, PBR, EV/EBITDA 등 밸류에이션 지표를 업종 평균/경쟁사 대비 비교, 제공된 과거 밸류에이션 밴드의 최저/중앙값/최고 대비 현재 위치(밴드 데이터가 없으면 없다고 명시), 적정 밸류에이션 수준 제시.",
         "기술적분석": "상세 분석 (최소 5문장). RSI, MFI의 현재값과 신호 해석, 이동평균선(5/20/60/120일) 배열과 추세 판단, 52주 고저 대비 현재 위치, 거래량 추이 분석.",
         "뉴스동향": "상세 분석 (최소 5문장). 최근 주요 뉴스의 핵심 내용 요약, 시장 반응 분석, 단기 주가에 미칠 영향 예측, 긍정적/부정적 이슈 구분.",
         "리스크": "주요 리스크 요인 상세 분석 (최소 5문장). 기업 고유 리스크(재무/사업/경영), 산업 리스크, 거시경제 리스크를 구분하여 최소 5가지 이상의 리스크 요인을 구체적으로 설명."
@@ -729,6 +832,7 @@ def validate_fair_price(result: Dict, all_data: Dict) -> Dict:
         krx = all_data.get('krx', {})
         current_price = krx.get('current_price', {}).get('close', 0)
         valuation = krx.get('valuation', {})
+        sector = krx.get('sector_valuation', {})
         
         if not current_price or current_price <= 0:
             print(f"[validate_fair_price] 현재가 없음, 검증 스킵")
@@ -740,6 +844,8 @@ def validate_fair_price(result: Dict, all_data: Dict) -> Dict:
         eps = valuation.get('eps', 0)
         pbr = valuation.get('pbr', 0)
         per = valuation.get('per', 0)
+        sector_pbr = sector.get('pbr', {}).get('median')
+        sector_per = sector.get('per', {}).get('median')
         
         # 적정주가가 현재가의 1% 미만이면 AI가 배수를 주가로 잘못 반환한 것으로 판단
         if fair_price < current_price * 0.01:
@@ -752,6 +858,8 @@ def validate_fair_price(result: Dict, all_data: Dict) -> Dict:
                 # AI가 반환한 값이 PBR 배수일 가능성 (예: 0.85)
                 if fair_price > 0 and fair_price < 10:
                     target_pbr = fair_price
+                elif sector_pbr:
+                    target_pbr = sector_pbr
                 else:
                     target_pbr = 0.8 if pbr and pbr < 1 else 1.0
                 recalculated = bps * target_pbr
@@ -759,7 +867,10 @@ def validate_fair_price(result: Dict, all_data: Dict) -> Dict:
             
             # EPS 기반 계산
             elif eps and eps > 0:
-                target_per = per if per and per > 5 else 10
+                if sector_per:
+                    target_per = sector_per
+                else:
+                    target_per = per if per and per > 5 else 10
                 recalculated = eps * target_per
                 print(f"[validate_fair_price] EPS 기반: {eps:,.0f} × {target_per:.1f} = {recalculated:,.0f}원")
             
@@ -793,6 +904,123 @@ def format_number(value, suffix=""):
         return str(value) if value else 'N/A'
 
 
+def format_sector_valuation(sector: Dict[str, Any]) -> str:
+    """업종 비교 섹션 포맷팅 (업종 중앙값/평균과 업종 내 백분위)"""
+    if not sector:
+        return ""
+
+    labels = {'per': ('PER', '배'), 'pbr': ('PBR', '배'), 'div': ('배당수익률', '%')}
+    lines = [f"\n### 🏭 업종 비교 ({sector.get('sector_name', 'N/A')}, {sector.get('peers', 0)}개 종목, {sector.get('date', '')})"]
+    for metric, (label, unit) in labels.items():
+        stats = sector.get(metric)
+        if not stats:
+            continue
+        percentile = stats.get('percentile')
+        position = f", 업종 내 백분위 {percentile:.0f}" if percentile is not None else ""
+        lines.append(
+            f"- 업종 {label}: 중앙값 {stats['median']}{unit}, 평균 {stats['mean']}{unit} "
+            f"(25~75%: {stats['p25']}~{stats['p75']}{unit}{position})"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def format_valuation_band(band: Dict[str, Any]) -> str:
+    """과거 밸류에이션 밴드 섹션 포맷팅 (주간 PER/PBR 이력의 분포와 현재 위치)"""
+    if not band:
+        return ""
+
+    lines = [f"\n### 📐 과거 밸류에이션 밴드 ({band.get('period', '')}, {band.get('weeks', 0)}주)"]
+    for metric, label in (('per', 'PER'), ('pbr', 'PBR')):
+        stats = band.get(metric)
+        if not stats:
+            continue
+        current = f"{stats['current']}배" if stats.get('current') is not None else "N/A"
+        percentile = stats.get('percentile')
+        position = f"밴드 내 백분위 {percentile:.0f}, {stats.get('position')}" if percentile is not None else "현재값 없음"
+        lines.append(
+            f"- {label}: 현재 {current} / 최저 {stats['min']}배, "
+            f"중앙값 {stats['median']}배, 최고 {stats['max']}배 "
+            f"(10~90%: {stats['p10']}~{stats['p90']}배, {position})"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def format_signal_quality(quality: Dict[str, Any]) -> str:
+    """신호 검증 섹션 포맷팅 (현재 신호의 과거 시장 전체 성과)"""
+    if not quality:
+        return ""
+
+    horizon = quality.get('horizon')
+    baseline = quality.get('baseline', {})
+    sessions = f"{quality['sessions']}거래일, " if quality.get('sessions') else ""
+    lines = [
+        f"\n### 🧪 신호 검증 ({quality.get('period', '')}, {sessions}{quality.get('tickers', 0)}개 종목 백테스트, {horizon}거래일 후)",
+        f"- 전체 평균: 수익률 {baseline.get('avg_return', 'N/A')}%, 상승 비율 {baseline.get('hit_rate', 'N/A')}%"
+    ]
+    for stats in quality.get('signals', {}).values():
+        if not stats.get('count'):
+            continue
+        lines.append(
+            f"- {stats['label']}: {stats['count']:,}건, 적중률 {stats['hit_rate']}%, "
+            f"평균 수익률 {stats['avg_return']}%, 평균 최대 역행폭 {stats['avg_drawdown']}%"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def format_market_risk(risk: Dict[str, Any]) -> str:
+    """시장 대비 위험 섹션 포맷팅 (소속 시장 지수와 비교)"""
+    if not risk:
+        return ""
+
+    market = risk.get('market', 'KOSPI')
+    index = risk.get('index', {})
+
+    def value(data: Dict[str, Any], key: str, unit: str = "%") -> str:
+        v = data.get(key)
+        return f"{v}{unit}" if v is not None else "N/A"
+
+    lines = [
+        f"\n### ⚖️ 시장 대비 위험 ({market} 기준, {risk.get('period', '')})",
+        f"- 베타: {value(risk, 'beta', '')} ({risk.get('beta_signal', 'N/A')}), 지수 상관계수 {value(risk, 'correlation', '')}",
+        f"- 연 변동성: 60일 {value(risk, 'volatility_60')} / 250일 {value(risk, 'volatility_250')} "
+        f"(지수 {value(index, 'volatility_60')} / {value(index, 'volatility_250')})",
+        f"- 최대낙폭(1년): {value(risk, 'max_drawdown')} (지수 {value(index, 'max_drawdown')})",
+        f"- 상대강도: 20일 {value(risk, 'relative_strength_20')}, 60일 {value(risk, 'relative_strength_60')}, "
+        f"250일 {value(risk, 'relative_strength_250')} ({risk.get('relative_signal', 'N/A')})",
+        f"- RS 등급(1년 수익률 시장 내 백분위): {value(risk, 'rs_rating', '')}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def format_investor_flow(flow: Dict[str, Any]) -> str:
+    """투자자별 수급 섹션 포맷팅 (기간별 누적 순매수와 소속 시장 전체 수급)"""
+    if not flow:
+        return ""
+
+    unit = flow.get('unit', '억원')
+    market_flow = flow.get('market_flow', {})
+
+    def amount(data: Dict[str, Any], key: str) -> str:
+        v = data.get(key)
+        return f"{v:+,.1f}{unit}" if v is not None else "N/A"
+
+    lines = [f"\n### 👥 투자자별 수급 ({flow.get('market', 'KOSPI')}, {flow.get('period', '')}, 순매수 기준)"]
+    for key, data in flow.get('investors', {}).items():
+        streak = data.get('streak', 0)
+        run = f"{streak}일 연속 순매수" if streak > 0 else f"{-streak}일 연속 순매도" if streak < 0 else "당일 변화 없음"
+        intensity = data.get('intensity_20')
+        share = f", 20일 시가총액 대비 {intensity:+.3f}%" if intensity is not None else ""
+        lines.append(
+            f"- {data['label']}: 5일 {amount(data, 'net_5')}, 20일 {amount(data, 'net_20')}, "
+            f"60일 {amount(data, 'net_60')} ({run}{share})"
+        )
+    market_parts = [f"{data['label']} {amount(data, 'net_20')}" for data in market_flow.values()]
+    if market_parts:
+        lines.append(f"- 시장 전체 20일: {', '.join(market_parts)}")
+    lines.append(f"- 수급 판단: {flow.get('signal', 'N/A')}")
+    return "\n".join(lines) + "\n"
+
+
 def format_data_for_gpt(all_data: Dict[str, Any]) -> str:
     """GPT 전송용 데이터 포맷팅"""
     
@@ -808,6 +1036,11 @@ def format_data_for_gpt(all_data: Dict[str, Any]) -> str:
     mfi = krx.get("mfi", {})
     ma = krx.get("moving_averages", {})
     yearly = krx.get("yearly_trend", {})
+    sector = krx.get("sector_valuation", {})
+    signal_quality = krx.get("signal_quality", {})
+    market_risk = krx.get("market_risk", {})
+    valuation_band = krx.get("valuation_band", {})
+    investor_flow = krx.get("investor_flow", {})
     
     # DART 데이터
     dart = all_data.get("dart", {})
@@ -856,14 +1089,14 @@ def format_data_for_gpt(all_data: Dict[str, Any]) -> str:
 ### 🔬 기술적 지표
 - RSI(14): {rsi.get('value', 'N/A')} ({rsi.get('signal', 'N/A')})
 - MFI(14): {mfi.get('value', 'N/A')} ({mfi.get('signal', 'N/A')})
-
+{format_signal_quality(signal_quality)}{format_market_risk(market_risk)}{format_investor_flow(investor_flow)}
 ### 💰 밸류에이션
 - PER: {valuation.get('per', 'N/A')}배
 - PBR: {valuation.get('pbr', 'N/A')}배
 - EPS: {eps_val}
 - BPS: {bps_val}
 - 배당수익률: {valuation.get('div_yield', 'N/A')}%
-
+{format_sector_valuation(sector)}{format_valuation_band(valuation_band)}
 ### 🏢 기업 개요
 - 회사명: {company_info.get('corp_name', company_name)}
 - 대표자: {company_info.get('ceo_nm', 'N/A')}
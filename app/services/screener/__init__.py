@@ -0,0 +1,30 @@
+# 종목 스크리너 (시장 전체 지표 기반 조건 검색)
+from app.services.screener.expression import (
+    evaluate,
+    ExpressionError,
+)
+from app.services.screener.technical import (
+    get_technical_screener,
+    screen_technical,
+    TechnicalScreener,
+    PRESETS as TECHNICAL_PRESETS,
+)
+from app.services.screener.fundamental import (
+    get_fundamental_screener,
+    screen_fundamental,
+    FundamentalScreener,
+    PRESETS as FUNDAMENTAL_PRESETS,
+)
+
+__all__ = [
+    'evaluate',
+    'ExpressionError',
+    'get_technical_screener',
+    'screen_technical',
+    'TechnicalScreener',
+    'TECHNICAL_PRESETS',
+    'get_fundamental_screener',
+    'screen_fundamental',
+    'FundamentalScreener',
+    'FUNDAMENTAL_PRESETS',
+]
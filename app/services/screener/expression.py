@@ -0,0 +1,209 @@
+"""
+스크리너 필터 식
+
+문자열 필터 식을 파싱하여 컬럼 배열 전체에 한 번에 적용한다. (eval 미사용)
+
+문법:
+    식      := 또는식
+    또는식  := 그리고식 ('or' 그리고식)*
+    그리고식 := 부정식 ('and' 부정식)*
+    부정식  := 'not' 부정식 | 비교식
+    비교식  := 값 (('<' | '<=' | '>' | '>=' | '==' | '!=') 값)?
+    값      := 컬럼명 | 숫자 | '문자열' | '(' 식 ')'
+
+예:
+    rsi < 30 and volume_surge
+    market == 'KOSDAQ' and (golden_cross or ma_alignment == 1) and not dead_cross
+"""
+
+import re
+from functools import lru_cache, reduce
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+
+Columns = Dict[str, np.ndarray]
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<op><=|>=|==|!=|<|>|\(|\))
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+_COMPARATORS: Dict[str, Callable] = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+_KEYWORDS = {'and', 'or', 'not'}
+
+
+class ExpressionError(ValueError):
+    """필터 식 문법 오류"""
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ExpressionError(f"해석할 수 없는 문자: '{text[pos:].strip()[:10]}' (위치 {pos})")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'name' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """재귀 하강 파서 - 컬럼 딕셔너리를 받아 결과 배열을 돌려주는 함수를 만든다"""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.names: set = set()
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ('end', '')
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _accept(self, kind: str, value: str = None) -> bool:
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self) -> Callable[[Columns], np.ndarray]:
+        if not self.tokens:
+            raise ExpressionError("필터 식이 비어 있습니다.")
+        node = self._or()
+        if self._peek()[0] != 'end':
+            raise ExpressionError(f"예상하지 못한 토큰: '{self._peek()[1]}'")
+        return node
+
+    def _or(self):
+        nodes = [self._and()]
+        while self._accept('keyword', 'or'):
+            nodes.append(self._and())
+        if len(nodes) == 1:
+            return nodes[0]
+        return lambda cols: reduce(np.logical_or, [_as_mask(node(cols)) for node in nodes])
+
+    def _and(self):
+        nodes = [self._not()]
+        while self._accept('keyword', 'and'):
+            nodes.append(self._not())
+        if len(nodes) == 1:
+            return nodes[0]
+        return lambda cols: reduce(np.logical_and, [_as_mask(node(cols)) for node in nodes])
+
+    def _not(self):
+        if self._accept('keyword', 'not'):
+            node = self._not()
+            return lambda cols: ~_as_mask(node(cols))
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._value()
+        kind, op = self._peek()
+        if kind == 'op' and op in _COMPARATORS:
+            self._take()
+            right = self._value()
+            compare = _COMPARATORS[op]
+
+            def node(cols):
+                with np.errstate(invalid='ignore'):
+                    return np.asarray(compare(left(cols), right(cols)), dtype=bool)
+            return node
+        return left
+
+    def _value(self):
+        kind, value = self._take()
+        if kind == 'number':
+            number = float(value)
+            return lambda cols: number
+        if kind == 'string':
+            text = value[1:-1]
+            return lambda cols: text
+        if kind == 'name':
+            self.names.add(value)
+            return lambda cols: cols[value]
+        if kind == 'op' and value == '(':
+            node = self._or()
+            if not self._accept('op', ')'):
+                raise ExpressionError("닫는 괄호 ')' 가 없습니다.")
+            return node
+        raise ExpressionError(f"값이 와야 할 위치에 '{value or '식 끝'}'")
+
+
+def _as_mask(values) -> np.ndarray:
+    """비교 없이 쓰인 컬럼(예: golden_cross)을 불리언 마스크로 변환 (NaN 은 False)"""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    if values.dtype.kind == 'f':
+        return np.nan_to_num(values) != 0
+    return values.astype(bool)
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> Tuple[Callable[[Columns], np.ndarray], frozenset]:
+    """
+    필터 식 컴파일 (같은 식은 캐시된 결과 재사용)
+
+    Returns:
+        (컬럼 딕셔너리 → 불리언 마스크 함수, 사용된 컬럼명 집합)
+
+    Raises:
+        ExpressionError: 문법 오류
+    """
+    parser = _Parser(text)
+    node = parser.parse()
+    return (lambda cols: _as_mask(node(cols))), frozenset(parser.names)
+
+
+def evaluate(text: str, columns: Columns) -> np.ndarray:
+    """
+    필터 식을 컬럼 전체에 적용
+
+    Args:
+        text: 필터 식 (예: "rsi < 30 and volume_surge")
+        columns: 컬럼명 → 1차원 배열 (길이 동일)
+
+    Returns:
+        조건을 만족하는 행의 불리언 마스크
+
+    Raises:
+        ExpressionError: 문법 오류 또는 알 수 없는 컬럼
+
+    Example:
+        >>> mask = evaluate("rsi <= 30", {'rsi': np.array([25.0, 50.0])})
+        >>> mask.tolist()
+        [True, False]
+    """
+    node, names = compile_expression(text.strip())
+    unknown = sorted(names - set(columns))
+    if unknown:
+        raise ExpressionError(f"알 수 없는 컬럼: {', '.join(unknown)} (사용 가능: {', '.join(sorted(columns))})")
+    length = len(next(iter(columns.values()))) if columns else 0
+    try:
+        mask = node(columns)
+    except TypeError as e:
+        raise ExpressionError(f"비교할 수 없는 값의 형식입니다: {e}")
+    return np.broadcast_to(mask, (length,))
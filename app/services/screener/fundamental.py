@@ -0,0 +1,232 @@
+"""
+재무/밸류에이션 스크리너
+
+시장 전체 스냅샷(PER/PBR/배당 등)과 기업별 재무비율 저장소(ROE/부채비율/영업이익률 등)를
+종목 순서의 컬럼 배열 하나로 합쳐 메모리에 두고, 컬럼별 정렬 순서(argsort)를 미리 계산한다.
+조회는 필터 마스크 계산과 미리 정렬된 순서에서 고르기뿐이라 외부 호출과 정렬 비용이 없다.
+
+사용 가능한 컬럼:
+    close, change_rate, market_cap, per, pbr, eps, bps, div, dps,
+    roe, roa, debt_ratio, equity_ratio, current_ratio, quick_ratio,
+    interest_coverage, operating_margin, net_margin, asset_turnover,
+    market ('KOSPI' / 'KOSDAQ'), sector (업종명)
+
+PER/PBR 이 0 이하(적자/자본잠식)인 종목은 결측으로 처리한다.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.services.dart.ratio_store import RATIO_COLUMNS, get_ratios_by_ticker, ratio_store_mtime
+from app.services.krx.market_snapshot import MarketSnapshot, get_market_snapshot, latest_snapshot_date
+from app.services.krx.ticker_index import get_ticker_index
+from app.services.screener.expression import ExpressionError, evaluate
+
+
+# 스냅샷에서 가져오는 컬럼
+SNAPSHOT_COLUMNS = ['close', 'change_rate', 'market_cap', 'per', 'pbr', 'eps', 'bps', 'div', 'dps']
+
+# 자주 쓰는 조건
+PRESETS = {
+    'value': 'per < 10 and pbr < 1',
+    'dividend': 'div >= 4',
+    'quality': 'roe >= 15 and debt_ratio < 100',
+    'profitable_growth': 'operating_margin >= 15 and roe >= 10',
+    'low_pbr_high_roe': 'pbr < 1 and roe >= 10',
+    'safe': 'debt_ratio < 50 and current_ratio >= 200',
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_screener: Optional["FundamentalScreener"] = None
+_screener_lock = threading.Lock()
+
+
+class FundamentalScreener:
+    """
+    종목 × 재무/밸류에이션 컬럼 테이블 (정렬 순서 사전 계산)
+
+    Example:
+        >>> screener = get_fundamental_screener()
+        >>> result = screener.screen("per < 10 and roe >= 15", sort="roe", ascending=False)
+        >>> print(result['total'], result['items'][:3])
+    """
+
+    def __init__(self, snapshot: MarketSnapshot, sector_stats: Dict[str, Any] = None):
+        self.date = snapshot.date
+        self.key = self.source_key(snapshot, sector_stats)
+
+        tickers = snapshot.columns['ticker'].astype(str)
+        index = get_ticker_index()
+        self.tickers = tickers
+        self.names = np.array([getattr(index.get(t), 'name', '') or t for t in tickers.tolist()])
+
+        columns: Dict[str, np.ndarray] = {
+            name: snapshot.columns[name].astype(float) for name in SNAPSHOT_COLUMNS
+        }
+        for name in ('per', 'pbr'):
+            columns[name] = np.where(columns[name] > 0, columns[name], np.nan)
+
+        # 재무비율 (corp_code 별 저장소 → 종목 순서)
+        ratios = get_ratios_by_ticker()
+        position = {t: i for i, t in enumerate(tickers.tolist())}
+        for source, name in RATIO_COLUMNS.items():
+            columns[name] = np.full(len(tickers), np.nan)
+        self.ratio_years = np.full(len(tickers), '', dtype='U4')
+        for ticker, entry in ratios.items():
+            pos = position.get(ticker)
+            if pos is None:
+                continue
+            self.ratio_years[pos] = entry.get('year', '')
+            for source, name in RATIO_COLUMNS.items():
+                value = entry.get('ratios', {}).get(source)
+                if value is not None:
+                    columns[name][pos] = value
+
+        columns['market'] = snapshot.columns['market'].astype(str)
+        columns['sector'] = self._sectors(tickers, sector_stats)
+        self.columns = columns
+
+        # 정렬 키 사전 계산 (결측값은 양방향 모두 뒤)
+        self._ascending: Dict[str, np.ndarray] = {}
+        self._descending: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            if values.dtype.kind == 'f':
+                self._ascending[name] = np.argsort(values, kind='stable')
+                self._descending[name] = np.argsort(-values, kind='stable')
+
+    @staticmethod
+    def source_key(snapshot: MarketSnapshot, sector_stats: Dict[str, Any] = None) -> Tuple:
+        """원천 데이터 식별자 (바뀌면 테이블 재구성)"""
+        return (snapshot.date, snapshot.built_at, ratio_store_mtime(),
+                sector_stats.get('date') if sector_stats else None)
+
+    @staticmethod
+    def _sectors(tickers: np.ndarray, sector_stats: Dict[str, Any] = None) -> np.ndarray:
+        if not sector_stats:
+            return np.full(len(tickers), '', dtype='U1')
+        groups = sector_stats.get('groups', {})
+        members = sector_stats.get('tickers', {})
+        return np.array([
+            groups.get(members.get(t, {}).get('group'), {}).get('name', '') for t in tickers.tolist()
+        ])
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def _item(self, pos: int) -> Dict[str, Any]:
+        item = {'ticker': str(self.tickers[pos]), 'name': str(self.names[pos])}
+        for name, values in self.columns.items():
+            value = values[pos]
+            if isinstance(value, np.floating):
+                item[name] = None if np.isnan(value) else round(float(value), 2)
+            else:
+                item[name] = str(value)
+        item['ratio_year'] = str(self.ratio_years[pos]) or None
+        return item
+
+    def screen(self, expression: str, market: str = None, sort: str = 'market_cap', ascending: bool = False,
+               page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        필터 식 적용
+
+        Args:
+            expression: 필터 식 또는 PRESETS 이름 (예: "per < 10 and roe >= 15", "value")
+            market: 시장 제한 (KOSPI / KOSDAQ)
+            sort: 정렬 컬럼 (숫자 컬럼, 결측값은 항상 뒤)
+            ascending: 오름차순 여부
+            page: 페이지 번호 (1부터)
+            page_size: 페이지 크기 (최대 MAX_PAGE_SIZE)
+
+        Returns:
+            {'date', 'expression', 'total', 'page', 'page_size', 'items': [...]}
+
+        Raises:
+            ExpressionError: 필터 식 또는 정렬 컬럼 오류
+        """
+        expression = PRESETS.get(expression, expression)
+        mask = evaluate(expression, self.columns)
+        if market:
+            mask = mask & (self.columns['market'] == market.upper())
+
+        orders = self._ascending if ascending else self._descending
+        if sort not in orders:
+            raise ExpressionError(f"정렬할 수 없는 컬럼: {sort}")
+
+        order = orders[sort]
+        matched = order[mask[order]]
+
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        start = (page - 1) * page_size
+
+        return {
+            'date': self.date,
+            'expression': expression,
+            'total': int(len(matched)),
+            'page': page,
+            'page_size': page_size,
+            'items': [self._item(pos) for pos in matched[start:start + page_size]],
+        }
+
+
+def get_fundamental_screener(date: str = None) -> Optional[FundamentalScreener]:
+    """
+    재무/밸류에이션 스크리너 (스냅샷, 재무비율 저장소, 업종 통계가 바뀌었을 때만 재구성)
+
+    Args:
+        date: 기준 거래일 (기본: 최근 거래일)
+    """
+    global _screener
+
+    from app.services.krx.sector_stats import get_sector_stats
+
+    # 요청 중 KRX 조회 없이 저장된 스냅샷만 사용 (오늘 스냅샷이 아직 없으면 가장 최근 저장본)
+    snapshot = get_market_snapshot(date, build=False)
+    if snapshot is None and date is None:
+        latest = latest_snapshot_date()
+        snapshot = get_market_snapshot(latest, build=False) if latest else None
+    if snapshot is None:
+        return None
+    sector_stats = get_sector_stats(snapshot.date, build=False)
+
+    with _screener_lock:
+        if _screener is None or _screener.key != FundamentalScreener.source_key(snapshot, sector_stats):
+            started = time.time()
+            _screener = FundamentalScreener(snapshot, sector_stats)
+            print(f"[Screener] 재무 지표 테이블 구성: {len(_screener)}개 종목 ({time.time() - started:.2f}초)")
+        return _screener
+
+
+def screen_fundamental(expression: str, market: str = None, sort: str = 'market_cap', ascending: bool = False,
+                       page: int = 1, page_size: int = DEFAULT_PAGE_SIZE, date: str = None) -> Dict[str, Any]:
+    """
+    시장 전체 재무/밸류에이션 스크리닝
+
+    Returns:
+        FundamentalScreener.screen 결과 (스냅샷이 없으면 빈 딕셔너리)
+
+    Raises:
+        ExpressionError: 필터 식 오류
+
+    Example:
+        >>> result = screen_fundamental("pbr < 1 and roe >= 10", sort="pbr", ascending=True)
+        >>> for item in result['items']:
+        ...     print(item['ticker'], item['name'], item['pbr'], item['roe'])
+    """
+    screener = get_fundamental_screener(date)
+    if screener is None:
+        return {}
+    return screener.screen(expression, market=market, sort=sort, ascending=ascending,
+                           page=page, page_size=page_size)
+
+
+if __name__ == "__main__":
+    result = screen_fundamental("value", sort="pbr", ascending=True, page_size=10)
+    print(f"{result.get('date')} 조건 충족: {result.get('total')}개")
+    for item in result.get('items', []):
+        print(f"  {item['ticker']} {item['name']} PER {item['per']} PBR {item['pbr']} ROE {item['roe']}")
@@ -0,0 +1,203 @@
+"""
+기술적 지표 스크리너
+
+시장 전체 지표 패널(indicator_engine)의 마지막 거래일 값을 컬럼 배열로 메모리에 올려 두고
+필터 식을 한 번에 적용한다. 종목별 calculate_rsi / get_volume_trend 호출이 없다.
+
+사용 가능한 컬럼:
+    close, change_rate, ma5, ma20, ma60, ma120, vol_ma5, vol_ma20, rsi, mfi,
+    golden_cross, dead_cross, volume_surge (bool),
+    trend (1 상승 / 0 횡보 / -1 하락), ma_alignment (1 정배열 / 0 혼조 / -1 역배열),
+    market ('KOSPI' / 'KOSDAQ')
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.services.krx.indicator_engine import IndicatorPanel, get_indicator_panel, latest_panel_date
+from app.services.krx.ticker_index import get_ticker_index
+from app.services.screener.expression import ExpressionError, evaluate
+
+
+# 패널에서 가져오는 지표
+PANEL_COLUMNS = [
+    'close', 'change_rate', 'ma5', 'ma20', 'ma60', 'ma120', 'vol_ma5', 'vol_ma20',
+    'rsi', 'mfi', 'golden_cross', 'dead_cross', 'volume_surge', 'trend',
+]
+
+# 자주 쓰는 조건
+PRESETS = {
+    'oversold': 'rsi <= 30',
+    'overbought': 'rsi >= 70',
+    'golden_cross': 'golden_cross',
+    'dead_cross': 'dead_cross',
+    'volume_surge': 'volume_surge',
+    'oversold_volume_surge': 'rsi < 30 and volume_surge',
+    'bullish_alignment': 'ma_alignment == 1',
+    'bearish_alignment': 'ma_alignment == -1',
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_screener: Optional["TechnicalScreener"] = None
+_screener_lock = threading.Lock()
+
+
+def _ma_alignment(ma5: np.ndarray, ma20: np.ndarray, ma60: np.ndarray, ma120: np.ndarray) -> np.ndarray:
+    """이동평균 배열 (정배열: 5 > 20 > 60 > 120 이면 1, 역배열이면 -1, 그 외 0)"""
+    alignment = np.zeros(len(ma5), dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        alignment[(ma5 > ma20) & (ma20 > ma60) & (ma60 > ma120)] = 1
+        alignment[(ma5 < ma20) & (ma20 < ma60) & (ma60 < ma120)] = -1
+    return alignment
+
+
+class TechnicalScreener:
+    """
+    마지막 거래일 기술적 지표 테이블 (컬럼 배열)
+
+    Example:
+        >>> screener = get_technical_screener()
+        >>> result = screener.screen("rsi < 30 and volume_surge", market="KOSDAQ")
+        >>> print(result['total'], result['items'][:3])
+    """
+
+    def __init__(self, panel: IndicatorPanel):
+        self.date = panel.dates[-1] if panel.dates else panel.date
+        self.panel_date = panel.date
+        self.built_at = panel.built_at
+
+        index = get_ticker_index()
+        tickers = panel.tickers.tolist()
+        infos = [index.get(ticker) for ticker in tickers]
+
+        self.columns: Dict[str, np.ndarray] = {name: panel.latest(name) for name in PANEL_COLUMNS}
+        self.columns['ma_alignment'] = _ma_alignment(
+            self.columns['ma5'], self.columns['ma20'], self.columns['ma60'], self.columns['ma120'])
+        self.columns['market'] = np.array([info.market if info else '' for info in infos])
+
+        self.tickers = np.asarray(tickers)
+        self.names = np.array([(info.name if info else '') or ticker for ticker, info in zip(tickers, infos)])
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def _item(self, pos: int) -> Dict[str, Any]:
+        item = {'ticker': str(self.tickers[pos]), 'name': str(self.names[pos])}
+        for name, values in self.columns.items():
+            value = values[pos]
+            if isinstance(value, np.bool_):
+                item[name] = bool(value)
+            elif isinstance(value, np.integer):
+                item[name] = int(value)
+            elif isinstance(value, np.floating):
+                item[name] = None if np.isnan(value) else round(float(value), 2)
+            else:
+                item[name] = str(value)
+        return item
+
+    def screen(self, expression: str, market: str = None, sort: str = 'rsi', ascending: bool = True,
+               page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        필터 식 적용
+
+        Args:
+            expression: 필터 식 또는 PRESETS 이름 (예: "rsi < 30 and volume_surge", "oversold")
+            market: 시장 제한 (KOSPI / KOSDAQ)
+            sort: 정렬 컬럼 (결측값은 항상 뒤)
+            ascending: 오름차순 여부
+            page: 페이지 번호 (1부터)
+            page_size: 페이지 크기 (최대 MAX_PAGE_SIZE)
+
+        Returns:
+            {'date', 'expression', 'total', 'page', 'page_size', 'items': [...]}
+
+        Raises:
+            ExpressionError: 필터 식 또는 정렬 컬럼 오류
+        """
+        expression = PRESETS.get(expression, expression)
+        mask = evaluate(expression, self.columns)
+        if market:
+            mask = mask & (self.columns['market'] == market.upper())
+
+        if sort not in self.columns or sort == 'market':
+            raise ExpressionError(f"정렬할 수 없는 컬럼: {sort}")
+
+        matched = np.flatnonzero(mask)
+        values = self.columns[sort][matched].astype(float)
+        # NaN 은 argsort 에서 항상 마지막
+        order = np.argsort(values if ascending else -values, kind='stable')
+
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        start = (page - 1) * page_size
+        rows = matched[order[start:start + page_size]]
+
+        return {
+            'date': self.date,
+            'expression': expression,
+            'total': int(len(matched)),
+            'page': page,
+            'page_size': page_size,
+            'items': [self._item(pos) for pos in rows],
+        }
+
+
+def get_technical_screener(date: str = None) -> Optional[TechnicalScreener]:
+    """
+    기술적 지표 스크리너 (지표 패널이 바뀌었을 때만 다시 구성)
+
+    Args:
+        date: 기준 거래일 (기본: 최근 거래일)
+    """
+    global _screener
+
+    # 요청 중 계산 없이 저장된 패널만 사용 (오늘 패널이 아직 없으면 가장 최근 저장본)
+    panel = get_indicator_panel(date, build=False)
+    if panel is None and date is None:
+        latest = latest_panel_date()
+        panel = get_indicator_panel(latest, build=False) if latest else None
+    if panel is None:
+        return None
+
+    with _screener_lock:
+        if (_screener is None or _screener.panel_date != panel.date
+                or _screener.built_at != panel.built_at):
+            started = time.time()
+            _screener = TechnicalScreener(panel)
+            print(f"[Screener] 기술적 지표 테이블 구성: {len(_screener)}개 종목 ({time.time() - started:.2f}초)")
+        return _screener
+
+
+def screen_technical(expression: str, market: str = None, sort: str = 'rsi', ascending: bool = True,
+                     page: int = 1, page_size: int = DEFAULT_PAGE_SIZE, date: str = None) -> Dict[str, Any]:
+    """
+    시장 전체 기술적 지표 스크리닝
+
+    Returns:
+        TechnicalScreener.screen 결과 (지표 패널이 없으면 빈 딕셔너리)
+
+    Raises:
+        ExpressionError: 필터 식 오류
+
+    Example:
+        >>> result = screen_technical("rsi < 30 and volume_surge", market="KOSDAQ")
+        >>> for item in result['items']:
+        ...     print(item['ticker'], item['name'], item['rsi'])
+    """
+    screener = get_technical_screener(date)
+    if screener is None:
+        return {}
+    return screener.screen(expression, market=market, sort=sort, ascending=ascending,
+                           page=page, page_size=page_size)
+
+
+if __name__ == "__main__":
+    result = screen_technical("oversold_volume_surge", page_size=10)
+    print(f"{result.get('date')} 조건 충족: {result.get('total')}개")
+    for item in result.get('items', []):
+        print(f"  {item['ticker']} {item['name']} RSI {item['rsi']} 종가 {item['close']:,.0f}")
@@ -7,6 +7,7 @@ let selectedCompanies = [];
 const MAX_COMPANIES = 10;
 let currentMarket = 'kospi';
 let allocationChart = null;
+let currentAnalysis = null;
 let searchTimeout = null;
 
 document.addEventListener('DOMContentLoaded', function() {
@@ -235,6 +236,7 @@ function displayAnalysisResult(analysis, totalAmount) {
     const resultSection = document.getElementById('portfolioResult');
     if (!resultSection) return;
     
+    currentAnalysis = analysis;
     resultSection.classList.remove('hidden');
     
     // 1. 자산 배분 파이 차트
@@ -404,6 +406,7 @@ async function savePortfolio() {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 companies: selectedCompanies,
+                allocations: currentAnalysis ? currentAnalysis.allocations : [],
                 name: `내 포트폴리오 ${new Date().toLocaleDateString()}`
             })
         });
@@ -1125,10 +1125,11 @@ function createYearlyChart(ctx, priceHistory) {
     const labels = priceHistory.map(p => p.date);
     const prices = priceHistory.map(p => p.close);
     
-    // 이동평균 계산
-    const ma5 = calculateMA(prices, 5);
-    const ma20 = calculateMA(prices, 20);
-    const ma60 = calculateMA(prices, 60);
+    // 이동평균 계산 (저장된 보고서는 축소 전 일별 기준 값이 함께 저장됨)
+    const hasMA = priceHistory.length > 0 && 'ma20' in priceHistory[0];
+    const ma5 = hasMA ? priceHistory.map(p => p.ma5) : calculateMA(prices, 5);
+    const ma20 = hasMA ? priceHistory.map(p => p.ma20) : calculateMA(prices, 20);
+    const ma60 = hasMA ? priceHistory.map(p => p.ma60) : calculateMA(prices, 60);
     
     priceChart = new Chart(ctx, {
         type: 'line',
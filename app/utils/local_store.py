@@ -0,0 +1,103 @@
+"""
+로컬 캐시 파일 유틸리티
+
+KRX/DART 데이터를 디스크에 보관하기 위한 공통 경로 및 원자적 저장 함수
+기본 위치는 프로젝트의 data/cache 이며 KORA_CACHE_DIR 환경 변수로 변경할 수 있다.
+
+여러 워커 프로세스가 키 단위로 동시에 갱신하는 저장소는 connect_sqlite(WAL)를 사용한다.
+"""
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Optional, Sequence
+
+_sqlite_local = threading.local()
+_sqlite_schema_lock = threading.Lock()
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    캐시 디렉터리 경로 반환 (없으면 생성)
+
+    Args:
+        parts: 하위 경로 (예: "krx", "ohlcv")
+
+    Returns:
+        절대 경로
+    """
+    base = os.environ.get('KORA_CACHE_DIR')
+    if not base:
+        base = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'cache')
+
+    path = os.path.abspath(os.path.join(base, *parts))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 교체하여 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 저장"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_json(path: str, data: Any) -> None:
+    """JSON 파일 원자적 저장"""
+    atomic_write_bytes(path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+
+def load_json(path: str) -> Optional[Any]:
+    """JSON 파일 로드 (없거나 손상된 경우 None)"""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[LocalStore] 로드 오류 ({os.path.basename(path)}): {e}")
+        return None
+
+
+def connect_sqlite(path: str, schema: Sequence[str] = ()) -> sqlite3.Connection:
+    """
+    현재 스레드(프로세스)용 SQLite 연결 (WAL, 자동 커밋, fork 후에는 새로 연결)
+
+    Args:
+        path: 데이터베이스 파일 경로
+        schema: 처음 연결할 때 실행할 CREATE ... IF NOT EXISTS 문 목록
+
+    Example:
+        >>> conn = connect_sqlite(path, ["CREATE TABLE IF NOT EXISTS t (k TEXT PRIMARY KEY, v TEXT)"])
+        >>> conn.execute("INSERT INTO t VALUES (?, ?) ON CONFLICT(k) DO UPDATE SET v = excluded.v", ("a", "1"))
+    """
+    connections = getattr(_sqlite_local, 'connections', None)
+    if connections is None or _sqlite_local.pid != os.getpid():
+        connections = _sqlite_local.connections = {}
+        _sqlite_local.pid = os.getpid()
+
+    conn = connections.get(path)
+    if conn is not None:
+        return conn
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    with _sqlite_schema_lock:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in schema:
+            conn.execute(statement)
+
+    connections[path] = conn
+    return conn
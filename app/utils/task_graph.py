@@ -0,0 +1,109 @@
+"""
+작은 작업 그래프 실행기
+
+서로 독립인 I/O 작업(DART API 호출 등)을 제한된 수의 스레드에서 동시에 실행하고,
+다른 작업의 결과에 따라 실행 여부가 정해지는 작업(예: 연결재무제표가 비었을 때만 개별재무제표 조회)은
+선행 작업이 끝난 뒤 조건을 확인하여 등록한다.
+
+작업은 호출 스레드가 조율하므로 작업 안에서 다른 작업을 기다리지 않으며 교착이 생기지 않는다.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class _Task:
+    name: str
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    after: List[str] = field(default_factory=list)
+    when: Optional[Callable[[Dict[str, Any]], bool]] = None
+
+
+class TaskGraph:
+    """
+    의존 관계가 있는 작업 묶음
+
+    Example:
+        >>> graph = TaskGraph(max_workers=4)
+        >>> graph.add("cfs", fetch_financials, corp_code, year, "11011", "CFS")
+        >>> graph.add("ofs", fetch_financials, corp_code, year, "11011", "OFS",
+        ...           after=["cfs"], when=lambda r: not r["cfs"])
+        >>> results = graph.run()
+        >>> print(results["cfs"] or results["ofs"], graph.errors, graph.elapsed)
+    """
+
+    def __init__(self, max_workers: int = 6):
+        self.max_workers = max_workers
+        self._tasks: Dict[str, _Task] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.skipped: List[str] = []
+        self.elapsed: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable, *args, after: List[str] = None,
+            when: Callable[[Dict[str, Any]], bool] = None, **kwargs) -> "TaskGraph":
+        """
+        작업 추가
+
+        Args:
+            name: 작업 이름 (결과 키)
+            fn: 실행할 함수 (args/kwargs 로 호출)
+            after: 먼저 끝나야 하는 작업 이름 목록
+            when: 선행 작업이 끝난 뒤 결과 딕셔너리로 실행 여부 판단 (False면 건너뛰고 결과 None)
+        """
+        if name in self._tasks:
+            raise ValueError(f"중복된 작업 이름: {name}")
+        missing = [dep for dep in (after or []) if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"{name}: 등록되지 않은 선행 작업 {missing}")
+        self._tasks[name] = _Task(name, fn, args, kwargs, list(after or []), when)
+        return self
+
+    def _timed(self, task: _Task) -> Any:
+        started = time.time()
+        try:
+            return task.fn(*task.args, **task.kwargs)
+        finally:
+            self.elapsed[task.name] = round(time.time() - started, 3)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        모든 작업 실행 (실패한 작업은 errors 에 기록하고 결과 None)
+
+        Returns:
+            {작업 이름: 결과}
+        """
+        waiting = dict(self._tasks)
+        running: Dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='task') as executor:
+            while waiting or running:
+                # 선행 작업이 모두 끝난 작업 등록 (조건이 거짓이면 건너뜀)
+                for name, task in list(waiting.items()):
+                    if any(dep not in self.results for dep in task.after):
+                        continue
+                    del waiting[name]
+                    if task.when is not None and not task.when(self.results):
+                        self.results[name] = None
+                        self.skipped.append(name)
+                        continue
+                    running[executor.submit(self._timed, task)] = name
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        self.errors[name] = e
+                        self.results[name] = None
+
+        return self.results